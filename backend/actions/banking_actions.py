@@ -96,71 +96,73 @@ def transfer_funds(
         Dict with transfer result
     """
     try:
-        # Get accounts
-        source_acc = banking_data.get_account(from_account, user_id)
-        dest_acc = banking_data.get_account(to_account, user_id)
+        # Check and update under one lock so concurrent transfers (on any worker) cannot overdraw
+        with banking_data.transaction():
+            # Get accounts
+            source_acc = banking_data.get_account(from_account, user_id)
+            dest_acc = banking_data.get_account(to_account, user_id)
+
+            if not source_acc:
+                return {"success": False, "error": f"Source account '{from_account}' not found"}
+
+            if not dest_acc:
+                return {"success": False, "error": f"Destination account '{to_account}' not found"}
+
+            # Check balance
+            if source_acc["balance"] < amount:
+                return {
+                    "success": False,
+                    "error": "Insufficient funds",
+                    "available": source_acc["balance"],
+                    "requested": amount
+                }
+
+            # Update balances
+            new_source_balance = source_acc["balance"] - amount
+            new_dest_balance = dest_acc["balance"] + amount
+
+            banking_data.update_account_balance(source_acc["id"], new_source_balance)
+            banking_data.update_account_balance(dest_acc["id"], new_dest_balance)
+
+            # Create transaction records
+            txn_id = f"txn_{uuid.uuid4().hex[:8]}"
+            date = datetime.now().strftime("%Y-%m-%d")
+
+            # Debit transaction
+            banking_data.add_transaction({
+                "id": f"{txn_id}_debit",
+                "account_id": source_acc["id"],
+                "date": date,
+                "amount": -amount,
+                "merchant": f"Transfer to {to_account}",
+                "category": "transfer",
+                "description": f"Transfer to {to_account}",
+                "status": "completed"
+            })
+
+            # Credit transaction
+            banking_data.add_transaction({
+                "id": f"{txn_id}_credit",
+                "account_id": dest_acc["id"],
+                "date": date,
+                "amount": amount,
+                "merchant": f"Transfer from {from_account}",
+                "category": "transfer",
+                "description": f"Transfer from {from_account}",
+                "status": "completed"
+            })
+
+            logger.info(f"Transfer completed: ${amount} from {from_account} to {to_account}")
 
-        if not source_acc:
-            return {"success": False, "error": f"Source account '{from_account}' not found"}
-
-        if not dest_acc:
-            return {"success": False, "error": f"Destination account '{to_account}' not found"}
-
-        # Check balance
-        if source_acc["balance"] < amount:
             return {
-                "success": False,
-                "error": "Insufficient funds",
-                "available": source_acc["balance"],
-                "requested": amount
+                "success": True,
+                "from_account": from_account,
+                "to_account": to_account,
+                "amount": amount,
+                "new_balance": new_source_balance,
+                "transaction_id": txn_id
             }
 
-        # Update balances
-        new_source_balance = source_acc["balance"] - amount
-        new_dest_balance = dest_acc["balance"] + amount
-
-        banking_data.update_account_balance(source_acc["id"], new_source_balance)
-        banking_data.update_account_balance(dest_acc["id"], new_dest_balance)
-
-        # Create transaction records
-        txn_id = f"txn_{uuid.uuid4().hex[:8]}"
-        date = datetime.now().strftime("%Y-%m-%d")
-
-        # Debit transaction
-        banking_data.add_transaction({
-            "id": f"{txn_id}_debit",
-            "account_id": source_acc["id"],
-            "date": date,
-            "amount": -amount,
-            "merchant": f"Transfer to {to_account}",
-            "category": "transfer",
-            "description": f"Transfer to {to_account}",
-            "status": "completed"
-        })
-
-        # Credit transaction
-        banking_data.add_transaction({
-            "id": f"{txn_id}_credit",
-            "account_id": dest_acc["id"],
-            "date": date,
-            "amount": amount,
-            "merchant": f"Transfer from {from_account}",
-            "category": "transfer",
-            "description": f"Transfer from {from_account}",
-            "status": "completed"
-        })
-
-        logger.info(f"Transfer completed: ${amount} from {from_account} to {to_account}")
-
-        return {
-            "success": True,
-            "from_account": from_account,
-            "to_account": to_account,
-            "amount": amount,
-            "new_balance": new_source_balance,
-            "transaction_id": txn_id
-        }
-
     except Exception as e:
         logger.error(f"Error transferring funds: {e}")
         raise ActionExecutionError(f"Failed to transfer funds: {e}")
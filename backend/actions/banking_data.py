@@ -1,19 +1,80 @@
 """
 Load and manage dummy banking data.
+
+In single-process mode every change rewrites the JSON file. With a shared
+state backend (several workers), the JSON file is the read-only starting
+point and changes are appended to a shared operation log instead; each
+worker replays new operations before it reads, so balances agree across
+workers. Multi-step changes (a transfer) run in `transaction()`, which
+holds a cross-worker lock and appends its operations atomically.
+
+Lookups go through indexes built at load time and kept up to date by
+every change: users by id, accounts by id and by (user_id, type), and
+each account's transactions sorted by date, so reading the newest N is a
+slice instead of a scan and a sort.
 """
+import bisect
 import json
+import threading
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from ..config import config
 from ..utils.logger import logger
+from ..utils.shared_state import shared_state
+
+# Shared log of banking data changes, and the lock serializing transactions
+_OPS_LOG = "banking:ops"
+_LOCK_NAME = "banking"
+
+
+class _AccountTransactions:
+    """One account's transactions, oldest first (ties in insertion order)."""
+
+    __slots__ = ("keys", "items")
+
+    def __init__(self):
+        self.keys: List[Tuple[str, int]] = []  # (date, -insertion seq), ascending
+        self.items: List[Dict] = []
+
+    def add(self, transaction: Dict, seq: int):
+        key = (transaction["date"], -seq)
+        if not self.keys or key > self.keys[-1]:
+            self.keys.append(key)  # The usual case: a new, latest transaction
+            self.items.append(transaction)
+            return
+        i = bisect.bisect(self.keys, key)
+        self.keys.insert(i, key)
+        self.items.insert(i, transaction)
+
+    def newest(self, limit: int) -> List[Dict]:
+        """The newest `limit` transactions, newest first (same date: first added first)."""
+        if limit <= 0:
+            return []
+        return self.items[:-limit - 1:-1]
 
 
 class BankingDataManager:
     """Manage dummy banking data from JSON file."""
 
-    def __init__(self):
+    def __init__(self, state=None):
+        """
+        Args:
+            state: Shared state backend (None = single process, changes saved to the JSON file)
+        """
         self.data_file = config.banking_data_file
         self.data = None
+        self.state = state
+        self._applied_seq = 0  # Last operation replayed from the shared log
+        self._lock = threading.RLock()
+        self._batch: Optional[List[Dict]] = None  # Operations of the open transaction
+
+        self._users_by_id: Dict[str, Dict] = {}
+        self._accounts_by_id: Dict[str, Dict] = {}
+        self._accounts_by_user: Dict[str, List[Dict]] = {}
+        self._account_by_user_type: Dict[Tuple[str, str], Dict] = {}
+        self._transactions_by_account: Dict[str, _AccountTransactions] = {}
+        self._transaction_seq = 0
         logger.info(f"Banking data file: {self.data_file}")
 
     def load_data(self) -> Dict:
@@ -25,7 +86,6 @@ class BankingDataManager:
             with open(self.data_file, "r", encoding="utf-8") as f:
                 self.data = json.load(f)
             logger.info("Banking data loaded successfully")
-            return self.data
         except Exception as e:
             logger.error(f"Failed to load banking data: {e}")
             # Return empty data structure
@@ -35,7 +95,104 @@ class BankingDataManager:
                 "transactions": [],
                 "payees": []
             }
-            return self.data
+        self._build_indexes()
+        # Changes made since the file was written (shared state only)
+        self._sync()
+        return self.data
+
+    def _build_indexes(self):
+        """Index users, accounts and transactions of freshly loaded data."""
+        self._users_by_id = {}
+        for user in self.data.get("users", []):
+            self._users_by_id.setdefault(user["id"], user)
+
+        self._accounts_by_id = {}
+        self._accounts_by_user = {}
+        self._account_by_user_type = {}
+        for acc in self.data.get("accounts", []):
+            self._accounts_by_id.setdefault(acc["id"], acc)
+            self._accounts_by_user.setdefault(acc["user_id"], []).append(acc)
+            self._account_by_user_type.setdefault((acc["user_id"], acc["type"]), acc)
+
+        self._transactions_by_account = {}
+        self._transaction_seq = 0
+        for txn in self.data.get("transactions", []):
+            self._index_transaction(txn)
+
+    def _index_transaction(self, transaction: Dict):
+        self._transaction_seq += 1
+        account_transactions = self._transactions_by_account.get(transaction["account_id"])
+        if account_transactions is None:
+            account_transactions = self._transactions_by_account[transaction["account_id"]] = _AccountTransactions()
+        account_transactions.add(transaction, self._transaction_seq)
+
+    def _sync(self):
+        """Replay operations other workers appended to the shared log."""
+        if self.state is None or self.data is None:
+            return
+        with self._lock:
+            for seq, value in self.state.read_log(_OPS_LOG, self._applied_seq):
+                self._apply_op(json.loads(value))
+                self._applied_seq = seq
+
+    def _apply_op(self, op: Dict):
+        """Apply one change to the in-memory data."""
+        if op["op"] == "add_transaction":
+            self.data["transactions"].append(op["transaction"])
+            self._index_transaction(op["transaction"])
+        elif op["op"] == "set_balance":
+            acc = self._accounts_by_id.get(op["account_id"])
+            if acc is not None:
+                acc["balance"] = op["balance"]
+        else:
+            logger.error(f"Unknown banking data operation: {op['op']}")
+
+    def _write(self, op: Dict):
+        """Apply a change now, or at commit inside a transaction."""
+        with self._lock:
+            if self._batch is not None:
+                self._batch.append(op)
+            else:
+                self._commit([op])
+
+    def _commit(self, ops: List[Dict]):
+        if not ops:
+            return
+        if self.state is None:
+            for op in ops:
+                self._apply_op(op)
+            self.save_data()
+        else:
+            self.state.append_many(_OPS_LOG, [json.dumps(op, ensure_ascii=False) for op in ops])
+            self._sync()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Run a read-check-write sequence atomically across threads and workers.
+
+        Reads inside the block see every committed change. Writes are
+        buffered and committed together when the block exits (discarded
+        if it raises), so other readers never see half a transfer.
+        """
+        with self._lock:
+            if self._batch is not None:  # Nested: part of the outer transaction
+                yield
+                return
+            if self.data is None:
+                self.load_data()
+            shared_lock = (
+                self.state.lock(_LOCK_NAME, timeout=config.shared_state_lock_timeout_seconds)
+                if self.state is not None else nullcontext()
+            )
+            with shared_lock:
+                self._batch = []
+                try:
+                    yield
+                    ops = self._batch
+                finally:
+                    self._batch = None
+                self._commit(ops)
 
     def save_data(self):
         """Save data back to JSON file."""
@@ -50,70 +207,56 @@ class BankingDataManager:
         """Get user by ID."""
         if self.data is None:
             self.load_data()
+        self._sync()
 
         user_id = user_id or config.banking_default_user
 
-        for user in self.data.get("users", []):
-            if user["id"] == user_id:
-                return user
-        return None
+        return self._users_by_id.get(user_id)
 
     def get_accounts(self, user_id: str = None) -> List[Dict]:
         """Get all accounts for a user."""
         if self.data is None:
             self.load_data()
+        self._sync()
 
         user_id = user_id or config.banking_default_user
 
-        return [
-            acc for acc in self.data.get("accounts", [])
-            if acc["user_id"] == user_id
-        ]
+        return list(self._accounts_by_user.get(user_id, []))
 
     def get_account(self, account_type: str = "checking", user_id: str = None) -> Optional[Dict]:
         """Get specific account by type."""
-        accounts = self.get_accounts(user_id)
+        if self.data is None:
+            self.load_data()
+        self._sync()
+
+        user_id = user_id or config.banking_default_user
 
-        for acc in accounts:
-            if acc["type"] == account_type:
-                return acc
-        return None
+        return self._account_by_user_type.get((user_id, account_type))
 
     def get_transactions(self, account_id: str, limit: int = 10) -> List[Dict]:
         """Get transactions for an account."""
         if self.data is None:
             self.load_data()
+        self._sync()
 
-        transactions = [
-            txn for txn in self.data.get("transactions", [])
-            if txn["account_id"] == account_id
-        ]
-
-        # Sort by date (newest first)
-        transactions.sort(key=lambda x: x["date"], reverse=True)
-
-        return transactions[:limit]
+        # Newest first, read from the date-sorted index
+        account_transactions = self._transactions_by_account.get(account_id)
+        return account_transactions.newest(limit) if account_transactions is not None else []
 
     def add_transaction(self, transaction: Dict):
         """Add a new transaction."""
         if self.data is None:
             self.load_data()
 
-        self.data["transactions"].append(transaction)
-        self.save_data()
+        self._write({"op": "add_transaction", "transaction": transaction})
 
     def update_account_balance(self, account_id: str, new_balance: float):
         """Update account balance."""
         if self.data is None:
             self.load_data()
 
-        for acc in self.data.get("accounts", []):
-            if acc["id"] == account_id:
-                acc["balance"] = new_balance
-                break
-
-        self.save_data()
+        self._write({"op": "set_balance", "account_id": account_id, "balance": new_balance})
 
 
 # Global data manager
-banking_data = BankingDataManager()
+banking_data = BankingDataManager(state=shared_state)
@@ -1,14 +1,16 @@
 """
 Main AI agent orchestrator.
 """
-from typing import Dict, List, Optional
-from .intent_classifier import classify_intent
-from .query_router import route_query
+from typing import AsyncIterator, Dict, List, Optional
+from .intent_classifier import Intent, classify_intent
+from .query_router import route_query, route_query_stream
+from .conversation_history import create_conversation_histories
+from ..utils.concurrency import get_executor, run_blocking
 from ..utils.logger import logger
 
 # Try to import LangChain agent (optional dependency)
 try:
-    from .langchain_agent import get_langchain_response
+    from .langchain_agent import get_langchain_response, stream_langchain_response
     LANGCHAIN_AVAILABLE = True
     logger.info("✅ LangChain agent available")
 except ImportError as e:
@@ -26,7 +28,7 @@ class BankingAgent:
         Args:
             use_langchain: If True and available, use LangChain agent with memory
         """
-        self.conversation_history = []
+        self.conversation_histories = create_conversation_histories()  # Classic agent, per session
         self.use_langchain = use_langchain and LANGCHAIN_AVAILABLE
 
         if self.use_langchain:
@@ -71,6 +73,46 @@ class BankingAgent:
                 "metadata": {"error": str(e), "session_id": session_id}
             }
 
+    async def stream_query(
+        self,
+        query: str,
+        session_id: str = "default",
+        old_messages: Optional[List[Dict]] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Process user query end-to-end, streaming the response.
+
+        Args:
+            query: User query
+            session_id: Session ID for conversation tracking
+            old_messages: Optional previous conversation history for LangChain agent
+
+        Yields:
+            Token frames ({"type": "token", "content": ...}), then one final
+            frame with the same fields as process_query's result
+        """
+        logger.info(f"Streaming query [{session_id}]: {query[:100]}...")
+
+        try:
+            if self.use_langchain:
+                frames = self._stream_with_langchain(query, session_id, old_messages)
+            else:
+                frames = self._stream_classic(query, session_id)
+
+            async for frame in frames:
+                yield frame
+
+        except Exception as e:
+            logger.error(f"Error streaming query: {e}", exc_info=True)
+            yield {
+                "type": "final",
+                "success": False,
+                "response": f"Sorry, I encountered an error: {str(e)}",
+                "intent": "error",
+                "sources": [],
+                "metadata": {"error": str(e), "session_id": session_id}
+            }
+
     async def _process_with_langchain(
         self,
         query: str,
@@ -104,10 +146,91 @@ class BankingAgent:
             "metadata": {
                 "session_id": session_id,
                 "query": query,
-                "agent_type": "langchain"
+                "agent_type": "langchain",
+                "memory": result.get("memory")
             }
         }
 
+    async def _stream_with_langchain(
+        self,
+        query: str,
+        session_id: str,
+        old_messages: Optional[List[Dict]] = None
+    ) -> AsyncIterator[Dict]:
+        """Stream query through the LangChain agent."""
+        async for frame in stream_langchain_response(
+            message=query,
+            session_id=session_id,
+            old_messages=old_messages
+        ):
+            if frame["type"] != "final":
+                yield frame
+                continue
+
+            yield {
+                "type": "final",
+                "success": frame.get("success", True),
+                "response": frame.get("response", ""),
+                "intent": "langchain_agent",
+                "sources": [],
+                "tools_used": frame.get("tools_used", []),
+                "metadata": {
+                    "session_id": session_id,
+                    "query": query,
+                    "agent_type": "langchain",
+                    "memory": frame.get("memory")
+                }
+            }
+
+    async def _stream_classic(self, query: str, session_id: str) -> AsyncIterator[Dict]:
+        """
+        Stream query through classic intent classification and routing.
+
+        An action has already run by the time its response is streamed, so
+        its turn is recorded even if the client goes away before the final
+        frame; other partial answers are not.
+        """
+        intent = classify_intent(query)
+        streamed = []  # Token contents so far
+        recorded = False
+
+        try:
+            async for frame in route_query_stream(query, intent):
+                if frame["type"] != "final":
+                    streamed.append(frame.get("content", ""))
+                    yield frame
+                    continue
+
+                recorded = True
+                # Shared state I/O with several workers
+                await run_blocking(self.conversation_histories.append, session_id, {
+                    "query": query,
+                    "response": frame["response"],
+                    "intent": frame["intent"]
+                })
+
+                yield {
+                    "type": "final",
+                    "success": True,
+                    "response": frame["response"],
+                    "intent": frame["intent"],
+                    "sources": frame.get("sources", []),
+                    "metadata": {
+                        "session_id": session_id,
+                        "query": query,
+                        "agent_type": "classic",
+                        "timings": frame.get("timings")
+                    }
+                }
+        finally:
+            # Closed or cancelled (client disconnect) after the action ran
+            if intent == Intent.ACTION and streamed and not recorded:
+                get_executor().submit(self.conversation_histories.append, session_id, {
+                    "query": query,
+                    "response": "".join(streamed),
+                    "intent": "action"
+                })
+
     async def _process_classic(self, query: str, session_id: str) -> Dict:
         """
         Process query using classic intent classification and routing.
@@ -125,8 +248,8 @@ class BankingAgent:
         # 2. Route to appropriate handler
         result = await route_query(query, intent)
 
-        # 3. Add to conversation history
-        self.conversation_history.append({
+        # 3. Add to the session's conversation history
+        await run_blocking(self.conversation_histories.append, session_id, {
             "query": query,
             "response": result["response"],
             "intent": result["intent"]
@@ -141,7 +264,8 @@ class BankingAgent:
             "metadata": {
                 "session_id": session_id,
                 "query": query,
-                "agent_type": "classic"
+                "agent_type": "classic",
+                "timings": result.get("timings")
             }
         }
 
@@ -0,0 +1,185 @@
+"""
+Per-session conversation history for the classic (intent-routing) agent.
+
+Each session keeps its most recent `agent.max_conversation_history` turns
+in a ring buffer (a bounded deque: the oldest turn is dropped when a new
+one arrives). Sessions are capped by count (least recently used evicted
+beyond `agent.max_sessions`) and dropped after `agent.session_idle_ttl_seconds`
+without a request, so memory stays bounded however long the server runs.
+
+With a shared state backend the histories live there instead, so every
+worker sees the same turns: one capped list per session, expiring after
+the idle TTL.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List
+from ..config import config
+from ..utils.logger import logger
+from ..utils.shared_state import shared_state
+
+# Shared state key of a session's history (a JSON list of turns)
+_HISTORY_KEY = "agent:history:{}"
+
+
+class _SessionHistory:
+    """One session's recent turns."""
+
+    __slots__ = ("turns", "last_used")
+
+    def __init__(self, max_turns: int):
+        self.turns: deque = deque(maxlen=max_turns)
+        self.last_used = time.monotonic()
+
+
+class ConversationHistories:
+    """
+    Bounded turn history per session, capped by session count (LRU) and idle time.
+    """
+
+    def __init__(self, max_turns: int = 10, max_sessions: int = 1000, idle_ttl_seconds: float = 1800):
+        """
+        Args:
+            max_turns: Turns kept per session (oldest dropped beyond)
+            max_sessions: Maximum sessions (least recently used evicted beyond)
+            idle_ttl_seconds: Drop sessions idle this long (0 = never)
+        """
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._sessions: "OrderedDict[str, _SessionHistory]" = OrderedDict()  # LRU order
+        self._lock = threading.Lock()
+
+        self.turns_added = 0
+        self.lru_evictions = 0
+        self.idle_evictions = 0
+
+    def append(self, session_id: str, turn: Dict):
+        """Add a turn to a session, creating the session if needed."""
+        with self._lock:
+            self._evict_idle()
+            history = self._sessions.get(session_id)
+            if history is None:
+                history = _SessionHistory(self.max_turns)
+                self._sessions[session_id] = history
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.lru_evictions += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            history.turns.append(turn)
+            history.last_used = time.monotonic()
+            self.turns_added += 1
+
+    def get(self, session_id: str) -> List[Dict]:
+        """A session's turns, oldest first (empty for unknown sessions)."""
+        with self._lock:
+            self._evict_idle()
+            history = self._sessions.get(session_id)
+            return list(history.turns) if history is not None else []
+
+    def clear(self, session_id: str) -> bool:
+        """Drop a session's history. Returns whether it existed."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict_idle(self):
+        """Drop idle sessions (the oldest are first in LRU order). Caller holds the lock."""
+        if not self.idle_ttl_seconds:
+            return
+        cutoff = time.monotonic() - self.idle_ttl_seconds
+        while self._sessions:
+            session_id, history = next(iter(self._sessions.items()))
+            if history.last_used > cutoff:
+                break
+            del self._sessions[session_id]
+            self.idle_evictions += 1
+            logger.debug(f"Evicted idle conversation history: {session_id}")
+
+    def get_metrics(self) -> Dict:
+        """Get session and turn counts and evictions."""
+        with self._lock:
+            self._evict_idle()
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "max_turns_per_session": self.max_turns,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "turns": sum(len(history.turns) for history in self._sessions.values()),
+                "turns_added": self.turns_added,
+                "lru_evictions": self.lru_evictions,
+                "idle_evictions": self.idle_evictions,
+            }
+
+
+class SharedConversationHistories:
+    """
+    Bounded turn history per session in the shared state backend.
+
+    Sessions are bounded by the idle TTL only (the backend expires them);
+    there is no session count cap across workers.
+    """
+
+    def __init__(self, state, max_turns: int = 10, idle_ttl_seconds: float = 1800):
+        """
+        Args:
+            state: Shared state backend
+            max_turns: Turns kept per session (oldest dropped beyond)
+            idle_ttl_seconds: Drop sessions idle this long (0 = never)
+        """
+        self.state = state
+        self.max_turns = max_turns
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.turns_added = 0  # By this worker
+
+    def append(self, session_id: str, turn: Dict):
+        """Add a turn to a session, creating the session if needed."""
+        key = _HISTORY_KEY.format(session_id)
+        # Read-modify-write: another worker may append to the same session
+        with self.state.lock(key):
+            stored = self.state.get(key)
+            turns = json.loads(stored) if stored else []
+            turns.append(turn)
+            self.state.set(
+                key, json.dumps(turns[-self.max_turns:], ensure_ascii=False), ttl=self.idle_ttl_seconds or None
+            )
+        self.turns_added += 1
+
+    def get(self, session_id: str) -> List[Dict]:
+        """A session's turns, oldest first (empty for unknown sessions)."""
+        stored = self.state.get(_HISTORY_KEY.format(session_id))
+        return json.loads(stored) if stored else []
+
+    def clear(self, session_id: str) -> bool:
+        """Drop a session's history. Returns whether it existed."""
+        key = _HISTORY_KEY.format(session_id)
+        existed = self.state.get(key) is not None
+        self.state.delete(key)
+        return existed
+
+    def get_metrics(self) -> Dict:
+        """Get session counts (across workers) and this worker's turn count."""
+        return {
+            "sessions": self.state.count(_HISTORY_KEY.format("")),
+            "max_turns_per_session": self.max_turns,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "turns_added": self.turns_added,
+            "shared_state": self.state.name,
+        }
+
+
+def create_conversation_histories():
+    """Create the classic agent's session histories from config (shared across workers with shared state)."""
+    if shared_state is not None:
+        return SharedConversationHistories(
+            shared_state,
+            max_turns=config.agent_max_conversation_history,
+            idle_ttl_seconds=config.agent_session_idle_ttl_seconds
+        )
+    return ConversationHistories(
+        max_turns=config.agent_max_conversation_history,
+        max_sessions=config.agent_max_sessions,
+        idle_ttl_seconds=config.agent_session_idle_ttl_seconds
+    )
@@ -1,9 +1,20 @@
 """
 LangChain-based agent with conversation memory for BankSight AI.
+
+The LLM, tools, prompt and AgentExecutor are immutable and built once;
+sessions only own their conversation memory (a bounded window of recent
+turns plus a rolling summary, see memory.py), persisted in the session
+store (session_store.py) when one is configured. The executor runs without
+memory attached: each call loads the session's history into the prompt
+inputs and saves the new turn afterwards.
 """
-from typing import Optional, List, Dict
+import asyncio
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import AsyncIterator, Optional, List, Dict, Set, Tuple
 from langchain.agents import create_tool_calling_agent, AgentExecutor
-from langchain.memory import ConversationBufferMemory
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain.prompts import (
     ChatPromptTemplate,
     MessagesPlaceholder,
@@ -12,44 +23,61 @@ from langchain.prompts import (
 )
 from langchain_groq import ChatGroq
 from .langchain_tools import create_banking_tools
+from .memory import SummarizingMemory, create_memory, estimate_tokens, summary_cache
+from .session_store import SessionRecord, session_store, turn_hash
 from ..llm.prompts import BANKING_ASSISTANT_SYSTEM
+from ..llm.http_transport import http_clients
 from ..config import config
 from ..utils.logger import logger
+from ..utils.concurrency import run_blocking
+from ..utils.streaming import token_frame
 import os
 
+# Prompt variable holding the conversation history
+MEMORY_KEY = "chat_history"
 
-class BankSightAgent:
+# Estimated prompt tokens of the system message
+_SYSTEM_PROMPT_TOKENS = estimate_tokens(BANKING_ASSISTANT_SYSTEM)
+
+# Executor runs of streams whose client went away, kept referenced until their turn is recorded
+_abandoned_runs: Set[asyncio.Future] = set()
+
+
+class TokenQueueCallbackHandler(BaseCallbackHandler):
     """
-    LangChain-based banking agent with conversation memory.
+    Forward LLM token deltas to an asyncio queue.
+
+    LangChain may run synchronous handlers in a worker thread, so tokens are
+    handed to the loop with call_soon_threadsafe.
     """
 
-    def __init__(self, session_id: str = "default"):
-        """
-        Initialize the BankSight agent.
+    run_inline = True  # Cheap and thread-safe; no need for an executor hop
 
-        Args:
-            session_id: Unique session identifier for conversation memory
-        """
-        self.session_id = session_id
-        self.memory = self._create_memory()
+    def __init__(self, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        self.queue = queue
+        self.loop = loop
+
+    def on_llm_new_token(self, token: str, **kwargs) -> None:
+        if token:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, token)
+
+
+class AgentComponents:
+    """
+    Session-independent agent parts: ChatGroq, tools, prompt and executor.
+    """
+
+    def __init__(self):
+        start = time.perf_counter()
         self.llm = self._create_llm()
         self.tools = create_banking_tools()
+        self.prompt = self._create_prompt()
         self.agent_executor = self._create_agent()
+        self.build_ms = (time.perf_counter() - start) * 1000.0
 
-        logger.info(f"✅ LangChain agent initialized for session: {session_id}")
-
-    def _create_memory(self) -> ConversationBufferMemory:
-        """Create conversation memory for the agent."""
-        memory = ConversationBufferMemory(
-            memory_key=f"chat_history_{self.session_id}",
-            input_key="input",
-            output_key="output",
-            return_messages=True
-        )
-        return memory
-
-    def _create_llm(self) -> ChatGroq:
-        """Create Groq LLM instance for LangChain."""
+    @staticmethod
+    def _create_llm() -> ChatGroq:
+        """Create Groq LLM instance for LangChain (on the shared HTTP connection pool)."""
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             raise ValueError("GROQ_API_KEY not found in environment variables")
@@ -59,33 +87,36 @@ class BankSightAgent:
             model_name=config.llm_groq_model_name,
             temperature=config.llm_groq_temperature,
             max_tokens=config.llm_groq_max_tokens,
+            # Stream from Groq even inside ainvoke, so on_llm_new_token fires for
+            # TokenQueueCallbackHandler (non-streaming calls get the joined chunks)
+            streaming=True,
+            http_client=http_clients.get_client(),
+            http_async_client=http_clients.get_async_client(),
         )
 
         logger.info(f"✅ ChatGroq LLM initialized: {config.llm_groq_model_name}")
         return llm
 
-    def _create_agent(self) -> AgentExecutor:
-        """Create the tool-calling agent with memory."""
-
-        # Create prompt template with chat history
-        prompt = ChatPromptTemplate.from_messages([
+    @staticmethod
+    def _create_prompt() -> ChatPromptTemplate:
+        """Create the prompt template; history goes in the 'chat_history' placeholder."""
+        return ChatPromptTemplate.from_messages([
             SystemMessagePromptTemplate.from_template(BANKING_ASSISTANT_SYSTEM),
-            MessagesPlaceholder(variable_name=f"chat_history_{self.session_id}"),
+            MessagesPlaceholder(variable_name=MEMORY_KEY),
             HumanMessagePromptTemplate.from_template("{input}"),
             MessagesPlaceholder(variable_name="agent_scratchpad"),
         ])
 
-        # Create the tool-calling agent
+    def _create_agent(self) -> AgentExecutor:
+        """Create the tool-calling agent executor (without memory, shared by all sessions)."""
         agent_chain = create_tool_calling_agent(
             llm=self.llm,
             tools=self.tools,
-            prompt=prompt,
+            prompt=self.prompt,
         )
 
-        # Wrap in AgentExecutor with memory
         agent_executor = AgentExecutor(
             agent=agent_chain,
-            memory=self.memory,
             tools=self.tools,
             verbose=config.agent_verbose,
             handle_parsing_errors=True,
@@ -96,6 +127,145 @@ class BankSightAgent:
         logger.info(f"✅ Agent executor created with {len(self.tools)} tools (max_iterations={config.agent_max_iterations})")
         return agent_executor
 
+
+class BankSightAgent:
+    """
+    One conversation: its memory plus the shared agent components.
+    """
+
+    def __init__(self, session_id: str, components: AgentComponents, store=None):
+        """
+        Initialize a session, restoring its history from the store.
+
+        Args:
+            session_id: Unique session identifier for conversation memory
+            components: Shared LLM, tools, prompt and executor
+            store: Session store to restore from and persist to (None = in memory only)
+        """
+        self.session_id = session_id
+        self.components = components
+        self.agent_executor = components.agent_executor
+        self.store = store
+        self._turn_counts: Counter = Counter()  # Turn hash -> occurrences in this session
+        self._stored_turns = 0  # Turns in the store as of the last load or write
+        self.memory: SummarizingMemory = create_memory(
+            on_summary=self._save_summary if store is not None else None
+        )
+        self.last_used = time.monotonic()
+        if store is not None:
+            self._restore(store.load(session_id))
+
+    def _restore(self, record: Optional[SessionRecord]):
+        """Rebuild memory from the stored summary and the turns it does not cover."""
+        self.memory.clear()
+        self._turn_counts.clear()
+        self._stored_turns = 0
+        if record is None:
+            return
+        self._turn_counts.update(h for _, _, h in record.turns)
+        self.memory.restore(
+            record.summary,
+            record.summarized_turns,
+            [(user, assistant) for user, assistant, _ in record.turns[record.summarized_turns:]]
+        )
+        self._stored_turns = len(record.turns)
+        logger.info(f"Restored session {self.session_id} from store ({len(record.turns)} turns)")
+
+    def refresh(self):
+        """Reload the session if another worker added turns or cleared it."""
+        if self.store is not None and self.store.turn_count(self.session_id) != self._stored_turns:
+            self._restore(self.store.load(self.session_id))
+
+    async def _arefresh(self):
+        """Reload the session if another worker changed it (store read off the event loop)."""
+        if self.store is None:
+            return
+        if await run_blocking(self.store.turn_count, self.session_id) != self._stored_turns:
+            self._restore(await run_blocking(self.store.load, self.session_id))
+
+    def _save_summary(self, summary: str, summarized_turns: int):
+        self.store.save_summary(self.session_id, summary, summarized_turns)
+
+    def _remember(self, turns: List[Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+        """Add turns to memory; returns them with hashes, for the store."""
+        hashed = []
+        for user, assistant in turns:
+            h = turn_hash(user, assistant)
+            self._turn_counts[h] += 1
+            self.memory.add_turn(user, assistant)
+            hashed.append((user or "", assistant or "", h))
+        return hashed
+
+    def _record_turns(self, turns: List[Tuple[str, str]]):
+        """Add turns to memory and the store."""
+        hashed = self._remember(turns)
+        if self.store is not None and hashed:
+            self.store.append_turns(self.session_id, hashed)
+            self._stored_turns += len(hashed)
+
+    async def _arecord_turns(self, turns: List[Tuple[str, str]]):
+        """Add turns to memory and the store (written off the event loop)."""
+        hashed = self._remember(turns)
+        if self.store is not None and hashed:
+            await run_blocking(self.store.append_turns, self.session_id, hashed)
+            self._stored_turns += len(hashed)
+
+    def _inputs(self, message: str) -> Dict:
+        """Executor inputs: the message plus this session's history."""
+        return {"input": message, MEMORY_KEY: self.memory.messages()}
+
+    def _prompt_stats(self, message: str) -> Dict:
+        """Estimated tokens of this turn's prompt (before tool-call iterations)."""
+        counts = self.memory.token_counts()
+        prompt_tokens = _SYSTEM_PROMPT_TOKENS + counts["history_tokens"] + estimate_tokens(message)
+        return {"prompt_tokens": prompt_tokens, **counts}
+
+    async def ainvoke(self, message: str, old_messages: Optional[List[Dict]] = None) -> Dict:
+        """
+        Invoke the agent asynchronously.
+
+        Uses AgentExecutor.ainvoke, so ChatGroq talks to Groq through its
+        native async client and the event loop stays free while waiting.
+
+        Args:
+            message: User's input message
+            old_messages: Optional list of previous messages to inject into memory
+
+        Returns:
+            Dict with agent response and metadata
+        """
+        try:
+            await self._arefresh()
+            await self._ainject_old_messages(old_messages)
+
+            logger.info(f"Invoking agent (async) with message: {message[:100]}...")
+            memory_stats = self._prompt_stats(message)
+            result = await self.agent_executor.ainvoke(self._inputs(message))
+
+            response = result.get("output", "No response generated")
+            await self._arecord_turns([(message, response)])
+            self.memory.schedule_summary()
+            tools_used = self._extract_tools_used(result.get("intermediate_steps", []))
+
+            logger.info(f"Agent response generated. Tools used: {len(tools_used)}")
+
+            return {
+                "success": True,
+                "response": response,
+                "tools_used": tools_used,
+                "session_id": self.session_id,
+                "memory": memory_stats
+            }
+
+        except Exception as e:
+            logger.error(f"Agent invocation error: {e}", exc_info=True)
+            return {
+                "success": False,
+                "response": f"I apologize, but I encountered an error: {str(e)}",
+                "error": str(e),
+                "session_id": self.session_id
+            }
+
     def invoke(self, message: str, old_messages: Optional[List[Dict]] = None) -> Dict:
         """
         Invoke the agent with a user message.
@@ -109,32 +279,20 @@ class BankSightAgent:
             Dict with agent response and metadata
         """
         try:
-            # Inject old history into memory if provided
-            if old_messages:
-                logger.info(f"Injecting {len(old_messages)} old messages into memory")
-                for item in old_messages:
-                    if item.get("user"):
-                        self.memory.chat_memory.add_user_message(item["user"])
-                    if item.get("assistant"):
-                        self.memory.chat_memory.add_ai_message(item["assistant"])
+            # Pick up turns other workers added, then inject old history if provided
+            self.refresh()
+            self._inject_old_messages(old_messages)
 
             # Invoke the agent
             logger.info(f"Invoking agent with message: {message[:100]}...")
-            result = self.agent_executor.invoke({"input": message})
+            memory_stats = self._prompt_stats(message)
+            result = self.agent_executor.invoke(self._inputs(message))
 
             # Extract response
             response = result.get("output", "No response generated")
-            intermediate_steps = result.get("intermediate_steps", [])
-
-            # Log tool usage
-            tools_used = []
-            for step in intermediate_steps:
-                if len(step) >= 2:
-                    action = step[0]
-                    tools_used.append({
-                        "tool": action.tool,
-                        "input": action.tool_input
-                    })
+            self._record_turns([(message, response)])
+            self.memory.summarize_pending()
+            tools_used = self._extract_tools_used(result.get("intermediate_steps", []))
 
             logger.info(f"Agent response generated. Tools used: {len(tools_used)}")
 
@@ -142,7 +300,8 @@ class BankSightAgent:
                 "success": True,
                 "response": response,
                 "tools_used": tools_used,
-                "session_id": self.session_id
+                "session_id": self.session_id,
+                "memory": memory_stats
             }
 
         except Exception as e:
@@ -154,9 +313,156 @@ class BankSightAgent:
                 "session_id": self.session_id
             }
 
+    async def stream(self, message: str, old_messages: Optional[List[Dict]] = None) -> AsyncIterator[Dict]:
+        """
+        Invoke the agent and stream LLM token deltas as they are generated.
+
+        The executor runs as a separate task via ainvoke; a callback handler
+        relays every token to this coroutine through an asyncio queue. Tokens from
+        intermediate tool-calling steps are streamed too, so clients see
+        activity before the final answer is ready.
+
+        If the consumer goes away mid-stream (client disconnect), the executor
+        is left to finish in the background and its turn is still recorded:
+        tools such as transfers may already have acted.
+
+        Args:
+            message: User's input message
+            old_messages: Optional list of previous messages to inject into memory
+
+        Yields:
+            Token frames, then a final frame with the response and tools used
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        handler = TokenQueueCallbackHandler(queue, loop)
+        task: Optional[asyncio.Future] = None
+        result_taken = False  # The executor's result (or error) was handled here
+
+        try:
+            await self._arefresh()
+            await self._ainject_old_messages(old_messages)
+
+            logger.info(f"Streaming agent with message: {message[:100]}...")
+            memory_stats = self._prompt_stats(message)
+            task = asyncio.ensure_future(
+                self.agent_executor.ainvoke(self._inputs(message), config={"callbacks": [handler]})
+            )
+            # Wake the consumer once the executor is done; queued tokens are delivered first
+            task.add_done_callback(lambda _: queue.put_nowait(None))
+
+            while True:
+                token = await queue.get()
+                if token is None:
+                    break
+                yield token_frame(token)
+
+            result = await task
+            result_taken = True
+            response = result.get("output", "No response generated")
+            await self._arecord_turns([(message, response)])
+            self.memory.schedule_summary()
+            tools_used = self._extract_tools_used(result.get("intermediate_steps", []))
+
+            logger.info(f"Agent response streamed. Tools used: {len(tools_used)}")
+
+            yield {
+                "type": "final",
+                "success": True,
+                "response": response,
+                "tools_used": tools_used,
+                "session_id": self.session_id,
+                "memory": memory_stats
+            }
+
+        except Exception as e:
+            result_taken = True
+            logger.error(f"Agent streaming error: {e}", exc_info=True)
+            yield {
+                "type": "final",
+                "success": False,
+                "response": f"I apologize, but I encountered an error: {str(e)}",
+                "error": str(e),
+                "tools_used": [],
+                "session_id": self.session_id
+            }
+
+        finally:
+            # Closed or cancelled (CancelledError/GeneratorExit) while the executor ran
+            if task is not None and not result_taken:
+                run = asyncio.ensure_future(self._finish_abandoned_run(message, task))
+                _abandoned_runs.add(run)
+                run.add_done_callback(_abandoned_runs.discard)
+
+    async def _finish_abandoned_run(self, message: str, task: asyncio.Future):
+        """Wait for the executor of a stream whose client went away and record its turn."""
+        try:
+            result = await task
+        except Exception as e:
+            logger.error(f"Agent run failed after its stream was closed: {e}", exc_info=True)
+            return
+        try:
+            await self._arecord_turns([(message, result.get("output", "No response generated"))])
+            self.memory.schedule_summary()
+        except Exception as e:
+            logger.error(f"Failed to record the turn of a closed stream: {e}", exc_info=True)
+            return
+        logger.info(f"Recorded the turn of a closed stream for session {self.session_id}")
+
+    def _new_turns(self, old_messages: Optional[List[Dict]]) -> List[Tuple[str, str]]:
+        """
+        Turns from old_messages this session has not seen yet.
+
+        Matching is by turn hash and counts occurrences, so a client that
+        resends its whole history adds nothing, while a turn repeated
+        verbatim (e.g. "thanks") is still added once per repetition.
+        """
+        if not old_messages:
+            return []
+
+        seen: Counter = Counter()
+        new_turns = []
+        for item in old_messages:
+            user, assistant = item.get("user") or "", item.get("assistant") or ""
+            if not (user or assistant):
+                continue
+            h = turn_hash(user, assistant)
+            seen[h] += 1
+            if seen[h] > self._turn_counts[h]:
+                new_turns.append((user, assistant))
+
+        if new_turns:
+            logger.info(f"Injecting {len(new_turns)} of {len(old_messages)} old messages into memory")
+        return new_turns
+
+    def _inject_old_messages(self, old_messages: Optional[List[Dict]]):
+        """Inject previous conversation turns the session does not have yet."""
+        self._record_turns(self._new_turns(old_messages))
+
+    async def _ainject_old_messages(self, old_messages: Optional[List[Dict]]):
+        """Inject previous conversation turns the session does not have yet (async)."""
+        await self._arecord_turns(self._new_turns(old_messages))
+
+    @staticmethod
+    def _extract_tools_used(intermediate_steps: List) -> List[Dict]:
+        """Extract tool name and input from the executor's intermediate steps."""
+        tools_used = []
+        for step in intermediate_steps:
+            if len(step) >= 2:
+                action = step[0]
+                tools_used.append({
+                    "tool": action.tool,
+                    "input": action.tool_input
+                })
+        return tools_used
+
     def clear_memory(self):
-        """Clear conversation memory."""
+        """Clear conversation memory, including the stored history."""
         self.memory.clear()
+        self._turn_counts.clear()
+        self._stored_turns = 0
+        if self.store is not None:
+            self.store.delete(self.session_id)
         logger.info(f"Memory cleared for session: {self.session_id}")
 
     def get_memory_history(self) -> List[Dict]:
@@ -164,20 +470,135 @@ class BankSightAgent:
         Get conversation history from memory.
 
         Returns:
-            List of message dictionaries
+            List of message dictionaries (the summary of older turns first,
+            with type 'summary')
         """
-        messages = []
-        for msg in self.memory.chat_memory.messages:
-            if hasattr(msg, 'type'):
-                messages.append({
-                    "type": msg.type,
-                    "content": msg.content
-                })
-        return messages
+        return self.memory.history()
+
+    def memory_footprint(self) -> Dict:
+        """Number of stored messages (summary included) and their size in bytes."""
+        messages, size = self.memory.footprint()
+        return {"messages": messages, "bytes": size}
+
+
+class SessionManager:
+    """
+    Live agent sessions, capped by count (LRU) and idle time.
+
+    Agent components are built on the first session and shared; creating
+    a session only creates its memory. Evicted sessions stay in the
+    session store and are restored on their next request.
+    """
+
+    def __init__(self, max_sessions: int = 1000, idle_ttl_seconds: float = 1800, store=None):
+        """
+        Args:
+            max_sessions: Maximum live sessions (least recently used evicted beyond)
+            idle_ttl_seconds: Evict sessions idle this long (0 = never)
+            store: Session store for persistence (None = in memory only)
+        """
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.store = store
+        self._components: Optional[AgentComponents] = None
+        self._components_lock = threading.Lock()
+        self._sessions: "OrderedDict[str, BankSightAgent]" = OrderedDict()  # LRU order
+        self._lock = threading.Lock()
+
+        self.created = 0
+        self.lru_evictions = 0
+        self.idle_evictions = 0
+
+    @property
+    def components(self) -> AgentComponents:
+        """Shared agent components (built on first use)."""
+        with self._components_lock:
+            if self._components is None:
+                self._components = AgentComponents()
+                logger.info(f"✅ Shared agent components built in {self._components.build_ms:.0f} ms")
+            return self._components
+
+    def get(self, session_id: str) -> BankSightAgent:
+        """Get a session, creating it if needed."""
+        components = self.components
+        with self._lock:
+            self._evict_idle()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = BankSightAgent(session_id, components, store=self.store)
+                self._sessions[session_id] = session
+                self.created += 1
+                logger.info(f"Created new agent session: {session_id}")
+                while len(self._sessions) > self.max_sessions:
+                    evicted_id, _ = self._sessions.popitem(last=False)
+                    self.lru_evictions += 1
+                    logger.info(f"Evicted least recently used agent session: {evicted_id}")
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_used = time.monotonic()
+            return session
+
+    def peek(self, session_id: str) -> Optional[BankSightAgent]:
+        """Get a live session without creating it or refreshing its LRU position."""
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    async def get_existing(self, session_id: str) -> Optional[BankSightAgent]:
+        """Get a live or stored session, without creating an empty one (store reads off the event loop)."""
+        session = self.peek(session_id)
+        if session is None and self.store is not None and await run_blocking(self.store.load, session_id) is not None:
+            session = await run_blocking(self.get, session_id)
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        """Clear and drop a session, stored history included. Returns whether it was live."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.clear_memory()
+        elif self.store is not None:
+            self.store.delete(session_id)
+        return session is not None
+
+    def _evict_idle(self):
+        """Drop idle sessions (the oldest are first in LRU order). Caller holds the lock."""
+        if not self.idle_ttl_seconds:
+            return
+        cutoff = time.monotonic() - self.idle_ttl_seconds
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_used > cutoff:
+                break
+            del self._sessions[session_id]
+            self.idle_evictions += 1
+            logger.info(f"Evicted idle agent session: {session_id}")
+
+    def get_metrics(self) -> Dict:
+        """Get session counts, evictions and conversation memory footprint."""
+        with self._lock:
+            self._evict_idle()
+            footprints = [session.memory_footprint() for session in self._sessions.values()]
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "created": self.created,
+                "lru_evictions": self.lru_evictions,
+                "idle_evictions": self.idle_evictions,
+                "memory_messages": sum(f["messages"] for f in footprints),
+                "memory_bytes": sum(f["bytes"] for f in footprints),
+                "components_built": self._components is not None,
+                "summary_cache": summary_cache.get_stats(),
+                "store": self.store.name if self.store is not None else None,
+            }
 
 
-# Global agent instances (one per session)
-_agent_instances: Dict[str, BankSightAgent] = {}
+# Global session manager (agent components are built with the first session)
+session_manager = SessionManager(
+    max_sessions=config.agent_max_sessions,
+    idle_ttl_seconds=config.agent_session_idle_ttl_seconds,
+    store=session_store
+)
 
 
 def get_agent(session_id: str = "default") -> BankSightAgent:
@@ -190,23 +611,35 @@ def get_agent(session_id: str = "default") -> BankSightAgent:
     Returns:
         BankSightAgent instance
     """
-    if session_id not in _agent_instances:
-        _agent_instances[session_id] = BankSightAgent(session_id=session_id)
-        logger.info(f"Created new agent instance for session: {session_id}")
-    return _agent_instances[session_id]
+    return session_manager.get(session_id)
+
+
+async def clear_agent_session(session_id: str):
+    """
+    Clear an agent session (stored history deleted off the event loop).
+
+    Args:
+        session_id: Session identifier
+    """
+    await run_blocking(session_manager.remove, session_id)
+    logger.info(f"Cleared agent session: {session_id}")
 
 
-def clear_agent_session(session_id: str):
+async def get_session_history(session_id: str) -> List[Dict]:
     """
-    Clear an agent session.
+    Get a session's conversation history without creating the session.
 
     Args:
         session_id: Session identifier
+
+    Returns:
+        List of message dictionaries (empty for unknown sessions)
     """
-    if session_id in _agent_instances:
-        _agent_instances[session_id].clear_memory()
-        del _agent_instances[session_id]
-        logger.info(f"Cleared agent session: {session_id}")
+    session = await session_manager.get_existing(session_id)
+    if session is None:
+        return []
+    await session._arefresh()
+    return session.get_memory_history()
 
 
 async def get_langchain_response(
@@ -225,6 +658,29 @@ async def get_langchain_response(
     Returns:
         Dict with response and metadata
     """
-    agent = get_agent(session_id)
-    result = agent.invoke(message, old_messages=old_messages)
+    # Creating a session restores it from the store
+    agent = await run_blocking(get_agent, session_id)
+    result = await agent.ainvoke(message, old_messages=old_messages)
     return result
+
+
+async def stream_langchain_response(
+    message: str,
+    session_id: str = "default",
+    old_messages: Optional[List[Dict]] = None
+) -> AsyncIterator[Dict]:
+    """
+    Stream a response from the LangChain agent.
+
+    Args:
+        message: User message
+        session_id: Session ID for conversation memory
+        old_messages: Optional previous conversation history
+
+    Yields:
+        Token frames, then a final frame with response and tools used
+    """
+    # Creating a session restores it from the store
+    agent = await run_blocking(get_agent, session_id)
+    async for frame in agent.stream(message, old_messages=old_messages):
+        yield frame
@@ -0,0 +1,331 @@
+"""
+Bounded, summarizing conversation memory for LangChain sessions.
+
+The most recent turns are kept verbatim, within `agent.max_conversation_history`
+turns and `agent.memory.max_history_tokens` tokens. Older turns are folded
+into a rolling summary sent as one system message, so the history part
+of the prompt stops growing after a few turns.
+
+Summaries are incremental: only the turns that just left the window are
+merged into the existing summary. Results are cached by a hash of
+(previous summary, new turns), so the same history is never summarized
+twice, for example when a client replays it into a fresh session. After
+an async turn, summarization runs in the background. Until it finishes,
+the turns waiting for it are still sent verbatim.
+"""
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional, Tuple
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from ..config import config
+from ..llm.client import llm_client
+from ..llm.prompts import CONVERSATION_SUMMARY_PROMPT
+from ..utils.logger import logger
+from ..utils.concurrency import run_blocking
+
+# Estimated characters per token (Groq models' tokenizers are not available locally)
+_CHARS_PER_TOKEN = 4
+
+# Role and framing tokens per chat message
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+# Longest excerpt of a turn kept by the fallback summary when the LLM fails
+_FALLBACK_EXCERPT_CHARS = 200
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimated tokens a chat message with this content adds to the prompt."""
+    if not text:
+        return 0
+    return len(text) // _CHARS_PER_TOKEN + 1 + _MESSAGE_OVERHEAD_TOKENS
+
+
+class _Turn:
+    """One user message and the assistant reply."""
+
+    __slots__ = ("user", "assistant", "tokens")
+
+    def __init__(self, user: str, assistant: str):
+        self.user = user
+        self.assistant = assistant
+        self.tokens = estimate_tokens(user) + estimate_tokens(assistant)
+
+    def as_text(self) -> str:
+        lines = []
+        if self.user:
+            lines.append(f"User: {self.user}")
+        if self.assistant:
+            lines.append(f"Assistant: {self.assistant}")
+        return "\n".join(lines)
+
+
+class SummaryCache:
+    """Process-wide LRU of summaries keyed by (previous summary, new turns)."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(summary: str, turns: List[_Turn]) -> str:
+        digest = hashlib.sha256(summary.encode("utf-8"))
+        for turn in turns:
+            digest.update(b"\x00" + turn.user.encode("utf-8") + b"\x01" + turn.assistant.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return summary
+
+    def put(self, key: str, summary: str):
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class Summarizer:
+    """Fold conversation turns into a running summary with the LLM."""
+
+    def __init__(self, cache: SummaryCache, max_tokens: int = 300):
+        self.cache = cache
+        self.max_tokens = max_tokens
+
+    def _messages(self, summary: str, turns: List[_Turn]) -> List[Dict[str, str]]:
+        prompt = CONVERSATION_SUMMARY_PROMPT.format(
+            summary=summary or "(none)",
+            turns="\n\n".join(turn.as_text() for turn in turns)
+        )
+        return [{"role": "user", "content": prompt}]
+
+    def _fallback(self, summary: str, turns: List[_Turn]) -> str:
+        """Extractive summary (turn excerpts), bounded to max_tokens."""
+        excerpts = [turn.as_text()[:_FALLBACK_EXCERPT_CHARS] for turn in turns]
+        text = "\n".join(part for part in [summary, *excerpts] if part)
+        return text[-self.max_tokens * _CHARS_PER_TOKEN:]
+
+    def summarize(self, summary: str, turns: List[_Turn]) -> str:
+        """Merge turns into the summary (blocking)."""
+        key = self.cache.key(summary, turns)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            updated = llm_client.generate_from_messages(self._messages(summary, turns), self.max_tokens)
+        except Exception as e:
+            logger.warning(f"Conversation summary failed, keeping turn excerpts: {e}")
+            return self._fallback(summary, turns)
+        self.cache.put(key, updated)
+        return updated
+
+    async def asummarize(self, summary: str, turns: List[_Turn]) -> str:
+        """Merge turns into the summary without blocking the event loop."""
+        key = self.cache.key(summary, turns)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            messages = self._messages(summary, turns)
+            if hasattr(llm_client, "agenerate_from_messages"):
+                updated = await llm_client.agenerate_from_messages(messages, self.max_tokens)
+            else:
+                updated = await run_blocking(llm_client.generate_from_messages, messages, self.max_tokens)
+        except Exception as e:
+            logger.warning(f"Conversation summary failed, keeping turn excerpts: {e}")
+            return self._fallback(summary, turns)
+        self.cache.put(key, updated)
+        return updated
+
+
+class SummarizingMemory:
+    """
+    Token-budgeted window of recent turns plus a rolling summary.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = 10,
+        max_tokens: int = 1500,
+        summarizer: Optional[Summarizer] = None,
+        on_summary: Optional[Callable[[str, int], None]] = None
+    ):
+        """
+        Args:
+            max_turns: Maximum turns kept verbatim
+            max_tokens: Token budget of the verbatim turns (the latest turn is always kept)
+            summarizer: Folds older turns into the summary (None = drop them)
+            on_summary: Called with (summary, summarized_turns) after each update
+        """
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.summarizer = summarizer
+        self.on_summary = on_summary
+
+        self.summary = ""
+        self._window: deque = deque()
+        self._window_tokens = 0
+        self._pending: List[_Turn] = []  # Left the window, not summarized yet
+        self._task: Optional[asyncio.Task] = None
+        self.summarized_turns = 0
+        self.dropped_turns = 0
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def add_turn(self, user: str, assistant: str):
+        """Append a turn; turns beyond the window's limits wait for summarization."""
+        turn = _Turn(user or "", assistant or "")
+        self._window.append(turn)
+        self._window_tokens += turn.tokens
+        while len(self._window) > 1 and (
+            len(self._window) > self.max_turns or self._window_tokens > self.max_tokens
+        ):
+            evicted = self._window.popleft()
+            self._window_tokens -= evicted.tokens
+            if self.summarizer is None:
+                self.dropped_turns += 1
+            else:
+                self._pending.append(evicted)
+
+    def restore(self, summary: str, summarized_turns: int, turns: List[Tuple[str, str]]):
+        """
+        Rebuild memory from a stored session.
+
+        Args:
+            summary: Stored rolling summary
+            summarized_turns: Number of leading turns the summary covers
+            turns: The turns after those, oldest first
+        """
+        self.clear()
+        self.summary = summary
+        self.summarized_turns = summarized_turns
+        for user, assistant in turns:
+            self.add_turn(user, assistant)
+
+    def summarize_pending(self):
+        """Fold waiting turns into the summary (blocking)."""
+        if not self._pending or self._task is not None:
+            return
+        turns = list(self._pending)
+        self._apply_summary(turns, self.summarizer.summarize(self.summary, turns))
+
+    def schedule_summary(self):
+        """Fold waiting turns into the summary in a background task."""
+        if not self._pending or self._task is not None:
+            return
+        self._task = asyncio.ensure_future(self._summarize_async())
+
+    async def _summarize_async(self):
+        try:
+            # Later turns may leave the window while this runs; they stay pending
+            while self._pending:
+                turns = list(self._pending)
+                self._apply_summary(turns, await self.summarizer.asummarize(self.summary, turns))
+        finally:
+            self._task = None
+
+    def _apply_summary(self, turns: List[_Turn], summary: str):
+        self.summary = summary.strip()
+        del self._pending[:len(turns)]
+        self.summarized_turns += len(turns)
+        if self.on_summary is not None:
+            try:
+                self.on_summary(self.summary, self.summarized_turns)
+            except Exception as e:
+                logger.error(f"Saving conversation summary failed: {e}")
+
+    def clear(self):
+        """Forget the summary and every turn."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.summary = ""
+        self._window.clear()
+        self._window_tokens = 0
+        self._pending.clear()
+        self.summarized_turns = 0
+        self.dropped_turns = 0
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _turns(self) -> List[_Turn]:
+        return [*self._pending, *self._window]
+
+    def messages(self) -> List:
+        """History for the prompt: summary message, then turns oldest first."""
+        messages = []
+        if self.summary:
+            messages.append(SystemMessage(content=SUMMARY_PREFIX + self.summary))
+        for turn in self._turns():
+            if turn.user:
+                messages.append(HumanMessage(content=turn.user))
+            if turn.assistant:
+                messages.append(AIMessage(content=turn.assistant))
+        return messages
+
+    def history(self) -> List[Dict]:
+        """History as message dicts (type 'summary', 'human' or 'ai')."""
+        history = [{"type": "summary", "content": self.summary}] if self.summary else []
+        for turn in self._turns():
+            if turn.user:
+                history.append({"type": "human", "content": turn.user})
+            if turn.assistant:
+                history.append({"type": "ai", "content": turn.assistant})
+        return history
+
+    def token_counts(self) -> Dict:
+        """Estimated prompt tokens taken by the history."""
+        summary_tokens = estimate_tokens(SUMMARY_PREFIX + self.summary) if self.summary else 0
+        pending_tokens = sum(turn.tokens for turn in self._pending)
+        return {
+            "history_tokens": summary_tokens + pending_tokens + self._window_tokens,
+            "summary_tokens": summary_tokens,
+            "window_turns": len(self._window),
+            "pending_turns": len(self._pending),
+            "summarized_turns": self.summarized_turns,
+            "dropped_turns": self.dropped_turns,
+        }
+
+    def footprint(self) -> Tuple[int, int]:
+        """(stored messages, bytes of stored text)."""
+        texts = [self.summary] + [text for turn in self._turns() for text in (turn.user, turn.assistant)]
+        return (
+            sum(1 for text in texts if text),
+            sum(len(text.encode("utf-8")) for text in texts)
+        )
+
+
+def create_memory(on_summary: Optional[Callable[[str, int], None]] = None) -> SummarizingMemory:
+    """Create a session memory from config."""
+    return SummarizingMemory(
+        max_turns=config.agent_max_conversation_history,
+        max_tokens=config.agent_memory_max_history_tokens,
+        summarizer=summarizer if config.agent_memory_summarize else None,
+        on_summary=on_summary
+    )
+
+
+# Global summary cache and summarizer (shared by every session)
+summary_cache = SummaryCache(max_entries=config.agent_memory_summary_cache_size)
+summarizer = Summarizer(summary_cache, max_tokens=config.agent_memory_summary_max_tokens)
@@ -1,9 +1,9 @@
 """
 Query routing based on intent.
 """
-from typing import Dict
+from typing import AsyncIterator, Dict
 from .intent_classifier import Intent
-from ..rag.retriever import retrieve_and_generate
+from ..rag.retriever import retrieve_and_generate, retrieve_and_stream
 from ..actions.banking_actions import execute_action
 from ..llm.client import llm_client
 from ..llm.prompts import (
@@ -13,6 +13,8 @@ from ..llm.prompts import (
 )
 from ..config import config
 from ..utils.logger import logger
+from ..utils.concurrency import run_blocking
+from ..utils.streaming import token_frame
 import re
 
 
@@ -33,7 +35,8 @@ async def route_query(query: str, intent: Intent) -> Dict:
         return {
             "response": result["answer"],
             "intent": "question",
-            "sources": result.get("sources", [])
+            "sources": result.get("sources", []),
+            "timings": result.get("timings", {})
         }
 
     elif intent == Intent.ACTION:
@@ -56,6 +59,57 @@ async def route_query(query: str, intent: Intent) -> Dict:
         }
 
 
+async def route_query_stream(query: str, intent: Intent) -> AsyncIterator[Dict]:
+    """
+    Route query to the appropriate handler and stream the response.
+
+    Args:
+        query: User query
+        intent: Classified intent
+
+    Yields:
+        Token frames, then a final frame with 'response', 'intent' and 'sources'
+    """
+    if intent == Intent.QUESTION:
+        logger.info("Routing to RAG system (streaming)")
+        async for frame in retrieve_and_stream(query):
+            if frame["type"] == "final":
+                yield {
+                    "type": "final",
+                    "response": frame["answer"],
+                    "intent": "question",
+                    "sources": frame.get("sources", []),
+                    "timings": frame.get("timings", {})
+                }
+            else:
+                yield frame
+
+    elif intent == Intent.ACTION:
+        # Actions run against local data, so there is nothing to stream
+        logger.info("Routing to action handler")
+        result = await handle_action(query)
+        yield token_frame(result["response"])
+        yield {
+            "type": "final",
+            "response": result["response"],
+            "intent": "action",
+            "sources": []
+        }
+
+    else:  # CHITCHAT
+        logger.info("Routing to chitchat handler (streaming)")
+        response_parts = []
+        async for delta in stream_chitchat(query):
+            response_parts.append(delta)
+            yield token_frame(delta)
+        yield {
+            "type": "final",
+            "response": "".join(response_parts).strip(),
+            "intent": "chitchat",
+            "sources": []
+        }
+
+
 async def handle_action(query: str) -> Dict:
     """Handle banking action queries."""
     # Extract action and parameters
@@ -67,8 +121,8 @@ async def handle_action(query: str) -> Dict:
             "action_result": {}
         }
 
-    # Execute action
-    result = execute_action(action_info["action"], action_info["parameters"])
+    # Execute action (reads/writes the banking data file)
+    result = await run_blocking(execute_action, action_info["action"], action_info["parameters"])
 
     # Format response
     if result.get("success"):
@@ -85,17 +139,27 @@ async def handle_action(query: str) -> Dict:
 async def handle_chitchat(query: str) -> str:
     """Handle casual conversation."""
     # Check if using Groq (supports chat messages) or HuggingFace (needs prompt string)
-    if config.llm_provider == "groq" and hasattr(llm_client, 'generate_from_messages'):
+    if config.llm_provider == "groq" and hasattr(llm_client, 'agenerate_from_messages'):
         # Use chat messages format for Groq
         messages = create_chitchat_messages(query)
-        response = llm_client.generate_from_messages(messages, max_tokens=100)
+        response = await llm_client.agenerate_from_messages(messages, max_tokens=100)
     else:
-        # Use prompt string for HuggingFace
+        # Use prompt string for HuggingFace (local, blocking inference)
         prompt = CHITCHAT_PROMPT.format(query=query)
-        response = llm_client.generate(prompt, max_new_tokens=100)
+        response = await run_blocking(llm_client.generate, prompt, max_new_tokens=100)
     return response
 
 
+async def stream_chitchat(query: str) -> AsyncIterator[str]:
+    """Stream a casual conversation response as text deltas."""
+    if config.llm_provider == "groq" and hasattr(llm_client, 'astream_from_messages'):
+        messages = create_chitchat_messages(query)
+        async for delta in llm_client.astream_from_messages(messages, max_tokens=100):
+            yield delta
+    else:
+        yield await handle_chitchat(query)
+
+
 def extract_action_parameters(query: str) -> Dict:
     """
     Extract action and parameters from query using keywords.
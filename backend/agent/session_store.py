@@ -0,0 +1,359 @@
+"""
+Persistent conversation store for LangChain sessions.
+
+Every turn is appended under its session_id together with a hash of its
+content, and so is the session's rolling summary. A session evicted
+from memory or lost in a restart is restored from the store (summary
+plus the turns it does not cover), so clients do not have to resend
+their history.
+
+Clients that still send `old_messages` on every request are reconciled
+by turn hash: only turns the store has not seen are appended.
+
+Backends:
+    sqlite        one table of turns and one of summaries (WAL, shared by
+                  every worker process on the host)
+    jsonl         one append-only log file per session
+    shared_state  the configured shared state backend (SQLite or Redis,
+                  see utils/shared_state.py), for workers on several hosts
+
+Any worker may serve a session's next request, so a live session checks
+`turn_count` before each call and reloads when another worker has added
+turns (or cleared the session).
+
+Sessions without a new turn for `agent.session_retention_seconds` are
+deleted: purged periodically (sqlite, jsonl) or expired by TTL
+(shared_state).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from ..config import config
+from ..utils.logger import logger
+from ..utils.shared_state import shared_state
+
+# Expired sessions are purged at most this often (sqlite, jsonl)
+_PURGE_INTERVAL_SECONDS = 3600
+# Sessions whose JSONL turn count is cached
+_TURN_COUNT_CACHE_SIZE = 10000
+
+
+def turn_hash(user: Optional[str], assistant: Optional[str]) -> str:
+    """Content hash of one (user, assistant) turn."""
+    payload = json.dumps([user or "", assistant or ""], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class SessionRecord:
+    """A stored session: every turn (oldest first) and the latest summary."""
+
+    __slots__ = ("turns", "summary", "summarized_turns")
+
+    def __init__(self, turns: List[Tuple[str, str, str]], summary: str = "", summarized_turns: int = 0):
+        self.turns = turns  # (user, assistant, hash)
+        self.summary = summary
+        self.summarized_turns = summarized_turns
+
+
+class SQLiteSessionStore:
+    """Sessions in a SQLite database."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, retention_seconds: float = 0):
+        """
+        Args:
+            path: Database file
+            retention_seconds: Delete sessions without a new turn for this long (0 = never)
+        """
+        self.path = Path(path)
+        self.retention_seconds = retention_seconds
+        self._purged_at = 0.0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS turns ("
+            "session_id TEXT NOT NULL, seq INTEGER NOT NULL, hash TEXT NOT NULL, "
+            "user TEXT NOT NULL, assistant TEXT NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (session_id, seq))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "session_id TEXT PRIMARY KEY, summary TEXT NOT NULL, summarized_turns INTEGER NOT NULL)"
+        )
+        self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Delete sessions whose latest turn is older than the retention; returns how many."""
+        if not self.retention_seconds:
+            return 0
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            self._purged_at = time.time()
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT session_id FROM turns GROUP BY session_id HAVING MAX(created_at) < ?", (cutoff,)
+            )]
+            self._conn.executemany("DELETE FROM turns WHERE session_id = ?", [(sid,) for sid in expired])
+            self._conn.executemany("DELETE FROM summaries WHERE session_id = ?", [(sid,) for sid in expired])
+        if expired:
+            logger.info(f"Session store: deleted {len(expired)} sessions idle over {self.retention_seconds:.0f}s")
+        return len(expired)
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        with self._lock:
+            turns = self._conn.execute(
+                "SELECT user, assistant, hash FROM turns WHERE session_id = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+            summary = self._conn.execute(
+                "SELECT summary, summarized_turns FROM summaries WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if not turns and summary is None:
+            return None
+        return SessionRecord(turns, *(summary or ("", 0)))
+
+    def append_turns(self, session_id: str, turns: List[Tuple[str, str, str]]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                next_seq = self._conn.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM turns WHERE session_id = ?", (session_id,)
+                ).fetchone()[0]
+                self._conn.executemany(
+                    "INSERT INTO turns (session_id, seq, hash, user, assistant, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(session_id, next_seq + i, h, user, assistant, now) for i, (user, assistant, h) in enumerate(turns)]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if now - self._purged_at >= _PURGE_INTERVAL_SECONDS:
+            self.purge_expired()
+
+    def turn_count(self, session_id: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM turns WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+
+    def save_summary(self, session_id: str, summary: str, summarized_turns: int):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (session_id, summary, summarized_turns) VALUES (?, ?, ?)",
+                (session_id, summary, summarized_turns)
+            )
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM summaries WHERE session_id = ?", (session_id,))
+
+    def count_sessions(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(DISTINCT session_id) FROM turns").fetchone()[0]
+
+
+class JSONLSessionStore:
+    """Sessions as append-only JSON-lines logs, one file per session."""
+
+    name = "jsonl"
+
+    def __init__(self, directory: str, retention_seconds: float = 0):
+        """
+        Args:
+            directory: Directory of session logs
+            retention_seconds: Delete logs not appended to for this long (0 = never)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        # file name -> (inode, bytes counted, turns in them); grows by reading only appended bytes
+        self._turn_counts: "OrderedDict[str, Tuple[int, int, int]]" = OrderedDict()
+        self._purged_at = 0.0
+        self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Delete session logs last written before the retention; returns how many."""
+        if not self.retention_seconds:
+            return 0
+        cutoff = time.time() - self.retention_seconds
+        removed = 0
+        with self._lock:
+            self._purged_at = time.time()
+            for path in self.directory.glob("*.jsonl"):
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        self._turn_counts.pop(path.name, None)
+                        removed += 1
+                except FileNotFoundError:
+                    continue  # Deleted concurrently
+        if removed:
+            logger.info(f"Session store: deleted {removed} sessions idle over {self.retention_seconds:.0f}s")
+        return removed
+
+    def _file(self, session_id: str) -> Path:
+        # Session IDs come from clients; hash them into safe file names
+        return self.directory / f"{hashlib.sha256(session_id.encode('utf-8')).hexdigest()[:32]}.jsonl"
+
+    def _append(self, session_id: str, records: List[Dict]):
+        lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with self._lock, open(self._file(session_id), "a", encoding="utf-8") as f:
+            f.write(lines)
+        if time.time() - self._purged_at >= _PURGE_INTERVAL_SECONDS:
+            self.purge_expired()
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        path = self._file(session_id)
+        if not path.exists():
+            return None
+        record = SessionRecord([])
+        with self._lock, open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line after a crash
+                if entry["type"] == "turn":
+                    record.turns.append((entry["user"], entry["assistant"], entry["hash"]))
+                elif entry["type"] == "summary":
+                    record.summary = entry["summary"]
+                    record.summarized_turns = entry["summarized_turns"]
+        return record
+
+    def append_turns(self, session_id: str, turns: List[Tuple[str, str, str]]):
+        self._append(session_id, [
+            {"type": "turn", "user": user, "assistant": assistant, "hash": h} for user, assistant, h in turns
+        ])
+
+    def turn_count(self, session_id: str) -> int:
+        """Turns in a session's log; only bytes appended since the last call are read."""
+        path = self._file(session_id)
+        with self._lock:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self._turn_counts.pop(path.name, None)
+                return 0
+            size = stat.st_size
+            inode, offset, turns = self._turn_counts.get(path.name, (stat.st_ino, 0, 0))
+            if inode != stat.st_ino or size < offset:
+                offset, turns = 0, 0  # Deleted and recreated
+            if size > offset:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    tail = f.read(size - offset)
+                complete = tail[:tail.rfind(b"\n") + 1]  # A torn last line is counted once finished
+                for line in complete.splitlines():
+                    try:
+                        turns += json.loads(line)["type"] == "turn"
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+                offset += len(complete)
+            self._turn_counts[path.name] = (stat.st_ino, offset, turns)
+            self._turn_counts.move_to_end(path.name)
+            while len(self._turn_counts) > _TURN_COUNT_CACHE_SIZE:
+                self._turn_counts.popitem(last=False)
+            return turns
+
+    def save_summary(self, session_id: str, summary: str, summarized_turns: int):
+        self._append(session_id, [{"type": "summary", "summary": summary, "summarized_turns": summarized_turns}])
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._file(session_id).unlink(missing_ok=True)
+            self._turn_counts.pop(self._file(session_id).name, None)
+
+    def count_sessions(self) -> int:
+        return sum(1 for _ in self.directory.glob("*.jsonl"))
+
+
+class SharedStateSessionStore:
+    """Sessions in the shared state backend: a log of turns plus a summary key."""
+
+    name = "shared_state"
+
+    def __init__(self, state, retention_seconds: float = 0):
+        """
+        Args:
+            state: Shared state backend
+            retention_seconds: Expire sessions without a new turn for this long (0 = never)
+        """
+        self.state = state
+        self.ttl = retention_seconds or None
+
+    @staticmethod
+    def _keys(session_id: str) -> Tuple[str, str, str]:
+        """(turn log, summary, session marker) keys."""
+        return f"session:{session_id}:turns", f"session:{session_id}:summary", f"sessions:{session_id}"
+
+    def load(self, session_id: str) -> Optional[SessionRecord]:
+        turns_key, summary_key, _ = self._keys(session_id)
+        turns = [tuple(json.loads(value)) for _, value in self.state.read_log(turns_key)]
+        summary = self.state.get(summary_key)
+        if not turns and summary is None:
+            return None
+        return SessionRecord(turns, *(json.loads(summary) if summary else ("", 0)))
+
+    def append_turns(self, session_id: str, turns: List[Tuple[str, str, str]]):
+        turns_key, summary_key, marker_key = self._keys(session_id)
+        self.state.append_many(turns_key, [json.dumps(list(turn), ensure_ascii=False) for turn in turns], ttl=self.ttl)
+        self.state.set(marker_key, "1", ttl=self.ttl)
+        if self.ttl:
+            # Keep the summary alive as long as the turns it covers
+            summary = self.state.get(summary_key)
+            if summary is not None:
+                self.state.set(summary_key, summary, ttl=self.ttl)
+
+    def turn_count(self, session_id: str) -> int:
+        return self.state.log_length(self._keys(session_id)[0])
+
+    def save_summary(self, session_id: str, summary: str, summarized_turns: int):
+        self.state.set(
+            self._keys(session_id)[1], json.dumps([summary, summarized_turns], ensure_ascii=False), ttl=self.ttl
+        )
+
+    def delete(self, session_id: str):
+        self.state.delete(*self._keys(session_id))
+
+    def count_sessions(self) -> int:
+        return self.state.count("sessions:")
+
+
+def create_session_store():
+    """Create the configured session store, or None if persistence is off."""
+    backend = config.agent_session_store_backend
+    if backend == "none":
+        return None
+    retention = config.agent_session_retention_seconds
+    if backend == "sqlite":
+        store = SQLiteSessionStore(config.agent_session_store_path, retention_seconds=retention)
+    elif backend == "jsonl":
+        store = JSONLSessionStore(config.agent_session_store_path, retention_seconds=retention)
+    elif backend == "shared_state":
+        if shared_state is None:
+            logger.error("agent.session_store.backend is 'shared_state' but shared_state.backend is 'none', "
+                         "sessions will not persist")
+            return None
+        store = SharedStateSessionStore(shared_state, retention_seconds=retention)
+        logger.info(f"✅ Session store: shared_state ({shared_state.name})")
+        return store
+    else:
+        logger.error(f"Unknown agent.session_store.backend '{backend}', sessions will not persist")
+        return None
+    logger.info(f"✅ Session store: {store.name} ({config.agent_session_store_path})")
+    return store
+
+
+# Global session store (None when persistence is off)
+session_store = create_session_store()
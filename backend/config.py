@@ -40,6 +40,27 @@ class Config(BaseSettings):
     def backend_reload(self) -> bool:
         return self._config_data.get("backend", {}).get("reload", True)
 
+    @property
+    def backend_workers(self) -> int:
+        return self._config_data.get("backend", {}).get("workers", 1)
+
+    # Shared State Settings
+    @property
+    def shared_state_backend(self) -> str:
+        return self._config_data.get("shared_state", {}).get("backend", "none")
+
+    @property
+    def shared_state_sqlite_path(self) -> str:
+        return self._config_data.get("shared_state", {}).get("sqlite_path", "./data/state/shared_state.sqlite")
+
+    @property
+    def shared_state_redis_url(self) -> str:
+        return self._config_data.get("shared_state", {}).get("redis_url", "redis://localhost:6379/0")
+
+    @property
+    def shared_state_lock_timeout_seconds(self) -> float:
+        return self._config_data.get("shared_state", {}).get("lock_timeout_seconds", 10)
+
     # LLM Provider Selection
     @property
     def llm_provider(self) -> str:
@@ -91,6 +112,52 @@ class Config(BaseSettings):
     def llm_hf_cache_dir(self) -> str:
         return self._config_data.get("llm", {}).get("huggingface", {}).get("cache_dir", "./models")
 
+    # LLM HTTP Pool Settings
+    @property
+    def llm_http_max_connections(self) -> int:
+        return self._config_data.get("llm", {}).get("http", {}).get("max_connections", 20)
+
+    @property
+    def llm_http_max_keepalive_connections(self) -> int:
+        return self._config_data.get("llm", {}).get("http", {}).get("max_keepalive_connections", 10)
+
+    @property
+    def llm_http_keepalive_expiry(self) -> float:
+        return self._config_data.get("llm", {}).get("http", {}).get("keepalive_expiry", 30)
+
+    @property
+    def llm_http_http2(self) -> bool:
+        return self._config_data.get("llm", {}).get("http", {}).get("http2", True)
+
+    @property
+    def llm_http_connect_timeout(self) -> float:
+        return self._config_data.get("llm", {}).get("http", {}).get("connect_timeout", 5)
+
+    # LLM Response Cache Settings
+    @property
+    def llm_response_cache_enabled(self) -> bool:
+        return self._config_data.get("llm", {}).get("response_cache", {}).get("enabled", True)
+
+    @property
+    def llm_response_cache_backend(self) -> str:
+        return self._config_data.get("llm", {}).get("response_cache", {}).get("backend", "memory")
+
+    @property
+    def llm_response_cache_max_entries(self) -> int:
+        return self._config_data.get("llm", {}).get("response_cache", {}).get("max_entries", 1000)
+
+    @property
+    def llm_response_cache_ttl_seconds(self) -> float:
+        return self._config_data.get("llm", {}).get("response_cache", {}).get("ttl_seconds", 86400)
+
+    @property
+    def llm_response_cache_sqlite_path(self) -> str:
+        return self._config_data.get("llm", {}).get("response_cache", {}).get("sqlite_path", "./data/llm_cache/responses.sqlite")
+
+    @property
+    def llm_response_cache_deterministic_only(self) -> bool:
+        return self._config_data.get("llm", {}).get("response_cache", {}).get("deterministic_only", True)
+
     # Legacy properties for backward compatibility (deprecated)
     @property
     def llm_model_name(self) -> str:
@@ -130,18 +197,143 @@ class Config(BaseSettings):
     def agent_verbose(self) -> bool:
         return self._config_data.get("agent", {}).get("verbose", True)
 
+    @property
+    def agent_max_sessions(self) -> int:
+        return self._config_data.get("agent", {}).get("max_sessions", 1000)
+
+    @property
+    def agent_session_idle_ttl_seconds(self) -> float:
+        return self._config_data.get("agent", {}).get("session_idle_ttl_seconds", 1800)
+
+    @property
+    def agent_session_retention_seconds(self) -> float:
+        return self._config_data.get("agent", {}).get("session_retention_seconds", 2592000)
+
+    @property
+    def agent_max_conversation_history(self) -> int:
+        return self._config_data.get("agent", {}).get("max_conversation_history", 10)
+
+    @property
+    def agent_memory_max_history_tokens(self) -> int:
+        return self._config_data.get("agent", {}).get("memory", {}).get("max_history_tokens", 1500)
+
+    @property
+    def agent_memory_summarize(self) -> bool:
+        return self._config_data.get("agent", {}).get("memory", {}).get("summarize", True)
+
+    @property
+    def agent_memory_summary_max_tokens(self) -> int:
+        return self._config_data.get("agent", {}).get("memory", {}).get("summary_max_tokens", 300)
+
+    @property
+    def agent_memory_summary_cache_size(self) -> int:
+        return self._config_data.get("agent", {}).get("memory", {}).get("summary_cache_size", 1000)
+
+    @property
+    def agent_session_store_backend(self) -> str:
+        return self._config_data.get("agent", {}).get("session_store", {}).get("backend", "sqlite")
+
+    @property
+    def agent_session_store_path(self) -> str:
+        return self._config_data.get("agent", {}).get("session_store", {}).get("path", "./data/sessions/sessions.sqlite")
+
     @property
     def embeddings_model_name(self) -> str:
         return self._config_data.get("embeddings", {}).get("model_name", "sentence-transformers/all-MiniLM-L6-v2")
 
+    @property
+    def embeddings_dimension(self) -> int:
+        return self._config_data.get("embeddings", {}).get("dimension", 384)
+
+    @property
+    def embeddings_max_seq_length(self) -> int:
+        return self._config_data.get("embeddings", {}).get("max_seq_length", 256)
+
+    @property
+    def embeddings_cache_enabled(self) -> bool:
+        return self._config_data.get("embeddings", {}).get("cache", {}).get("enabled", True)
+
+    @property
+    def embeddings_cache_path(self) -> str:
+        return self._config_data.get("embeddings", {}).get("cache", {}).get("path", "./data/embedding_cache")
+
+    @property
+    def embeddings_cache_query_lru_size(self) -> int:
+        return self._config_data.get("embeddings", {}).get("cache", {}).get("query_lru_size", 2048)
+
+    @property
+    def embeddings_batching_enabled(self) -> bool:
+        return self._config_data.get("embeddings", {}).get("batching", {}).get("enabled", True)
+
+    @property
+    def embeddings_batching_max_batch_size(self) -> int:
+        return self._config_data.get("embeddings", {}).get("batching", {}).get("max_batch_size", 32)
+
+    @property
+    def embeddings_batching_max_wait_ms(self) -> float:
+        return self._config_data.get("embeddings", {}).get("batching", {}).get("max_wait_ms", 5.0)
+
     @property
     def vector_store_path(self) -> str:
         return self._config_data.get("vector_store", {}).get("path", "./data/vector_db")
 
+    @property
+    def vector_store_type(self) -> str:
+        return self._config_data.get("vector_store", {}).get("type", "chromadb")
+
+    @property
+    def vector_store_index(self) -> str:
+        return self._config_data.get("vector_store", {}).get("index", "flat")
+
+    @property
+    def vector_store_ivf_nlist(self) -> int:
+        return self._config_data.get("vector_store", {}).get("ivf", {}).get("nlist", 0)
+
+    @property
+    def vector_store_ivf_nprobe(self) -> int:
+        return self._config_data.get("vector_store", {}).get("ivf", {}).get("nprobe", 16)
+
+    @property
+    def vector_store_ivf_min_rows(self) -> int:
+        return self._config_data.get("vector_store", {}).get("ivf", {}).get("min_rows", 20000)
+
+    @property
+    def vector_store_quantization(self) -> str:
+        return self._config_data.get("vector_store", {}).get("quantization", {}).get("type", "none")
+
+    @property
+    def vector_store_pq_subvectors(self) -> int:
+        return self._config_data.get("vector_store", {}).get("quantization", {}).get("pq_subvectors", 48)
+
+    @property
+    def vector_store_quantization_min_rows(self) -> int:
+        return self._config_data.get("vector_store", {}).get("quantization", {}).get("min_rows", 10000)
+
+    @property
+    def vector_store_rerank_factor(self) -> int:
+        return self._config_data.get("vector_store", {}).get("quantization", {}).get("rerank_factor", 4)
+
+    @property
+    def vector_store_hnsw_ef_search(self) -> int:
+        return self._config_data.get("vector_store", {}).get("hnsw", {}).get("ef_search", 64)
+
+    @property
+    def vector_store_hnsw_ef_construction(self) -> int:
+        return self._config_data.get("vector_store", {}).get("hnsw", {}).get("ef_construction", 200)
+
+    @property
+    def vector_store_hnsw_m(self) -> int:
+        return self._config_data.get("vector_store", {}).get("hnsw", {}).get("m", 16)
+
     @property
     def vector_store_collection(self) -> str:
         return self._config_data.get("vector_store", {}).get("collection_name", "banking_documents")
 
+    @property
+    def vector_store_manifest_path(self) -> str:
+        default = str(Path(self.vector_store_path) / "ingestion_manifest.json")
+        return self._config_data.get("vector_store", {}).get("manifest_path", default)
+
     @property
     def rag_chunk_size(self) -> int:
         return self._config_data.get("rag", {}).get("chunk_size", 500)
@@ -150,10 +342,118 @@ class Config(BaseSettings):
     def rag_chunk_overlap(self) -> int:
         return self._config_data.get("rag", {}).get("chunk_overlap", 50)
 
+    @property
+    def rag_chunking_mode(self) -> str:
+        return self._config_data.get("rag", {}).get("chunking_mode", "chars")
+
+    @property
+    def rag_chunk_size_tokens(self) -> int:
+        return self._config_data.get("rag", {}).get("chunk_size_tokens", 0)
+
+    @property
+    def rag_chunk_overlap_tokens(self) -> int:
+        return self._config_data.get("rag", {}).get("chunk_overlap_tokens", 32)
+
     @property
     def rag_top_k(self) -> int:
         return self._config_data.get("rag", {}).get("top_k", 5)
 
+    @property
+    def rag_similarity_threshold(self) -> float:
+        return self._config_data.get("rag", {}).get("similarity_threshold", 0.3)
+
+    @property
+    def rag_mmr_enabled(self) -> bool:
+        return self._config_data.get("rag", {}).get("mmr", {}).get("enabled", False)
+
+    @property
+    def rag_mmr_lambda(self) -> float:
+        return self._config_data.get("rag", {}).get("mmr", {}).get("lambda", 0.7)
+
+    @property
+    def rag_mmr_fetch_factor(self) -> int:
+        return self._config_data.get("rag", {}).get("mmr", {}).get("fetch_factor", 3)
+
+    @property
+    def rag_mmr_duplicate_threshold(self) -> float:
+        return self._config_data.get("rag", {}).get("mmr", {}).get("duplicate_threshold", 0.95)
+
+    @property
+    def rag_context_token_budget(self) -> int:
+        return self._config_data.get("rag", {}).get("context_token_budget", 2000)
+
+    @property
+    def rag_enable_reranking(self) -> bool:
+        return self._config_data.get("rag", {}).get("enable_reranking", False)
+
+    @property
+    def rag_reranking_model_name(self) -> str:
+        return self._config_data.get("rag", {}).get("reranking", {}).get("model_name", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+    @property
+    def rag_reranking_candidates(self) -> int:
+        return self._config_data.get("rag", {}).get("reranking", {}).get("candidates", 20)
+
+    @property
+    def rag_reranking_top_n(self) -> int:
+        return self._config_data.get("rag", {}).get("reranking", {}).get("top_n", 3)
+
+    @property
+    def rag_reranking_latency_budget_ms(self) -> float:
+        return self._config_data.get("rag", {}).get("reranking", {}).get("latency_budget_ms", 300)
+
+    @property
+    def rag_reranking_cache_size(self) -> int:
+        return self._config_data.get("rag", {}).get("reranking", {}).get("cache_size", 10000)
+
+    @property
+    def rag_reranking_max_length(self) -> int:
+        return self._config_data.get("rag", {}).get("reranking", {}).get("max_length", 512)
+
+    @property
+    def rag_answer_cache_enabled(self) -> bool:
+        return self._config_data.get("rag", {}).get("answer_cache", {}).get("enabled", False)
+
+    @property
+    def rag_answer_cache_similarity_threshold(self) -> float:
+        return self._config_data.get("rag", {}).get("answer_cache", {}).get("similarity_threshold", 0.95)
+
+    @property
+    def rag_answer_cache_max_entries(self) -> int:
+        return self._config_data.get("rag", {}).get("answer_cache", {}).get("max_entries", 1000)
+
+    @property
+    def rag_answer_cache_ttl_seconds(self) -> float:
+        return self._config_data.get("rag", {}).get("answer_cache", {}).get("ttl_seconds", 3600)
+
+    @property
+    def rag_retrieval_mode(self) -> str:
+        return self._config_data.get("rag", {}).get("retrieval_mode", "dense")
+
+    @property
+    def rag_hybrid_candidates(self) -> int:
+        return self._config_data.get("rag", {}).get("hybrid", {}).get("candidates", 20)
+
+    @property
+    def rag_hybrid_dense_top_k(self) -> int:
+        return self._config_data.get("rag", {}).get("hybrid", {}).get("dense_top_k", 0)
+
+    @property
+    def rag_rrf_k(self) -> int:
+        return self._config_data.get("rag", {}).get("hybrid", {}).get("rrf_k", 60)
+
+    @property
+    def rag_bm25_k1(self) -> float:
+        return self._config_data.get("rag", {}).get("hybrid", {}).get("bm25_k1", 1.2)
+
+    @property
+    def rag_bm25_b(self) -> float:
+        return self._config_data.get("rag", {}).get("hybrid", {}).get("bm25_b", 0.75)
+
+    @property
+    def rag_sparse_index_path(self) -> str:
+        return self._config_data.get("rag", {}).get("hybrid", {}).get("sparse_index_path", "./data/vector_db/sparse_index.npz")
+
     @property
     def documents_upload_dir(self) -> str:
         return self._config_data.get("documents", {}).get("upload_dir", "./data/documents")
@@ -162,6 +462,34 @@ class Config(BaseSettings):
     def documents_supported_formats(self) -> List[str]:
         return self._config_data.get("documents", {}).get("supported_formats", ["pdf", "txt", "docx"])
 
+    @property
+    def concurrency_max_workers(self) -> int:
+        return self._config_data.get("concurrency", {}).get("max_workers", 8)
+
+    @property
+    def ingestion_workers(self) -> int:
+        return self._config_data.get("ingestion", {}).get("workers", 0)
+
+    @property
+    def ingestion_embed_batch_size(self) -> int:
+        return self._config_data.get("ingestion", {}).get("embed_batch_size", 64)
+
+    @property
+    def ingestion_queue_size(self) -> int:
+        return self._config_data.get("ingestion", {}).get("queue_size", 8)
+
+    @property
+    def ingestion_job_workers(self) -> int:
+        return self._config_data.get("ingestion", {}).get("job_workers", 1)
+
+    @property
+    def ingestion_job_history_size(self) -> int:
+        return self._config_data.get("ingestion", {}).get("job_history_size", 100)
+
+    @property
+    def ingestion_job_lock_timeout_seconds(self) -> float:
+        return self._config_data.get("ingestion", {}).get("job_lock_timeout_seconds", 3600)
+
     @property
     def banking_data_file(self) -> str:
         return self._config_data.get("banking", {}).get("data_file", "./data/banking_dummy_data.json")
@@ -3,6 +3,7 @@ LLM client factory for Groq API.
 """
 from ..config import config
 from ..utils.logger import logger
+from .response_cache import with_response_cache
 
 
 def get_llm_client():
@@ -10,7 +11,7 @@ def get_llm_client():
     Get the Groq LLM client.
 
     Returns:
-        GroqLLM instance
+        GroqLLM instance, wrapped in the response cache when enabled
 
     Raises:
         RuntimeError: If Groq API key is not configured
@@ -20,7 +21,7 @@ def get_llm_client():
     if provider == "groq":
         from .groq_client import groq_client
         logger.info("✅ Using Groq API for LLM inference (CPU-only, no GPU needed)")
-        return groq_client
+        return with_response_cache(groq_client)
     else:
         logger.error(f"Unsupported LLM provider: {provider}")
         logger.error("This application requires Groq API. Please set llm.provider='groq' in config.yaml")
@@ -2,12 +2,13 @@
 Groq API client for fast LLM inference.
 """
 import os
-from groq import Groq
-from typing import Optional, List, Dict
+from groq import Groq, AsyncGroq
+from typing import Optional, List, Dict, Iterator, AsyncIterator
 from dotenv import load_dotenv
 from ..config import config
 from ..utils.logger import logger
 from ..utils.exceptions import LLMError
+from .http_transport import http_clients
 
 # Load environment variables
 load_dotenv()
@@ -33,6 +34,7 @@ class GroqLLM:
         self.timeout = config.llm_groq_timeout
 
         self.client = None
+        self.async_client = None
 
         logger.info(f"Initializing Groq LLM: {self.model_name}")
 
@@ -43,7 +45,8 @@ class GroqLLM:
             return
 
         try:
-            self.client = Groq(api_key=self.api_key)
+            self.client = Groq(api_key=self.api_key, http_client=http_clients.get_client())
+            self.async_client = AsyncGroq(api_key=self.api_key, http_client=http_clients.get_async_client())
             logger.info(f"✅ Groq client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Groq client: {e}")
@@ -81,11 +84,7 @@ class GroqLLM:
             # Extract response
             if self.stream:
                 # Handle streaming response
-                response_text = ""
-                for chunk in completion:
-                    if chunk.choices[0].delta.content:
-                        response_text += chunk.choices[0].delta.content
-                return response_text.strip()
+                return "".join(self._iter_deltas(completion)).strip()
             else:
                 # Handle non-streaming response
                 return completion.choices[0].message.content.strip()
@@ -122,11 +121,7 @@ class GroqLLM:
             )
 
             if self.stream:
-                response_text = ""
-                for chunk in completion:
-                    if chunk.choices[0].delta.content:
-                        response_text += chunk.choices[0].delta.content
-                return response_text.strip()
+                return "".join(self._iter_deltas(completion)).strip()
             else:
                 return completion.choices[0].message.content.strip()
 
@@ -134,6 +129,150 @@ class GroqLLM:
             logger.error(f"Groq generation failed: {e}")
             raise LLMError(f"Groq generation failed: {e}")
 
+    def stream_from_messages(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Stream generated text deltas from chat messages.
+
+        Unlike generate_from_messages, this always requests a streaming
+        completion and yields each content delta as soon as Groq sends it.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            max_tokens: Override default max tokens
+
+        Yields:
+            Text deltas in generation order
+        """
+        if self.client is None:
+            self.load_model()
+
+        try:
+            completion = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=max_tokens or self.max_tokens,
+                top_p=self.top_p,
+                stream=True,
+                timeout=self.timeout,
+            )
+            yield from self._iter_deltas(completion)
+
+        except Exception as e:
+            logger.error(f"Groq streaming failed: {e}")
+            raise LLMError(f"Groq streaming failed: {e}")
+
+    def stream(self, prompt: str, max_new_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Stream generated text deltas from a single prompt.
+
+        Args:
+            prompt: Input prompt (will be converted to chat format)
+            max_new_tokens: Override default max tokens
+
+        Yields:
+            Text deltas in generation order
+        """
+        yield from self.stream_from_messages(self._prompt_to_messages(prompt), max_new_tokens)
+
+    async def agenerate(self, prompt: str, max_new_tokens: Optional[int] = None) -> str:
+        """
+        Generate text from prompt without blocking the event loop.
+
+        Args:
+            prompt: Input prompt (will be converted to chat format)
+            max_new_tokens: Override default max tokens
+
+        Returns:
+            Generated text
+        """
+        return await self.agenerate_from_messages(self._prompt_to_messages(prompt), max_new_tokens)
+
+    async def agenerate_from_messages(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Generate text from chat messages using the native async Groq client.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            max_tokens: Override default max tokens
+
+        Returns:
+            Generated text
+        """
+        if self.async_client is None:
+            self.load_model()
+
+        try:
+            completion = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=max_tokens or self.max_tokens,
+                top_p=self.top_p,
+                stream=self.stream,
+                timeout=self.timeout,
+            )
+
+            if self.stream:
+                return "".join([delta async for delta in self._aiter_deltas(completion)]).strip()
+            else:
+                return completion.choices[0].message.content.strip()
+
+        except Exception as e:
+            logger.error(f"Groq generation failed: {e}")
+            raise LLMError(f"Groq generation failed: {e}")
+
+    async def astream_from_messages(
+        self, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text deltas from chat messages using the async Groq client.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            max_tokens: Override default max tokens
+
+        Yields:
+            Text deltas in generation order
+        """
+        if self.async_client is None:
+            self.load_model()
+
+        try:
+            completion = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=max_tokens or self.max_tokens,
+                top_p=self.top_p,
+                stream=True,
+                timeout=self.timeout,
+            )
+            async for delta in self._aiter_deltas(completion):
+                yield delta
+
+        except Exception as e:
+            logger.error(f"Groq streaming failed: {e}")
+            raise LLMError(f"Groq streaming failed: {e}")
+
+    @staticmethod
+    async def _aiter_deltas(completion) -> AsyncIterator[str]:
+        """Yield non-empty content deltas from an async streaming completion."""
+        async for chunk in completion:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    @staticmethod
+    def _iter_deltas(completion) -> Iterator[str]:
+        """Yield non-empty content deltas from a streaming completion."""
+        for chunk in completion:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
     def _prompt_to_messages(self, prompt: str) -> List[Dict[str, str]]:
         """
         Convert a single prompt string to chat messages format.
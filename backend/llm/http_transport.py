@@ -0,0 +1,263 @@
+"""
+Shared, pooled HTTP clients for every Groq caller.
+
+GroqLLM and each session's ChatGroq would otherwise build their own httpx
+client, so every new session opened fresh connections and repeated the
+TCP and TLS handshakes. One keep-alive pool per sync/async flavour is
+created here and injected into all of them. HTTP/2 is used when the `h2`
+package is installed (one connection then multiplexes many requests).
+
+The pool is metered through httpx's public transport and trace
+extension hooks: requests in flight against the connection limit,
+requests that started while the pool was saturated, and how many
+connections (and TLS handshakes) were opened versus reused.
+"""
+import importlib.util
+import threading
+from typing import Dict, Optional
+import httpx
+from ..config import config
+from ..utils.logger import logger
+
+
+def http2_available() -> bool:
+    """Check whether the optional `h2` package (HTTP/2 support) is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class PoolMeter:
+    """Thread-safe counters for one connection pool."""
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.saturated_starts = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.http2_requests = 0
+        self.errors = 0
+
+    def begin(self):
+        with self._lock:
+            if self.in_flight >= self.max_connections:
+                self.saturated_starts += 1
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def end(self, error: bool = False):
+        with self._lock:
+            self.in_flight -= 1
+            if error:
+                self.errors += 1
+
+    def record_event(self, event_name: str):
+        """Count an httpcore trace event."""
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+        elif event_name == "http2.send_request_headers.started":
+            with self._lock:
+                self.http2_requests += 1
+
+    def get_metrics(self) -> Dict:
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "max_connections": self.max_connections,
+                "utilization": round(self.in_flight / self.max_connections, 4) if self.max_connections else 0.0,
+                "saturated_starts": self.saturated_starts,
+                "connections_opened": self.connections_opened,
+                "tls_handshakes": self.tls_handshakes,
+                "connection_reuse_rate": round(reused / self.requests, 4) if self.requests else 0.0,
+                "http2_requests": self.http2_requests,
+                "errors": self.errors,
+            }
+
+
+class _MeteredStream(httpx.SyncByteStream):
+    """Response body that reports when its connection is released."""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
+class _AsyncMeteredStream(httpx.AsyncByteStream):
+    """Async response body that reports when its connection is released."""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """Wrap a sync transport, counting requests and new connections."""
+
+    def __init__(self, transport: httpx.BaseTransport, meter: PoolMeter):
+        self._transport = transport
+        self._meter = meter
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        previous = request.extensions.get("trace")
+
+        def trace(event_name, info):
+            self._meter.record_event(event_name)
+            if previous is not None:
+                previous(event_name, info)
+
+        request.extensions["trace"] = trace
+        self._meter.begin()
+        try:
+            response = self._transport.handle_request(request)
+        except Exception:
+            self._meter.end(error=True)
+            raise
+        response.stream = _MeteredStream(response.stream, self._meter.end)
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncMeteredTransport(httpx.AsyncBaseTransport):
+    """Wrap an async transport, counting requests and new connections."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, meter: PoolMeter):
+        self._transport = transport
+        self._meter = meter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        previous = request.extensions.get("trace")
+
+        async def trace(event_name, info):
+            self._meter.record_event(event_name)
+            if previous is not None:
+                await previous(event_name, info)
+
+        request.extensions["trace"] = trace
+        self._meter.begin()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            self._meter.end(error=True)
+            raise
+        response.stream = _AsyncMeteredStream(response.stream, self._meter.end)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class SharedHTTPClients:
+    """Lazily created, process-wide httpx clients (one sync, one async)."""
+
+    def __init__(self, verify: bool = True):
+        """
+        Args:
+            verify: Verify TLS certificates (off only for local test servers)
+        """
+        self.verify = verify
+        self.max_connections = config.llm_http_max_connections
+        self.max_keepalive_connections = config.llm_http_max_keepalive_connections
+        self.keepalive_expiry = config.llm_http_keepalive_expiry
+        self.http2 = config.llm_http_http2 and http2_available()
+        self.timeout = httpx.Timeout(config.llm_groq_timeout, connect=config.llm_http_connect_timeout)
+
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self.sync_meter = PoolMeter(self.max_connections)
+        self.async_meter = PoolMeter(self.max_connections)
+
+        if config.llm_http_http2 and not self.http2:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1 keep-alive")
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def get_client(self) -> httpx.Client:
+        """Get the shared sync client (for Groq and ChatGroq)."""
+        with self._lock:
+            if self._client is None:
+                transport = httpx.HTTPTransport(limits=self._limits(), http2=self.http2, verify=self.verify)
+                self._client = httpx.Client(
+                    transport=MeteredTransport(transport, self.sync_meter),
+                    timeout=self.timeout
+                )
+                logger.info(
+                    f"✅ Shared HTTP client created (max_connections={self.max_connections}, "
+                    f"http2={self.http2})"
+                )
+            return self._client
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        """Get the shared async client (for AsyncGroq and ChatGroq)."""
+        with self._lock:
+            if self._async_client is None:
+                transport = httpx.AsyncHTTPTransport(limits=self._limits(), http2=self.http2, verify=self.verify)
+                self._async_client = httpx.AsyncClient(
+                    transport=AsyncMeteredTransport(transport, self.async_meter),
+                    timeout=self.timeout
+                )
+            return self._async_client
+
+    async def aclose(self):
+        """Close both clients and their pooled connections (application shutdown)."""
+        with self._lock:
+            client, self._client = self._client, None
+            async_client, self._async_client = self._async_client, None
+        if client is not None:
+            client.close()
+        if async_client is not None:
+            await async_client.aclose()
+
+    def get_metrics(self) -> Dict:
+        """Get pool limits and per-client saturation and reuse counters."""
+        return {
+            "http2": self.http2,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry": self.keepalive_expiry,
+            "sync": self.sync_meter.get_metrics(),
+            "async": self.async_meter.get_metrics(),
+        }
+
+
+# Global shared HTTP clients (created on first use)
+http_clients = SharedHTTPClients()
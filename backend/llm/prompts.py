@@ -111,6 +111,25 @@ Instructions:
 Response:"""
 
 
+# Conversation memory
+CONVERSATION_SUMMARY_PROMPT = """Update the running summary of a banking assistant conversation.
+
+Current summary:
+{summary}
+
+New conversation turns:
+{turns}
+
+Instructions:
+- Merge the new turns into the summary; keep what is still relevant
+- Keep facts the assistant may need later: account types, amounts, dates,
+  transfers made or requested, user preferences and open questions
+- Write the summary in the language the user mostly uses (English or Arabic)
+- Be brief: at most a few sentences
+
+Updated summary:"""
+
+
 # ==========================================
 # Message Format Helpers for Chat APIs
 # ==========================================
@@ -0,0 +1,407 @@
+"""
+Exact-match LLM response cache.
+
+Identical requests (same chitchat greeting, same action-extraction prompt,
+same RAG context plus question) are answered from a cache instead of a
+new LLM call. The key is a sha256 over the canonical JSON of
+(model, messages, temperature, max_tokens, top_p).
+
+Only deterministic settings are cached by default (temperature 0): with
+sampling, a repeated request is expected to produce a different answer.
+
+Backends:
+    memory  in-process LRU
+    sqlite        on-disk table shared by every worker process on the host,
+                  kept across restarts
+    shared_state  the configured shared state backend (SQLite or Redis),
+                  shared by workers on several hosts; entries are bounded
+                  by the TTL rather than max_entries (a day when ttl_seconds
+                  is 0, since nothing else would ever remove them)
+"""
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from ..config import config
+from ..utils.logger import logger
+from ..utils.concurrency import run_blocking
+from ..utils.shared_state import shared_state
+
+# Key prefix of responses in the shared state backend
+_SHARED_KEY_PREFIX = "llm:response:"
+
+# TTL of shared state responses when ttl_seconds is 0 (never expire)
+_SHARED_DEFAULT_TTL_SECONDS = 86400
+
+
+def response_cache_key(
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    top_p: Optional[float]
+) -> str:
+    """Canonical hash of an LLM request."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": [{"role": m.get("role"), "content": m.get("content")} for m in messages],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "top_p": top_p,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryResponseCache:
+    """In-process LRU of responses."""
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (response, stored_at)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.ttl_seconds and time.time() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, response: str):
+        with self._lock:
+            self._entries[key] = (response, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache:
+    """On-disk response table, evicting least-recently-used rows."""
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: float = 0):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, stored_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            excess = self._count() - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY used_at LIMIT ?)",
+                    (excess,)
+                )
+                self.evictions += excess
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+
+class SharedStateResponseCache:
+    """Responses in the shared state backend, expiring after the TTL."""
+
+    name = "shared_state"
+    blocking = True
+
+    def __init__(self, state, ttl_seconds: float = 0):
+        if not ttl_seconds:
+            # Expiry is the only bound on the number of entries
+            logger.warning(
+                f"llm.response_cache.ttl_seconds is 0, shared state responses expire after "
+                f"{_SHARED_DEFAULT_TTL_SECONDS}s instead"
+            )
+            ttl_seconds = _SHARED_DEFAULT_TTL_SECONDS
+        self.state = state
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0  # Expiry is left to the backend
+
+    def get(self, key: str) -> Optional[str]:
+        return self.state.get(_SHARED_KEY_PREFIX + key)
+
+    def put(self, key: str, response: str):
+        self.state.set(_SHARED_KEY_PREFIX + key, response, ttl=self.ttl_seconds)
+
+    def __len__(self) -> int:
+        """Live entries (a prefix scan on Redis: for stats only, off the event loop)."""
+        return self.state.count(_SHARED_KEY_PREFIX)
+
+
+class CachedLLM:
+    """
+    Caching layer around an LLM client (GroqLLM or HuggingFaceLLM).
+
+    generate, generate_from_messages and their async and streaming
+    variants are served from the cache when the same request was answered
+    before. Other attributes pass through to the wrapped client, and a
+    method the client lacks stays missing (callers probe with hasattr).
+    """
+
+    _WRAPPED = {
+        "generate", "generate_from_messages", "agenerate", "agenerate_from_messages",
+        "stream_from_messages", "astream_from_messages"
+    }
+
+    def __init__(self, client, cache, deterministic_only: bool = True):
+        self._client = client
+        self._cache = cache
+        self._deterministic_only = deterministic_only
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name in self._WRAPPED:
+            return functools.partial(getattr(self, f"_cached_{name}"), attr)
+        return attr
+
+    # ------------------------------------------------------------------
+    # Keys and counters
+    # ------------------------------------------------------------------
+
+    def _cacheable(self) -> bool:
+        if not self._deterministic_only:
+            return True
+        return getattr(self._client, "temperature", None) == 0
+
+    def _key(self, messages: List[Dict[str, str]], max_tokens: Optional[int]) -> Optional[str]:
+        """Cache key for a request, or None if it must not be cached."""
+        if not self._cacheable():
+            with self._stats_lock:
+                self.bypassed += 1
+            return None
+        default_max_tokens = getattr(self._client, "max_tokens", None) or getattr(self._client, "max_new_tokens", None)
+        return response_cache_key(
+            self._client.model_name,
+            messages,
+            getattr(self._client, "temperature", None),
+            max_tokens or default_max_tokens,
+            getattr(self._client, "top_p", None)
+        )
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @staticmethod
+    def _prompt_messages(prompt: str) -> List[Dict[str, str]]:
+        return [{"role": "user", "content": prompt}]
+
+    def _lookup(self, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return None
+        response = self._cache.get(key)
+        self._count(response is not None)
+        return response
+
+    def _store(self, key: Optional[str], response: str):
+        if key is not None and response:
+            self._cache.put(key, response)
+
+    async def _alookup(self, key: Optional[str]) -> Optional[str]:
+        if key is None or not self._cache.blocking:
+            return self._lookup(key)
+        response = await run_blocking(self._cache.get, key)
+        self._count(response is not None)
+        return response
+
+    async def _astore(self, key: Optional[str], response: str):
+        if key is not None and response and self._cache.blocking:
+            await run_blocking(self._cache.put, key, response)
+        else:
+            self._store(key, response)
+
+    # ------------------------------------------------------------------
+    # Cached methods (first argument: the wrapped client's method)
+    # ------------------------------------------------------------------
+
+    def _cached_generate(self, generate, prompt: str, max_new_tokens: Optional[int] = None) -> str:
+        key = self._key(self._prompt_messages(prompt), max_new_tokens)
+        response = self._lookup(key)
+        if response is None:
+            response = generate(prompt, max_new_tokens)
+            self._store(key, response)
+        return response
+
+    def _cached_generate_from_messages(
+        self, generate, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> str:
+        key = self._key(messages, max_tokens)
+        response = self._lookup(key)
+        if response is None:
+            response = generate(messages, max_tokens)
+            self._store(key, response)
+        return response
+
+    async def _cached_agenerate(self, agenerate, prompt: str, max_new_tokens: Optional[int] = None) -> str:
+        key = self._key(self._prompt_messages(prompt), max_new_tokens)
+        response = await self._alookup(key)
+        if response is None:
+            response = await agenerate(prompt, max_new_tokens)
+            await self._astore(key, response)
+        return response
+
+    async def _cached_agenerate_from_messages(
+        self, agenerate, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> str:
+        key = self._key(messages, max_tokens)
+        response = await self._alookup(key)
+        if response is None:
+            response = await agenerate(messages, max_tokens)
+            await self._astore(key, response)
+        return response
+
+    def _cached_stream_from_messages(
+        self, stream, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        key = self._key(messages, max_tokens)
+        response = self._lookup(key)
+        if response is not None:
+            yield response
+            return
+        parts = []
+        for delta in stream(messages, max_tokens):
+            parts.append(delta)
+            yield delta
+        self._store(key, "".join(parts).strip())
+
+    async def _cached_astream_from_messages(
+        self, astream, messages: List[Dict[str, str]], max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        key = self._key(messages, max_tokens)
+        response = await self._alookup(key)
+        if response is not None:
+            yield response
+            return
+        parts = []
+        async for delta in astream(messages, max_tokens):
+            parts.append(delta)
+            yield delta
+        await self._astore(key, "".join(parts).strip())
+
+    def get_cache_stats(self) -> Dict:
+        """Get hit/miss counters and cache size (blocking with an on-disk or shared backend)."""
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "backend": self._cache.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "bypassed_nondeterministic": self.bypassed,
+                "deterministic_only": self._deterministic_only,
+            }
+        stats["entries"] = len(self._cache)
+        stats["evictions"] = self._cache.evictions
+        return stats
+
+
+def create_response_cache():
+    """Create the configured response cache backend, or None if disabled."""
+    if not config.llm_response_cache_enabled:
+        return None
+    backend = config.llm_response_cache_backend
+    if backend == "memory":
+        return MemoryResponseCache(config.llm_response_cache_max_entries, config.llm_response_cache_ttl_seconds)
+    if backend == "sqlite":
+        return SQLiteResponseCache(
+            config.llm_response_cache_sqlite_path,
+            config.llm_response_cache_max_entries,
+            config.llm_response_cache_ttl_seconds
+        )
+    if backend == "shared_state":
+        if shared_state is None:
+            logger.error("llm.response_cache.backend is 'shared_state' but shared_state.backend is 'none', "
+                         "response cache disabled")
+            return None
+        return SharedStateResponseCache(shared_state, config.llm_response_cache_ttl_seconds)
+    logger.error(f"Unknown llm.response_cache.backend '{backend}', response cache disabled")
+    return None
+
+
+def with_response_cache(client):
+    """Wrap an LLM client in the configured response cache (unchanged if disabled)."""
+    cache = create_response_cache()
+    if cache is None:
+        return client
+    logger.info(
+        f"LLM response cache: {cache.name} backend"
+        f"{' (deterministic requests only)' if config.llm_response_cache_deterministic_only else ''}"
+    )
+    if config.llm_response_cache_deterministic_only and getattr(client, "temperature", None) != 0:
+        logger.warning(
+            f"LLM response cache is inactive: temperature is {getattr(client, 'temperature', None)} and "
+            f"llm.response_cache.deterministic_only is true (set temperature to 0 to cache answers)"
+        )
+    return CachedLLM(client, cache, deterministic_only=config.llm_response_cache_deterministic_only)
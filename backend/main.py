@@ -3,6 +3,7 @@ FastAPI backend main application.
 """
 from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import aiofiles
@@ -11,11 +12,17 @@ import uvicorn
 
 from .config import config
 from .agent.agent import agent
-from .rag.document_loader import load_document
-from .rag.chunker import chunk_document
 from .rag.vector_store import vector_store
+from .rag.ingestion_jobs import job_manager
+from .rag.embeddings import embedding_service
+from .rag.reranker import reranker
+from .rag.answer_cache import answer_cache
 from .llm.client import llm_client  # Use client factory (Groq API)
+from .llm.http_transport import http_clients
 from .utils.logger import logger
+from .utils.shared_state import shared_state
+from .utils.concurrency import run_blocking, shutdown_executor
+from .utils.streaming import format_sse
 
 # Create FastAPI app
 app = FastAPI(
@@ -61,6 +68,8 @@ class ChatResponse(BaseModel):
     sources: List[dict] = []
     tools_used: Optional[List[ToolUsage]] = None
     agent_type: Optional[str] = None
+    timings: Optional[dict] = None  # Per-stage milliseconds (RAG questions)
+    memory: Optional[dict] = None  # Prompt token counts of the conversation memory (LangChain agent)
 
 
 @app.on_event("startup")
@@ -71,6 +80,10 @@ async def startup_event():
     # Initialize vector store
     vector_store.initialize()
 
+    # Load the re-ranking model now so the first question stays within its latency budget
+    if config.rag_enable_reranking:
+        reranker.load_model()
+
     # Load LLM (this can take a few minutes on first run)
     logger.info("Loading LLM model (this may take a few minutes)...")
     llm_client.load_model()
@@ -78,6 +91,15 @@ async def startup_event():
     logger.info("✅ BankSight AI API ready!")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release background resources on shutdown."""
+    job_manager.shutdown()
+    vector_store.flush()
+    shutdown_executor()
+    await http_clients.aclose()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -94,10 +116,29 @@ async def health_check():
     return {
         "status": "healthy",
         "llm_loaded": llm_client.is_loaded(),
-        "vector_store_count": vector_store.get_count()
+        "vector_store_count": await run_blocking(vector_store.get_count),
+        "query_embeddings": embedding_service.get_metrics(),
+        "embedding_cache": embedding_service.get_cache_stats(),
+        "reranker": reranker.get_metrics() if config.rag_enable_reranking else {"enabled": False},
+        "answer_cache": {"enabled": True, **answer_cache.get_stats()} if answer_cache else {"enabled": False},
+        "llm_cache": (
+            {"enabled": True, **await run_blocking(llm_client.get_cache_stats)}
+            if hasattr(llm_client, "get_cache_stats") else {"enabled": False}
+        ),
+        "llm_http_pool": http_clients.get_metrics(),
+        "agent_sessions": await run_blocking(_agent_session_metrics),
+        "shared_state": shared_state.name if shared_state is not None else None
     }
 
 
+def _agent_session_metrics() -> dict:
+    """LangChain session counts and memory footprint, or the classic agent's history counts."""
+    if not agent.use_langchain:
+        return {"enabled": True, **agent.conversation_histories.get_metrics()}
+    from .agent.langchain_agent import session_manager
+    return {"enabled": True, **session_manager.get_metrics()}
+
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -128,7 +169,9 @@ async def chat(request: ChatRequest):
             intent=result["intent"],
             sources=result.get("sources", []),
             tools_used=result.get("tools_used"),
-            agent_type=result.get("metadata", {}).get("agent_type")
+            agent_type=result.get("metadata", {}).get("agent_type"),
+            timings=result.get("metadata", {}).get("timings"),
+            memory=result.get("metadata", {}).get("memory")
         )
 
     except Exception as e:
@@ -136,6 +179,49 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming chat endpoint (Server-Sent Events).
+
+    Emits one `token` event per LLM delta as soon as it is generated, then a
+    single `final` event carrying the full response, intent, sources,
+    tools_used and agent_type (same fields as /api/chat).
+    """
+    old_messages_dict = None
+    if request.old_messages:
+        old_messages_dict = [msg.model_dump() for msg in request.old_messages]
+
+    async def event_stream():
+        async for frame in agent.stream_query(
+            query=request.message,
+            session_id=request.session_id,
+            old_messages=old_messages_dict
+        ):
+            if frame["type"] == "final":
+                frame = {
+                    "type": "final",
+                    "success": frame["success"],
+                    "response": frame["response"],
+                    "intent": frame["intent"],
+                    "sources": frame.get("sources", []),
+                    "tools_used": frame.get("tools_used"),
+                    "agent_type": frame.get("metadata", {}).get("agent_type"),
+                    "timings": frame.get("metadata", {}).get("timings"),
+                    "memory": frame.get("metadata", {}).get("memory")
+                }
+            yield format_sse(frame)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering so tokens flush immediately
+        }
+    )
+
+
 @app.post("/api/agent/clear-session/{session_id}")
 async def clear_agent_session(session_id: str):
     """
@@ -147,19 +233,19 @@ async def clear_agent_session(session_id: str):
     - Starting fresh conversations
     """
     try:
-        # Only available with LangChain agent
         if agent.use_langchain:
             from .agent.langchain_agent import clear_agent_session as clear_session
-            clear_session(session_id)
+            await clear_session(session_id)
             return {
                 "success": True,
                 "message": f"Session {session_id} cleared",
                 "agent_type": "langchain"
             }
         else:
+            await run_blocking(agent.conversation_histories.clear, session_id)
             return {
-                "success": False,
-                "message": "Session management only available with LangChain agent",
+                "success": True,
+                "message": f"Session {session_id} cleared",
                 "agent_type": "classic"
             }
 
@@ -181,9 +267,8 @@ async def get_conversation_memory(session_id: str):
     try:
         # Only available with LangChain agent
         if agent.use_langchain:
-            from .agent.langchain_agent import get_agent
-            session_agent = get_agent(session_id)
-            history = session_agent.get_memory_history()
+            from .agent.langchain_agent import get_session_history
+            history = await get_session_history(session_id)
 
             return {
                 "success": True,
@@ -193,12 +278,13 @@ async def get_conversation_memory(session_id: str):
                 "agent_type": "langchain"
             }
         else:
-            # Return classic agent history
+            # Return this session's classic agent history
+            history = await run_blocking(agent.conversation_histories.get, session_id)
             return {
                 "success": True,
                 "session_id": session_id,
-                "messages": agent.conversation_history,
-                "count": len(agent.conversation_history),
+                "messages": history,
+                "count": len(history),
                 "agent_type": "classic"
             }
 
@@ -239,6 +325,8 @@ async def get_agent_info():
                 "llm_provider": config.llm_provider
             }
 
+            info["sessions"] = await run_blocking(_agent_session_metrics)
+
             # Get tool count
             try:
                 from .agent.langchain_tools import create_banking_tools
@@ -259,7 +347,11 @@ async def get_agent_info():
 
 @app.post("/api/documents/upload")
 async def upload_document(file: UploadFile = File(...)):
-    """Upload and process a document."""
+    """
+    Upload a document and queue it for processing.
+
+    Returns immediately with a job ID; poll /api/jobs/{job_id} for progress.
+    """
     try:
         # Validate file type
         file_ext = Path(file.filename).suffix.lower()
@@ -281,21 +373,19 @@ async def upload_document(file: UploadFile = File(...)):
 
         logger.info(f"File saved: {file_path}")
 
-        # Process document
-        doc = load_document(str(file_path))
-        chunks = chunk_document(doc["text"], doc["metadata"])
-
-        # Add to vector store
-        vector_store.add_documents(chunks)
-
-        logger.info(f"Document processed: {file.filename}, {len(chunks)} chunks")
+        # Parsing, chunking and embedding run as a background job;
+        # re-uploading an identical file is a no-op
+        job = job_manager.submit_files([str(file_path)], f"Process {file.filename}")
 
         return {
             "success": True,
-            "message": f"Document '{file.filename}' uploaded and processed",
-            "chunks": len(chunks)
+            "message": f"Document '{file.filename}' uploaded, processing started",
+            "job_id": job.job_id,
+            "status": job.status
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Upload error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -328,42 +418,26 @@ async def list_documents():
 
 @app.post("/api/documents/process-all")
 async def process_all_documents():
-    """Process all documents in the upload directory."""
+    """
+    Queue processing of all documents in the upload directory.
+
+    Runs the parallel ingestion pipeline as a background job. Incremental:
+    only new or changed files are processed, and chunks of deleted files
+    are removed from the vector store. Poll /api/jobs/{job_id} for progress.
+    """
     try:
         upload_dir = Path(config.documents_upload_dir)
 
         if not upload_dir.exists():
-            return {"message": "No documents directory found"}
-
-        processed = 0
-        total_chunks = 0
-
-        for file_path in upload_dir.iterdir():
-            if file_path.is_file() and file_path.suffix[1:] in config.documents_supported_formats:
-                try:
-                    logger.info(f"Processing document: {file_path.name}")
-                    doc = load_document(str(file_path))
-                    logger.info(f"Loaded {len(doc['text'])} characters from {file_path.name}")
+            return {"success": False, "message": "No documents directory found"}
 
-                    logger.info(f"Chunking document: {file_path.name}")
-                    chunks = chunk_document(doc["text"], doc["metadata"])
-                    logger.info(f"Created {len(chunks)} chunks from {file_path.name}")
-
-                    logger.info(f"Adding chunks to vector store for {file_path.name}")
-                    vector_store.add_documents(chunks)
-                    logger.info(f"✅ Added chunks to vector store for {file_path.name}")
-
-                    processed += 1
-                    total_chunks += len(chunks)
-                    logger.info(f"✅ Successfully processed: {file_path.name}")
-
-                except Exception as e:
-                    logger.error(f"❌ Failed to process {file_path.name}: {str(e)}", exc_info=True)
+        job = job_manager.submit_directory(str(upload_dir))
 
         return {
             "success": True,
-            "processed": processed,
-            "total_chunks": total_chunks
+            "message": "Processing started",
+            "job_id": job.job_id,
+            "status": job.status
         }
 
     except Exception as e:
@@ -371,10 +445,52 @@ async def process_all_documents():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/jobs")
+async def list_jobs():
+    """List ingestion jobs, newest first."""
+    return {"jobs": [job.to_dict() for job in job_manager.list()]}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get an ingestion job's status and progress."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running ingestion job."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+
+def _multiworker_problems() -> List[str]:
+    """Why backend.workers > 1 cannot work with the current configuration."""
+    problems = []
+    if shared_state is None:
+        problems.append("shared_state.backend is 'none': jobs, sessions, balances and indexes would differ per worker")
+    if config.vector_store_type == "chromadb":
+        # Reads could reopen the client, but PersistentClient is not safe with several writing processes
+        problems.append("vector_store.type 'chromadb' cannot be shared by several processes; use 'numpy'")
+    return problems
+
+
 if __name__ == "__main__":
+    if config.backend_workers > 1 and not config.backend_reload:
+        problems = _multiworker_problems()
+        if problems:
+            for problem in problems:
+                logger.error(f"❌ backend.workers > 1: {problem}")
+            raise SystemExit(1)
     uvicorn.run(
         "backend.main:app",
         host=config.backend_host,
         port=config.backend_port,
-        reload=config.backend_reload
+        reload=config.backend_reload,
+        workers=config.backend_workers
     )
@@ -0,0 +1,319 @@
+"""
+Semantic answer cache for RAG questions.
+
+Answers are cached with the question's embedding. A new question whose
+embedding has cosine similarity >= `rag.answer_cache.similarity_threshold`
+with a cached one gets the cached answer and sources back without a
+search or an LLM call. Paraphrases such as "what is the overdraft fee?"
+and "overdraft fee?" therefore share one entry.
+
+Off unless `rag.answer_cache.enabled`: questions that differ only in a
+negation, a fee name or an account type can embed above the threshold too.
+
+Question embeddings live in one preallocated matrix, so a lookup is a
+single matrix-vector product. Entries expire after a TTL, are evicted
+least-recently-used when the cache is full, and are invalidated when a
+chunk they were answered from is deleted or its file is re-ingested.
+
+With a shared state backend, every invalidation also bumps a shared
+generation counter; a worker that sees the counter change drops its
+whole cache, since another worker changed the documents.
+
+Every invalidation (local or seen from another worker) also advances a
+local epoch. lookup() returns the epoch it saw and store() discards an
+answer if the epoch moved since: its chunks may have been re-ingested
+while the answer was being generated.
+
+lookup() and store() may read shared state, so async callers run them
+off the event loop.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from ..config import config
+from ..utils.logger import logger
+from ..utils.shared_state import shared_state
+
+# Shared counter bumped whenever any worker invalidates answers
+_GENERATION_KEY = "rag:answer_cache:generation"
+
+
+class _Entry:
+    """One cached answer plus what it was generated from."""
+
+    __slots__ = ("query", "top_k", "answer", "sources", "chunk_ids", "files", "expires_at")
+
+    def __init__(self, query: str, top_k: Optional[int], answer: str, sources: List[Dict],
+                 chunk_ids: List[str], files: List[str], expires_at: float):
+        self.query = query
+        self.top_k = top_k
+        self.answer = answer
+        self.sources = sources
+        self.chunk_ids = chunk_ids
+        self.files = files
+        self.expires_at = expires_at
+
+
+class SemanticAnswerCache:
+    """Answer cache keyed by question embedding (cosine similarity)."""
+
+    def __init__(
+        self,
+        dimension: int,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float = 0.95,
+        state=None
+    ):
+        """
+        Args:
+            dimension: Question embedding dimension
+            max_entries: Maximum cached answers (LRU eviction beyond)
+            ttl_seconds: Lifetime of an answer (0 = no expiry)
+            similarity_threshold: Minimum cosine similarity for a hit
+            state: Shared state backend for invalidations by other workers (None = single process)
+        """
+        self.dimension = dimension
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.state = state
+        self._generation = state.get(_GENERATION_KEY) if state is not None else None
+
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((max_entries, dimension), dtype=np.float32)
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()  # slot -> entry, LRU order
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._slots_by_chunk: Dict[str, Set[int]] = {}
+        self._slots_by_file: Dict[str, Set[int]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.lru_evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_stores = 0
+        self._epoch = 0  # Advanced by every invalidation
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    def lookup(self, query_embedding: np.ndarray, top_k: Optional[int] = None) -> Tuple[Optional[Dict], int]:
+        """
+        Find a cached answer for a question.
+
+        Args:
+            query_embedding: Question embedding
+            top_k: Requested number of sources (must match the cached entry)
+
+        Returns:
+            (dict with 'answer', 'sources', 'similarity' and the cached
+            'query', or None on a miss; the invalidation epoch, for store())
+        """
+        query = self._normalize(query_embedding)
+        with self._lock:
+            self._check_generation()
+            return self._lookup(query, top_k), self._epoch
+
+    def _lookup(self, query: np.ndarray, top_k: Optional[int]) -> Optional[Dict]:
+        """lookup() body. Caller holds the lock."""
+        if not self._entries:
+            self.misses += 1
+            return None
+
+        slots = np.fromiter(self._entries.keys(), dtype=np.int64, count=len(self._entries))
+        similarities = self._matrix[slots] @ query
+        now = time.time()
+        for i in np.argsort(-similarities, kind="stable").tolist():
+            if similarities[i] < self.similarity_threshold:
+                break
+            slot = int(slots[i])
+            entry = self._entries[slot]
+            if self.ttl_seconds and entry.expires_at <= now:
+                self._remove(slot)
+                self.expirations += 1
+                continue
+            if entry.top_k != top_k:
+                continue
+            self._entries.move_to_end(slot)
+            self.hits += 1
+            return {
+                "answer": entry.answer,
+                "sources": entry.sources,
+                "similarity": float(similarities[i]),
+                "query": entry.query
+            }
+        self.misses += 1
+        return None
+
+    def store(
+        self,
+        query: str,
+        query_embedding: np.ndarray,
+        answer: str,
+        sources: List[Dict],
+        documents: List[Dict],
+        top_k: Optional[int] = None,
+        epoch: Optional[int] = None
+    ):
+        """
+        Cache an answer.
+
+        Dropped instead if answers were invalidated since the lookup that
+        returned `epoch`.
+
+        Args:
+            query: Question text (for logs)
+            query_embedding: Question embedding
+            answer: Generated answer
+            sources: Source references returned with the answer
+            documents: Chunks the answer was generated from ('id' and
+                       'metadata' with 'file_path'), for invalidation
+            top_k: Requested number of sources
+            epoch: Epoch returned by the lookup before generating the answer
+        """
+        chunk_ids = [doc["id"] for doc in documents if doc.get("id")]
+        files = sorted({doc["metadata"]["file_path"] for doc in documents if doc["metadata"].get("file_path")})
+        with self._lock:
+            self._check_generation()
+            if epoch is not None and epoch != self._epoch:
+                # Its chunks may have been re-ingested or deleted meanwhile
+                self.stale_stores += 1
+                logger.info(f"Answer cache: not storing an answer invalidated while generated: {query[:50]}")
+                return
+            if not self._free:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.lru_evictions += 1
+            slot = self._free.pop()
+            self._matrix[slot] = self._normalize(query_embedding)
+            self._entries[slot] = _Entry(
+                query=query,
+                top_k=top_k,
+                answer=answer,
+                sources=sources,
+                chunk_ids=chunk_ids,
+                files=files,
+                expires_at=time.time() + self.ttl_seconds
+            )
+            for chunk_id in chunk_ids:
+                self._slots_by_chunk.setdefault(chunk_id, set()).add(slot)
+            for file_path in files:
+                self._slots_by_file.setdefault(file_path, set()).add(slot)
+            self.stores += 1
+
+    def _remove(self, slot: int):
+        entry = self._entries.pop(slot)
+        for chunk_id in entry.chunk_ids:
+            _discard(self._slots_by_chunk, chunk_id, slot)
+        for file_path in entry.files:
+            _discard(self._slots_by_file, file_path, slot)
+        self._free.append(slot)
+
+    def _check_generation(self):
+        """Drop everything if another worker invalidated answers. Caller holds the lock."""
+        if self.state is None:
+            return
+        generation = self.state.get(_GENERATION_KEY)
+        if generation != self._generation:
+            self._generation = generation
+            self._epoch += 1
+            if self._entries:
+                logger.info(f"Answer cache: documents changed on another worker, dropping {len(self._entries)} answers")
+            self._drop_all()
+
+    def _publish_invalidation(self):
+        """Tell other workers to drop their answers. Caller holds the lock."""
+        if self.state is None:
+            return
+        generation = self.state.incr(_GENERATION_KEY)
+        if self._generation != str(generation - 1):
+            self._drop_all()  # Missed another worker's invalidation
+        self._generation = str(generation)
+
+    def _drop_all(self):
+        self._epoch += 1
+        self.invalidations += len(self._entries)
+        for slot in list(self._entries):
+            self._remove(slot)
+
+    def invalidate_chunks(self, chunk_ids: Iterable[str]):
+        """Drop answers generated from any of these chunks."""
+        with self._lock:
+            self._publish_invalidation()
+            slots = set()
+            for chunk_id in chunk_ids:
+                slots |= self._slots_by_chunk.get(chunk_id, set())
+            self._invalidate(slots)
+
+    def invalidate_files(self, file_paths: Iterable[str]):
+        """Drop answers generated from chunks of these files."""
+        with self._lock:
+            self._publish_invalidation()
+            slots = set()
+            for file_path in file_paths:
+                slots |= self._slots_by_file.get(file_path, set())
+            self._invalidate(slots)
+
+    def _invalidate(self, slots: Set[int]):
+        self._epoch += 1
+        for slot in slots:
+            self._remove(slot)
+        if slots:
+            self.invalidations += len(slots)
+            logger.info(f"Answer cache: invalidated {len(slots)} answers")
+
+    def clear(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._publish_invalidation()
+            self._drop_all()
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss and eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "entries": len(self._entries),
+                "capacity": self.max_entries,
+                "lru_evictions": self.lru_evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_stores": self.stale_stores,
+                "similarity_threshold": self.similarity_threshold,
+            }
+
+
+def _discard(index: Dict[str, Set[int]], key: str, slot: int):
+    slots = index.get(key)
+    if slots is not None:
+        slots.discard(slot)
+        if not slots:
+            del index[key]
+
+
+def create_answer_cache() -> Optional[SemanticAnswerCache]:
+    """Create the answer cache from config, or None if disabled."""
+    if not config.rag_answer_cache_enabled:
+        return None
+    return SemanticAnswerCache(
+        dimension=config.embeddings_dimension,
+        max_entries=config.rag_answer_cache_max_entries,
+        ttl_seconds=config.rag_answer_cache_ttl_seconds,
+        similarity_threshold=config.rag_answer_cache_similarity_threshold,
+        state=shared_state
+    )
+
+
+# Global answer cache instance (None when disabled)
+answer_cache = create_answer_cache()
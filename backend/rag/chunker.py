@@ -1,9 +1,299 @@
 """
 Document chunking utilities.
+
+Chunking is streaming: documents arrive as an iterable of text segments
+(PDF pages, paragraphs, CSV row blocks) and chunks are produced as soon as
+enough text is buffered. Each chunk boundary is found with one compiled
+regex match confined to the chunk window, and only text from the current
+window onwards is kept, so chunking runs in linear time and bounded memory.
+
+Chunk size is measured in characters ("chars" mode) or in embedding
+tokenizer tokens ("tokens" mode, `rag.chunking_mode`), where chunks fill
+but never exceed the embedding model's input window.
 """
-from typing import List, Dict
+import re
+from bisect import bisect_left
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
 from ..config import config
 from ..utils.logger import logger
+from .tokenizer import chunk_token_budget, get_tokenizer, tokenize_with_offsets
+
+# Separator placed between consecutive segments (pages, paragraphs, ...)
+SEGMENT_SEPARATOR = "\n\n"
+
+# Matches up to the last sentence end (incl. the Arabic question mark) or
+# paragraph break of a window: the greedy prefix runs to the window end and
+# backtracks to the nearest boundary, so lookback never leaves the window
+_LAST_BOUNDARY_RE = re.compile(r".*(?:[.!?؟] |\n\n)", re.DOTALL)
+
+# Segments tokenized per tokenizer call in tokens mode
+_TOKENIZE_SEGMENTS = 16
+
+# Drop consumed token spans once this many have piled up
+_TOKEN_COMPACT_THRESHOLD = 4096
+
+
+class StreamingChunker:
+    """
+    Incremental chunker over a stream of text segments.
+
+    Each chunk window ends at the last sentence or paragraph boundary inside
+    it (or is cut at `chunk_size` if there is none, or if the boundary lies
+    within `chunk_overlap` of the window start), and the next window starts
+    `chunk_overlap` characters before that end.
+
+    Offsets refer to the document text as it would read with segments
+    joined by SEGMENT_SEPARATOR.
+    """
+
+    def __init__(self, chunk_size: int = None, chunk_overlap: int = None, metadata: Dict = None):
+        self.chunk_size = chunk_size or config.rag_chunk_size
+        self.chunk_overlap = chunk_overlap or config.rag_chunk_overlap
+        self.metadata = metadata or {}
+
+        self._buffer = ""
+        self._offset = 0  # Document offset of _buffer[0]
+        self._start = 0  # Buffer position of the next chunk window
+        self._has_text = False
+
+        self._pages = deque()  # (document offset, page) of buffered segments
+        self.chunk_index = 0
+
+    def feed(self, text: str, page: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Add a segment and yield the chunks it completes.
+
+        Args:
+            text: Segment text
+            page: Page number of the segment, if any
+
+        Yields:
+            Chunk dicts with 'text' and 'metadata'
+        """
+        if not text or not text.strip():
+            return
+
+        self._append(text, page)
+        yield from self._drain(final=False)
+
+    def finish(self) -> Iterator[Dict]:
+        """Yield the remaining chunks once all segments are fed."""
+        yield from self._drain(final=True)
+
+    def _append(self, text: str, page: Optional[int]) -> int:
+        """Append a segment to the buffer; returns its document offset."""
+        self._trim()
+        if self._has_text:
+            self._buffer += SEGMENT_SEPARATOR
+        self._has_text = True
+
+        position = self._offset + len(self._buffer)
+        self._pages.append((position, page))
+        self._buffer += text
+        return position
+
+    def _window_limit(self, start: int, final: bool) -> Optional[int]:
+        """
+        Buffer position the window starting at `start` may extend to.
+
+        Returns None when the window reaches past the buffered text and
+        more text may still arrive.
+        """
+        limit = start + self.chunk_size
+        if limit >= len(self._buffer):
+            return len(self._buffer) if final else None
+        return limit
+
+    def _overlap_start(self, start: int, end: int) -> int:
+        """Start of the window following a chunk that ended at `end`."""
+        return end - self.chunk_overlap
+
+    def _span_size(self, start: int, end: int) -> int:
+        """Size of buffer[start:end] in chunk size units."""
+        return end - start
+
+    def _trim(self):
+        """Drop buffered text before the current window."""
+        if self._start > 0:
+            self._buffer = self._buffer[self._start:]
+            self._offset += self._start
+            self._start = 0
+
+    def _drain(self, final: bool) -> Iterator[Dict]:
+        buffer = self._buffer
+        while self._start < len(buffer):
+            window_end = self._window_limit(self._start, final)
+            if window_end is None:
+                # The window may still grow into text not received yet
+                return
+            if window_end >= len(buffer):
+                end = len(buffer)
+            else:
+                boundary = _LAST_BOUNDARY_RE.match(buffer, self._start, window_end)
+                # A boundary inside the overlap would start the next window
+                # right back before it: the same boundary again, one step on
+                if boundary and self._span_size(self._start, boundary.end()) > self.chunk_overlap:
+                    end = boundary.end()
+                else:
+                    end = window_end
+
+            chunk = self._make_chunk(self._start, end)
+            if chunk is not None:
+                yield chunk
+
+            # Always make forward progress, even with a large overlap
+            if end < len(buffer):
+                self._start = max(self._overlap_start(self._start, end), self._start + 1)
+            else:
+                self._start = end
+
+    def _make_chunk(self, start: int, end: int) -> Optional[Dict]:
+        raw = self._buffer[start:end]
+        text = raw.strip()
+        if not text:
+            return None
+
+        start_char = self._offset + start + (len(raw) - len(raw.lstrip()))
+        while len(self._pages) > 1 and self._pages[1][0] <= start_char:
+            self._pages.popleft()
+
+        metadata = {
+            **self.metadata,
+            "chunk_index": self.chunk_index,
+            "start_char": start_char,
+            "end_char": start_char + len(text)
+        }
+        if self._pages and self._pages[0][1] is not None:
+            metadata["page"] = self._pages[0][1]
+
+        self._annotate(metadata)
+        self.chunk_index += 1
+        return {"text": text, "metadata": metadata}
+
+    def _annotate(self, metadata: Dict):
+        """Hook for subclasses to add chunk metadata."""
+        pass
+
+
+class TokenStreamingChunker(StreamingChunker):
+    """
+    Streaming chunker measuring chunk size in embedding tokenizer tokens.
+
+    Segments must be fed with their token character spans (from the
+    model's fast tokenizer), so windows hold at most `chunk_size` tokens
+    and chunk boundaries fall between tokens.
+    """
+
+    def __init__(self, chunk_size: int = None, chunk_overlap: int = None, metadata: Dict = None):
+        super().__init__(
+            chunk_size or chunk_token_budget(),
+            chunk_overlap or config.rag_chunk_overlap_tokens,
+            metadata
+        )
+        # Token spans (document offsets) from the current window onwards
+        self._token_starts: List[int] = []
+        self._token_ends: List[int] = []
+        self._token_head = 0
+
+    def feed(self, text: str, page: Optional[int] = None, token_spans: List[tuple] = ()) -> Iterator[Dict]:
+        """
+        Add a segment and yield the chunks it completes.
+
+        Args:
+            text: Segment text
+            page: Page number of the segment, if any
+            token_spans: (start, end) character offsets of the segment's tokens
+
+        Yields:
+            Chunk dicts with 'text' and 'metadata' (including 'token_count')
+        """
+        if not text or not text.strip():
+            return
+
+        position = self._append(text, page)
+        for token_start, token_end in token_spans:
+            self._token_starts.append(position + token_start)
+            self._token_ends.append(position + token_end)
+        yield from self._drain(final=False)
+
+    def _window_limit(self, start: int, final: bool) -> Optional[int]:
+        start += self._offset
+        head = self._token_head
+        while head < len(self._token_ends) and self._token_ends[head] <= start:
+            head += 1
+        if head >= _TOKEN_COMPACT_THRESHOLD:
+            del self._token_starts[:head], self._token_ends[:head]
+            head = 0
+        self._token_head = head
+
+        if head + self.chunk_size >= len(self._token_ends):
+            return len(self._buffer) if final else None
+        return self._token_ends[head + self.chunk_size - 1] - self._offset
+
+    def _overlap_start(self, start: int, end: int) -> int:
+        # Step back `chunk_overlap` whole tokens, moving at least one token forward
+        next_token = bisect_left(self._token_starts, end + self._offset, lo=self._token_head)
+        index = max(next_token - self.chunk_overlap, self._token_head + 1)
+        if index >= len(self._token_starts):
+            return end
+        return self._token_starts[index] - self._offset
+
+    def _span_size(self, start: int, end: int) -> int:
+        # Tokens starting inside the span
+        return bisect_left(self._token_starts, end + self._offset, lo=self._token_head) - bisect_left(
+            self._token_starts, start + self._offset, lo=self._token_head
+        )
+
+    def _annotate(self, metadata: Dict):
+        first = bisect_left(self._token_starts, metadata["start_char"], lo=self._token_head)
+        last = bisect_left(self._token_starts, metadata["end_char"], lo=first)
+        metadata["token_count"] = last - first
+
+
+def chunk_segments(
+    segments: Iterable[Dict],
+    metadata: Dict = None,
+    chunk_size: int = None,
+    chunk_overlap: int = None,
+    mode: str = None
+) -> Iterator[Dict]:
+    """
+    Chunk a stream of text segments (e.g. PDF pages) without joining them.
+
+    Args:
+        segments: Iterable of dicts with 'text' and optional 'page'
+        metadata: Document metadata copied into every chunk
+        chunk_size: Maximum chunk size (characters, or tokens in tokens mode)
+        chunk_overlap: Overlap between chunks (same unit)
+        mode: "chars" or "tokens" (default: rag.chunking_mode)
+
+    Yields:
+        Dicts with 'text' and 'metadata' (including 'chunk_index',
+        'start_char', 'end_char', 'token_count' in tokens mode and, for
+        paged documents, the 'page' the chunk starts on)
+    """
+    mode = mode or config.rag_chunking_mode
+    if mode == "tokens" and get_tokenizer() is None:
+        logger.warning("Tokenizer unavailable, falling back to character chunking")
+        mode = "chars"
+        chunk_size = chunk_overlap = None
+
+    if mode == "tokens":
+        chunker = TokenStreamingChunker(chunk_size, chunk_overlap, metadata)
+        segments = iter(segments)
+        # Tokenize a few segments per call to amortize tokenizer overhead
+        for batch in iter(lambda: list(islice(segments, _TOKENIZE_SEGMENTS)), []):
+            texts = [segment.get("text") or "" for segment in batch]
+            for segment, text, spans in zip(batch, texts, tokenize_with_offsets(texts)):
+                yield from chunker.feed(text, segment.get("page"), spans)
+    else:
+        chunker = StreamingChunker(chunk_size, chunk_overlap, metadata)
+        for segment in segments:
+            yield from chunker.feed(segment.get("text") or "", segment.get("page"))
+
+    yield from chunker.finish()
 
 
 def chunk_text(text: str, chunk_size: int = None, chunk_overlap: int = None) -> List[str]:
@@ -18,57 +308,7 @@ def chunk_text(text: str, chunk_size: int = None, chunk_overlap: int = None) ->
     Returns:
         List of text chunks
     """
-    chunk_size = chunk_size or config.rag_chunk_size
-    chunk_overlap = chunk_overlap or config.rag_chunk_overlap
-
-    logger.info(f"Chunking text: {len(text)} chars, chunk_size={chunk_size}, overlap={chunk_overlap}")
-
-    if len(text) <= chunk_size:
-        logger.info("Text fits in single chunk")
-        return [text]
-
-    chunks = []
-    start = 0
-    iteration = 0
-    max_iterations = len(text) * 2  # Safety limit
-
-    while start < len(text):
-        iteration += 1
-        if iteration > max_iterations:
-            logger.error(f"Infinite loop detected in chunking! Breaking at iteration {iteration}")
-            break
-
-        end = start + chunk_size
-
-        # Try to break at sentence boundary
-        if end < len(text):
-            # Look for sentence endings
-            for punct in [". ", "! ", "? ", "\n\n"]:
-                last_punct = text.rfind(punct, start, end)
-                if last_punct != -1:
-                    end = last_punct + len(punct)
-                    break
-
-        chunk = text[start:end].strip()
-        if chunk:
-            chunks.append(chunk)
-
-        # Move start position with overlap
-        # CRITICAL FIX: Ensure we always make forward progress to avoid infinite loops
-        old_start = start
-        if end < len(text):
-            start = end - chunk_overlap
-            # Safety check: never move backwards
-            if start <= old_start:
-                start = old_start + 1
-        else:
-            start = end
-
-        if iteration % 10 == 0:
-            logger.debug(f"Chunking progress: {start}/{len(text)} chars, {len(chunks)} chunks created")
-
-    logger.info(f"Chunking complete: {len(chunks)} chunks created")
-    return chunks
+    return [chunk["text"] for chunk in chunk_segments([{"text": text}], None, chunk_size, chunk_overlap, "chars")]
 
 
 def chunk_document(
@@ -90,23 +330,22 @@ def chunk_document(
         List of dicts with 'text' and 'metadata'
     """
     logger.info(f"Starting chunk_document with {len(text)} characters")
+    return collect_chunks(chunk_segments([{"text": text}], metadata, chunk_size, chunk_overlap))
 
-    chunks = chunk_text(text, chunk_size, chunk_overlap)
-    metadata = metadata or {}
 
-    logger.info(f"Adding metadata to {len(chunks)} chunks")
+def collect_chunks(chunks: Iterable[Dict]) -> List[Dict]:
+    """
+    Materialize streamed chunks, adding 'total_chunks' to their metadata.
 
-    chunked_docs = []
-    for i, chunk in enumerate(chunks):
-        doc = {
-            "text": chunk,
-            "metadata": {
-                **metadata,
-                "chunk_index": i,
-                "total_chunks": len(chunks)
-            }
-        }
-        chunked_docs.append(doc)
+    Args:
+        chunks: Chunks from chunk_segments
+
+    Returns:
+        List of dicts with 'text' and 'metadata'
+    """
+    chunked_docs = list(chunks)
+    for doc in chunked_docs:
+        doc["metadata"]["total_chunks"] = len(chunked_docs)
 
-    logger.info(f"✅ chunk_document complete: {len(chunked_docs)} documents ready")
+    logger.info(f"✅ Chunking complete: {len(chunked_docs)} documents ready")
     return chunked_docs
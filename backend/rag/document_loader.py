@@ -6,16 +6,54 @@ import pdfplumber
 from docx import Document
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional, Tuple
 from ..utils.logger import logger
 from ..utils.exceptions import DocumentProcessingError
 
+# Rows per text segment when streaming CSV files
+CSV_ROWS_PER_SEGMENT = 200
+
 
 class DocumentLoader:
     """Load and parse different document types."""
 
     @staticmethod
-    def load_pdf(file_path: str) -> Dict:
+    def iter_pdf_pages(file_path: str) -> Iterator[Tuple[int, str]]:
+        """
+        Extract PDF text page by page.
+
+        pdfplumber is tried first (better for tables and layout); pages it
+        returns no text for are retried with PyPDF2, page by page. Each
+        page's parsed objects are released once its text is extracted, so
+        memory stays bounded by a few pages.
+
+        Args:
+            file_path: Path to PDF file
+
+        Yields:
+            (page_number, text) tuples, page numbers starting at 1
+        """
+        fallback_file = None
+        fallback_reader = None
+        try:
+            with pdfplumber.open(file_path) as pdf:
+                for page_number, page in enumerate(pdf.pages, 1):
+                    page_text = page.extract_text() or ""
+                    page.flush_cache()
+
+                    if not page_text.strip():
+                        if fallback_reader is None:
+                            fallback_file = open(file_path, "rb")
+                            fallback_reader = PyPDF2.PdfReader(fallback_file)
+                        page_text = fallback_reader.pages[page_number - 1].extract_text() or ""
+
+                    yield page_number, page_text
+        finally:
+            if fallback_file is not None:
+                fallback_file.close()
+
+    @classmethod
+    def load_pdf(cls, file_path: str) -> Dict:
         """
         Load PDF file.
 
@@ -28,25 +66,14 @@ class DocumentLoader:
         try:
             logger.info(f"Loading PDF: {file_path}")
 
-            # Try pdfplumber first (better for tables and layout)
-            with pdfplumber.open(file_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n\n"
-
-            # Fallback to PyPDF2 if pdfplumber fails
-            if not text.strip():
-                with open(file_path, "rb") as file:
-                    reader = PyPDF2.PdfReader(file)
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n\n"
+            page_texts = [page_text for _, page_text in cls.iter_pdf_pages(file_path)]
+            text = "\n\n".join(page_text for page_text in page_texts if page_text.strip())
 
             metadata = {
                 "filename": Path(file_path).name,
                 "file_type": "pdf",
-                "file_path": file_path
+                "file_path": file_path,
+                "pages": len(page_texts)
             }
 
             return {"text": text.strip(), "metadata": metadata}
@@ -121,6 +148,58 @@ class DocumentLoader:
             logger.error(f"Failed to load CSV {file_path}: {e}")
             raise DocumentProcessingError(f"Failed to load CSV: {e}")
 
+    @classmethod
+    def iter_segments(cls, file_path: str) -> Iterator[Dict]:
+        """
+        Stream a document as text segments, without building its full text.
+
+        PDFs yield one segment per page, DOCX files one per paragraph, CSV
+        files one per block of rows (each with the header) and text files
+        one per paragraph.
+
+        Args:
+            file_path: Path to document
+
+        Yields:
+            Dicts with 'text' and, for PDFs, 'page'
+        """
+        file_path = Path(file_path)
+
+        if not file_path.exists():
+            raise DocumentProcessingError(f"File not found: {file_path}")
+
+        suffix = file_path.suffix.lower()
+        try:
+            if suffix == ".pdf":
+                for page_number, page_text in cls.iter_pdf_pages(str(file_path)):
+                    yield {"text": page_text, "page": page_number}
+            elif suffix == ".txt":
+                with open(file_path, "r", encoding="utf-8") as f:
+                    yield from _iter_paragraphs(f)
+            elif suffix == ".docx":
+                for para in Document(str(file_path)).paragraphs:
+                    yield {"text": para.text}
+            elif suffix == ".csv":
+                for rows in pd.read_csv(file_path, chunksize=CSV_ROWS_PER_SEGMENT):
+                    yield {"text": rows.to_string(index=False)}
+            else:
+                raise DocumentProcessingError(f"Unsupported file type: {suffix}")
+        except DocumentProcessingError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to load {file_path}: {e}")
+            raise DocumentProcessingError(f"Failed to load {suffix[1:].upper()}: {e}")
+
+    @staticmethod
+    def describe(file_path: str) -> Dict:
+        """Base metadata for a document (filename, type and path)."""
+        file_path = Path(file_path)
+        return {
+            "filename": file_path.name,
+            "file_type": file_path.suffix.lower()[1:],
+            "file_path": str(file_path)
+        }
+
     @classmethod
     def load_document(cls, file_path: str) -> Dict:
         """
@@ -151,7 +230,25 @@ class DocumentLoader:
             raise DocumentProcessingError(f"Unsupported file type: {suffix}")
 
 
-# Convenience function
+def _iter_paragraphs(lines) -> Iterator[Dict]:
+    """Group lines into blank-line separated paragraph segments."""
+    paragraph = []
+    for line in lines:
+        if line.strip():
+            paragraph.append(line.rstrip("\n"))
+        elif paragraph:
+            yield {"text": "\n".join(paragraph)}
+            paragraph = []
+    if paragraph:
+        yield {"text": "\n".join(paragraph)}
+
+
+# Convenience functions
 def load_document(file_path: str) -> Dict:
     """Load a document."""
     return DocumentLoader.load_document(file_path)
+
+
+def iter_document_segments(file_path: str) -> Iterator[Dict]:
+    """Stream a document as text segments."""
+    return DocumentLoader.iter_segments(file_path)
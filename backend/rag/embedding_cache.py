@@ -0,0 +1,310 @@
+"""
+Persistent content-addressed embedding cache.
+
+Embeddings are keyed by sha256(model name + normalized text), so an
+unchanged chunk is never re-encoded, whichever file or run it comes from.
+
+On-disk layout (one directory per model):
+    embeddings.f32  raw float32 matrix, memory-mapped, grown in place
+    index.txt       append-only "<key> <row>" lines
+Rows are written to the matrix before their index line, so a crash can at
+worst leave an unreferenced row, never an index entry pointing at garbage.
+
+Several processes (ingestion workers, API workers) may share a cache
+directory: writers take an exclusive flock on `index.lock`, then read the
+index lines and matrix growth other processes appended since they last
+looked before reserving rows at the end. Without fcntl (Windows) the lock
+is a no-op and the cache must not be shared between processes.
+
+Repeated user questions hit a small in-memory LRU tier instead.
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from ..config import config
+from ..utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Initial matrix capacity (rows); doubled whenever it fills up
+_INITIAL_CAPACITY = 1024
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys (Unicode NFC, collapsed whitespace)."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: memory-mapped store for chunks, LRU for queries."""
+
+    def __init__(
+        self,
+        cache_dir: str,
+        model_name: str,
+        dimension: int,
+        query_lru_size: int = 2048
+    ):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.query_lru_size = query_lru_size
+
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.dir = Path(cache_dir) / slug
+        self.matrix_path = self.dir / "embeddings.f32"
+        self.index_path = self.dir / "index.txt"
+        self.lock_path = self.dir / "index.lock"
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._index_offset = 0  # Bytes of index.txt already read
+        self._matrix: Optional[np.memmap] = None
+        self._rows = 0
+        self._capacity = 0
+        self._loaded = False
+
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.query_hits = 0
+        self.query_misses = 0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def key(self, text: str) -> str:
+        """Content-addressed key for a text under this model."""
+        payload = f"{self.model_name}\x00{normalize_text(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Persistent tier (document chunks)
+    # ------------------------------------------------------------------
+
+    def get_many(self, texts: List[str]) -> Tuple[List[Optional[np.ndarray]], List[int]]:
+        """
+        Look up embeddings for texts.
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            (embeddings, miss_indices): one embedding or None per text, and
+            the positions of texts that were not cached
+        """
+        with self._lock:
+            self._ensure_loaded()
+            results: List[Optional[np.ndarray]] = []
+            misses = []
+            for i, text in enumerate(texts):
+                row = self._index.get(self.key(text))
+                if row is None:
+                    results.append(None)
+                    misses.append(i)
+                else:
+                    results.append(np.array(self._matrix[row]))
+            self.hits += len(texts) - len(misses)
+            self.misses += len(misses)
+        return results, misses
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray):
+        """
+        Store embeddings for texts (already-cached keys are skipped).
+
+        Args:
+            texts: Texts that were encoded
+            embeddings: Matching embeddings, shape (len(texts), dimension)
+        """
+        if len(texts) == 0:
+            return
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            self._ensure_loaded()
+            with self._file_lock():
+                # Rows other processes added since we last looked
+                self._catch_up()
+
+                new_rows = {}  # key -> embedding; in-batch duplicates are stored once
+                for text, embedding in zip(texts, embeddings):
+                    key = self.key(text)
+                    if key not in self._index and key not in new_rows:
+                        new_rows[key] = embedding
+                if not new_rows:
+                    return
+
+                self._reserve(self._rows + len(new_rows))
+                start = self._rows
+                self._matrix[start:start + len(new_rows)] = np.stack(list(new_rows.values()))
+                self._matrix.flush()
+
+                with open(self.index_path, "ab") as f:
+                    if f.tell() > self._index_offset:
+                        f.write(b"\n")  # Terminate a line left half-written by a crashed process
+                    for offset, key in enumerate(new_rows):
+                        self._index[key] = start + offset
+                        f.write(f"{key} {start + offset}\n".encode("utf-8"))
+                    self._index_offset = f.tell()
+                self._rows += len(new_rows)
+
+    # ------------------------------------------------------------------
+    # In-memory LRU tier (queries)
+    # ------------------------------------------------------------------
+
+    def get_query(self, text: str) -> Optional[np.ndarray]:
+        """Look up a query embedding in the LRU tier."""
+        key = self.key(text)
+        with self._lock:
+            embedding = self._lru.get(key)
+            if embedding is None:
+                self.query_misses += 1
+                return None
+            self._lru.move_to_end(key)
+            self.query_hits += 1
+            return embedding
+
+    def put_query(self, text: str, embedding: np.ndarray):
+        """Store a query embedding in the LRU tier."""
+        if self.query_lru_size <= 0:
+            return
+        key = self.key(text)
+        with self._lock:
+            self._lru[key] = np.asarray(embedding, dtype=np.float32)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.query_lru_size:
+                self._lru.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters and sizes for both tiers."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            query_lookups = self.query_hits + self.query_misses
+            return {
+                "chunks": {
+                    "hits": self.hits,
+                    "misses": self.misses,
+                    "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                    "entries": self._rows,
+                },
+                "queries": {
+                    "hits": self.query_hits,
+                    "misses": self.query_misses,
+                    "hit_rate": round(self.query_hits / query_lookups, 4) if query_lookups else 0.0,
+                    "entries": len(self._lru),
+                    "capacity": self.query_lru_size,
+                },
+            }
+
+    # ------------------------------------------------------------------
+    # Storage internals (callers hold self._lock)
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+        with self._file_lock():
+            self._catch_up()
+
+            if self._file_rows() < self._rows:
+                # Index references rows that never made it to disk; start over
+                logger.warning(f"Embedding cache at {self.dir} is inconsistent, resetting it")
+                self._index.clear()
+                self._index_offset = 0
+                self._rows = 0
+                self.index_path.unlink(missing_ok=True)
+
+            self._reserve(_INITIAL_CAPACITY)
+        self._loaded = True
+        logger.info(f"Embedding cache loaded: {self._rows} entries ({self.dir})")
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the cache directory, across processes."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _catch_up(self):
+        """Read index lines appended (by any process) since the last read. Caller holds the file lock."""
+        if self.index_path.exists():
+            with open(self.index_path, "rb") as f:
+                f.seek(self._index_offset)
+                tail = f.read()
+            # A trailing line without a newline is a crashed write; leave it unread
+            complete = tail[:tail.rfind(b"\n") + 1]
+            for line in complete.decode("utf-8", errors="replace").splitlines():
+                parts = line.split()
+                if len(parts) == 2:
+                    row = int(parts[1])
+                    self._index[parts[0]] = row
+                    self._rows = max(self._rows, row + 1)
+            self._index_offset += len(complete)
+
+        # Another process may have grown the matrix file; map all of it
+        if self._matrix is not None and self._file_rows() > self._capacity:
+            self._reserve(self._file_rows())
+
+    def _file_rows(self) -> int:
+        """Rows the matrix file currently holds."""
+        return self.matrix_path.stat().st_size // (self.dimension * 4) if self.matrix_path.exists() else 0
+
+    def _reserve(self, rows: int):
+        """Grow the memory-mapped matrix to hold at least `rows` rows (never shrinks the file)."""
+        rows = max(rows, self._file_rows())
+        if rows <= self._capacity:
+            return
+
+        capacity = max(self._capacity, _INITIAL_CAPACITY)
+        while capacity < rows:
+            capacity *= 2
+
+        if self._matrix is not None:
+            self._matrix.flush()
+            del self._matrix
+            self._matrix = None
+
+        with open(self.matrix_path, "ab") as f:
+            if f.tell() < capacity * self.dimension * 4:
+                f.truncate(capacity * self.dimension * 4)
+
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+        self._capacity = capacity
+
+
+def create_embedding_cache(model_name: str) -> Optional[EmbeddingCache]:
+    """Create the embedding cache from config, or None if disabled."""
+    if not config.embeddings_cache_enabled:
+        return None
+    return EmbeddingCache(
+        cache_dir=config.embeddings_cache_path,
+        model_name=model_name,
+        dimension=config.embeddings_dimension,
+        query_lru_size=config.embeddings_cache_query_lru_size
+    )
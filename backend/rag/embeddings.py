@@ -2,10 +2,24 @@
 Embeddings generation using sentence-transformers.
 """
 from sentence_transformers import SentenceTransformer
-from typing import List
+from concurrent.futures import Future
+from collections import deque
+from typing import Dict, List, Optional
+import asyncio
+import queue
+import threading
+import time
 import numpy as np
 from ..config import config
 from ..utils.logger import logger
+from ..utils.concurrency import run_blocking
+from .embedding_cache import create_embedding_cache
+
+# Batches larger than this show a progress bar (document ingestion)
+PROGRESS_BAR_MIN_TEXTS = 64
+
+# Forward-pass batch size for large encodes
+ENCODE_BATCH_SIZE = 64
 
 
 class EmbeddingModel:
@@ -14,35 +28,58 @@ class EmbeddingModel:
     def __init__(self):
         self.model_name = config.embeddings_model_name
         self.model = None
+        self._load_lock = threading.Lock()
+        self.cache = create_embedding_cache(self.model_name)
         logger.info(f"Initializing embedding model: {self.model_name}")
 
     def load_model(self):
         """Load the embedding model."""
-        if self.model is not None:
-            return
+        with self._load_lock:
+            if self.model is not None:
+                return
 
-        logger.info(f"Loading embedding model: {self.model_name}")
-        logger.info("This may take a few minutes on first run (downloading model)...")
+            logger.info(f"Loading embedding model: {self.model_name}")
+            logger.info("This may take a few minutes on first run (downloading model)...")
 
-        # Load model with GPU support if available
-        import torch
-        device = "cuda" if torch.cuda.is_available() else "cpu"
-        logger.info(f"Device available: {device}")
+            # Load model with GPU support if available
+            import torch
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            logger.info(f"Device available: {device}")
 
-        logger.info("Downloading/loading model from HuggingFace...")
-        self.model = SentenceTransformer(self.model_name, device=device)
-        logger.info(f"✅ Embedding model loaded successfully on device: {device}")
+            logger.info("Downloading/loading model from HuggingFace...")
+            self.model = SentenceTransformer(self.model_name, device=device)
+            logger.info(f"✅ Embedding model loaded successfully on device: {device}")
 
     def encode(self, texts: List[str]) -> np.ndarray:
         """
         Encode texts to embeddings.
 
+        Texts already in the persistent embedding cache are not re-encoded.
+
         Args:
             texts: List of text strings
 
         Returns:
             Numpy array of embeddings
         """
+        if self.cache is None:
+            return self._encode_uncached(texts)
+
+        cached, misses = self.cache.get_many(texts)
+        logger.info(f"Embedding cache: {len(texts) - len(misses)} hits, {len(misses)} misses")
+
+        if misses:
+            encoded = self._encode_uncached([texts[i] for i in misses])
+            self.cache.put_many([texts[i] for i in misses], encoded)
+            for row, i in enumerate(misses):
+                cached[i] = encoded[row]
+
+        if not cached:
+            return np.zeros((0, config.embeddings_dimension), dtype=np.float32)
+        return np.stack(cached)
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        """Encode texts with the model, logging progress."""
         if self.model is None:
             logger.info("Embedding model not loaded, loading now...")
             self.load_model()
@@ -50,15 +87,277 @@ class EmbeddingModel:
         logger.info(f"🔄 Encoding {len(texts)} text chunks into embeddings...")
         logger.info(f"Total characters to process: {sum(len(t) for t in texts)}")
 
-        embeddings = self.model.encode(texts, show_progress_bar=True)
+        embeddings = self.encode_batch(texts)
 
         logger.info(f"✅ Successfully encoded {len(texts)} chunks")
         return embeddings
 
+    def encode_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts in a single forward pass, without per-call logging.
+
+        Used on the hot query path, where logging and progress bars cost
+        more than the encode itself.
+
+        Args:
+            texts: List of text strings
+
+        Returns:
+            float32 numpy array of shape (len(texts), dimension)
+        """
+        if self.model is None:
+            self.load_model()
+
+        return self.model.encode(
+            texts,
+            batch_size=min(max(len(texts), 1), ENCODE_BATCH_SIZE),
+            show_progress_bar=len(texts) >= PROGRESS_BAR_MIN_TEXTS,
+            convert_to_numpy=True
+        )
+
     def encode_single(self, text: str) -> np.ndarray:
         """Encode a single text."""
-        return self.encode([text])[0]
+        return self.encode_batch([text])[0]
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching embedding service for concurrent query encodes.
+
+    Callers submit single texts; a background worker collects whatever
+    arrives within `max_wait_ms` (up to `max_batch_size` texts), encodes
+    them in one forward pass and resolves each caller's future with its
+    own row.
+    """
+
+    _STOP = object()
+
+    def __init__(self, model: EmbeddingModel, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+        # Metrics
+        self._metrics_lock = threading.Lock()
+        self._started_at = time.perf_counter()
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._max_batch_seen = 0
+        self._encode_seconds = 0.0
+        self._latencies = deque(maxlen=1000)  # Submit-to-result latency, seconds
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for encoding.
+
+        Args:
+            text: Text to encode
+
+        Returns:
+            Future resolving to the text's embedding (1-D numpy array)
+        """
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def encode(self, text: str) -> np.ndarray:
+        """Encode a single text, blocking until its batch completes."""
+        return self.submit(text).result()
+
+    async def aencode(self, text: str) -> np.ndarray:
+        """Encode a single text without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def stop(self):
+        """Stop the worker thread after draining queued requests."""
+        with self._worker_lock:
+            if self._worker is not None:
+                self._queue.put(self._STOP)
+                self._worker.join()
+                self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="embedding-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        """Worker loop: gather a micro-batch, encode it, hand results back."""
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+
+            batch = [item]
+            stop_after_batch = False
+            deadline = time.perf_counter() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop_after_batch = True
+                    break
+                batch.append(item)
+
+            self._encode_batch(batch)
+
+            if stop_after_batch:
+                return
+
+    def _encode_batch(self, batch: List[tuple]):
+        # Drop requests whose caller gave up (e.g. a cancelled request)
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for text, _, _ in batch]
+
+        start = time.perf_counter()
+        try:
+            embeddings = self.model.encode_batch(texts)
+        except Exception as e:
+            logger.error(f"Batched embedding failed for {len(batch)} texts: {e}")
+            with self._metrics_lock:
+                self._errors += len(batch)
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        finished = time.perf_counter()
+
+        for i, (_, future, submitted_at) in enumerate(batch):
+            future.set_result(embeddings[i])
+
+        with self._metrics_lock:
+            self._requests += len(batch)
+            self._batches += 1
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+            self._encode_seconds += finished - start
+            self._latencies.extend(finished - submitted_at for _, _, submitted_at in batch)
+
+    def get_metrics(self) -> Dict:
+        """
+        Get throughput and latency metrics.
+
+        Returns:
+            Dict with request/batch counts, batch sizes, throughput and
+            latency percentiles (milliseconds)
+        """
+        with self._metrics_lock:
+            latencies = sorted(self._latencies)
+            requests = self._requests
+            batches = self._batches
+            encode_seconds = self._encode_seconds
+            uptime = time.perf_counter() - self._started_at
+            metrics = {
+                "requests": requests,
+                "batches": batches,
+                "errors": self._errors,
+                "queue_depth": self._queue.qsize(),
+                "avg_batch_size": round(requests / batches, 2) if batches else 0.0,
+                "max_batch_size_seen": self._max_batch_seen,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+            }
+
+        metrics["throughput_per_s"] = round(requests / uptime, 2) if uptime > 0 else 0.0
+        metrics["encode_throughput_per_s"] = round(requests / encode_seconds, 2) if encode_seconds > 0 else 0.0
+        metrics["latency_ms"] = {
+            "p50": _percentile_ms(latencies, 50),
+            "p95": _percentile_ms(latencies, 95),
+            "p99": _percentile_ms(latencies, 99),
+        }
+        return metrics
+
+
+class EmbeddingService:
+    """
+    Query embedding entry point.
+
+    Routes single-query encodes through the micro-batcher when batching is
+    enabled, otherwise encodes each query directly.
+    """
+
+    def __init__(self, model: EmbeddingModel):
+        self.model = model
+        self.batcher = None
+        if config.embeddings_batching_enabled:
+            self.batcher = EmbeddingBatcher(
+                model,
+                max_batch_size=config.embeddings_batching_max_batch_size,
+                max_wait_ms=config.embeddings_batching_max_wait_ms
+            )
+
+    def encode_query(self, text: str) -> np.ndarray:
+        """Encode a query (blocking)."""
+        embedding = self._cached_query(text)
+        if embedding is not None:
+            return embedding
+
+        if self.batcher is not None:
+            embedding = self.batcher.encode(text)
+        else:
+            embedding = self.model.encode_single(text)
+        return self._store_query(text, embedding)
+
+    async def aencode_query(self, text: str) -> np.ndarray:
+        """Encode a query without blocking the event loop."""
+        embedding = self._cached_query(text)
+        if embedding is not None:
+            return embedding
+
+        if self.batcher is not None:
+            embedding = await self.batcher.aencode(text)
+        else:
+            embedding = await run_blocking(self.model.encode_single, text)
+        return self._store_query(text, embedding)
+
+    def _cached_query(self, text: str) -> Optional[np.ndarray]:
+        if self.model.cache is None:
+            return None
+        return self.model.cache.get_query(text)
+
+    def _store_query(self, text: str, embedding: np.ndarray) -> np.ndarray:
+        if self.model.cache is not None:
+            self.model.cache.put_query(text, embedding)
+        return embedding
+
+    def get_metrics(self) -> Dict:
+        """Get query embedding metrics."""
+        if self.batcher is None:
+            return {"batching_enabled": False}
+        return {"batching_enabled": True, **self.batcher.get_metrics()}
+
+    def get_cache_stats(self) -> Dict:
+        """Get embedding cache hit/miss counters."""
+        if self.model.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.model.cache.get_stats()}
+
+
+def _percentile_ms(sorted_values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of sorted seconds, in milliseconds."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(percentile / 100.0 * (len(sorted_values) - 1))))
+    return round(sorted_values[index] * 1000.0, 2)
 
 
 # Global embedding model instance
 embedding_model = EmbeddingModel()
+
+# Global query embedding service (micro-batched)
+embedding_service = EmbeddingService(embedding_model)
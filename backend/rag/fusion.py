@@ -0,0 +1,26 @@
+"""
+Rank fusion for combining retrievers.
+"""
+from typing import Dict, List
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[tuple]:
+    """
+    Fuse ranked ID lists with reciprocal rank fusion.
+
+    Each ID scores sum(1 / (k + rank)) over the rankings it appears in
+    (rank starting at 1), so items ranked well by several retrievers rise
+    to the top without their raw scores having to be comparable.
+
+    Args:
+        rankings: Ranked ID lists, best first
+        k: Rank damping constant (60 in the original RRF paper)
+
+    Returns:
+        (id, fused_score) pairs, best first
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, 1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
@@ -0,0 +1,267 @@
+"""
+Incremental, idempotent document ingestion.
+
+An ingestion manifest records, for every ingested file, its size, mtime,
+content hash and the IDs of the chunks it produced. Files whose size and
+mtime are unchanged are skipped without being read; files that changed are
+re-chunked and their stale chunks deleted; files that disappeared have their
+chunks removed. Chunk IDs are derived from the file's normalized path, its
+content hash and the chunk index, so re-running ingestion never creates
+duplicates, and identical files at different paths keep separate chunks
+(deleting or changing one never removes the other's).
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from ..config import config
+from ..utils.logger import logger
+from .parse_worker import parse_and_chunk
+from .vector_store import vector_store
+
+# Read size for content hashing
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_content_hash(file_path: str) -> str:
+    """Compute the sha256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_chunk_ids(file_path: str, content_hash: str, count: int, start: int = 0) -> List[str]:
+    """Deterministic chunk IDs: sha256(normalized path + content hash) prefix plus chunk index (from start)."""
+    path = os.path.normcase(os.path.abspath(file_path))
+    prefix = hashlib.sha256(f"{path}\x00{content_hash}".encode("utf-8")).hexdigest()[:24]
+    return [f"{prefix}_{i}" for i in range(start, start + count)]
+
+
+def _has_current_ids(file_path: str, entry: Dict) -> bool:
+    """Whether a manifest entry's chunk IDs follow make_chunk_ids (older manifests used the content hash alone)."""
+    return entry["chunk_ids"] == make_chunk_ids(file_path, entry["content_hash"], len(entry["chunk_ids"]))
+
+
+class IngestionManifest:
+    """JSON manifest of ingested files, keyed by file path."""
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = Path(manifest_path)
+        self.entries: Dict[str, Dict] = {}
+        self._loaded = False
+
+    def load(self):
+        """Load the manifest from disk (once)."""
+        if self._loaded:
+            return
+        if self.manifest_path.exists():
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f).get("files", {})
+            except Exception as e:
+                logger.error(f"Failed to read ingestion manifest, starting fresh: {e}")
+                self.entries = {}
+        self._loaded = True
+
+    def reload(self):
+        """Re-read the manifest from disk (another worker may have written it)."""
+        self.entries = {}
+        self._loaded = False
+        self.load()
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.entries}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def get(self, file_path: str) -> Optional[Dict]:
+        self.load()
+        return self.entries.get(file_path)
+
+    def set(self, file_path: str, entry: Dict):
+        self.load()
+        self.entries[file_path] = entry
+
+    def remove(self, file_path: str) -> Optional[Dict]:
+        self.load()
+        return self.entries.pop(file_path, None)
+
+    def paths(self) -> List[str]:
+        self.load()
+        return list(self.entries.keys())
+
+
+class DocumentIngestor:
+    """Ingest files into the vector store, touching only what changed."""
+
+    def __init__(self, manifest: IngestionManifest):
+        self.manifest = manifest
+        # Uploads and process-all may run concurrently; the manifest is shared
+        self._lock = threading.RLock()
+
+    def plan_file(self, file_path: str) -> Optional[Dict]:
+        """
+        Decide whether a file needs (re-)ingestion.
+
+        Args:
+            file_path: Path to the document
+
+        Returns:
+            An ingestion plan dict if the file is new or changed, else None
+        """
+        file_path = str(file_path)
+        with self._lock:
+            stat = os.stat(file_path)
+            entry = self.manifest.get(file_path)
+
+            # Entries with outdated chunk IDs are re-ingested under the current scheme
+            current = entry is not None and _has_current_ids(file_path, entry)
+
+            # Fast path: same size and mtime means the file was not touched
+            if current and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                return None
+
+            content_hash = file_content_hash(file_path)
+            if current and entry["content_hash"] == content_hash:
+                # Touched but identical: just refresh the stat fields
+                entry.update(size=stat.st_size, mtime=stat.st_mtime)
+                return None
+
+            return {
+                "file_path": file_path,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "content_hash": content_hash,
+                "previous_chunk_ids": entry["chunk_ids"] if entry else None
+            }
+
+    def prepare(self, plan: Dict):
+        """
+        Clear the way for writing a planned file's chunks.
+
+        Files not tracked yet may still have chunks from pre-manifest
+        ingestion runs (random IDs); those are purged before new chunks land.
+        """
+        if plan["previous_chunk_ids"] is None:
+            vector_store.delete_by_file(plan["file_path"])
+
+    def commit(self, plan: Dict, chunk_ids: List[str], save: bool = True):
+        """
+        Record a file as ingested once its new chunks are written.
+
+        Chunks from the previous version of the file are deleted here, after
+        the new ones exist, so the file never disappears from search.
+        """
+        with self._lock:
+            if plan["previous_chunk_ids"]:
+                stale_ids = sorted(set(plan["previous_chunk_ids"]) - set(chunk_ids))
+                vector_store.delete_ids(stale_ids)
+
+            self.manifest.set(plan["file_path"], {
+                "size": plan["size"],
+                "mtime": plan["mtime"],
+                "content_hash": plan["content_hash"],
+                "chunk_ids": chunk_ids
+            })
+            if save:
+                self.save()
+
+    def ingest_file(self, file_path: str, save: bool = True) -> Dict:
+        """
+        Ingest one file if it is new or changed.
+
+        Args:
+            file_path: Path to the document
+            save: Persist the manifest afterwards
+
+        Returns:
+            Dict with 'status' ('unchanged', 'added' or 'updated') and 'chunks'
+        """
+        file_path = str(file_path)
+        with self._lock:
+            plan = self.plan_file(file_path)
+            if plan is None:
+                if save:
+                    self.save()
+                return {"status": "unchanged", "chunks": len(self.manifest.get(file_path)["chunk_ids"])}
+
+            logger.info(f"Processing document: {file_path}")
+            chunks = parse_and_chunk(file_path, plan["content_hash"])["chunks"]
+            chunk_ids = make_chunk_ids(file_path, plan["content_hash"], len(chunks))
+
+            self.prepare(plan)
+            if chunks:
+                vector_store.add_documents(chunks, ids=chunk_ids)
+            self.commit(plan, chunk_ids, save=save)
+
+            status = "updated" if plan["previous_chunk_ids"] is not None else "added"
+            logger.info(f"✅ Document {status}: {file_path} ({len(chunks)} chunks)")
+            return {"status": status, "chunks": len(chunks)}
+
+    def remove_file(self, file_path: str, save: bool = True) -> int:
+        """
+        Remove a file's chunks from the vector store and the manifest.
+
+        Returns:
+            Number of chunks deleted
+        """
+        with self._lock:
+            entry = self.manifest.remove(str(file_path))
+            if not entry:
+                return 0
+            vector_store.delete_ids(entry["chunk_ids"])
+            if save:
+                self.save()
+            logger.info(f"Removed stale document: {file_path} ({len(entry['chunk_ids'])} chunks)")
+            return len(entry["chunk_ids"])
+
+    def remove_missing(self, directory: str, present: List[str]) -> int:
+        """
+        Remove tracked files of a directory that are no longer present.
+
+        Args:
+            directory: Directory that was scanned
+            present: File paths found in the directory
+
+        Returns:
+            Number of files removed
+        """
+        directory = Path(directory)
+        present = set(present)
+        removed = 0
+        with self._lock:
+            for tracked in self.manifest.paths():
+                if Path(tracked).parent == directory and tracked not in present:
+                    self.remove_file(tracked, save=False)
+                    removed += 1
+        return removed
+
+    def reload(self):
+        """Re-read the manifest before ingesting after another worker did."""
+        with self._lock:
+            self.manifest.reload()
+
+    def save(self):
+        """Persist the vector store, then the manifest that describes it."""
+        with self._lock:
+            vector_store.flush()
+            self.manifest.save()
+
+
+def list_documents(directory: str) -> List[str]:
+    """List supported document files in a directory, sorted by name."""
+    return [
+        str(file_path) for file_path in sorted(Path(directory).iterdir())
+        if file_path.is_file() and file_path.suffix[1:].lower() in config.documents_supported_formats
+    ]
+
+
+# Global ingestor
+document_ingestor = DocumentIngestor(IngestionManifest(config.vector_store_manifest_path))
@@ -0,0 +1,347 @@
+"""
+Background ingestion jobs.
+
+Uploads and process-all requests are queued as jobs and run on a small
+worker pool, so the HTTP call returns a job ID right away. Each job tracks
+its progress (files done, chunks embedded, ETA) from the ingestion pipeline
+and can be cancelled; files already written by a cancelled job stay
+committed, so re-running picks up where it stopped.
+
+With a shared state backend, every job's status is published there, so any
+worker can report or cancel it, and jobs run one at a time across workers:
+the running job holds a shared lock on the index, reloads what other
+workers wrote before starting, and bumps the index generation when done
+(see VectorStore.refresh).
+"""
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+from ..config import config
+from ..utils.logger import logger
+from ..utils.shared_state import shared_state
+from .ingestion import document_ingestor
+from .ingestion_pipeline import IngestionCancelled, IngestionPipeline
+from .vector_store import vector_store
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+# Shared state keys: one record per job, a log of job IDs, a cancel flag per job
+_JOB_KEY = "ingestion:job:{}"
+_JOB_LOG_KEY = "ingestion:jobs"
+_CANCEL_KEY = "ingestion:job:{}:cancel"
+# Shared lock held while a job writes to the index
+_INDEX_LOCK = "rag:index:write"
+# Job records outlive the history a worker lists (a week)
+_JOB_TTL_SECONDS = 7 * 24 * 3600
+# Progress is published at most this often (status changes always are)
+_PUBLISH_INTERVAL_SECONDS = 0.5
+# The index lock is renewed from progress updates once this share of its timeout has passed
+_LOCK_RENEW_FRACTION = 0.1
+
+
+class IngestionJob:
+    """One queued or running ingestion job."""
+
+    def __init__(self, kind: str, description: str):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.description = description
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress = {"files_total": 0, "files_done": 0, "chunks_total": 0, "chunks_embedded": 0}
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        # Called with the job after progress updates (publishes it to shared state)
+        self.on_progress: Optional[Callable[["IngestionJob"], None]] = None
+
+    def update_progress(self, snapshot: Dict):
+        """Progress callback for the ingestion pipeline."""
+        with self._lock:
+            self.progress.update(snapshot)
+        if self.on_progress is not None:
+            self.on_progress(self)
+
+    def eta_seconds(self) -> Optional[float]:
+        """Estimate remaining time from the file completion rate so far."""
+        if self.status != RUNNING or self.started_at is None:
+            return None
+        done, total = self.progress["files_done"], self.progress["files_total"]
+        if done == 0 or total == 0:
+            return None
+        elapsed = time.time() - self.started_at
+        return round(elapsed / done * (total - done), 1)
+
+    def to_dict(self) -> Dict:
+        """Serialize the job for the API."""
+        with self._lock:
+            progress = dict(self.progress)
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "description": self.description,
+            "status": self.status,
+            "progress": progress,
+            "eta_s": self.eta_seconds(),
+            "elapsed_s": round(end - self.started_at, 1) if self.started_at else 0.0,
+            "created_at": self.created_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class _SharedJob:
+    """A job run by another worker, as last published to shared state."""
+
+    def __init__(self, record: Dict):
+        self.record = record
+        self.job_id = record["job_id"]
+        self.status = record["status"]
+
+    def to_dict(self) -> Dict:
+        return dict(self.record)
+
+
+class JobManager:
+    """Runs ingestion jobs on a worker pool and keeps their status."""
+
+    def __init__(self, max_workers: int = 1, history_size: int = 100, state=None, lock_timeout: float = 3600):
+        """
+        Args:
+            max_workers: Jobs run concurrently by this worker
+            history_size: Finished jobs kept for status polling
+            state: Shared state backend publishing jobs to every worker (None = single process)
+            lock_timeout: Seconds without a progress update after which a
+                          crashed worker's index lock expires (renewed
+                          while its job makes progress)
+        """
+        self.history_size = history_size
+        self.state = state
+        self.lock_timeout = lock_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ingestion-job")
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._published: Dict[str, float] = {}  # job ID -> last progress publish (monotonic)
+        # job ID -> (renew the index lock, last renewal (monotonic)) while the job holds it
+        self._lock_renewals: Dict[str, Tuple[Callable[[], bool], float]] = {}
+
+    def submit_files(self, files: List[str], description: str) -> IngestionJob:
+        """
+        Queue ingestion of specific files (e.g. an upload).
+
+        Args:
+            files: File paths to ingest
+            description: Human readable job description
+
+        Returns:
+            The queued job
+        """
+        return self._submit(
+            "upload", description,
+            lambda job: IngestionPipeline().run_files(files, job.update_progress, job.cancel_event)
+        )
+
+    def submit_directory(self, directory: str) -> IngestionJob:
+        """
+        Queue ingestion of a whole directory (process-all).
+
+        Args:
+            directory: Documents directory
+
+        Returns:
+            The queued job
+        """
+        return self._submit(
+            "process_all", f"Process all documents in {directory}",
+            lambda job: IngestionPipeline().run(directory, job.update_progress, job.cancel_event)
+        )
+
+    def get(self, job_id: str):
+        """A job of this worker, else one published by another worker (None if unknown)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None or self.state is None:
+            return job
+        record = self.state.get(_JOB_KEY.format(job_id))
+        return _SharedJob(json.loads(record)) if record is not None else None
+
+    def list(self) -> List:
+        """All known jobs (of every worker with shared state), newest first."""
+        with self._lock:
+            local = list(reversed(self._jobs.values()))
+        if self.state is None:
+            return local
+
+        by_id = {job.job_id: job for job in local}
+        length = self.state.log_length(_JOB_LOG_KEY)
+        jobs = []
+        for _, job_id in reversed(self.state.read_log(_JOB_LOG_KEY, after=max(0, length - self.history_size))):
+            job = by_id.pop(job_id, None) or self.get(job_id)
+            if job is not None:
+                jobs.append(job)
+        return jobs + list(by_id.values())
+
+    def cancel(self, job_id: str) -> Optional[IngestionJob]:
+        """
+        Request cancellation of a job.
+
+        Queued jobs are cancelled immediately; running jobs stop at the next
+        pipeline checkpoint.
+
+        Returns:
+            The job, or None if unknown
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.status not in FINISHED_STATES:
+            if isinstance(job, _SharedJob):
+                # The owning worker picks the flag up at its next progress update
+                self.state.set(_CANCEL_KEY.format(job_id), "1", ttl=_JOB_TTL_SECONDS)
+            else:
+                job.cancel_event.set()
+                if job.status == QUEUED:
+                    job.status = CANCELLED
+                    job.finished_at = time.time()
+                    self._publish(job)
+            logger.info(f"Cancellation requested for ingestion job {job_id}")
+        return job
+
+    def shutdown(self):
+        """Cancel this worker's outstanding jobs and stop the worker pool."""
+        # Only jobs this worker runs: other workers' jobs in shared state are theirs to stop
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if job.status not in FINISHED_STATES:
+                job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, kind: str, description: str, work: Callable[[IngestionJob], Dict]) -> IngestionJob:
+        job = IngestionJob(kind, description)
+        job.on_progress = self._publish_progress
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        if self.state is not None:
+            self._publish(job)
+            self.state.append(_JOB_LOG_KEY, job.job_id)
+        self._executor.submit(self._run, job, work)
+        logger.info(f"Queued ingestion job {job.job_id}: {description}")
+        return job
+
+    def _run(self, job: IngestionJob, work: Callable[[IngestionJob], Dict]):
+        if job.cancel_event.is_set():
+            return
+
+        try:
+            with self._index_lock() as renew_lock:
+                if renew_lock is not None:
+                    self._lock_renewals[job.job_id] = (renew_lock, time.monotonic())
+                self._check_cancel_flag(job)
+                if job.cancel_event.is_set():
+                    raise IngestionCancelled("Ingestion cancelled")
+                job.status = RUNNING
+                job.started_at = time.time()
+                self._publish(job)
+                if self.state is not None:
+                    # Start from what other workers last committed
+                    vector_store.refresh(force=True)
+                    document_ingestor.reload()
+                job.result = work(job)
+            job.status = COMPLETED
+            logger.info(f"✅ Ingestion job {job.job_id} completed")
+        except IngestionCancelled:
+            job.status = CANCELLED
+            logger.info(f"Ingestion job {job.job_id} cancelled")
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            logger.error(f"❌ Ingestion job {job.job_id} failed: {e}", exc_info=True)
+        finally:
+            self._lock_renewals.pop(job.job_id, None)
+            job.finished_at = time.time()
+            self._publish(job)
+
+    def _index_lock(self):
+        """Shared lock serializing index writes across workers (no-op in single-process mode)."""
+        if self.state is None:
+            return nullcontext()
+        return self.state.lock(_INDEX_LOCK, timeout=self.lock_timeout, wait=self.lock_timeout)
+
+    def _publish(self, job: IngestionJob):
+        """Write a job's status to shared state for the other workers."""
+        if self.state is None:
+            return
+        try:
+            self.state.set(_JOB_KEY.format(job.job_id), json.dumps(job.to_dict()), ttl=_JOB_TTL_SECONDS)
+        except Exception as e:
+            logger.warning(f"Failed to publish ingestion job {job.job_id}: {e}")
+
+    def _publish_progress(self, job: IngestionJob):
+        """Progress callback: publish at most every _PUBLISH_INTERVAL_SECONDS and pick up remote cancels."""
+        if self.state is None:
+            return
+        now = time.monotonic()
+        if now - self._published.get(job.job_id, 0.0) < _PUBLISH_INTERVAL_SECONDS:
+            return
+        self._published[job.job_id] = now
+        self._renew_index_lock(job, now)
+        self._check_cancel_flag(job)
+        self._publish(job)
+
+    def _renew_index_lock(self, job: IngestionJob, now: float):
+        """Keep the running job's index lock from expiring; cancel the job if it was already lost."""
+        renewal = self._lock_renewals.get(job.job_id)
+        if renewal is None or now - renewal[1] < self.lock_timeout * _LOCK_RENEW_FRACTION:
+            return
+        renew, _ = renewal
+        try:
+            renewed = renew()
+        except Exception as e:
+            logger.warning(f"Failed to renew the index lock of ingestion job {job.job_id}: {e}")
+            return
+        if renewed:
+            self._lock_renewals[job.job_id] = (renew, now)
+        else:
+            # Another worker may be writing the index now
+            logger.error(f"❌ Ingestion job {job.job_id} lost the index lock, cancelling it")
+            job.cancel_event.set()
+
+    def _check_cancel_flag(self, job: IngestionJob):
+        """Honour a cancellation requested through another worker."""
+        if self.state is not None and self.state.get(_CANCEL_KEY.format(job.job_id)) is not None:
+            job.cancel_event.set()
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond the history size (caller holds the lock)."""
+        excess = len(self._jobs) - self.history_size
+        if excess <= 0:
+            return
+        for job_id in [j.job_id for j in self._jobs.values() if j.status in FINISHED_STATES][:excess]:
+            del self._jobs[job_id]
+            self._published.pop(job_id, None)
+
+
+# Global job manager
+job_manager = JobManager(
+    max_workers=config.ingestion_job_workers,
+    history_size=config.ingestion_job_history_size,
+    state=shared_state,
+    lock_timeout=config.ingestion_job_lock_timeout_seconds
+)
@@ -0,0 +1,537 @@
+"""
+Staged, parallel document ingestion pipeline.
+
+    plan ──► parse + chunk ──► embed ──► write
+             (process pool)    (batches)  (single writer)
+
+- Planning uses the ingestion manifest, so only new or changed files enter
+  the pipeline.
+- Parsing (pdfplumber etc.) and chunking run in a process pool, with a
+  bounded number of files in flight; workers send chunks back in
+  embedding-batch-sized messages on a bounded queue while they parse.
+- The embedding stage feeds the model fixed-size batches, across file
+  boundaries.
+- A single writer bulk-upserts into the vector store and commits each file
+  to the manifest once all of its chunks are written.
+
+Stages are connected by bounded queues, so memory stays flat however large
+the corpus is.
+
+CLI:
+    python -m backend.rag.ingestion_pipeline ./data/documents --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+from ..config import config
+from ..utils.logger import logger
+from .embeddings import embedding_model
+from .ingestion import DocumentIngestor, document_ingestor, list_documents, make_chunk_ids
+from .parse_worker import CHUNKS, init_worker, stream_parse_and_chunk
+from .tokenizer import merge_token_stats
+from .vector_store import vector_store
+
+_END = object()
+
+
+class PipelineAborted(Exception):
+    """Raised inside pipeline stages when another stage failed."""
+    pass
+
+
+class IngestionCancelled(Exception):
+    """Raised when an ingestion run is cancelled; completed files stay committed."""
+    pass
+
+
+class IngestionPipeline:
+    """Parallel parse → batched embed → single-writer ingestion."""
+
+    def __init__(
+        self,
+        ingestor: DocumentIngestor = document_ingestor,
+        workers: Optional[int] = None,
+        embed_batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None
+    ):
+        self.ingestor = ingestor
+        self.workers = workers or config.ingestion_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.embed_batch_size = embed_batch_size or config.ingestion_embed_batch_size
+        self.queue_size = queue_size or config.ingestion_queue_size
+
+    def run(
+        self,
+        directory: str,
+        progress: Optional[Callable[[Dict], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Dict:
+        """
+        Ingest a directory; chunks of files deleted from it are removed.
+
+        Args:
+            directory: Directory containing documents
+            progress: Optional callback receiving progress snapshots
+            cancel_event: Optional event; when set the run stops and raises
+                          IngestionCancelled (files already written stay committed)
+
+        Returns:
+            Summary dict with file counts, totals and per-stage throughput
+        """
+        run = _PipelineRun(self, list_documents(directory), directory, progress, cancel_event)
+        return run.execute()
+
+    def run_files(
+        self,
+        files: List[str],
+        progress: Optional[Callable[[Dict], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Dict:
+        """
+        Ingest specific files (e.g. a fresh upload).
+
+        Args:
+            files: File paths to ingest
+            progress: Optional callback receiving progress snapshots
+            cancel_event: Optional cancellation event
+
+        Returns:
+            Summary dict with file counts, totals and per-stage throughput
+        """
+        run = _PipelineRun(self, [str(f) for f in files], None, progress, cancel_event)
+        return run.execute()
+
+
+class _PipelineRun:
+    """State of one pipeline run (queues, counters, worker threads)."""
+
+    def __init__(
+        self,
+        pipeline: IngestionPipeline,
+        files: List[str],
+        directory: Optional[str],
+        progress: Optional[Callable[[Dict], None]],
+        cancel_event: Optional[threading.Event]
+    ):
+        self.pipeline = pipeline
+        self.ingestor = pipeline.ingestor
+        self.files = files
+        self.directory = directory
+        self.progress = progress
+        self.cancel_event = cancel_event or threading.Event()
+
+        self.chunk_queue: queue.Queue = queue.Queue(maxsize=pipeline.queue_size * pipeline.embed_batch_size)
+        self.write_queue: queue.Queue = queue.Queue(maxsize=pipeline.queue_size)
+        self.abort = threading.Event()
+        self.error: Optional[BaseException] = None
+
+        # Per-file bookkeeping: plan, chunks emitted and written, total once parsed
+        self.pending: Dict[str, Dict] = {}
+        self.pending_lock = threading.Lock()
+
+        self.summary = {"processed": 0, "skipped": 0, "removed": 0, "failed": 0, "total_chunks": 0}
+        self.counters = {"files_total": len(files), "files_done": 0, "chunks_total": 0, "chunks_embedded": 0}
+        self.counters_lock = threading.Lock()
+        self.token_stats: List[Dict] = []
+        self.stats = {
+            "parse": {"files": 0, "pages": 0, "chunks": 0, "seconds": 0.0},
+            "embed": {"embeddings": 0, "batches": 0, "seconds": 0.0},
+            "write": {"chunks": 0, "batches": 0, "seconds": 0.0},
+        }
+
+    # ------------------------------------------------------------------
+    # Orchestration
+    # ------------------------------------------------------------------
+
+    def execute(self) -> Dict:
+        started = time.perf_counter()
+
+        plans = []
+        self._report_progress()
+        for file_path in self.files:
+            self._check_cancelled()
+            try:
+                plan = self.ingestor.plan_file(file_path)
+            except Exception as e:
+                self.summary["failed"] += 1
+                self._advance(files_done=1)
+                logger.error(f"❌ Failed to stat/hash {file_path}: {e}")
+                continue
+            if plan is None:
+                self.summary["skipped"] += 1
+                self._advance(files_done=1)
+            else:
+                plans.append(plan)
+
+        logger.info(
+            f"Ingestion pipeline: {len(plans)} new/changed files, {self.summary['skipped']} unchanged "
+            f"(workers={self.pipeline.workers}, embed_batch_size={self.pipeline.embed_batch_size})"
+        )
+
+        embedder = threading.Thread(target=self._guard, args=(self._embed_stage,), name="ingest-embed", daemon=True)
+        writer = threading.Thread(target=self._guard, args=(self._write_stage,), name="ingest-write", daemon=True)
+        embedder.start()
+        writer.start()
+
+        try:
+            if plans:
+                self._parse_stage(plans)
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(self.chunk_queue, _END, force=True)
+            embedder.join()
+            writer.join()
+
+        self._discard_uncommitted_files()
+        if self.error is not None:
+            self.ingestor.save()
+            raise self.error
+
+        if self.directory is not None:
+            self.summary["removed"] = self.ingestor.remove_missing(self.directory, self.files)
+        self.ingestor.save()
+
+        elapsed = time.perf_counter() - started
+        tokens = merge_token_stats(self.token_stats)
+        if tokens:
+            logger.info(
+                f"Chunk tokens: avg {tokens['avg_tokens']}, max {tokens['max_tokens']}, "
+                f"{tokens['truncated']} of {tokens['chunks']} truncated ({tokens['truncated_pct']}%)"
+            )
+        return {
+            **self.summary,
+            "elapsed_s": round(elapsed, 3),
+            "tokens": tokens,
+            "stages": self._stage_report()
+        }
+
+    def _guard(self, stage):
+        try:
+            stage()
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def _check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise IngestionCancelled("Ingestion cancelled")
+
+    def _advance(self, **deltas):
+        """Bump progress counters and notify the progress callback."""
+        with self.counters_lock:
+            for key, delta in deltas.items():
+                self.counters[key] += delta
+        self._report_progress()
+
+    def _report_progress(self):
+        if self.progress is None:
+            return
+        with self.counters_lock:
+            snapshot = dict(self.counters)
+        try:
+            self.progress(snapshot)
+        except Exception as e:
+            logger.warning(f"Ingestion progress callback failed: {e}")
+
+    def _fail(self, error: BaseException):
+        if self.error is None and not isinstance(error, PipelineAborted):
+            if isinstance(error, IngestionCancelled):
+                logger.info("Ingestion pipeline cancelled")
+            else:
+                logger.error(f"Ingestion pipeline failed: {error}", exc_info=True)
+            self.error = error
+        self.abort.set()
+
+    def _put(self, q: queue.Queue, item, force: bool = False):
+        """Put into a bounded queue, giving up if the pipeline aborts."""
+        while True:
+            if not force:
+                self._check_cancelled()
+            if self.abort.is_set() and not force:
+                raise PipelineAborted()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self.abort.is_set() and force:
+                    # Consumers are gone; nobody will read it
+                    return
+
+    def _get(self, q: queue.Queue):
+        """Get from a queue, giving up if the pipeline aborts."""
+        while True:
+            self._check_cancelled()
+            if self.abort.is_set():
+                raise PipelineAborted()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    # ------------------------------------------------------------------
+    # Stage 1: parse + chunk in a process pool
+    # ------------------------------------------------------------------
+
+    def _parse_stage(self, plans: List[Dict]):
+        max_in_flight = self.pipeline.workers * 2
+        context = multiprocessing.get_context("spawn")
+        # Bounded: workers block on put while the embed stage is behind
+        output = context.Queue(maxsize=self.pipeline.queue_size)
+        stage_start = time.perf_counter()
+
+        with ProcessPoolExecutor(
+            max_workers=self.pipeline.workers, mp_context=context,
+            initializer=init_worker, initargs=(output,)
+        ) as pool:
+            in_flight = {}
+            remaining = list(plans)
+            try:
+                # Files stay open until their DONE message is read, even after the future completes
+                while remaining or in_flight or self._open_files():
+                    if self.abort.is_set() or self.cancel_event.is_set():
+                        self._check_cancelled()
+                        raise PipelineAborted()
+
+                    while remaining and len(in_flight) < max_in_flight:
+                        plan = remaining.pop(0)
+                        with self.pending_lock:
+                            self.pending[plan["file_path"]] = {
+                                "plan": plan, "emitted": 0, "written": 0, "total": None, "failed": False
+                            }
+                        future = pool.submit(
+                            stream_parse_and_chunk, plan["file_path"], plan["content_hash"],
+                            self.pipeline.embed_batch_size
+                        )
+                        in_flight[future] = plan
+
+                    self._drain(output)
+                    for future in [f for f in in_flight if f.done()]:
+                        plan = in_flight.pop(future)
+                        if future.exception() is not None:
+                            self._file_failed(plan, future.exception())
+            finally:
+                # Unblock workers stuck on a full queue so the pool can shut down
+                for future in in_flight:
+                    future.cancel()
+                while any(not future.done() for future in in_flight):
+                    self._drain(output, discard=True)
+
+        self.stats["parse"]["seconds"] = time.perf_counter() - stage_start
+
+    def _open_files(self) -> bool:
+        with self.pending_lock:
+            return any(entry["total"] is None and not entry["failed"] for entry in self.pending.values())
+
+    def _drain(self, output, discard: bool = False):
+        """Handle worker messages for up to 0.1 s."""
+        deadline = time.monotonic() + 0.1
+        while True:
+            try:
+                kind, file_path, payload = output.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                return
+            if discard:
+                continue
+            if kind == CHUNKS:
+                self._enqueue_batch(file_path, payload)
+            else:
+                self._finish_file(file_path, payload)
+
+    def _enqueue_batch(self, file_path: str, chunks: List[Dict]):
+        with self.pending_lock:
+            entry = self.pending[file_path]
+            if entry["failed"]:
+                return
+            first = entry["emitted"] == 0
+            start = entry["emitted"]
+            entry["emitted"] += len(chunks)
+        plan = entry["plan"]
+        if first:
+            self.ingestor.prepare(plan)
+
+        chunk_ids = make_chunk_ids(file_path, plan["content_hash"], len(chunks), start=start)
+        self.stats["parse"]["chunks"] += len(chunks)
+        self._advance(chunks_total=len(chunks))
+        for chunk, chunk_id in zip(chunks, chunk_ids):
+            self._put(self.chunk_queue, (file_path, chunk_id, chunk))
+
+    def _finish_file(self, file_path: str, result: Dict):
+        """A worker finished a file: record its totals and commit it if all chunks are written."""
+        self.stats["parse"]["files"] += 1
+        self.stats["parse"]["pages"] += result["pages"]
+        if result.get("token_stats"):
+            self.token_stats.append(result["token_stats"])
+        self.summary["processed"] += 1
+        self.summary["total_chunks"] += result["chunks"]
+
+        with self.pending_lock:
+            entry = self.pending[file_path]
+            entry["total"] = result["chunks"]
+            done = entry["written"] == entry["total"]
+            if done:
+                del self.pending[file_path]
+        if done:
+            if entry["total"] == 0:
+                self.ingestor.prepare(entry["plan"])
+            self._commit_file(entry)
+
+    def _file_failed(self, plan: Dict, error: BaseException):
+        with self.pending_lock:
+            entry = self.pending.get(plan["file_path"])
+            if entry is None or entry["total"] is not None:
+                return  # DONE already read; the failure came after the file was parsed
+            entry["failed"] = True
+        self.summary["failed"] += 1
+        self._advance(files_done=1)
+        logger.error(f"❌ Failed to process {plan['file_path']}: {error}")
+
+    def _discard_uncommitted_files(self):
+        """
+        Delete chunks already written for files that will not be committed.
+
+        That is files whose parsing failed part-way and, when the run was
+        cancelled or failed, every file still in flight. Their chunks are
+        not in the manifest, so nothing else would ever delete them.
+        """
+        for file_path, entry in list(self.pending.items()):
+            if not entry["emitted"] or not (entry["failed"] or self.error is not None):
+                continue
+            plan = entry["plan"]
+            # The committed previous version stays searchable
+            previous = set(plan["previous_chunk_ids"] or ())
+            chunk_ids = make_chunk_ids(file_path, plan["content_hash"], entry["emitted"])
+            vector_store.delete_ids([chunk_id for chunk_id in chunk_ids if chunk_id not in previous])
+            logger.info(f"Discarded {entry['emitted']} chunks of partially ingested {file_path}")
+
+    # ------------------------------------------------------------------
+    # Stage 2: fixed-size embedding batches
+    # ------------------------------------------------------------------
+
+    def _embed_stage(self):
+        batch = []
+        try:
+            while True:
+                item = self._get(self.chunk_queue)
+                if item is _END:
+                    break
+                batch.append(item)
+                if len(batch) >= self.pipeline.embed_batch_size:
+                    self._embed_batch(batch)
+                    batch = []
+
+            if batch:
+                self._embed_batch(batch)
+        finally:
+            self._put(self.write_queue, _END, force=True)
+
+    def _embed_batch(self, batch: List[tuple]):
+        start = time.perf_counter()
+        embeddings = embedding_model.encode([chunk["text"] for _, _, chunk in batch])
+        self.stats["embed"]["seconds"] += time.perf_counter() - start
+        self.stats["embed"]["embeddings"] += len(batch)
+        self.stats["embed"]["batches"] += 1
+        self._advance(chunks_embedded=len(batch))
+        self._put(self.write_queue, (batch, embeddings))
+
+    # ------------------------------------------------------------------
+    # Stage 3: single writer
+    # ------------------------------------------------------------------
+
+    def _write_stage(self):
+        while True:
+            item = self._get(self.write_queue)
+            if item is _END:
+                return
+
+            batch, embeddings = item
+            start = time.perf_counter()
+            vector_store.add_embeddings(
+                ids=[chunk_id for _, chunk_id, _ in batch],
+                texts=[chunk["text"] for _, _, chunk in batch],
+                embeddings=embeddings,
+                metadatas=[chunk.get("metadata", {}) for _, _, chunk in batch]
+            )
+            self.stats["write"]["seconds"] += time.perf_counter() - start
+            self.stats["write"]["chunks"] += len(batch)
+            self.stats["write"]["batches"] += 1
+
+            self._mark_written(batch)
+
+    def _mark_written(self, batch: List[tuple]):
+        completed = []
+        with self.pending_lock:
+            for file_path, _, _ in batch:
+                entry = self.pending[file_path]
+                entry["written"] += 1
+                if not entry["failed"] and entry["written"] == entry["total"]:
+                    completed.append(self.pending.pop(file_path))
+
+        for entry in completed:
+            self._commit_file(entry)
+
+    def _commit_file(self, entry: Dict):
+        """Record a file in the manifest once all of its chunks are written."""
+        plan = entry["plan"]
+        chunk_ids = make_chunk_ids(plan["file_path"], plan["content_hash"], entry["total"])
+        self.ingestor.commit(plan, chunk_ids, save=False)
+        self._advance(files_done=1)
+        logger.info(f"✅ Ingested: {plan['file_path']} ({len(chunk_ids)} chunks)")
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def _stage_report(self) -> Dict:
+        parse, embed, write = self.stats["parse"], self.stats["embed"], self.stats["write"]
+        return {
+            "parse": {
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in parse.items()},
+                "pages_per_s": _rate(parse["pages"], parse["seconds"]),
+                "chunks_per_s": _rate(parse["chunks"], parse["seconds"]),
+            },
+            "embed": {
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in embed.items()},
+                "embeddings_per_s": _rate(embed["embeddings"], embed["seconds"]),
+            },
+            "write": {
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in write.items()},
+                "chunks_per_s": _rate(write["chunks"], write["seconds"]),
+            },
+        }
+
+
+def _rate(count: int, seconds: float) -> float:
+    return round(count / seconds, 2) if seconds > 0 else 0.0
+
+
+def run_ingestion(
+    directory: Optional[str] = None,
+    progress: Optional[Callable[[Dict], None]] = None,
+    cancel_event: Optional[threading.Event] = None
+) -> Dict:
+    """Run the ingestion pipeline over a directory (default: the upload directory)."""
+    return IngestionPipeline().run(directory or config.documents_upload_dir, progress, cancel_event)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest a directory of documents into the vector store")
+    parser.add_argument("directory", nargs="?", default=config.documents_upload_dir, help="Documents directory")
+    parser.add_argument("--workers", type=int, default=None, help="Parse/chunk worker processes")
+    parser.add_argument("--batch-size", type=int, default=None, help="Embedding batch size")
+    parser.add_argument("--queue-size", type=int, default=None, help="Bounded queue size (batches) between stages")
+    args = parser.parse_args()
+
+    pipeline = IngestionPipeline(workers=args.workers, embed_batch_size=args.batch_size, queue_size=args.queue_size)
+    result = pipeline.run(args.directory)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Parse-and-chunk step of the ingestion pipeline, run in worker processes.
+
+Kept separate from the pipeline so worker processes only import the
+document loader and chunker, not the embedding model or vector store.
+
+In the pipeline, workers send a document's chunks back in bounded batches
+on an output queue (set up by init_worker) as the chunker produces them,
+so neither the worker nor the pipeline ever holds a whole large document's
+chunks, and a full queue pauses the workers until the pipeline catches up.
+"""
+import time
+from typing import Dict, Iterator, List, Optional
+from ..utils.logger import logger
+from .document_loader import DocumentLoader, iter_document_segments
+from .chunker import chunk_segments, collect_chunks
+from .tokenizer import count_tokens, token_stats
+
+# Messages a worker puts on its output queue for one file:
+#   (CHUNKS, file_path, [chunk, ...])  zero or more bounded batches, in order
+#   (DONE, file_path, summary)         last, with pages, chunk count and token stats
+CHUNKS = "chunks"
+DONE = "done"
+
+# Output queue of a pool worker process (see init_worker)
+_output = None
+
+
+def init_worker(output):
+    """Pool initializer: the queue chunk batches are sent back on."""
+    global _output
+    _output = output
+
+
+def _parse(file_path: str, content_hash: str, pages: List[int]) -> Iterator[Dict]:
+    """Stream a document's chunks; pages[0] counts segments read so far."""
+    metadata = {**DocumentLoader.describe(file_path), "content_hash": content_hash}
+
+    def segments() -> Iterator[Dict]:
+        for segment in iter_document_segments(file_path):
+            pages[0] += 1
+            yield segment
+
+    return chunk_segments(segments(), metadata)
+
+
+def parse_and_chunk(file_path: str, content_hash: str) -> Dict:
+    """
+    Load and chunk one document in this process.
+
+    The document is streamed segment by segment (page by page for PDFs)
+    into the chunker, so its full text is never held in memory; the chunks
+    are returned as one list (with 'total_chunks' in their metadata).
+
+    Args:
+        file_path: Path to the document
+        content_hash: Content hash recorded in each chunk's metadata
+
+    Returns:
+        Dict with 'file_path', 'chunks', 'pages', 'token_stats' (None if
+        the tokenizer is unavailable) and 'seconds'
+    """
+    start = time.perf_counter()
+    pages = [0]
+    chunks = collect_chunks(_parse(file_path, content_hash, pages))
+    counts = _token_counts(chunks)
+
+    return {
+        "file_path": file_path,
+        "chunks": chunks,
+        "pages": _page_count(file_path, pages[0]),
+        "token_stats": _token_stats(file_path, counts),
+        "seconds": time.perf_counter() - start
+    }
+
+
+def stream_parse_and_chunk(file_path: str, content_hash: str, batch_size: int) -> Dict:
+    """
+    Pool task: load and chunk one document, sending chunks on the output queue.
+
+    Chunks go out in batches of at most batch_size as they are produced,
+    followed by a DONE message carrying the summary. Streamed chunks have
+    no 'total_chunks' metadata, since the total is only known at the end.
+
+    Args:
+        file_path: Path to the document
+        content_hash: Content hash recorded in each chunk's metadata
+        batch_size: Maximum chunks per message
+
+    Returns:
+        The summary also sent with DONE: 'file_path', 'chunks' (count),
+        'pages', 'token_stats' and 'seconds'
+    """
+    if _output is None:
+        raise RuntimeError("stream_parse_and_chunk runs in pool workers started with init_worker")
+
+    start = time.perf_counter()
+    pages = [0]
+    total = 0
+    counts: Optional[List[int]] = []
+    batch = []
+
+    def send(batch: List[Dict]):
+        nonlocal counts
+        batch_counts = _token_counts(batch)
+        counts = counts + batch_counts if counts is not None and batch_counts is not None else None
+        _output.put((CHUNKS, file_path, batch))  # Blocks while the pipeline is behind
+
+    for chunk in _parse(file_path, content_hash, pages):
+        batch.append(chunk)
+        total += 1
+        if len(batch) >= batch_size:
+            send(batch)
+            batch = []
+    if batch:
+        send(batch)
+
+    summary = {
+        "file_path": file_path,
+        "chunks": total,
+        "pages": _page_count(file_path, pages[0]),
+        "token_stats": _token_stats(file_path, counts) if counts is not None else None,
+        "seconds": time.perf_counter() - start
+    }
+    _output.put((DONE, file_path, summary))
+    logger.info(f"✅ Chunking complete: {file_path} ({total} chunks)")
+    return summary
+
+
+def _page_count(file_path: str, segments: int) -> int:
+    return segments if DocumentLoader.describe(file_path)["file_type"] == "pdf" else 1
+
+
+def _token_counts(chunks: List[Dict]) -> Optional[List[int]]:
+    """Each chunk's token count, recorded in its metadata (None if the tokenizer is unavailable)."""
+    counts = [chunk["metadata"].get("token_count") for chunk in chunks]
+    if None in counts:
+        counts = count_tokens([chunk["text"] for chunk in chunks])
+        if counts is None:
+            return None
+        for chunk, count in zip(chunks, counts):
+            chunk["metadata"]["token_count"] = count
+    return counts
+
+
+def _token_stats(file_path: str, counts: Optional[List[int]]):
+    """Summarize truncation for the file."""
+    if counts is None:
+        return None
+    stats = token_stats(counts)
+    if stats["truncated"]:
+        logger.warning(
+            f"{stats['truncated']}/{stats['chunks']} chunks of {file_path} exceed the embedding "
+            f"window and will be truncated (max {stats['max_tokens']} tokens)"
+        )
+    return stats
@@ -0,0 +1,165 @@
+"""
+Retrieval post-processing: similarity threshold, MMR diversification and
+the context token budget.
+
+Overlapping chunks (`rag.chunk_overlap`) of the same passage tend to be
+retrieved together; sending all of them only makes the prompt longer.
+Candidates are filtered by cosine similarity to the query, then picked
+by maximal marginal relevance (MMR), which trades relevance against
+similarity to the chunks already picked and drops near-duplicates
+outright. The retriever finally trims the chunks to a token budget
+before building the LLM context.
+"""
+from typing import Dict, List, Optional
+import numpy as np
+from .vector_backends.numpy_backend import normalize_rows
+
+# Estimated tokens per character when a chunk has no 'token_count'
+_CHARS_PER_TOKEN = 4
+
+# "[Source i: filename]" header and separator added per chunk in the context
+_SOURCE_HEADER_TOKENS = 12
+
+
+def mmr_select(
+    relevance: np.ndarray,
+    pairwise: np.ndarray,
+    top_k: int,
+    lambda_mult: float = 0.7,
+    duplicate_threshold: float = 1.0
+) -> List[int]:
+    """
+    Pick items by maximal marginal relevance.
+
+    Each step picks the item maximizing
+    lambda * relevance - (1 - lambda) * max similarity to the picked items.
+
+    Args:
+        relevance: Relevance of each candidate, shape (n,)
+        pairwise: Candidate-candidate cosine similarities, shape (n, n)
+        top_k: Maximum number of items to pick
+        lambda_mult: 1 ranks by relevance only, 0 by diversity only
+        duplicate_threshold: Candidates at least this similar to a picked
+                             item are dropped (1.0 = keep all)
+
+    Returns:
+        Indices of the picked candidates, in pick order
+    """
+    available = np.ones(len(relevance), dtype=bool)
+    redundancy = np.zeros(len(relevance), dtype=np.float32)
+    selected = []
+    while len(selected) < top_k and available.any():
+        scores = np.where(available, lambda_mult * relevance - (1.0 - lambda_mult) * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, pairwise[best], out=redundancy)
+        if duplicate_threshold < 1.0:
+            available &= redundancy < duplicate_threshold
+    return selected
+
+
+def postprocess_results(
+    documents: List[Dict],
+    query_embedding: np.ndarray,
+    embeddings: np.ndarray,
+    top_k: int,
+    similarity_threshold: float = 0.0,
+    mmr: bool = True,
+    lambda_mult: float = 0.7,
+    duplicate_threshold: float = 1.0
+) -> List[Dict]:
+    """
+    Filter ranked candidates by similarity and pick a diverse top_k.
+
+    Chunks BM25 ranks within the top_k in hybrid search pass the threshold
+    regardless of their embedding similarity (exact terms such as account
+    codes embed poorly). Chunks without a dense 'score' get one from their
+    stored embedding; chunks without a stored embedding (deleted since the
+    search) keep the similarity of their dense 'score'.
+
+    Args:
+        documents: Ranked candidates from the vector store
+        query_embedding: Query embedding vector
+        embeddings: Stored embeddings of the candidates, one row each
+        top_k: Number of results
+        similarity_threshold: Minimum cosine similarity to the query
+        mmr: Pick by MMR (otherwise keep the first top_k in rank order)
+        lambda_mult: MMR relevance/diversity trade-off
+        duplicate_threshold: Drop chunks this similar to a picked one
+
+    Returns:
+        At most top_k documents
+    """
+    if not documents:
+        return []
+
+    query = normalize_rows(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1))[0]
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    if vectors.shape != (len(documents), len(query)):
+        # No stored embedding for any candidate (e.g. a zero-width result)
+        vectors = np.zeros((len(documents), len(query)), dtype=np.float32)
+    # Chunks deleted since the search have a zero row: not re-scored
+    stored = np.any(vectors != 0, axis=1)
+    vectors = normalize_rows(vectors)
+    similarities = vectors @ query
+    for i in np.flatnonzero(~stored):
+        if documents[i].get("score") is not None:
+            similarities[i] = 1.0 - documents[i]["score"]
+
+    keep = []
+    for i, doc in enumerate(documents):
+        if doc.get("score") is None:
+            doc["score"] = float(1.0 - similarities[i])
+        sparse_rank = (doc.get("fusion") or {}).get("sparse_rank")
+        lexical = sparse_rank is not None and sparse_rank <= top_k
+        if lexical or similarities[i] >= similarity_threshold:
+            keep.append(i)
+    if not keep or not mmr:
+        return [documents[i] for i in keep[:top_k]]
+
+    # Relevance in rank order: fused RRF score in hybrid mode, else similarity
+    if all("fusion" in documents[i] for i in keep):
+        relevance = np.array([documents[i]["fusion"]["rrf_score"] for i in keep], dtype=np.float32)
+        relevance /= relevance.max()
+    else:
+        relevance = similarities[keep]
+
+    candidates = vectors[keep]
+    picked = mmr_select(relevance, candidates @ candidates.T, top_k, lambda_mult, duplicate_threshold)
+    return [documents[keep[i]] for i in picked]
+
+
+def estimate_tokens(document: Dict) -> int:
+    """Tokens a chunk adds to the LLM context ('token_count' metadata or a length estimate)."""
+    tokens = document.get("metadata", {}).get("token_count")
+    if tokens is None:
+        tokens = len(document["text"]) // _CHARS_PER_TOKEN + 1
+    return int(tokens) + _SOURCE_HEADER_TOKENS
+
+
+def trim_to_token_budget(documents: List[Dict], budget: Optional[int]) -> List[Dict]:
+    """
+    Keep the best-ranked chunks that fit in a context token budget.
+
+    The first chunk is always kept, so a question never loses all context
+    to one long chunk.
+
+    Args:
+        documents: Ranked documents
+        budget: Maximum context tokens (0 or None = unlimited)
+
+    Returns:
+        The longest prefix of documents within the budget
+    """
+    if not budget:
+        return documents
+
+    kept, used = [], 0
+    for doc in documents:
+        tokens = estimate_tokens(doc)
+        if kept and used + tokens > budget:
+            break
+        kept.append(doc)
+        used += tokens
+    return kept
@@ -0,0 +1,214 @@
+"""
+Cross-encoder re-ranking of retrieved chunks.
+
+A cross-encoder reads the question and a chunk together, which ranks far
+better than comparing two separately computed embeddings but costs a
+forward pass per pair. It therefore only scores the candidates retrieval
+already found: every uncached (question, chunk) pair goes to the model in
+one batch on the CPU, and scores are cached by (question hash, chunk ID).
+
+If scoring does not finish within the latency budget, the retrieval order
+is kept. The batch still completes in the background and its scores land
+in the cache for the next identical question. Scoring runs on its own
+single thread (the model scores one batch at a time anyway), so overdue
+batches never tie up the shared blocking-work executor, and while one is
+still running, budgeted requests keep the retrieval order right away
+instead of queueing another batch behind it.
+"""
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from ..config import config
+from ..utils.logger import logger
+from .embeddings import _percentile_ms
+
+
+class CrossEncoderReranker:
+    """CPU cross-encoder with a (question, chunk) score cache."""
+
+    def __init__(self):
+        self.model_name = config.rag_reranking_model_name
+        self.max_length = config.rag_reranking_max_length
+        self.cache_size = config.rag_reranking_cache_size
+        self.model = None
+        self._load_lock = threading.Lock()
+        self._predict_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        self._metrics_lock = threading.Lock()
+        self._requests = 0
+        self._pairs_scored = 0
+        self._cache_hits = 0
+        self._fallbacks = 0
+        self._busy_skips = 0
+        self._errors = 0
+        self._overdue = 0  # Batches past their budget, still scoring in the background
+        self._latencies = deque(maxlen=1000)  # Scoring time per request, seconds
+
+    def load_model(self):
+        """Load the cross-encoder (on the CPU)."""
+        with self._load_lock:
+            if self.model is not None:
+                return
+
+            from sentence_transformers import CrossEncoder
+            logger.info(f"Loading re-ranking model: {self.model_name}")
+            self.model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+            logger.info("✅ Re-ranking model loaded")
+
+    @staticmethod
+    def _query_hash(query: str) -> str:
+        return hashlib.sha256(query.strip().encode("utf-8")).hexdigest()[:32]
+
+    def score(self, query: str, documents: List[Dict]) -> np.ndarray:
+        """
+        Score (query, chunk) pairs, using cached scores where available.
+
+        Args:
+            query: User question
+            documents: Retrieved documents with 'id' and 'text'
+
+        Returns:
+            float32 relevance scores, one per document (higher is better)
+        """
+        query_hash = self._query_hash(query)
+        keys = [(query_hash, doc["id"]) for doc in documents]
+        scores = np.empty(len(documents), dtype=np.float32)
+
+        misses = []
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    misses.append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    scores[i] = cached
+
+        if misses:
+            self.load_model()
+            pairs = [(query, documents[i]["text"]) for i in misses]
+            with self._predict_lock:
+                predicted = self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+            scores[misses] = predicted
+
+            with self._cache_lock:
+                for i, value in zip(misses, np.asarray(predicted, dtype=np.float32).tolist()):
+                    self._cache[keys[i]] = value
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        with self._metrics_lock:
+            self._pairs_scored += len(misses)
+            self._cache_hits += len(documents) - len(misses)
+        return scores
+
+    async def arerank(
+        self,
+        query: str,
+        documents: List[Dict],
+        top_n: int,
+        budget_ms: Optional[float] = None
+    ) -> Tuple[List[Dict], bool]:
+        """
+        Re-rank documents without blocking the event loop.
+
+        Args:
+            query: User question
+            documents: Retrieved documents, in retrieval order
+            top_n: Number of documents to keep
+            budget_ms: Keep the retrieval order if scoring takes longer
+                       (None or 0 = no limit)
+
+        Returns:
+            (top_n documents, whether they were re-ranked). Re-ranked
+            documents carry a 'rerank_score'.
+        """
+        if not documents:
+            return documents, False
+
+        with self._metrics_lock:
+            self._requests += 1
+            busy = bool(budget_ms) and self._overdue > 0
+            if busy:
+                self._busy_skips += 1
+                self._fallbacks += 1
+        if busy:
+            # It would only queue behind the overdue batch and miss its budget too
+            logger.warning("Re-ranker busy with an overdue batch, keeping retrieval order")
+            return documents[:top_n], False
+
+        start = time.perf_counter()
+        task = asyncio.get_running_loop().run_in_executor(self._executor, self.score, query, documents)
+        try:
+            if budget_ms:
+                # shield: on timeout the batch keeps running and fills the cache
+                scores = await asyncio.wait_for(asyncio.shield(task), timeout=budget_ms / 1000.0)
+            else:
+                scores = await task
+        except asyncio.TimeoutError:
+            with self._metrics_lock:
+                self._overdue += 1
+                self._fallbacks += 1
+            task.add_done_callback(self._background_done)
+            logger.warning(f"Re-ranking exceeded {budget_ms:.0f} ms budget, keeping retrieval order")
+            return documents[:top_n], False
+        except Exception as e:
+            logger.error(f"Re-ranking failed, keeping retrieval order: {e}")
+            with self._metrics_lock:
+                self._errors += 1
+            return documents[:top_n], False
+
+        with self._metrics_lock:
+            self._latencies.append(time.perf_counter() - start)
+
+        order = np.argsort(-scores, kind="stable")[:top_n]
+        reranked = []
+        for i in order.tolist():
+            documents[i]["rerank_score"] = float(scores[i])
+            reranked.append(documents[i])
+        return reranked, True
+
+    def _background_done(self, task: asyncio.Future):
+        """An overdue batch finished (its scores are cached)."""
+        with self._metrics_lock:
+            self._overdue -= 1
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background re-ranking failed: {task.exception()}")
+
+    def get_metrics(self) -> Dict:
+        """Get request, cache and latency counters."""
+        with self._metrics_lock:
+            latencies = sorted(self._latencies)
+            pairs = self._pairs_scored + self._cache_hits
+            metrics = {
+                "model": self.model_name,
+                "loaded": self.model is not None,
+                "requests": self._requests,
+                "pairs_scored": self._pairs_scored,
+                "cache_hits": self._cache_hits,
+                "cache_hit_rate": round(self._cache_hits / pairs, 4) if pairs else 0.0,
+                "fallbacks": self._fallbacks,
+                "busy_skips": self._busy_skips,
+                "overdue_batches": self._overdue,
+                "errors": self._errors,
+            }
+        with self._cache_lock:
+            metrics["cache_entries"] = len(self._cache)
+        metrics["latency_ms"] = {
+            "p50": _percentile_ms(latencies, 50),
+            "p95": _percentile_ms(latencies, 95),
+        }
+        return metrics
+
+
+# Global re-ranker instance (the model loads on first use)
+reranker = CrossEncoderReranker()
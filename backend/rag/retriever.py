@@ -1,68 +1,287 @@
 """
 RAG retrieval and generation pipeline.
+
+Question embedding -> semantic answer cache (`rag.answer_cache`) ->
+retrieval -> optional cross-encoder re-ranking (`rag.enable_reranking`) ->
+context token budget -> LLM. Each stage's wall time is reported in the
+result's 'timings' (milliseconds).
 """
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import time
+import numpy as np
 from .vector_store import vector_store
+from .answer_cache import answer_cache
+from .embeddings import embedding_service
+from .postprocessing import trim_to_token_budget
+from .reranker import reranker
 from ..llm.client import llm_client
 from ..llm.prompts import RAG_ANSWER_PROMPT, create_rag_messages
 from ..config import config
 from ..utils.logger import logger
+from ..utils.concurrency import get_executor, run_blocking
+from ..utils.streaming import token_frame
 
+NO_DOCUMENTS_ANSWER = "I don't have any relevant documents to answer this question. / ليس لدي أي مستندات ذات صلة للإجابة على هذا السؤال."
 
-async def retrieve_and_generate(query: str, top_k: int = None) -> Dict:
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000.0, 2)
+
+
+def _format_timings(timings: Dict) -> str:
+    return ", ".join(f"{name[:-3]} {value:.0f} ms" for name, value in timings.items() if name.endswith("_ms"))
+
+
+async def _lookup_answer(
+    query: str, top_k: Optional[int], timings: Dict
+) -> Tuple[np.ndarray, Optional[Dict], Optional[int]]:
     """
-    Full RAG pipeline: retrieve relevant documents and generate answer.
+    Encode the question and look it up in the semantic answer cache.
+
+    Returns:
+        (question embedding, cached answer dict or None, cache epoch for
+        _store_answer or None without a cache)
+    """
+    start = time.perf_counter()
+    query_embedding = await embedding_service.aencode_query(query)
+    timings["embedding_ms"] = _elapsed_ms(start)
+    if answer_cache is None:
+        return query_embedding, None, None
+
+    start = time.perf_counter()
+    # May read shared state
+    cached, epoch = await run_blocking(answer_cache.lookup, query_embedding, top_k)
+    timings["answer_cache_ms"] = _elapsed_ms(start)
+    if cached is not None:
+        logger.info(f"Answer cache hit (similarity {cached['similarity']:.3f} to '{cached['query']}')")
+    return query_embedding, cached, epoch
+
+
+def _store_answer(query: str, query_embedding: np.ndarray, top_k: Optional[int], epoch: Optional[int],
+                  answer: str, sources: List[Dict], documents: List[Dict]):
+    """Cache an answer in the background (storing may read shared state)."""
+    if answer_cache is not None and answer:
+        get_executor().submit(
+            answer_cache.store, query, query_embedding, answer, sources, documents, top_k, epoch
+        ).add_done_callback(_log_store_error)
+
+
+def _log_store_error(future):
+    if future.exception() is not None:
+        logger.warning(f"Failed to cache answer: {future.exception()}")
+
+
+async def _retrieve(query: str, query_embedding: np.ndarray, top_k: Optional[int], timings: Dict) -> List[Dict]:
+    """
+    Retrieve (and optionally re-rank) documents for a question.
+
+    Search and re-ranking run off the event loop. With re-ranking on,
+    `rag.reranking.candidates` chunks are retrieved and the best top_k
+    (default `rag.reranking.top_n`) kept. The result is trimmed to the
+    context token budget.
 
     Args:
         query: User question
+        query_embedding: Question embedding
         top_k: Number of documents to retrieve
+        timings: Filled with 'retrieval_ms', plus 'rerank_ms' and
+                 'reranked' when re-ranking is enabled
 
     Returns:
-        Dict with 'answer' and 'sources'
+        Documents for the LLM context
     """
-    logger.info(f"RAG query: {query}")
+    start = time.perf_counter()
+    if not config.rag_enable_reranking:
+        documents = await vector_store.asearch(query, top_k=top_k, query_embedding=query_embedding)
+        timings["retrieval_ms"] = _elapsed_ms(start)
+    else:
+        documents = await vector_store.asearch(
+            query, top_k=config.rag_reranking_candidates, query_embedding=query_embedding
+        )
+        timings["retrieval_ms"] = _elapsed_ms(start)
 
-    # 1. Retrieve relevant documents
-    documents = vector_store.search(query, top_k=top_k)
+        start = time.perf_counter()
+        documents, reranked = await reranker.arerank(
+            query,
+            documents,
+            top_n=top_k or config.rag_reranking_top_n,
+            budget_ms=config.rag_reranking_latency_budget_ms
+        )
+        timings["rerank_ms"] = _elapsed_ms(start)
+        timings["reranked"] = reranked
+
+    return trim_to_token_budget(documents, config.rag_context_token_budget)
 
-    if not documents:
-        return {
-            "answer": "I don't have any relevant documents to answer this question. / ليس لدي أي مستندات ذات صلة للإجابة على هذا السؤال.",
-            "sources": []
-        }
 
-    # 2. Build context from retrieved documents
+def _build_context(documents: List[Dict]) -> str:
+    """Build the LLM context block from retrieved documents."""
     context_parts = []
     for i, doc in enumerate(documents, 1):
         source = doc["metadata"].get("filename", "Unknown")
         context_parts.append(f"[Source {i}: {source}]\n{doc['text']}")
 
-    context = "\n\n".join(context_parts)
+    return "\n\n".join(context_parts)
 
-    # 3. Generate answer using LLM
-    # Check if using Groq (supports chat messages) or HuggingFace (needs prompt string)
-    if config.llm_provider == "groq" and hasattr(llm_client, 'generate_from_messages'):
-        # Use chat messages format for Groq
-        messages = create_rag_messages(context, query)
-        answer = llm_client.generate_from_messages(messages)
-    else:
-        # Use prompt string for HuggingFace
-        prompt = RAG_ANSWER_PROMPT.format(context=context, question=query)
-        answer = llm_client.generate(prompt)
 
-    # 4. Extract sources
-    sources = [
+def _extract_sources(documents: List[Dict]) -> List[Dict]:
+    """Extract source references from retrieved documents."""
+    return [
         {
             "filename": doc["metadata"].get("filename", "Unknown"),
             "chunk_index": doc["metadata"].get("chunk_index", 0),
-            "score": doc.get("score", 0)
+            "score": doc.get("score", 0),
+            **({"rerank_score": doc["rerank_score"]} if "rerank_score" in doc else {})
         }
         for doc in documents
     ]
 
-    logger.info("RAG answer generated")
+
+def _use_chat_messages() -> bool:
+    """Check if the LLM client supports async chat messages (Groq) or needs a prompt string."""
+    return config.llm_provider == "groq" and hasattr(llm_client, 'agenerate_from_messages')
+
+
+async def retrieve_and_generate(query: str, top_k: int = None) -> Dict:
+    """
+    Full RAG pipeline: retrieve relevant documents and generate answer.
+
+    Args:
+        query: User question
+        top_k: Number of documents to retrieve
+
+    Returns:
+        Dict with 'answer', 'sources', per-stage 'timings' and whether the
+        answer came from the answer cache ('cached')
+    """
+    logger.info(f"RAG query: {query}")
+    timings = {}
+
+    # 1. Reuse the answer to a near-identical question
+    query_embedding, cached, epoch = await _lookup_answer(query, top_k, timings)
+    if cached is not None:
+        return {
+            "answer": cached["answer"],
+            "sources": cached["sources"],
+            "timings": timings,
+            "cached": True
+        }
+
+    # 2. Retrieve relevant documents
+    documents = await _retrieve(query, query_embedding, top_k, timings)
+
+    if not documents:
+        return {
+            "answer": NO_DOCUMENTS_ANSWER,
+            "sources": [],
+            "timings": timings,
+            "cached": False
+        }
+
+    # 3. Build context from retrieved documents
+    context = _build_context(documents)
+
+    # 4. Generate answer using LLM
+    # Check if using Groq (supports chat messages) or HuggingFace (needs prompt string)
+    start = time.perf_counter()
+    if _use_chat_messages():
+        # Use chat messages format for Groq
+        messages = create_rag_messages(context, query)
+        answer = await llm_client.agenerate_from_messages(messages)
+    else:
+        # Use prompt string for HuggingFace (local, blocking inference)
+        prompt = RAG_ANSWER_PROMPT.format(context=context, question=query)
+        answer = await run_blocking(llm_client.generate, prompt)
+    timings["generation_ms"] = _elapsed_ms(start)
+
+    # 5. Extract sources
+    sources = _extract_sources(documents)
+    _store_answer(query, query_embedding, top_k, epoch, answer, sources, documents)
+
+    logger.info(f"RAG answer generated ({_format_timings(timings)})")
 
     return {
         "answer": answer,
-        "sources": sources
+        "sources": sources,
+        "timings": timings,
+        "cached": False
+    }
+
+
+async def retrieve_and_stream(query: str, top_k: int = None) -> AsyncIterator[Dict]:
+    """
+    Streaming RAG pipeline: retrieve documents, then stream the answer.
+
+    Yields token frames ({"type": "token", "content": ...}) as the LLM
+    produces them, followed by one final frame carrying the full answer,
+    sources and timings (including 'first_token_ms'). A cached answer is
+    sent as a single token frame.
+
+    Args:
+        query: User question
+        top_k: Number of documents to retrieve
+
+    Yields:
+        Token frames, then a final frame with 'answer', 'sources' and 'timings'
+    """
+    logger.info(f"RAG streaming query: {query}")
+    timings = {}
+
+    query_embedding, cached, epoch = await _lookup_answer(query, top_k, timings)
+    if cached is not None:
+        yield token_frame(cached["answer"])
+        yield {"type": "final", "answer": cached["answer"], "sources": cached["sources"],
+               "timings": timings, "cached": True}
+        return
+
+    documents = await _retrieve(query, query_embedding, top_k, timings)
+
+    if not documents:
+        yield token_frame(NO_DOCUMENTS_ANSWER)
+        yield {"type": "final", "answer": NO_DOCUMENTS_ANSWER, "sources": [], "timings": timings, "cached": False}
+        return
+
+    context = _build_context(documents)
+
+    answer_parts = []
+    complete = stored = False  # Whole answer generated / cached
+    start = time.perf_counter()
+    try:
+        if _use_chat_messages() and hasattr(llm_client, 'astream_from_messages'):
+            messages = create_rag_messages(context, query)
+            async for delta in llm_client.astream_from_messages(messages):
+                if not answer_parts:
+                    timings["first_token_ms"] = _elapsed_ms(start)
+                answer_parts.append(delta)
+                yield token_frame(delta)
+            complete = True
+        else:
+            # Clients without streaming support produce the whole answer at once
+            prompt = RAG_ANSWER_PROMPT.format(context=context, question=query)
+            answer = await run_blocking(llm_client.generate, prompt)
+            answer_parts.append(answer)
+            complete = True
+            timings["first_token_ms"] = _elapsed_ms(start)
+            yield token_frame(answer)
+        timings["generation_ms"] = _elapsed_ms(start)
+
+        logger.info(f"RAG answer streamed ({_format_timings(timings)})")
+
+        answer = "".join(answer_parts).strip()
+        sources = _extract_sources(documents)
+        stored = True
+        _store_answer(query, query_embedding, top_k, epoch, answer, sources, documents)
+    finally:
+        # The client went away after the whole answer was generated: still cache it
+        if complete and not stored:
+            _store_answer(
+                query, query_embedding, top_k, epoch, "".join(answer_parts).strip(),
+                _extract_sources(documents), documents
+            )
+
+    yield {
+        "type": "final",
+        "answer": answer,
+        "sources": sources,
+        "timings": timings,
+        "cached": False
     }
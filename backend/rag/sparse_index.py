@@ -0,0 +1,397 @@
+"""
+BM25 sparse retrieval over an incrementally built inverted index.
+
+Text is normalized for mixed English/Arabic banking content: NFKC and case
+folding, Arabic diacritics and tatweel stripped, alef/ya/ta-marbuta and
+hamza-carrier variants folded, Arabic-Indic digits mapped to ASCII, and
+the definite article removed from Arabic words.
+
+Each term's postings (chunk number, term frequency) are kept as a
+compressed block (delta-coded chunk numbers and frequencies, each stored
+in the narrowest unsigned integer type that fits) plus an uncompressed
+tail that new chunks are appended to. Tails are merged into the blocks on
+flush(), when the whole index is written as one .npz file.
+"""
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from ..utils.logger import logger
+
+_ARABIC_DIACRITICS_RE = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_TOKEN_RE = re.compile(r"\w+")
+
+_ARABIC_FOLDING = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ئ": "ي", "ؤ": "و", "ة": "ه",
+    **{chr(0x0660 + d): str(d) for d in range(10)},  # Arabic-Indic digits
+    **{chr(0x06F0 + d): str(d) for d in range(10)},  # Extended Arabic-Indic digits
+})
+
+# Definite article (optionally after a conjunction/preposition), longest first
+_ARABIC_ARTICLES = ("وبال", "وال", "بال", "كال", "فال", "ولل", "لل", "ال")
+
+# Compact on flush once deleted chunks exceed this share of all chunks
+_COMPACT_DEAD_RATIO = 0.25
+
+_INDEX_VERSION = 1
+_EMPTY = np.zeros(0, dtype=np.uint8)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for indexing and querying (see module docstring)."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _ARABIC_DIACRITICS_RE.sub("", text)
+    return text.translate(_ARABIC_FOLDING)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split normalized text into index terms."""
+    tokens = []
+    for token in _TOKEN_RE.findall(normalize_text(text)):
+        if "\u0600" <= token[0] <= "\u06ff":
+            for article in _ARABIC_ARTICLES:
+                if token.startswith(article) and len(token) - len(article) >= 2:
+                    token = token[len(article):]
+                    break
+        tokens.append(token)
+    return tokens
+
+
+def _narrowest_uint(values: np.ndarray) -> np.ndarray:
+    """Cast non-negative integers to the smallest unsigned type that holds them."""
+    top = int(values.max()) if len(values) else 0
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if top <= np.iinfo(dtype).max:
+            return values.astype(dtype)
+    return values.astype(np.uint64)
+
+
+class _Postings:
+    """One term's postings: a compressed block plus an append-only tail."""
+
+    __slots__ = ("first", "deltas", "tfs", "tail_docs", "tail_tfs")
+
+    def __init__(self, first: int = 0, deltas: np.ndarray = _EMPTY, tfs: np.ndarray = _EMPTY):
+        self.first = first  # first chunk number of the block
+        self.deltas = deltas  # gaps between consecutive chunk numbers
+        self.tfs = tfs  # term frequencies (len(deltas) + 1 entries, or none)
+        self.tail_docs: List[int] = []
+        self.tail_tfs: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.tfs) + len(self.tail_docs)
+
+    def append(self, doc: int, tf: int):
+        self.tail_docs.append(doc)
+        self.tail_tfs.append(tf)
+
+    def decode(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Chunk numbers and term frequencies, in chunk order."""
+        docs = np.empty(len(self), dtype=np.int64)
+        tfs = np.empty(len(self), dtype=np.float32)
+        block = len(self.tfs)
+        if block:
+            docs[0] = self.first
+            np.cumsum(self.deltas, dtype=np.int64, out=docs[1:block])
+            docs[1:block] += self.first
+            tfs[:block] = self.tfs
+        docs[block:] = self.tail_docs
+        tfs[block:] = self.tail_tfs
+        return docs, tfs
+
+    @classmethod
+    def encode(cls, docs: np.ndarray, tfs: np.ndarray) -> "_Postings":
+        if not len(docs):
+            return cls()
+        return cls(int(docs[0]), _narrowest_uint(np.diff(docs)), _narrowest_uint(tfs))
+
+
+class SparseIndex:
+    """BM25 index of chunk texts, keyed by chunk ID."""
+
+    def __init__(self, path: str, k1: float = 1.2, b: float = 0.75):
+        """
+        Args:
+            path: .npz file the index is persisted to
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+        """
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+        self._reset_state()
+
+    def _reset_state(self):
+        self._terms: Dict[str, _Postings] = {}
+        self._doc_ids: List[Optional[str]] = []  # None marks a deleted chunk
+        self._doc_nums: Dict[str, int] = {}
+        self._doc_files: List[Optional[str]] = []
+        self._doc_lens = np.zeros(0, dtype=np.int32)
+        self._live = np.zeros(0, dtype=bool)
+        self._total_len = 0
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Load the index from disk (once)."""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.path.exists():
+                return
+            try:
+                self._read()
+                logger.info(f"Sparse index loaded: {self.count()} chunks, {len(self._terms)} terms")
+            except Exception as e:
+                logger.error(f"Failed to read sparse index, starting empty: {e}")
+                self._reset_state()
+
+    def _read(self):
+        with np.load(self.path) as saved:
+            meta = json.loads(saved["meta"].tobytes().decode("utf-8"))
+            if meta["version"] != _INDEX_VERSION:
+                raise ValueError(f"unsupported sparse index version {meta['version']}")
+            firsts, counts = saved["firsts"], saved["counts"]
+            delta_widths, tf_widths = saved["delta_widths"], saved["tf_widths"]
+            delta_blob, tf_blob = saved["delta_blob"], saved["tf_blob"]
+            self._doc_lens = saved["doc_lens"]
+            self._live = saved["live"]
+
+        files = meta["files"]
+        self._doc_ids = meta["doc_ids"]
+        self._doc_files = [files[code] if code >= 0 else None for code in meta["file_codes"]]
+        self._doc_nums = {chunk_id: num for num, chunk_id in enumerate(self._doc_ids) if chunk_id is not None}
+        self._total_len = int(self._doc_lens[self._live].sum())
+
+        delta_offset = tf_offset = 0
+        for term, first, count, delta_width, tf_width in zip(
+            meta["terms"], firsts.tolist(), counts.tolist(), delta_widths.tolist(), tf_widths.tolist()
+        ):
+            delta_bytes = (count - 1) * delta_width
+            tf_bytes = count * tf_width
+            deltas = delta_blob[delta_offset:delta_offset + delta_bytes].view(f"<u{delta_width}")
+            tfs = tf_blob[tf_offset:tf_offset + tf_bytes].view(f"<u{tf_width}")
+            self._terms[term] = _Postings(first, deltas, tfs)
+            delta_offset += delta_bytes
+            tf_offset += tf_bytes
+
+    def flush(self):
+        """Merge postings tails, compact if needed, and write the index."""
+        with self._lock:
+            if not self._dirty:
+                return
+            dead = len(self._doc_ids) - len(self._doc_nums)
+            if dead > _COMPACT_DEAD_RATIO * len(self._doc_ids):
+                self._compact()
+            else:
+                for term, postings in self._terms.items():
+                    if postings.tail_docs:
+                        self._terms[term] = _Postings.encode(*postings.decode())
+            self._write()
+            self._dirty = False
+
+    def _compact(self):
+        """Drop deleted chunks and renumber the rest."""
+        keep = np.flatnonzero(self._live[:len(self._doc_ids)])
+        remap = np.full(len(self._doc_ids), -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+
+        terms = {}
+        for term, postings in self._terms.items():
+            docs, tfs = postings.decode()
+            new_docs = remap[docs]
+            alive = new_docs >= 0
+            if alive.any():
+                terms[term] = _Postings.encode(new_docs[alive], tfs[alive])
+        self._terms = terms
+
+        keep_list = keep.tolist()
+        self._doc_ids = [self._doc_ids[num] for num in keep_list]
+        self._doc_files = [self._doc_files[num] for num in keep_list]
+        self._doc_nums = {chunk_id: num for num, chunk_id in enumerate(self._doc_ids)}
+        self._doc_lens = self._doc_lens[keep]
+        self._live = np.ones(len(keep), dtype=bool)
+        logger.info(f"Compacted sparse index: {len(keep)} chunks, {len(terms)} terms")
+
+    def _write(self):
+        terms = list(self._terms)
+        postings = [self._terms[term] for term in terms]
+        files = sorted({f for f in self._doc_files if f is not None})
+        file_codes = {f: code for code, f in enumerate(files)}
+        meta = {
+            "version": _INDEX_VERSION,
+            "terms": terms,
+            "doc_ids": self._doc_ids,
+            "files": files,
+            "file_codes": [file_codes[f] if f is not None else -1 for f in self._doc_files]
+        }
+        meta_bytes = np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+        def blob(arrays: List[np.ndarray]) -> np.ndarray:
+            parts = [a.astype(a.dtype.newbyteorder("<")).view(np.uint8) for a in arrays if len(a)]
+            return np.concatenate(parts) if parts else _EMPTY
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                meta=meta_bytes,
+                firsts=np.array([p.first for p in postings], dtype=np.int64),
+                counts=np.array([len(p.tfs) for p in postings], dtype=np.int64),
+                delta_widths=np.array([p.deltas.dtype.itemsize for p in postings], dtype=np.uint8),
+                tf_widths=np.array([p.tfs.dtype.itemsize for p in postings], dtype=np.uint8),
+                delta_blob=blob([p.deltas for p in postings]),
+                tf_blob=blob([p.tfs for p in postings]),
+                doc_lens=self._doc_lens[:len(self._doc_ids)],
+                live=self._live[:len(self._doc_ids)]
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def add(self, ids: List[str], texts: List[str], metadatas: Optional[List[Dict]] = None):
+        """
+        Index chunks, replacing any with the same ID.
+
+        Args:
+            ids: Chunk IDs
+            texts: Chunk texts
+            metadatas: Chunk metadata ('file_path' enables remove_file)
+        """
+        self.load()
+        metadatas = metadatas or [{}] * len(ids)
+        with self._lock:
+            self.remove(ids)
+            first = len(self._doc_ids)
+            self._reserve(first + len(ids))
+
+            for offset, (chunk_id, text, metadata) in enumerate(zip(ids, texts, metadatas)):
+                num = first + offset
+                counts = Counter(tokenize(text))
+                length = sum(counts.values())
+
+                self._doc_ids.append(chunk_id)
+                self._doc_nums[chunk_id] = num
+                self._doc_files.append((metadata or {}).get("file_path"))
+                self._doc_lens[num] = length
+                self._live[num] = True
+                self._total_len += length
+
+                for term, tf in counts.items():
+                    postings = self._terms.get(term)
+                    if postings is None:
+                        postings = self._terms[term] = _Postings()
+                    postings.append(num, tf)
+            self._dirty = True
+
+    def _reserve(self, size: int):
+        if size <= len(self._live):
+            return
+        capacity = max(size, 2 * len(self._live), 1024)
+        lens = np.zeros(capacity, dtype=np.int32)
+        lens[:len(self._doc_lens)] = self._doc_lens
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self._live)] = self._live
+        self._doc_lens, self._live = lens, live
+
+    def remove(self, ids: Iterable[str]):
+        """Remove chunks by ID (unknown IDs are ignored)."""
+        self.load()
+        with self._lock:
+            for chunk_id in ids:
+                num = self._doc_nums.pop(chunk_id, None)
+                if num is None:
+                    continue
+                self._doc_ids[num] = None
+                self._live[num] = False
+                self._total_len -= int(self._doc_lens[num])
+                self._dirty = True
+
+    def remove_file(self, file_path: str):
+        """Remove every chunk whose metadata 'file_path' matches."""
+        self.load()
+        with self._lock:
+            self.remove([
+                chunk_id for chunk_id, chunk_file in zip(self._doc_ids, self._doc_files)
+                if chunk_id is not None and chunk_file == file_path
+            ])
+
+    def clear(self):
+        """Remove every chunk."""
+        with self._lock:
+            self._reset_state()
+            self._loaded = True
+            self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def count(self) -> int:
+        self.load()
+        return len(self._doc_nums)
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """
+        Rank chunks against a query with BM25.
+
+        Args:
+            query: Query text
+            top_k: Number of results
+
+        Returns:
+            (chunk_id, score) pairs, best first
+        """
+        self.load()
+        terms = set(tokenize(query))
+        with self._lock:
+            live_count = len(self._doc_nums)
+            if not terms or live_count == 0 or top_k <= 0:
+                return []
+            avg_len = self._total_len / live_count
+            doc_lens, live = self._doc_lens, self._live
+            matches = [self._terms[term].decode() for term in terms if term in self._terms]
+            doc_ids = self._doc_ids
+        if not matches:
+            return []
+
+        all_docs, all_weights = [], []
+        for docs, tfs in matches:
+            alive = live[docs]
+            docs, tfs = docs[alive], tfs[alive]
+            if not len(docs):
+                continue
+            df = len(docs)
+            idf = math.log(1.0 + (live_count - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * doc_lens[docs] / avg_len)
+            all_docs.append(docs)
+            all_weights.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+        if not all_docs:
+            return []
+
+        docs, inverse = np.unique(np.concatenate(all_docs), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(all_weights))
+
+        k = min(top_k, len(docs))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(docs) else np.arange(len(docs))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        results = [(doc_ids[int(docs[i])], float(scores[i])) for i in top.tolist()]
+        return [(chunk_id, score) for chunk_id, score in results if chunk_id is not None]
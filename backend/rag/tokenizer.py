@@ -0,0 +1,137 @@
+"""
+Embedding-model tokenizer for token-aware chunking and truncation stats.
+
+Loads only the model's fast (Rust) tokenizer, not the model itself, so it
+is cheap enough to use in ingestion worker processes.
+"""
+import threading
+from typing import Dict, List, Optional
+from ..config import config
+from ..utils.logger import logger
+
+# Texts per tokenizer call
+TOKENIZE_BATCH_SIZE = 256
+
+# [CLS] and [SEP] take two positions of the model window
+SPECIAL_TOKENS = 2
+
+_tokenizer = None
+_tokenizer_failed = False
+_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer():
+    """
+    Get the embedding model's fast tokenizer (loaded once per process).
+
+    Returns:
+        A transformers fast tokenizer, or None if it cannot be loaded
+    """
+    global _tokenizer, _tokenizer_failed
+    if _tokenizer is not None or _tokenizer_failed:
+        return _tokenizer
+
+    with _tokenizer_lock:
+        if _tokenizer is None and not _tokenizer_failed:
+            try:
+                from transformers import AutoTokenizer
+                _tokenizer = AutoTokenizer.from_pretrained(config.embeddings_model_name, use_fast=True)
+            except Exception as e:
+                _tokenizer_failed = True
+                logger.warning(f"Embedding tokenizer unavailable, token stats disabled: {e}")
+    return _tokenizer
+
+
+def chunk_token_budget() -> int:
+    """Content tokens that fit in one chunk in tokens mode."""
+    window = config.embeddings_max_seq_length - SPECIAL_TOKENS
+    budget = config.rag_chunk_size_tokens or window
+    return min(budget, window)
+
+
+def tokenize_with_offsets(texts: List[str]) -> List[List[tuple]]:
+    """
+    Tokenize texts in one batch, returning character spans of each token.
+
+    Args:
+        texts: Texts to tokenize
+
+    Returns:
+        One list of (start, end) character offsets per text
+    """
+    encoded = get_tokenizer()(
+        texts,
+        add_special_tokens=False,
+        return_offsets_mapping=True,
+        return_attention_mask=False,
+        return_token_type_ids=False
+    )
+    return [list(offsets) for offsets in encoded["offset_mapping"]]
+
+
+def count_tokens(texts: List[str]) -> Optional[List[int]]:
+    """
+    Count content tokens per text, in batches.
+
+    Returns:
+        Token counts, or None if the tokenizer is unavailable
+    """
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return None
+
+    counts = []
+    for i in range(0, len(texts), TOKENIZE_BATCH_SIZE):
+        encoded = tokenizer(
+            texts[i:i + TOKENIZE_BATCH_SIZE],
+            add_special_tokens=False,
+            return_attention_mask=False,
+            return_token_type_ids=False
+        )
+        counts.extend(len(ids) for ids in encoded["input_ids"])
+    return counts
+
+
+def token_stats(token_counts: List[int]) -> Dict:
+    """
+    Summarize chunk token counts against the embedding model window.
+
+    Args:
+        token_counts: Content tokens per chunk
+
+    Returns:
+        Dict with chunk count, total/max tokens and how many chunks the
+        model would truncate
+    """
+    limit = config.embeddings_max_seq_length - SPECIAL_TOKENS
+    return {
+        "chunks": len(token_counts),
+        "tokens": sum(token_counts),
+        "max_tokens": max(token_counts, default=0),
+        "truncated": sum(1 for count in token_counts if count > limit)
+    }
+
+
+def merge_token_stats(stats: List[Dict]) -> Dict:
+    """
+    Combine per-file token stats into an ingestion summary.
+
+    Returns:
+        Dict with chunks, avg/max tokens, truncated count and percentage,
+        and the model window; empty if no stats were collected
+    """
+    stats = [s for s in stats if s]
+    if not stats:
+        return {}
+
+    chunks = sum(s["chunks"] for s in stats)
+    tokens = sum(s["tokens"] for s in stats)
+    truncated = sum(s["truncated"] for s in stats)
+    return {
+        "chunks": chunks,
+        "avg_tokens": round(tokens / chunks, 1) if chunks else 0.0,
+        "max_tokens": max(s["max_tokens"] for s in stats),
+        "truncated": truncated,
+        "truncated_pct": round(100.0 * truncated / chunks, 2) if chunks else 0.0,
+        "max_seq_length": config.embeddings_max_seq_length
+    }
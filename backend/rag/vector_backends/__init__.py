@@ -0,0 +1,66 @@
+"""
+Pluggable vector store backends.
+"""
+from pathlib import Path
+from ...config import config
+from ...utils.exceptions import RAGError
+from .base import VectorBackend
+from .chroma_backend import ChromaBackend
+from .ivf_index import IVFIndex
+from .numpy_backend import NumpyBackend
+from .quantization import Int8Quantizer, ProductQuantizer, create_quantizer
+
+BACKEND_TYPES = ("chromadb", "numpy")
+
+
+def create_backend(backend_type: str) -> VectorBackend:
+    """
+    Create the vector backend for a `vector_store.type` value.
+
+    Args:
+        backend_type: "chromadb" or "numpy"
+
+    Returns:
+        An uninitialized backend for the configured collection
+    """
+    if backend_type == "chromadb":
+        hnsw = {
+            "hnsw:search_ef": config.vector_store_hnsw_ef_search,
+            "hnsw:construction_ef": config.vector_store_hnsw_ef_construction,
+            "hnsw:M": config.vector_store_hnsw_m
+        }
+        return ChromaBackend(
+            config.vector_store_path, config.vector_store_collection, hnsw, dimension=config.embeddings_dimension
+        )
+    if backend_type == "numpy":
+        directory = Path(config.vector_store_path) / "numpy" / config.vector_store_collection
+        ivf = None
+        if config.vector_store_index == "ivf":
+            ivf = IVFIndex(
+                config.embeddings_dimension,
+                nlist=config.vector_store_ivf_nlist,
+                nprobe=config.vector_store_ivf_nprobe,
+                min_rows=config.vector_store_ivf_min_rows
+            )
+        quantizer = create_quantizer(
+            config.vector_store_quantization,
+            config.embeddings_dimension,
+            pq_subvectors=config.vector_store_pq_subvectors,
+            min_rows=config.vector_store_quantization_min_rows
+        )
+        return NumpyBackend(
+            str(directory),
+            config.embeddings_dimension,
+            ivf=ivf,
+            quantizer=quantizer,
+            rerank_factor=config.vector_store_rerank_factor
+        )
+    raise RAGError(
+        f"Unknown vector_store.type '{backend_type}', expected one of: {', '.join(BACKEND_TYPES)}"
+    )
+
+
+__all__ = [
+    "VectorBackend", "ChromaBackend", "NumpyBackend", "IVFIndex",
+    "Int8Quantizer", "ProductQuantizer", "create_backend", "BACKEND_TYPES"
+]
@@ -0,0 +1,74 @@
+"""
+Vector backend interface.
+
+A backend stores chunk texts, metadata and embeddings and answers top-k
+similarity queries. Scores are cosine distances (lower is more similar).
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List
+import numpy as np
+
+
+class VectorBackend(ABC):
+    """Storage and similarity search for chunk embeddings."""
+
+    name = "base"
+
+    @abstractmethod
+    def initialize(self):
+        """Open or create the underlying storage."""
+
+    @abstractmethod
+    def upsert(self, ids: List[str], texts: List[str], embeddings: np.ndarray, metadatas: List[Dict]):
+        """Insert chunks, replacing any with the same ID."""
+
+    @abstractmethod
+    def delete_ids(self, ids: List[str]):
+        """Delete chunks by ID (unknown IDs are ignored)."""
+
+    @abstractmethod
+    def delete_where(self, field: str, value: Any):
+        """Delete every chunk whose metadata `field` equals `value`."""
+
+    @abstractmethod
+    def query(self, embedding: np.ndarray, top_k: int) -> List[Dict]:
+        """
+        Find the chunks closest to an embedding.
+
+        Returns:
+            Up to top_k dicts with 'id', 'text', 'metadata' and 'score',
+            best first
+        """
+
+    @abstractmethod
+    def get(self, ids: List[str]) -> List[Dict]:
+        """Fetch chunks by ID as dicts with 'id', 'text' and 'metadata' (unknown IDs are skipped)."""
+
+    @abstractmethod
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """Stored embeddings for chunk IDs, one row per ID (zeros for unknown IDs)."""
+
+    @abstractmethod
+    def iter_documents(self, batch_size: int = 1000) -> Iterator[List[Dict]]:
+        """Yield every stored chunk, in batches of dicts with 'id', 'text' and 'metadata'."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored chunks."""
+
+    @abstractmethod
+    def reset(self):
+        """Delete all stored chunks."""
+
+    def flush(self):
+        """Persist pending writes (no-op for backends that write through)."""
+        pass
+
+    def close(self):
+        """
+        Let a new instance reopen the storage (no-op by default).
+
+        Searches still holding this instance must keep working until they
+        finish, so this must not invalidate it.
+        """
+        pass
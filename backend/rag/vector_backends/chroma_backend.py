@@ -0,0 +1,187 @@
+"""
+ChromaDB vector backend.
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import numpy as np
+from ...utils.logger import logger
+from .base import VectorBackend
+from .numpy_backend import normalize_rows
+
+# Distance space of new collections; scores are cosine distances
+_SPACE = "cosine"
+
+
+class ChromaBackend(VectorBackend):
+    """Persistent ChromaDB collection."""
+
+    name = "chromadb"
+
+    def __init__(self, db_path: str, collection_name: str, hnsw: Optional[Dict] = None, dimension: int = 0):
+        """
+        Args:
+            db_path: ChromaDB directory
+            collection_name: Collection to use
+            hnsw: Optional "hnsw:*" collection settings (search_ef,
+                  construction_ef, M), applied when the collection is
+                  created; an existing collection keeps its own (a
+                  mismatch is logged, rebuilding the collection applies them)
+            dimension: Embedding dimension, for get_embeddings() when none
+                       of the requested chunks exist any more
+        """
+        self.db_path = db_path
+        self.collection_name = collection_name
+        self.hnsw = hnsw or {}
+        self.dimension = dimension
+        self.client = None
+        self.collection = None
+        self.space = _SPACE  # Distance space of the open collection
+
+    def initialize(self):
+        """Initialize ChromaDB client and collection."""
+        if self.client is not None:
+            return
+
+        # Imported here so the numpy backend does not pay for chromadb
+        import chromadb
+
+        Path(self.db_path).mkdir(parents=True, exist_ok=True)
+        self.client = chromadb.PersistentClient(path=self.db_path)
+
+        try:
+            self.collection = self.client.get_collection(name=self.collection_name)
+            logger.info(f"Loaded existing collection: {self.collection_name}")
+        except Exception:
+            self._create_collection()
+            return
+        self._check_space()
+        self._check_hnsw_settings()
+
+    def _check_space(self):
+        """
+        Detect collections built with another distance (Chroma's default is l2).
+
+        Their distances are not cosine distances, so query() recomputes the
+        scores from the returned embeddings until the collection is rebuilt.
+        """
+        self.space = (self.collection.metadata or {}).get("hnsw:space", "l2")
+        if self.space != _SPACE:
+            logger.warning(
+                f"Collection '{self.collection_name}' uses hnsw:space '{self.space}', not '{_SPACE}'; "
+                f"scores are recomputed as cosine distances, but neighbours are still ranked by "
+                f"{self.space}. Rebuild it (delete {self.db_path} and the ingestion manifest, then "
+                f"re-ingest) to search by cosine distance"
+            )
+
+    def _check_hnsw_settings(self):
+        """Warn when configured HNSW settings differ from the ones the collection was built with."""
+        built = self.collection.metadata or {}
+        differing = {
+            key: (built.get(key), value) for key, value in self.hnsw.items()
+            if built.get(key) != value
+        }
+        if differing:
+            details = ", ".join(f"{key} {old} (configured {new})" for key, (old, new) in differing.items())
+            logger.warning(
+                f"Collection '{self.collection_name}' was built with {details}; HNSW settings only apply "
+                f"when a collection is created, so rebuild it (delete {self.db_path} and the ingestion "
+                f"manifest, then re-ingest) to use the configured values"
+            )
+
+    def _create_collection(self):
+        # Cosine distance, matching the numpy backend's scores
+        self.collection = self.client.create_collection(
+            name=self.collection_name,
+            metadata={"description": "Banking documents", "hnsw:space": _SPACE, **self.hnsw}
+        )
+        self.space = _SPACE
+        logger.info(f"Created new collection: {self.collection_name}")
+
+    def close(self):
+        # PersistentClient caches one system per path; a new client would
+        # reuse it and keep serving the HNSW index as this process last saw it.
+        # Client and collection stay usable for searches already holding this
+        # instance; they are released when it is garbage collected.
+        if self.client is not None:
+            self.client.clear_system_cache()
+
+    def upsert(self, ids: List[str], texts: List[str], embeddings: np.ndarray, metadatas: List[Dict]):
+        self.collection.upsert(
+            documents=texts,
+            embeddings=np.asarray(embeddings).tolist(),
+            metadatas=metadatas,
+            ids=ids
+        )
+
+    def delete_ids(self, ids: List[str]):
+        self.collection.delete(ids=ids)
+
+    def delete_where(self, field: str, value: Any):
+        self.collection.delete(where={field: value})
+
+    def query(self, embedding: np.ndarray, top_k: int) -> List[Dict]:
+        include = ["documents", "metadatas", "distances"]
+        if self.space != _SPACE:
+            include.append("embeddings")
+        results = self.collection.query(
+            query_embeddings=[np.asarray(embedding).tolist()],
+            n_results=top_k,
+            include=include
+        )
+
+        documents = []
+        if results["documents"] and len(results["documents"]) > 0:
+            distances = results["distances"][0] if results["distances"] else [0] * len(results["ids"][0])
+            if self.space != _SPACE and len(results["ids"][0]):
+                distances = _cosine_distances(embedding, results["embeddings"][0])
+            for i in range(len(results["documents"][0])):
+                documents.append({
+                    "id": results["ids"][0][i],
+                    "text": results["documents"][0][i],
+                    "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
+                    "score": float(distances[i])
+                })
+        return documents
+
+    def get(self, ids: List[str]) -> List[Dict]:
+        results = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        return _as_documents(results)
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        results = self.collection.get(ids=ids, include=["embeddings"])
+        rows = dict(zip(results["ids"], results["embeddings"]))
+        dimension = len(next(iter(rows.values()))) if rows else self.dimension
+        embeddings = np.zeros((len(ids), dimension), dtype=np.float32)
+        for i, chunk_id in enumerate(ids):
+            if chunk_id in rows:
+                embeddings[i] = rows[chunk_id]
+        return embeddings
+
+    def iter_documents(self, batch_size: int = 1000) -> Iterator[List[Dict]]:
+        for offset in range(0, self.count(), batch_size):
+            results = self.collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+            yield _as_documents(results)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def reset(self):
+        self.client.delete_collection(name=self.collection_name)
+        logger.info(f"Deleted collection: {self.collection_name}")
+        self._create_collection()
+
+
+def _cosine_distances(query: np.ndarray, embeddings) -> np.ndarray:
+    """Cosine distance from a query to each embedding."""
+    vectors = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+    query = normalize_rows(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+    return 1.0 - vectors @ query
+
+
+def _as_documents(results: Dict) -> List[Dict]:
+    """Convert a collection.get() result into document dicts."""
+    metadatas = results.get("metadatas") or [{}] * len(results["ids"])
+    return [
+        {"id": chunk_id, "text": text, "metadata": metadata or {}}
+        for chunk_id, text, metadata in zip(results["ids"], results["documents"], metadatas)
+    ]
@@ -0,0 +1,279 @@
+"""
+IVF-flat approximate nearest-neighbour index for the NumPy backend.
+
+Spherical k-means partitions the normalized embeddings into `nlist`
+clusters. Each row is appended to the inverted list of its closest
+centroid; a query scores the centroids, scans only the rows of the
+`nprobe` best lists and ranks those exactly. Larger `nprobe` trades
+latency for recall (nprobe = nlist is exact search).
+
+The index only stores row numbers; embeddings stay in the backend's
+memory-mapped matrix. A row that is re-assigned (its chunk was upserted
+with a new embedding) keeps a stale entry in its old list, which is
+filtered out at query time by checking the row's current assignment.
+"""
+import os
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from ...utils.logger import logger
+
+# Training sample per centroid (the rest of the rows are only assigned)
+_TRAIN_POINTS_PER_LIST = 64
+
+# Rows per block when assigning rows to centroids (bounds temp memory)
+_ASSIGN_BLOCK = 16384
+
+_INITIAL_LIST_CAPACITY = 16
+
+
+def auto_nlist(rows: int) -> int:
+    """Default number of lists: about sqrt(rows), clamped to [16, 4096]."""
+    return int(min(4096, max(16, round(np.sqrt(rows)))))
+
+
+def assign_to_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for each (normalized) vector."""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), _ASSIGN_BLOCK):
+        block = np.asarray(vectors[start:start + _ASSIGN_BLOCK])
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means over a sample of the vectors.
+
+    Args:
+        vectors: Normalized vectors (rows)
+        nlist: Number of centroids
+        iterations: Lloyd iterations
+        seed: Random seed for sampling and initialization
+
+    Returns:
+        float32 array (nlist, dimension) of normalized centroids
+    """
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * _TRAIN_POINTS_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = assign_to_centroids(sample, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=nlist)
+        present = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[present]
+        centroids[present] = np.add.reduceat(sample[order], starts, axis=0)
+
+        # Re-seed empty clusters with random sample points
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(sample_size, len(empty), replace=False)]
+
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids /= np.where(norms > 0, norms, 1.0)
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """Inverted-file index over the rows of an embedding matrix."""
+
+    def __init__(self, dimension: int, nlist: int = 0, nprobe: int = 16, min_rows: int = 20000):
+        """
+        Args:
+            dimension: Embedding dimension
+            nlist: Number of lists (0 = auto_nlist of the rows at training time)
+            nprobe: Lists scanned per query
+            min_rows: Below this many rows the backend searches exactly and
+                      the index is not trained
+        """
+        self.dimension = dimension
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_rows = min_rows
+        self.clear()
+
+    def clear(self):
+        """Drop the trained centroids and all lists."""
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_rows = 0
+        self._assign = np.full(0, -1, dtype=np.int32)  # row -> list (-1: not indexed)
+        self._lists = []  # row arrays, over-allocated
+        self._sizes = np.zeros(0, dtype=np.int64)
+        self._stale = 0  # entries left behind by rows that changed lists
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def needs_training(self, live_rows: int) -> bool:
+        """Train once the store is big enough; retrain after 4x growth."""
+        if live_rows == 0 or live_rows < self.min_rows:
+            return False
+        return not self.trained or live_rows > 4 * self.trained_rows
+
+    def train(self, matrix: np.ndarray, rows: np.ndarray):
+        """
+        Train centroids on the given rows of the matrix and index them.
+
+        Args:
+            matrix: Embedding matrix (normalized rows)
+            rows: Row numbers to train on and add (the live rows)
+        """
+        nlist = self.nlist or auto_nlist(len(rows))
+        nlist = min(nlist, len(rows))
+        logger.info(f"Training IVF index: {len(rows)} rows, {nlist} lists")
+
+        self.clear()
+        rng = np.random.default_rng(0)
+        sample_size = min(len(rows), nlist * _TRAIN_POINTS_PER_LIST)
+        sample = np.sort(rng.choice(rows, sample_size, replace=False))
+        self.centroids = train_centroids(matrix[sample], nlist)
+        self.trained_rows = len(rows)
+        self._lists = [np.empty(_INITIAL_LIST_CAPACITY, dtype=np.int64) for _ in range(nlist)]
+        self._sizes = np.zeros(nlist, dtype=np.int64)
+        for start in range(0, len(rows), _ASSIGN_BLOCK):
+            block = rows[start:start + _ASSIGN_BLOCK]
+            self.add(block, matrix[block])
+        logger.info(f"✅ IVF index trained: {nlist} lists")
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray):
+        """Assign rows (with their normalized vectors) to lists."""
+        if not self.trained or len(rows) == 0:
+            return
+        rows = np.asarray(rows, dtype=np.int64)
+        labels = assign_to_centroids(vectors, self.centroids)
+
+        if rows.max() >= len(self._assign):
+            grown = np.full(max(int(rows.max()) + 1, 2 * len(self._assign)), -1, dtype=np.int32)
+            grown[:len(self._assign)] = self._assign
+            self._assign = grown
+
+        # Rows already in the right list need no new entry
+        changed = self._assign[rows] != labels
+        rows, labels = rows[changed], labels[changed]
+        self._stale += int(np.count_nonzero(self._assign[rows] >= 0))
+        self._assign[rows] = labels
+
+        order = np.argsort(labels, kind="stable")
+        rows, labels = rows[order], labels[order]
+        for label, start, end in _runs(labels):
+            self._append(label, rows[start:end])
+
+    def _append(self, label: int, rows: np.ndarray):
+        size = self._sizes[label]
+        entries = self._lists[label]
+        if size + len(rows) > len(entries):
+            grown = np.empty(max(2 * len(entries), size + len(rows)), dtype=np.int64)
+            grown[:size] = entries[:size]
+            self._lists[label] = entries = grown
+        entries[size:size + len(rows)] = rows
+        self._sizes[label] = size + len(rows)
+
+    def candidates(self, query: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """
+        Rows of the `nprobe` lists closest to a normalized query.
+
+        Returns:
+            Unique row numbers currently assigned to the probed lists
+        """
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        centroid_scores = self.centroids @ query
+        if nprobe < len(centroid_scores):
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(len(centroid_scores))
+
+        parts = [self._lists[label][:self._sizes[label]] for label in probe.tolist()]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate(parts)
+        owners = np.repeat(probe, self._sizes[probe])
+
+        if self._stale:
+            # Drop entries of rows that moved to another list (a row that
+            # moved away and back has two entries in the same list)
+            rows = np.unique(rows[self._assign[rows] == owners])
+        return rows
+
+    def remap(self, keep: np.ndarray):
+        """Renumber rows after compaction (row keep[i] becomes row i)."""
+        if not self.trained:
+            return
+        assign = self._assign[keep] if len(self._assign) else np.full(len(keep), -1, dtype=np.int32)
+        self._rebuild_lists(assign)
+
+    def _rebuild_lists(self, assign: np.ndarray):
+        nlist = len(self.centroids)
+        indexed = np.flatnonzero(assign >= 0)
+        labels = assign[indexed]
+        order = np.argsort(labels, kind="stable")
+        indexed, labels = indexed[order], labels[order]
+
+        self._assign = assign.astype(np.int32)
+        self._lists = [np.empty(_INITIAL_LIST_CAPACITY, dtype=np.int64) for _ in range(nlist)]
+        self._sizes = np.zeros(nlist, dtype=np.int64)
+        self._stale = 0
+        for label, start, end in _runs(labels):
+            self._lists[label] = indexed[start:end].copy()
+            self._sizes[label] = end - start
+
+    def save(self, path: Path, generation: int, rows: int):
+        """Write centroids and row assignments atomically."""
+        if not self.trained:
+            Path(path).unlink(missing_ok=True)
+            return
+        assign = np.full(rows, -1, dtype=np.int32)
+        known = min(rows, len(self._assign))
+        assign[:known] = self._assign[:known]
+
+        tmp_path = Path(path).with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                assign=assign,
+                generation=np.int64(generation),
+                trained_rows=np.int64(self.trained_rows)
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def load(self, path: Path, generation: int) -> bool:
+        """
+        Load a saved index written for the given data generation.
+
+        Returns:
+            True if loaded; False if missing or stale (caller retrains)
+        """
+        if not Path(path).exists():
+            return False
+        with np.load(path) as saved:
+            if int(saved["generation"]) != generation or saved["centroids"].shape[1] != self.dimension:
+                return False
+            self.centroids = saved["centroids"]
+            self.trained_rows = int(saved["trained_rows"])
+            assign = saved["assign"]
+        self._rebuild_lists(assign)
+        return True
+
+    def unindexed_rows(self, rows: int) -> np.ndarray:
+        """Row numbers below `rows` that are not assigned to any list."""
+        assign = np.full(rows, -1, dtype=np.int32)
+        known = min(rows, len(self._assign))
+        assign[:known] = self._assign[:known]
+        return np.flatnonzero(assign < 0)
+
+
+def _runs(sorted_labels: np.ndarray):
+    """Yield (label, start, end) for each run of equal values."""
+    if len(sorted_labels) == 0:
+        return
+    boundaries = np.flatnonzero(np.diff(sorted_labels)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(sorted_labels)]))
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        yield int(sorted_labels[start]), start, end
@@ -0,0 +1,623 @@
+"""
+In-process vector backend on NumPy and memory-mapped files.
+
+Embeddings are L2-normalized float32 rows of a memory-mapped .npy matrix,
+so a query is one matrix-vector product followed by argpartition for the
+top-k. Chunk texts live in an append-only UTF-8 blob. IDs, text spans and
+metadata live in a compact columnar index (repetitive metadata columns
+such as filename are dictionary-encoded).
+
+On-disk layout (one directory per collection):
+    embeddings.<gen>.npy  float32 matrix (capacity x dimension), memory-mapped
+    texts.<gen>.bin       UTF-8 chunk texts, append-only
+    index.npz             row count, IDs, text spans and metadata columns
+    ivf.npz               optional IVF centroids and row assignments
+    codes.<gen>.npy       optional quantized codes (int8 or PQ), memory-mapped
+    quantizer.npz         quantizer state (PQ codebooks)
+With a quantizer, searches scan only the codes and re-rank the best
+top_k * rerank_factor candidates with exact float32 scores, so the float
+matrix stays on disk except for the few rows being re-ranked.
+Writes go straight to the matrix and blob; index.npz is replaced atomically
+on flush(). Compaction writes a new generation of data files before
+switching index.npz over, so a crash never leaves the index pointing at
+rows that do not match.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import numpy as np
+from ...utils.logger import logger
+from .base import VectorBackend
+from .ivf_index import IVFIndex
+from .quantization import load_quantizer, save_quantizer
+
+# Initial matrix capacity (rows); doubled whenever it fills up
+_INITIAL_CAPACITY = 1024
+
+# Training sample for quantizer codebooks
+_QUANTIZER_TRAIN_SAMPLE = 65536
+
+# Rows encoded per block when (re)building quantized codes
+_ENCODE_BLOCK = 65536
+
+# Compact on flush once deleted rows exceed this share of all rows
+_COMPACT_DEAD_RATIO = 0.25
+
+_INDEX_VERSION = 1
+
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize embeddings (rows), leaving zero vectors as they are."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return embeddings / np.where(norms > 0, norms, 1.0)
+
+
+class NumpyBackend(VectorBackend):
+    """Cosine search over a memory-mapped embedding matrix (exact or IVF)."""
+
+    name = "numpy"
+
+    def __init__(
+        self,
+        directory: str,
+        dimension: int,
+        ivf: Optional[IVFIndex] = None,
+        quantizer=None,
+        rerank_factor: int = 4
+    ):
+        """
+        Args:
+            directory: Collection directory
+            dimension: Embedding dimension
+            ivf: Optional IVF index; without one every query scans all rows
+            quantizer: Optional Int8Quantizer or ProductQuantizer for the
+                       scanned codes; without one scans use float32
+            rerank_factor: With a quantizer, re-rank top_k * rerank_factor
+                           candidates exactly (0 = return quantized scores)
+        """
+        self.dir = Path(directory)
+        self.dimension = dimension
+        self.index_path = self.dir / "index.npz"
+        self.ivf = ivf
+        self.ivf_path = self.dir / "ivf.npz"
+        self.quantizer = quantizer
+        self.quantizer_path = self.dir / "quantizer.npz"
+        self.rerank_factor = rerank_factor
+
+        self._lock = threading.RLock()
+        self._text_lock = threading.Lock()
+        self._initialized = False
+        self._dirty = False
+        self._generation = 0
+        self._layout = 0  # Bumped whenever row numbers change (compaction, reset)
+
+        self._matrix: Optional[np.ndarray] = None
+        self._codes: Optional[np.ndarray] = None
+        self._capacity = 0
+        self._live = np.zeros(0, dtype=bool)
+        self._text_spans = np.zeros((0, 2), dtype=np.int64)  # (offset, length) in bytes
+        self._texts_size = 0
+        self._text_reader = None
+        self._text_writer = None
+
+        self._ids: List[Optional[str]] = []  # None marks a deleted row
+        self._rows_by_id: Dict[str, int] = {}
+        self._columns: Dict[str, List[Any]] = {}
+        self._deleted = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def initialize(self):
+        with self._lock:
+            if self._initialized:
+                return
+            self.dir.mkdir(parents=True, exist_ok=True)
+
+            if self.index_path.exists():
+                self._load_index()
+                self._load_ivf()
+                self._load_quantizer()
+            else:
+                self._open_data_files(create=True)
+
+            self._initialized = True
+            if self.ivf is not None and self.ivf.needs_training(self.count()):
+                self._train_ivf()
+                self.ivf.save(self.ivf_path, self._generation, len(self._ids))
+            if self.quantizer is not None and self.quantizer.needs_training(self.count()):
+                self._train_quantizer()
+                save_quantizer(self.quantizer, self.quantizer_path, self._generation, len(self._ids))
+            logger.info(f"NumPy vector store loaded: {self.count()} chunks ({self.dir})")
+
+    def _matrix_path(self, generation: int) -> Path:
+        return self.dir / f"embeddings.{generation}.npy"
+
+    def _texts_path(self, generation: int) -> Path:
+        return self.dir / f"texts.{generation}.bin"
+
+    def _codes_path(self, generation: int) -> Path:
+        return self.dir / f"codes.{generation}.npy"
+
+    def _open_data_files(self, create: bool):
+        matrix_path = self._matrix_path(self._generation)
+        texts_path = self._texts_path(self._generation)
+
+        if create or not matrix_path.exists():
+            self._matrix = np.lib.format.open_memmap(
+                matrix_path, mode="w+", dtype=np.float32, shape=(_INITIAL_CAPACITY, self.dimension)
+            )
+        else:
+            self._matrix = np.load(matrix_path, mmap_mode="r+")
+        self._capacity = self._matrix.shape[0]
+
+        if self.quantizer is not None:
+            self._open_codes(create)
+
+        if create:
+            texts_path.write_bytes(b"")
+        self._text_writer = open(texts_path, "ab")
+        self._text_reader = open(texts_path, "rb")
+        self._texts_size = texts_path.stat().st_size
+
+        self._live = _pad_rows(self._live, self._capacity)
+        self._text_spans = _pad_rows(self._text_spans, self._capacity)
+
+    def _open_codes(self, create: bool):
+        codes_path = self._codes_path(self._generation)
+        shape = (self._capacity, self.quantizer.code_size)
+        codes = None
+        if not create and codes_path.exists():
+            codes = np.load(codes_path, mmap_mode="r+")
+            if codes.shape[1:] != shape[1:]:
+                codes = None  # quantizer settings changed; codes are rebuilt
+            elif codes.shape[0] < shape[0]:
+                codes = _grow_memmap(codes_path, codes, shape[0])
+        if codes is None:
+            codes = np.lib.format.open_memmap(codes_path, mode="w+", dtype=np.uint8, shape=shape)
+            # Saved quantizer state does not describe these (empty) codes
+            self.quantizer_path.unlink(missing_ok=True)
+        self._codes = codes
+
+    def _load_index(self):
+        with np.load(self.index_path) as index:
+            meta = json.loads(index["meta"].tobytes().decode("utf-8"))
+            spans = index["text_spans"]
+
+        if meta.get("version") != _INDEX_VERSION or meta["dimension"] != self.dimension:
+            raise ValueError(
+                f"Vector index at {self.dir} has dimension {meta.get('dimension')}, expected {self.dimension}"
+            )
+
+        self._generation = meta["generation"]
+        self._ids = meta["ids"]
+        self._columns = {name: _decode_column(column) for name, column in meta["columns"].items()}
+        self._rows_by_id = {chunk_id: row for row, chunk_id in enumerate(self._ids) if chunk_id is not None}
+        self._deleted = len(self._ids) - len(self._rows_by_id)
+
+        self._live = np.array([chunk_id is not None for chunk_id in self._ids], dtype=bool)
+        self._text_spans = spans
+        self._open_data_files(create=False)
+
+        if self._matrix.shape[0] < len(self._ids) or self._matrix.shape[1] != self.dimension:
+            raise ValueError(f"Vector index at {self.dir} does not match its embedding matrix")
+
+    def _load_ivf(self):
+        """Load the saved IVF index and index rows written after it was saved."""
+        if self.ivf is None or not self.ivf.load(self.ivf_path, self._generation):
+            return
+        missing = self.ivf.unindexed_rows(len(self._ids))
+        missing = missing[self._live[missing]]
+        if len(missing):
+            self.ivf.add(missing, self._matrix[missing])
+
+    def _train_ivf(self):
+        live_rows = np.flatnonzero(self._live[:len(self._ids)])
+        self.ivf.train(self._matrix, live_rows)
+
+    def _load_quantizer(self):
+        """Restore quantizer state and encode rows whose codes are missing."""
+        if self.quantizer is None:
+            return
+        encoded = load_quantizer(self.quantizer, self.quantizer_path, self._generation)
+        if encoded == 0:
+            self.quantizer.clear()
+        if self.quantizer.trained:
+            self._encode_rows(encoded, len(self._ids))
+
+    def _train_quantizer(self):
+        live_rows = np.flatnonzero(self._live[:len(self._ids)])
+        sample = np.random.default_rng(0).choice(live_rows, min(len(live_rows), _QUANTIZER_TRAIN_SAMPLE), replace=False)
+        self.quantizer.train(self._matrix[np.sort(sample)])
+        self._encode_rows(0, len(self._ids))
+
+    def _encode_rows(self, start: int, end: int):
+        for block in range(start, end, _ENCODE_BLOCK):
+            block_end = min(block + _ENCODE_BLOCK, end)
+            self._codes[block:block_end] = self.quantizer.encode(self._matrix[block:block_end])
+
+    def flush(self):
+        """Persist the index (and compact if many rows were deleted)."""
+        with self._lock:
+            if not self._initialized or not self._dirty:
+                return
+            if self._deleted > _COMPACT_DEAD_RATIO * len(self._ids):
+                self._compact()
+            if self.ivf is not None and self.ivf.needs_training(self.count()):
+                self._train_ivf()
+            if self.quantizer is not None and self.quantizer.needs_training(self.count()):
+                self._train_quantizer()
+
+            self._matrix.flush()
+            self._text_writer.flush()
+            os.fsync(self._text_writer.fileno())
+            if self.ivf is not None:
+                self.ivf.save(self.ivf_path, self._generation, len(self._ids))
+            if self.quantizer is not None and self.quantizer.trained:
+                self._codes.flush()
+                save_quantizer(self.quantizer, self.quantizer_path, self._generation, len(self._ids))
+            self._write_index()
+            self._dirty = False
+
+    def _write_index(self):
+        meta = {
+            "version": _INDEX_VERSION,
+            "dimension": self.dimension,
+            "generation": self._generation,
+            "ids": self._ids,
+            "columns": {name: _encode_column(values) for name, values in self._columns.items()},
+        }
+        meta_bytes = np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=meta_bytes, text_spans=self._text_spans[:len(self._ids)])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert(self, ids: List[str], texts: List[str], embeddings: np.ndarray, metadatas: List[Dict]):
+        if not ids:
+            return
+        embeddings = normalize_rows(embeddings)
+
+        with self._lock:
+            rows = []
+            for chunk_id in ids:
+                row = self._rows_by_id.get(chunk_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._ids.append(chunk_id)
+                    self._rows_by_id[chunk_id] = row
+                    for values in self._columns.values():
+                        values.append(None)
+                rows.append(row)
+            self._reserve(len(self._ids))
+
+            rows = np.asarray(rows)
+            self._matrix[rows] = embeddings
+            self._live[rows] = True
+            if self.ivf is not None:
+                self.ivf.add(rows, embeddings)
+            if self.quantizer is not None and self.quantizer.trained:
+                self._codes[rows] = self.quantizer.encode(embeddings)
+
+            encoded = [text.encode("utf-8") for text in texts]
+            self._text_writer.write(b"".join(encoded))
+            self._text_writer.flush()  # make the texts visible to the reader handle
+            lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+            self._text_spans[rows, 0] = self._texts_size + np.cumsum(lengths) - lengths
+            self._text_spans[rows, 1] = lengths
+            self._texts_size += int(lengths.sum())
+
+            for row, metadata in zip(rows.tolist(), metadatas):
+                self._set_metadata(row, metadata or {})
+            self._dirty = True
+
+    def _set_metadata(self, row: int, metadata: Dict):
+        for name, values in self._columns.items():
+            values[row] = metadata.get(name)
+        for name, value in metadata.items():
+            if name not in self._columns:
+                column = [None] * len(self._ids)
+                column[row] = value
+                self._columns[name] = column
+
+    def delete_ids(self, ids: List[str]):
+        with self._lock:
+            for chunk_id in ids:
+                row = self._rows_by_id.pop(chunk_id, None)
+                if row is None:
+                    continue
+                self._ids[row] = None
+                self._live[row] = False
+                for values in self._columns.values():
+                    values[row] = None
+                self._deleted += 1
+                self._dirty = True
+
+    def delete_where(self, field: str, value: Any):
+        with self._lock:
+            column = self._columns.get(field)
+            if column is None:
+                return
+            self.delete_ids([self._ids[row] for row, v in enumerate(column) if v == value and self._ids[row]])
+
+    def reset(self):
+        with self._lock:
+            self._close_files()
+            for pattern in ("embeddings.*.npy", "texts.*.bin", "codes.*.npy"):
+                for path in self.dir.glob(pattern):
+                    path.unlink()
+            for path in (self.index_path, self.ivf_path, self.quantizer_path):
+                path.unlink(missing_ok=True)
+            if self.ivf is not None:
+                self.ivf.clear()
+            if self.quantizer is not None:
+                self.quantizer.clear()
+
+            self._ids, self._rows_by_id, self._columns = [], {}, {}
+            self._deleted = 0
+            self._generation = 0
+            self._layout += 1
+            self._live = np.zeros(0, dtype=bool)
+            self._text_spans = np.zeros((0, 2), dtype=np.int64)
+            self._open_data_files(create=True)
+            self._dirty = True
+            self.flush()
+            logger.info(f"Reset NumPy vector store: {self.dir}")
+
+    def _reserve(self, rows: int):
+        """Grow the matrix (and per-row arrays) to hold at least `rows` rows."""
+        if rows <= self._capacity:
+            return
+        capacity = max(self._capacity, _INITIAL_CAPACITY)
+        while capacity < rows:
+            capacity *= 2
+
+        self._matrix = _grow_memmap(self._matrix_path(self._generation), self._matrix, capacity)
+        if self._codes is not None:
+            self._codes = _grow_memmap(self._codes_path(self._generation), self._codes, capacity)
+        self._capacity = capacity
+        self._live = _pad_rows(self._live, capacity)
+        self._text_spans = _pad_rows(self._text_spans, capacity)
+
+    def _compact(self):
+        """Rewrite data files without deleted rows, as a new generation."""
+        keep = np.flatnonzero(self._live[:len(self._ids)])
+        old_generation = self._generation
+        new_generation = old_generation + 1
+        capacity = max(_INITIAL_CAPACITY, 1 << int(len(keep)).bit_length())
+
+        matrix = np.lib.format.open_memmap(
+            self._matrix_path(new_generation), mode="w+", dtype=np.float32, shape=(capacity, self.dimension)
+        )
+        matrix[:len(keep)] = self._matrix[keep]
+        matrix.flush()
+        if self._codes is not None:
+            codes = np.lib.format.open_memmap(
+                self._codes_path(new_generation), mode="w+", dtype=np.uint8, shape=(capacity, self._codes.shape[1])
+            )
+            codes[:len(keep)] = self._codes[keep]
+            codes.flush()
+
+        spans = np.zeros((capacity, 2), dtype=np.int64)
+        offset = 0
+        with open(self._texts_path(new_generation), "wb") as f:
+            for new_row, row in enumerate(keep.tolist()):
+                data = self._read_text_bytes(row)
+                f.write(data)
+                spans[new_row] = (offset, len(data))
+                offset += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        keep_list = keep.tolist()
+        self._ids = [self._ids[row] for row in keep_list]
+        self._columns = {
+            name: [values[row] for row in keep_list]
+            for name, values in self._columns.items()
+        }
+        self._columns = {name: values for name, values in self._columns.items() if any(v is not None for v in values)}
+        self._rows_by_id = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._deleted = 0
+        self._text_spans = spans
+        self._live = np.zeros(capacity, dtype=bool)
+        self._live[:len(keep)] = True
+
+        if self.ivf is not None:
+            self.ivf.remap(keep)
+
+        self._close_files()
+        self._generation = new_generation
+        self._layout += 1
+        self._open_data_files(create=False)
+        if self.ivf is not None:
+            self.ivf.save(self.ivf_path, self._generation, len(self._ids))
+        if self.quantizer is not None and self.quantizer.trained:
+            save_quantizer(self.quantizer, self.quantizer_path, self._generation, len(self._ids))
+        self._write_index()
+
+        self._matrix_path(old_generation).unlink(missing_ok=True)
+        self._texts_path(old_generation).unlink(missing_ok=True)
+        self._codes_path(old_generation).unlink(missing_ok=True)
+        logger.info(f"Compacted NumPy vector store: {len(keep)} chunks")
+
+    def _close_files(self):
+        for handle in (self._text_writer, self._text_reader):
+            if handle is not None:
+                handle.close()
+        self._text_writer = self._text_reader = None
+        self._matrix = self._codes = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def query(self, embedding: np.ndarray, top_k: int) -> List[Dict]:
+        """
+        Top-k search.
+
+        The scan runs outside the lock on the arrays pinned at the start
+        (replaced memmaps stay readable), so concurrent queries overlap.
+        Results are assembled under the lock; if a compaction or reset
+        renumbered the rows meanwhile, the query is re-run under the lock.
+        """
+        query = normalize_rows(embedding).reshape(-1)
+        with self._lock:
+            snapshot = self._snapshot(query)
+        hits = self._scan(query, top_k, snapshot)
+
+        with self._lock:
+            if self._layout != snapshot["layout"]:
+                hits = self._scan(query, top_k, self._snapshot(query))
+            # Rows deleted since the scan are dropped
+            return [self._row_result(row, similarity) for row, similarity in hits if self._ids[row] is not None]
+
+    def _snapshot(self, query: np.ndarray) -> Dict:
+        """The arrays a scan reads, pinned. Caller holds the lock."""
+        rows = len(self._ids)
+        live_count = rows - self._deleted
+        candidates = None
+        if self.ivf is not None and self.ivf.trained and live_count >= self.ivf.min_rows:
+            candidates = self.ivf.candidates(query)
+        return {
+            "layout": self._layout,
+            "rows": rows,
+            "live_count": live_count,
+            "matrix": self._matrix,
+            "live": self._live,
+            "codes": self._codes if self.quantizer is not None and self.quantizer.trained else None,
+            "candidates": candidates,
+        }
+
+    def _scan(self, query: np.ndarray, top_k: int, snapshot: Dict) -> List[tuple]:
+        """Score a snapshot; returns (row, similarity) pairs, best first."""
+        rows, live_count = snapshot["rows"], snapshot["live_count"]
+        matrix, live, codes, candidates = snapshot["matrix"], snapshot["live"], snapshot["codes"], snapshot["candidates"]
+        if live_count == 0 or top_k <= 0:
+            return []
+        k = min(top_k, live_count)
+
+        if candidates is None:
+            candidates = np.arange(rows)
+            selected = slice(0, rows)
+        else:
+            selected = candidates
+
+        if codes is None:
+            # Float32 scan: one matrix-vector product over the candidate rows
+            scores = matrix[selected] @ query
+        else:
+            # Asymmetric scan of the quantized codes
+            scores = self.quantizer.scores(query, codes[selected])
+        scores[~live[selected]] = -np.inf
+
+        if codes is not None and self.rerank_factor > 0:
+            # Re-rank the best quantized candidates with exact float32 scores
+            shortlist = candidates[_top_positions(scores, k * self.rerank_factor)]
+            candidates, scores = shortlist, matrix[shortlist] @ query
+
+        return [(int(candidates[i]), float(scores[i])) for i in _top_positions(scores, k).tolist()]
+
+    def _row_result(self, row: int, similarity: float) -> Dict:
+        document = self._row_document(row)
+        document["score"] = 1.0 - similarity
+        return document
+
+    def _row_document(self, row: int) -> Dict:
+        with self._lock:
+            metadata = {name: values[row] for name, values in self._columns.items() if values[row] is not None}
+            chunk_id = self._ids[row]
+        return {
+            "id": chunk_id,
+            "text": self._read_text_bytes(row).decode("utf-8"),
+            "metadata": metadata
+        }
+
+    def get(self, ids: List[str]) -> List[Dict]:
+        with self._lock:
+            rows = [self._rows_by_id[chunk_id] for chunk_id in ids if chunk_id in self._rows_by_id]
+            return [self._row_document(row) for row in rows]
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        embeddings = np.zeros((len(ids), self.dimension), dtype=np.float32)
+        with self._lock:
+            for i, chunk_id in enumerate(ids):
+                row = self._rows_by_id.get(chunk_id)
+                if row is not None:
+                    embeddings[i] = self._matrix[row]
+        return embeddings
+
+    def iter_documents(self, batch_size: int = 1000) -> Iterator[List[Dict]]:
+        with self._lock:
+            rows = [row for row, chunk_id in enumerate(self._ids) if chunk_id is not None]
+        for start in range(0, len(rows), batch_size):
+            with self._lock:
+                batch = [row for row in rows[start:start + batch_size] if self._ids[row] is not None]
+                yield [self._row_document(row) for row in batch]
+
+    def _read_text_bytes(self, row: int) -> bytes:
+        offset, length = self._text_spans[row]
+        with self._text_lock:
+            self._text_reader.seek(int(offset))
+            return self._text_reader.read(int(length))
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._ids) - self._deleted
+
+
+def _top_positions(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest finite scores, best first."""
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return top[np.isfinite(scores[top])]
+
+
+def _grow_memmap(path: Path, array: np.ndarray, rows: int) -> np.ndarray:
+    """Copy a memory-mapped .npy into a larger one at the same path."""
+    tmp_path = path.with_suffix(".tmp")
+    grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=array.dtype, shape=(rows,) + array.shape[1:])
+    grown[:len(array)] = array
+    grown.flush()
+    os.replace(tmp_path, path)
+    return grown
+
+
+def _pad_rows(array: np.ndarray, rows: int) -> np.ndarray:
+    """Zero-pad (or truncate) an array to `rows` rows."""
+    padded = np.zeros((rows,) + array.shape[1:], dtype=array.dtype)
+    padded[:min(rows, len(array))] = array[:rows]
+    return padded
+
+
+def _encode_column(values: List[Any]) -> Dict:
+    """Dictionary-encode a metadata column when it has few distinct values."""
+    distinct = {}
+    codes = []
+    for value in values:
+        key = json.dumps(value, sort_keys=True)
+        code = distinct.setdefault(key, len(distinct))
+        codes.append(code)
+        if len(distinct) > max(16, len(values) // 2):
+            return {"values": values}
+    return {"dictionary": [json.loads(key) for key in distinct], "codes": codes}
+
+
+def _decode_column(column: Dict) -> List[Any]:
+    if "values" in column:
+        return column["values"]
+    dictionary = column["dictionary"]
+    return [dictionary[code] for code in column["codes"]]
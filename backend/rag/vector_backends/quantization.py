@@ -0,0 +1,228 @@
+"""
+Embedding quantizers for the NumPy backend.
+
+A quantizer turns each normalized float32 embedding into a fixed-size
+uint8 code. Queries stay in float32 and are scored against the codes
+directly (asymmetric distance computation), so a search only scans the
+small code matrix; the float32 matrix is touched only to re-rank the
+best candidates exactly.
+
+    int8  one signed byte per dimension plus a float32 scale per vector
+          (384 dims: 388 bytes instead of 1536, about 4x smaller)
+    pq    product quantization: the vector is split into `subvectors`
+          pieces, each replaced by the index of its nearest of 256
+          k-means centroids (48 subvectors: 48 bytes, 32x smaller)
+"""
+import os
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from ...utils.logger import logger
+
+# Rows scored per block: small enough for the block's float32 copy (int8)
+# or gathered table entries (PQ) to stay in CPU cache
+_INT8_SCORE_BLOCK = 512
+_PQ_SCORE_BLOCK = 1024
+
+_PQ_CENTROIDS = 256
+
+# Training points per PQ centroid (more adds training time, not accuracy)
+_PQ_TRAIN_POINTS_PER_CENTROID = 64
+
+
+def kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """
+    Euclidean k-means (Lloyd) on a small matrix.
+
+    Returns:
+        float32 array (k, dimension) of centroids
+    """
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    centroids = vectors[rng.choice(len(vectors), k, replace=len(vectors) < k)].copy()
+
+    for _ in range(iterations):
+        # argmin ||x - c||^2 == argmax (x.c - ||c||^2 / 2)
+        labels = np.argmax(vectors @ centroids.T - 0.5 * np.einsum("ij,ij->i", centroids, centroids), axis=1)
+        counts = np.bincount(labels, minlength=k)
+        present = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[present]
+        sums = np.add.reduceat(vectors[np.argsort(labels, kind="stable")], starts, axis=0)
+        centroids[present] = sums / counts[present, None]
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = vectors[rng.choice(len(vectors), len(empty))]
+    return centroids
+
+
+class Int8Quantizer:
+    """Scalar int8 codes with a per-vector scale."""
+
+    kind = "int8"
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.code_size = dimension + 4  # int8 values + float32 scale
+
+    @property
+    def trained(self) -> bool:
+        return True
+
+    def clear(self):
+        pass
+
+    def needs_training(self, live_rows: int) -> bool:
+        return False
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+
+        codes = np.empty((len(vectors), self.code_size), dtype=np.uint8)
+        codes[:, :self.dimension] = np.rint(vectors / scales[:, None]).astype(np.int8).view(np.uint8)
+        codes[:, self.dimension:] = scales.astype(np.float32).view(np.uint8).reshape(-1, 4)
+        return codes
+
+    def scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate inner products of a float32 query with int8 codes."""
+        out = np.empty(len(codes), dtype=np.float32)
+        buffer = np.empty((_INT8_SCORE_BLOCK, self.dimension), dtype=np.float32)
+        for start in range(0, len(codes), _INT8_SCORE_BLOCK):
+            block = np.asarray(codes[start:start + _INT8_SCORE_BLOCK])
+            values = buffer[:len(block)]
+            # int8 @ float32 has no BLAS path; convert into a cached float32 block
+            np.copyto(values, block[:, :self.dimension].view(np.int8), casting="unsafe")
+            scales = np.ascontiguousarray(block[:, self.dimension:]).view(np.float32).ravel()
+            out[start:start + len(block)] = (values @ query) * scales
+        return out
+
+    def state(self) -> dict:
+        return {}
+
+    def load_state(self, state: dict) -> bool:
+        return True
+
+
+class ProductQuantizer:
+    """Product quantization with 256 centroids per subvector (one byte each)."""
+
+    kind = "pq"
+
+    def __init__(self, dimension: int, subvectors: int = 48, min_rows: int = 10000):
+        """
+        Args:
+            dimension: Embedding dimension
+            subvectors: Bytes per code; must divide the dimension
+            min_rows: Train the codebooks once the store has this many
+                      rows (until then the backend scans float32)
+        """
+        if dimension % subvectors:
+            raise ValueError(f"PQ subvectors ({subvectors}) must divide the embedding dimension ({dimension})")
+        self.dimension = dimension
+        self.subvectors = subvectors
+        self.sub_dimension = dimension // subvectors
+        self.code_size = subvectors
+        self.min_rows = max(min_rows, _PQ_CENTROIDS)
+        self.codebooks: Optional[np.ndarray] = None  # (subvectors, 256, sub_dimension)
+
+    @property
+    def trained(self) -> bool:
+        return self.codebooks is not None
+
+    def clear(self):
+        self.codebooks = None
+
+    def needs_training(self, live_rows: int) -> bool:
+        return not self.trained and live_rows >= self.min_rows
+
+    def train(self, vectors: np.ndarray):
+        """Learn one 256-centroid codebook per subvector from a sample."""
+        rng = np.random.default_rng(0)
+        sample_size = min(len(vectors), _PQ_CENTROIDS * _PQ_TRAIN_POINTS_PER_CENTROID)
+        vectors = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))], dtype=np.float32)
+        logger.info(f"Training PQ codebooks: {len(vectors)} vectors, {self.subvectors} subvectors")
+        self.codebooks = np.stack([
+            kmeans(self._split(vectors)[:, j], _PQ_CENTROIDS, seed=j)
+            for j in range(self.subvectors)
+        ])
+        logger.info("✅ PQ codebooks trained")
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        return vectors.reshape(len(vectors), self.subvectors, self.sub_dimension)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        parts = self._split(np.asarray(vectors, dtype=np.float32))
+        half_norms = 0.5 * np.einsum("jkd,jkd->jk", self.codebooks, self.codebooks)
+        codes = np.empty((len(vectors), self.subvectors), dtype=np.uint8)
+        for j in range(self.subvectors):
+            codes[:, j] = np.argmax(parts[:, j] @ self.codebooks[j].T - half_norms[j], axis=1)
+        return codes
+
+    def scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate inner products via per-query lookup tables (ADC)."""
+        # table[j, c] = <query piece j, centroid c of codebook j>, flattened
+        table = np.einsum("jkd,jd->jk", self.codebooks, query.reshape(self.subvectors, self.sub_dimension)).ravel()
+        offsets = np.arange(self.subvectors, dtype=np.intp) * _PQ_CENTROIDS
+
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), _PQ_SCORE_BLOCK):
+            block = np.asarray(codes[start:start + _PQ_SCORE_BLOCK])
+            out[start:start + len(block)] = table[block + offsets].sum(axis=1)
+        return out
+
+    def state(self) -> dict:
+        return {"codebooks": self.codebooks}
+
+    def load_state(self, state: dict) -> bool:
+        codebooks = state.get("codebooks")
+        if codebooks is None or codebooks.shape != (self.subvectors, _PQ_CENTROIDS, self.sub_dimension):
+            return False
+        self.codebooks = codebooks
+        return True
+
+
+def save_quantizer(quantizer, path: Path, generation: int, encoded_rows: int):
+    """Write a quantizer's state and how many rows of its codes are valid."""
+    tmp_path = Path(path).with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            kind=np.array(quantizer.kind),
+            code_size=np.int64(quantizer.code_size),
+            generation=np.int64(generation),
+            encoded_rows=np.int64(encoded_rows),
+            **{name: value for name, value in quantizer.state().items() if value is not None}
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_quantizer(quantizer, path: Path, generation: int) -> int:
+    """
+    Restore a quantizer saved for a data generation.
+
+    Returns:
+        Number of rows whose codes are valid (0 if missing or stale)
+    """
+    if not Path(path).exists():
+        return 0
+    with np.load(path) as saved:
+        if (str(saved["kind"]) != quantizer.kind or int(saved["code_size"]) != quantizer.code_size
+                or int(saved["generation"]) != generation):
+            return 0
+        if not quantizer.load_state({name: saved[name] for name in saved.files}):
+            return 0
+        return int(saved["encoded_rows"])
+
+
+def create_quantizer(kind: str, dimension: int, pq_subvectors: int = 48, min_rows: int = 10000):
+    """Create a quantizer for a `vector_store.quantization.type` value (None for "none")."""
+    if kind in (None, "", "none"):
+        return None
+    if kind == "int8":
+        return Int8Quantizer(dimension)
+    if kind == "pq":
+        return ProductQuantizer(dimension, pq_subvectors, min_rows)
+    raise ValueError(f"Unknown quantization type '{kind}', expected none, int8 or pq")
@@ -1,84 +1,254 @@
 """
-ChromaDB vector store for document embeddings.
+Vector store for document embeddings.
+
+Storage and similarity search are delegated to a pluggable backend chosen
+by `vector_store.type` (see vector_backends/). In hybrid retrieval mode
+(`rag.retrieval_mode`) every write is mirrored into a BM25 sparse index
+and searches fuse both rankings with reciprocal rank fusion.
+
+With a shared state backend, a flush that wrote anything bumps a shared
+index generation; a worker that sees the generation change (checked at
+most once a second) reopens the backend and the sparse index, so
+documents ingested by another worker become searchable everywhere.
 """
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict
-from pathlib import Path
+from typing import List, Dict, Optional
+import hashlib
+import threading
+import time
+import numpy as np
 from ..config import config
 from ..utils.logger import logger
-from .embeddings import embedding_model
+from ..utils.concurrency import run_blocking
+from ..utils.exceptions import RAGError
+from ..utils.shared_state import shared_state
+from .answer_cache import answer_cache
+from .embeddings import embedding_model, embedding_service
+from .fusion import reciprocal_rank_fusion
+from .postprocessing import postprocess_results
+from .sparse_index import SparseIndex
+from .vector_backends import create_backend
+
+RETRIEVAL_MODES = ("dense", "hybrid")
+
+# Shared counter bumped whenever any worker commits index writes
+_GENERATION_KEY = "rag:index:generation"
+# Searches check the shared generation at most this often
+_GENERATION_CHECK_SECONDS = 1.0
 
 
 class VectorStore:
-    """ChromaDB vector store wrapper."""
+    """Vector store facade over a pluggable backend."""
 
-    def __init__(self):
+    def __init__(self, state=None):
+        """
+        Args:
+            state: Shared state backend announcing other workers' writes (None = single process)
+        """
         self.db_path = config.vector_store_path
         self.collection_name = config.vector_store_collection
-        self.client = None
-        self.collection = None
+        self.backend = None
+        self.sparse_index: Optional[SparseIndex] = None
+        self.state = state
+        self._generation: Optional[str] = None
+        self._generation_checked_at = 0.0  # monotonic
+        self._dirty = False  # Writes since the last flush
+        self._reload_lock = threading.Lock()
 
         logger.info(f"Initializing vector store at: {self.db_path}")
 
     def initialize(self):
-        """Initialize ChromaDB client and collection."""
-        if self.client is not None:
+        """Create and open the configured backend (and sparse index in hybrid mode)."""
+        if self.backend is not None:
             return
 
-        # Create directory if it doesn't exist
-        Path(self.db_path).mkdir(parents=True, exist_ok=True)
+        mode = config.rag_retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise RAGError(f"Unknown retrieval mode '{mode}', expected one of {', '.join(RETRIEVAL_MODES)}")
 
-        # Initialize client
-        self.client = chromadb.PersistentClient(path=self.db_path)
+        if self.state is not None:
+            self._generation = self.state.get(_GENERATION_KEY)
+        backend = create_backend(config.vector_store_type)
+        backend.initialize()
+        if mode == "hybrid":
+            self.sparse_index = self._open_sparse_index(backend)
+        self.backend = backend
+        logger.info(f"Vector store backend: {backend.name}, retrieval mode: {mode}")
 
-        # Get or create collection
-        try:
-            self.collection = self.client.get_collection(name=self.collection_name)
-            logger.info(f"Loaded existing collection: {self.collection_name}")
-        except:
-            self.collection = self.client.create_collection(
-                name=self.collection_name,
-                metadata={"description": "Banking documents"}
-            )
-            logger.info(f"Created new collection: {self.collection_name}")
+    def refresh(self, force: bool = False):
+        """
+        Reopen the backend and sparse index if another worker committed writes.
+
+        A no-op without shared state or when the index generation is unchanged.
+        The shared generation is read at most every _GENERATION_CHECK_SECONDS
+        unless forced.
 
-    def add_documents(self, documents: List[Dict]):
+        Args:
+            force: Check the generation now (e.g. before writing to the index)
         """
-        Add documents to vector store.
+        if self.backend is None:
+            self.initialize()
+            return
+        if self.state is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._generation_checked_at < _GENERATION_CHECK_SECONDS:
+            return
+        self._generation_checked_at = now
+        generation = self.state.get(_GENERATION_KEY)
+        if generation == self._generation:
+            return
+
+        with self._reload_lock:
+            if generation == self._generation:
+                return
+            # Chroma only sees other processes' writes from a new client; the
+            # old backend keeps serving searches already running and is
+            # collected once they finish
+            self.backend.close()
+            backend = create_backend(config.vector_store_type)
+            backend.initialize()
+            if self.sparse_index is not None:
+                self.sparse_index = self._open_sparse_index(backend, persist=False)
+            self.backend = backend
+            self._generation = generation
+        logger.info(f"Vector store reloaded (index generation {generation}): {backend.count()} chunks")
+
+    def _open_sparse_index(self, backend, persist: bool = True) -> SparseIndex:
+        """
+        Load the BM25 index, rebuilding it from the backend if it is out of sync.
+
+        Args:
+            backend: Initialized vector backend
+            persist: Write a rebuilt index to disk (False when reloading
+                     another worker's writes: only the writer persists)
+        """
+        sparse_index = SparseIndex(config.rag_sparse_index_path, k1=config.rag_bm25_k1, b=config.rag_bm25_b)
+        sparse_index.load()
+
+        # A missing index, or one from before a crash between the two flushes
+        if sparse_index.count() != backend.count():
+            logger.info(f"Rebuilding sparse index from {backend.count()} stored chunks")
+            sparse_index.clear()
+            for batch in backend.iter_documents():
+                sparse_index.add(
+                    [doc["id"] for doc in batch],
+                    [doc["text"] for doc in batch],
+                    [doc["metadata"] for doc in batch]
+                )
+            if persist:
+                sparse_index.flush()
+            logger.info(f"✅ Sparse index rebuilt: {sparse_index.count()} chunks")
+        return sparse_index
+
+    def add_documents(self, documents: List[Dict], ids: Optional[List[str]] = None):
+        """
+        Add (or replace) documents in the vector store.
 
         Args:
             documents: List of dicts with 'text' and 'metadata'
+            ids: Optional chunk IDs. Defaults to a hash of each chunk's text
+                 plus its chunk index, so re-adding the same chunks is idempotent.
         """
-        if self.collection is None:
+        if self.backend is None:
             self.initialize()
 
+        if not documents:
+            return
+
         # Extract texts
         texts = [doc["text"] for doc in documents]
 
         # Generate embeddings
         embeddings = embedding_model.encode(texts)
 
-        # Generate IDs
-        ids = [f"doc_{i}_{hash(doc['text'])}" for i, doc in enumerate(documents)]
+        # Generate deterministic IDs (built-in hash() is salted per process)
+        if ids is None:
+            ids = [
+                f"{hashlib.sha256(doc['text'].encode('utf-8')).hexdigest()[:24]}_"
+                f"{doc.get('metadata', {}).get('chunk_index', i)}"
+                for i, doc in enumerate(documents)
+            ]
 
         # Extract metadata
         metadatas = [doc.get("metadata", {}) for doc in documents]
 
-        # Add to collection
-        self.collection.add(
-            documents=texts,
-            embeddings=embeddings.tolist(),
-            metadatas=metadatas,
-            ids=ids
-        )
+        self.add_embeddings(ids, texts, embeddings, metadatas)
+
+    def add_embeddings(
+        self,
+        ids: List[str],
+        texts: List[str],
+        embeddings: np.ndarray,
+        metadatas: List[Dict]
+    ):
+        """
+        Bulk-write chunks whose embeddings are already computed.
 
-        logger.info(f"Added {len(documents)} documents to vector store")
+        Args:
+            ids: Chunk IDs
+            texts: Chunk texts
+            embeddings: Embedding matrix, one row per chunk
+            metadatas: Chunk metadata dicts
+        """
+        if self.backend is None:
+            self.initialize()
+
+        # Upsert so re-ingesting a chunk replaces it instead of duplicating it
+        self.backend.upsert(ids, texts, embeddings, metadatas)
+        self._dirty = True
+        if self.sparse_index is not None:
+            self.sparse_index.add(ids, texts, metadatas)
+        if answer_cache is not None:
+            # A re-ingested file may have changed; answers built on it are stale
+            answer_cache.invalidate_files({m["file_path"] for m in metadatas if m.get("file_path")})
+
+        logger.info(f"Added {len(ids)} documents to vector store")
+
+    def delete_ids(self, ids: List[str]):
+        """
+        Delete chunks by ID.
+
+        Args:
+            ids: Chunk IDs to delete
+        """
+        if not ids:
+            return
+        if self.backend is None:
+            self.initialize()
+
+        self.backend.delete_ids(ids)
+        self._dirty = True
+        if self.sparse_index is not None:
+            self.sparse_index.remove(ids)
+        if answer_cache is not None:
+            answer_cache.invalidate_chunks(ids)
+        logger.info(f"Deleted {len(ids)} chunks from vector store")
+
+    def delete_by_file(self, file_path: str):
+        """
+        Delete every chunk whose metadata points at a file.
+
+        Args:
+            file_path: The 'file_path' metadata value of the chunks
+        """
+        if self.backend is None:
+            self.initialize()
+
+        self.backend.delete_where("file_path", file_path)
+        self._dirty = True
+        if self.sparse_index is not None:
+            self.sparse_index.remove_file(file_path)
+        if answer_cache is not None:
+            answer_cache.invalidate_files([file_path])
 
     def search(self, query: str, top_k: int = None) -> List[Dict]:
         """
         Search for similar documents.
 
+        Candidates below `rag.similarity_threshold` are dropped and, with
+        `rag.mmr.enabled`, the rest diversified with MMR (see
+        postprocessing.py), so fewer than top_k documents may be returned.
+
         Args:
             query: Search query
             top_k: Number of results
@@ -86,51 +256,178 @@ class VectorStore:
         Returns:
             List of dicts with 'text', 'metadata', and 'score'
         """
-        if self.collection is None:
-            self.initialize()
+        # Encode query (micro-batched with concurrent queries)
+        query_embedding = embedding_service.encode_query(query)
+
+        return self._search_encoded(query, query_embedding, top_k)
+
+    def _search_encoded(self, query: str, query_embedding: np.ndarray, top_k: int = None) -> List[Dict]:
+        """Dense or hybrid search (depending on the retrieval mode), then post-processing."""
+        self.refresh()
 
         top_k = top_k or config.rag_top_k
+        fetch_k = top_k * max(config.rag_mmr_fetch_factor, 1) if config.rag_mmr_enabled else top_k
 
-        # Encode query
-        query_embedding = embedding_model.encode_single(query)
+        if self.sparse_index is not None:
+            candidates = self.hybrid_search(query, query_embedding, fetch_k)
+        else:
+            candidates = self.search_by_embedding(query_embedding, top_k=fetch_k)
+        if not candidates:
+            return candidates
 
-        # Search
-        results = self.collection.query(
-            query_embeddings=[query_embedding.tolist()],
-            n_results=top_k
+        documents = postprocess_results(
+            candidates,
+            query_embedding,
+            self.backend.get_embeddings([doc["id"] for doc in candidates]),
+            top_k,
+            similarity_threshold=config.rag_similarity_threshold,
+            mmr=config.rag_mmr_enabled,
+            lambda_mult=config.rag_mmr_lambda,
+            duplicate_threshold=config.rag_mmr_duplicate_threshold
         )
+        logger.info(f"Post-processing kept {len(documents)} of {len(candidates)} candidates")
+        return documents
 
-        # Format results
-        documents = []
-        if results["documents"] and len(results["documents"]) > 0:
-            for i in range(len(results["documents"][0])):
-                doc = {
-                    "text": results["documents"][0][i],
-                    "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
-                    "score": results["distances"][0][i] if results["distances"] else 0
-                }
-                documents.append(doc)
+    def search_by_embedding(self, query_embedding: np.ndarray, top_k: int = None) -> List[Dict]:
+        """
+        Search for similar documents with a pre-computed query embedding.
+
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of results
+
+        Returns:
+            List of dicts with 'id', 'text', 'metadata', and 'score'
+            (cosine distance, lower is more similar)
+        """
+        self.refresh()
+
+        top_k = top_k or config.rag_top_k
+
+        documents = self.backend.query(query_embedding, top_k)
 
         logger.info(f"Found {len(documents)} documents for query")
         return documents
 
+    def hybrid_search(self, query: str, query_embedding: np.ndarray, top_k: int = None) -> List[Dict]:
+        """
+        Fuse dense and BM25 rankings with reciprocal rank fusion.
+
+        Each retriever contributes `rag.hybrid.candidates` chunks (the dense
+        side `rag.hybrid.dense_top_k` if set); the fused top_k are returned.
+
+        Args:
+            query: Query text (for BM25)
+            query_embedding: Query embedding vector
+            top_k: Number of results
+
+        Returns:
+            List of dicts with 'id', 'text', 'metadata', 'score' (cosine
+            distance, or None for chunks found only by BM25) and 'fusion'
+            (RRF score plus each retriever's rank, None where absent)
+        """
+        self.refresh()
+        if self.sparse_index is None:
+            raise RAGError("Hybrid search requires rag.retrieval_mode: hybrid")
+
+        top_k = top_k or config.rag_top_k
+        candidates = max(config.rag_hybrid_candidates, top_k)
+
+        dense = self.backend.query(query_embedding, config.rag_hybrid_dense_top_k or candidates)
+        sparse = self.sparse_index.search(query, candidates)
+
+        dense_ranks = {doc["id"]: rank for rank, doc in enumerate(dense, 1)}
+        sparse_ranks = {chunk_id: rank for rank, (chunk_id, _) in enumerate(sparse, 1)}
+        fused = reciprocal_rank_fusion(
+            [list(dense_ranks), list(sparse_ranks)], k=config.rag_rrf_k
+        )[:top_k]
+
+        by_id = {doc["id"]: doc for doc in dense}
+        missing = [chunk_id for chunk_id, _ in fused if chunk_id not in by_id]
+        if missing:
+            for doc in self.backend.get(missing):
+                doc["score"] = None
+                by_id[doc["id"]] = doc
+
+        documents = []
+        for chunk_id, fused_score in fused:
+            doc = by_id.get(chunk_id)
+            if doc is None:  # deleted between the sparse search and the fetch
+                continue
+            doc["fusion"] = {
+                "rrf_score": fused_score,
+                "dense_rank": dense_ranks.get(chunk_id),
+                "sparse_rank": sparse_ranks.get(chunk_id)
+            }
+            documents.append(doc)
+
+        logger.info(
+            f"Hybrid search: {len(dense)} dense + {len(sparse)} BM25 candidates -> {len(documents)} documents"
+        )
+        return documents
+
+    async def asearch(
+        self,
+        query: str,
+        top_k: int = None,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[Dict]:
+        """
+        Search without blocking the event loop.
+
+        The query is encoded through the micro-batching service (awaited on
+        the loop, so no executor thread waits on the batch), then the dense
+        or hybrid search runs in the shared bounded executor.
+
+        Args:
+            query: Search query
+            top_k: Number of results
+            query_embedding: Pre-computed query embedding (encoded if None)
+
+        Returns:
+            List of dicts with 'text', 'metadata', and 'score'
+        """
+        if query_embedding is None:
+            query_embedding = await embedding_service.aencode_query(query)
+        return await run_blocking(self._search_encoded, query, query_embedding, top_k)
+
     def delete_collection(self):
-        """Delete the entire collection."""
-        if self.client is not None:
+        """Delete every stored chunk."""
+        if self.backend is not None:
             try:
-                self.client.delete_collection(name=self.collection_name)
-                logger.info(f"Deleted collection: {self.collection_name}")
-                self.collection = None
+                self.backend.reset()
+                if self.sparse_index is not None:
+                    self.sparse_index.clear()
+                    self.sparse_index.flush()
+                if answer_cache is not None:
+                    answer_cache.clear()
+                self._dirty = True
+                self._publish_generation()
             except Exception as e:
                 logger.error(f"Failed to delete collection: {e}")
 
+    def flush(self):
+        """Persist pending backend and sparse index writes (call before saving the manifest)."""
+        if self.backend is not None:
+            self.backend.flush()
+        if self.sparse_index is not None:
+            self.sparse_index.flush()
+        self._publish_generation()
+
+    def _publish_generation(self):
+        """Tell other workers to reload, once the writes are on disk."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        if self.state is not None:
+            self._generation = str(self.state.incr(_GENERATION_KEY))
+
     def get_count(self) -> int:
         """Get number of documents in collection."""
-        if self.collection is None:
-            self.initialize()
+        self.refresh()
 
-        return self.collection.count()
+        return self.backend.count()
 
 
 # Global vector store instance
-vector_store = VectorStore()
+vector_store = VectorStore(state=shared_state)
@@ -0,0 +1,49 @@
+"""
+Bounded executor for running blocking work from async request handlers.
+
+CPU-bound or blocking calls (SentenceTransformer.encode, Chroma queries,
+document parsing, JSON file writes) must not run on the uvicorn event loop,
+otherwise one slow request stalls every other request, including /health.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from ..config import config
+from ..utils.logger import logger
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get (or lazily create) the shared bounded thread pool."""
+    global _executor
+    if _executor is None:
+        max_workers = config.concurrency_max_workers
+        _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="banksight-worker")
+        logger.info(f"Blocking-work executor started (max_workers={max_workers})")
+    return _executor
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking function in the bounded executor and await its result.
+
+    Args:
+        func: Blocking callable
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executor():
+    """Shut down the shared executor (called on application shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,332 @@
+"""
+State shared by every worker process.
+
+With `uvicorn --workers N` or several hosts behind a load balancer, any
+worker may serve any request. State that must agree across workers
+(banking data changes, agent sessions, cache invalidation) goes through
+this layer instead of module-level dicts.
+
+Primitives:
+    get / set / delete / incr   string values, optional TTL
+    append / read_log           append-only logs with sequence numbers
+                                (1, 2, ...); workers replay new entries;
+                                append_many can give a log a TTL
+    lock                        mutual exclusion across workers; yields a
+                                renew() that extends the holder's expiry
+
+Backends:
+    sqlite  a database file shared by the workers on one host
+    redis   a Redis-compatible server (Redis, Valkey, KeyDB), for several
+            hosts; needs the optional `redis` package
+"""
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+from ..config import config
+from .logger import logger
+
+# Poll interval while waiting for a lock held by another worker (SQLite backend)
+_LOCK_POLL_SECONDS = 0.005
+# Expired keys and logs are deleted at most this often (SQLite backend)
+_PURGE_INTERVAL_SECONDS = 60
+
+
+class SQLiteSharedState:
+    """Shared state in a SQLite database (WAL), for workers on one host."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # timeout: wait for other processes' write transactions instead of failing
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS logs ("
+            "key TEXT NOT NULL, seq INTEGER NOT NULL, value TEXT NOT NULL, PRIMARY KEY (key, seq))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS log_expiry (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+        )
+        self._purged_at = 0.0
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Serialized write transaction (across threads and processes)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._purge_expired()
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _purge_expired(self):
+        """Delete expired keys and logs every _PURGE_INTERVAL_SECONDS (inside a write transaction)."""
+        now = time.time()
+        if now - self._purged_at < _PURGE_INTERVAL_SECONDS:
+            return
+        self._purged_at = now
+        self._conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        self._conn.execute(
+            "DELETE FROM logs WHERE key IN (SELECT key FROM log_expiry WHERE expires_at <= ?)", (now,)
+        )
+        self._conn.execute("DELETE FROM log_expiry WHERE expires_at <= ?", (now,))
+
+    def _drop_if_expired(self, key: str):
+        """Start an expired log afresh before appending to it (inside a write transaction)."""
+        if self._log_expired(key):
+            self._conn.execute("DELETE FROM logs WHERE key = ?", (key,))
+            self._conn.execute("DELETE FROM log_expiry WHERE key = ?", (key,))
+
+    def _log_expired(self, key: str) -> bool:
+        """Whether a log's TTL has passed (not yet purged). Caller holds self._lock."""
+        row = self._conn.execute("SELECT expires_at FROM log_expiry WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] <= time.time()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)", (key, value, expires_at)
+            )
+
+    def delete(self, *keys: str):
+        with self._write() as conn:
+            conn.executemany("DELETE FROM kv WHERE key = ?", [(key,) for key in keys])
+            conn.executemany("DELETE FROM logs WHERE key = ?", [(key,) for key in keys])
+            conn.executemany("DELETE FROM log_expiry WHERE key = ?", [(key,) for key in keys])
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._write() as conn:
+            row = conn.execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+            current = int(row[0]) if row and (row[1] is None or row[1] > time.time()) else 0
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, NULL)", (key, str(current + amount))
+            )
+        return current + amount
+
+    def count(self, prefix: str) -> int:
+        """Number of live keys starting with prefix."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM kv WHERE key >= ? AND key < ? AND (expires_at IS NULL OR expires_at > ?)",
+                (prefix, prefix + "\uffff", time.time())
+            ).fetchone()[0]
+
+    def append(self, key: str, value: str) -> int:
+        """Append to a log; returns the entry's sequence number."""
+        with self._write() as conn:
+            self._drop_if_expired(key)
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM logs WHERE key = ?", (key,)).fetchone()[0]
+            conn.execute("INSERT INTO logs (key, seq, value) VALUES (?, ?, ?)", (key, seq, value))
+        return seq
+
+    def append_many(self, key: str, values: List[str], ttl: Optional[float] = None) -> int:
+        """
+        Append several entries atomically; returns the last sequence number.
+
+        Args:
+            key: Log key
+            values: Entries to append
+            ttl: If set, the whole log expires this many seconds after this append
+        """
+        with self._write() as conn:
+            self._drop_if_expired(key)
+            first = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM logs WHERE key = ?", (key,)).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO logs (key, seq, value) VALUES (?, ?, ?)",
+                [(key, first + i, value) for i, value in enumerate(values)]
+            )
+            if ttl:
+                conn.execute(
+                    "INSERT OR REPLACE INTO log_expiry (key, expires_at) VALUES (?, ?)", (key, time.time() + ttl)
+                )
+        return first + len(values) - 1
+
+    def read_log(self, key: str, after: int = 0) -> List[Tuple[int, str]]:
+        """Log entries with sequence number > after, in order."""
+        with self._lock:
+            if self._log_expired(key):
+                return []
+            return self._conn.execute(
+                "SELECT seq, value FROM logs WHERE key = ? AND seq > ? ORDER BY seq", (key, after)
+            ).fetchall()
+
+    def log_length(self, key: str) -> int:
+        with self._lock:
+            if self._log_expired(key):
+                return 0
+            return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM logs WHERE key = ?", (key,)).fetchone()[0]
+
+    @contextmanager
+    def lock(self, name: str, timeout: float = 10.0, wait: float = 10.0) -> Iterator[Callable[[], bool]]:
+        """
+        Hold a named lock across workers.
+
+        Yields renew(), which pushes the expiry back to `timeout` seconds
+        from now and returns False if the lock already expired and was lost.
+
+        Args:
+            name: Lock name
+            timeout: Seconds after which a crashed holder's lock expires
+            wait: Seconds to wait for the lock before raising TimeoutError
+        """
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + wait
+        while True:
+            now = time.time()
+            with self._write() as conn:
+                row = conn.execute("SELECT expires_at FROM locks WHERE name = ?", (name,)).fetchone()
+                acquired = row is None or row[0] <= now
+                if acquired:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO locks (name, owner, expires_at) VALUES (?, ?, ?)",
+                        (name, owner, now + timeout)
+                    )
+            if acquired:
+                break
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out waiting for shared lock '{name}'")
+            time.sleep(_LOCK_POLL_SECONDS)
+
+        def renew() -> bool:
+            with self._write() as conn:
+                return conn.execute(
+                    "UPDATE locks SET expires_at = ? WHERE name = ? AND owner = ?", (time.time() + timeout, name, owner)
+                ).rowcount > 0
+
+        try:
+            yield renew
+        finally:
+            with self._lock:
+                self._conn.execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+
+
+class RedisSharedState:
+    """Shared state on a Redis-compatible server, for workers on several hosts."""
+
+    name = "redis"
+
+    def __init__(self, client):
+        """
+        Args:
+            client: redis.Redis client with decode_responses=True (or a
+                    compatible stand-in such as fakeredis.FakeRedis)
+        """
+        self._client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisSharedState":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "shared_state.backend is 'redis' but the 'redis' package is not installed "
+                "(pip install redis)"
+            )
+        return cls(redis.Redis.from_url(url, decode_responses=True))
+
+    def get(self, key: str) -> Optional[str]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        self._client.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, *keys: str):
+        if keys:
+            self._client.delete(*keys)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        return int(self._client.incrby(key, amount))
+
+    def count(self, prefix: str) -> int:
+        """Number of keys starting with prefix (scans; for stats only)."""
+        return sum(1 for _ in self._client.scan_iter(match=f"{prefix}*", count=1000))
+
+    def append(self, key: str, value: str) -> int:
+        """Append to a log; returns the entry's sequence number."""
+        return int(self._client.rpush(key, value))
+
+    def append_many(self, key: str, values: List[str], ttl: Optional[float] = None) -> int:
+        """Append several entries atomically (see SQLiteSharedState.append_many); returns the last sequence number."""
+        if not ttl:
+            return int(self._client.rpush(key, *values))
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.rpush(key, *values)
+        pipeline.pexpire(key, int(ttl * 1000))
+        return int(pipeline.execute()[0])
+
+    def read_log(self, key: str, after: int = 0) -> List[Tuple[int, str]]:
+        """Log entries with sequence number > after, in order."""
+        return [(after + i + 1, value) for i, value in enumerate(self._client.lrange(key, after, -1))]
+
+    def log_length(self, key: str) -> int:
+        return int(self._client.llen(key))
+
+    @contextmanager
+    def lock(self, name: str, timeout: float = 10.0, wait: float = 10.0) -> Iterator[Callable[[], bool]]:
+        """Hold a named lock across workers (see SQLiteSharedState.lock)."""
+        from redis.exceptions import LockError
+
+        lock = self._client.lock(f"lock:{name}", timeout=timeout, blocking_timeout=wait)
+        if not lock.acquire():
+            raise TimeoutError(f"Timed out waiting for shared lock '{name}'")
+
+        def renew() -> bool:
+            try:
+                lock.reacquire()
+                return True
+            except LockError:
+                return False
+
+        try:
+            yield renew
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                # Expired (and maybe taken over): nothing to release, as with SQLite
+                logger.warning(f"Shared lock '{name}' expired before it was released")
+
+
+def create_shared_state():
+    """Create the configured shared state backend, or None for single-process mode."""
+    backend = config.shared_state_backend
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        state = SQLiteSharedState(config.shared_state_sqlite_path)
+        logger.info(f"✅ Shared state: SQLite ({config.shared_state_sqlite_path})")
+        return state
+    if backend == "redis":
+        state = RedisSharedState.from_url(config.shared_state_redis_url)
+        logger.info("✅ Shared state: Redis")
+        return state
+    raise RuntimeError(f"Unsupported shared_state.backend: {backend} (use 'sqlite', 'redis' or 'none')")
+
+
+# Global shared state (None in single-process mode)
+shared_state = create_shared_state()
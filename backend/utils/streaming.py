@@ -0,0 +1,23 @@
+"""
+Helpers for streaming responses (token deltas, SSE framing).
+"""
+import json
+from typing import Dict
+
+
+def token_frame(content: str) -> Dict:
+    """Build a token delta frame."""
+    return {"type": "token", "content": content}
+
+
+def format_sse(frame: Dict) -> str:
+    """
+    Serialize a frame as a Server-Sent Events message.
+
+    Args:
+        frame: JSON-serializable frame dict with a 'type' key
+
+    Returns:
+        SSE-formatted string
+    """
+    return f"event: {frame.get('type', 'message')}\ndata: {json.dumps(frame, ensure_ascii=False)}\n\n"
@@ -0,0 +1,115 @@
+"""
+Benchmark: IVF approximate search vs. exact search (NumPy backend).
+
+Builds a NumPy vector store of clustered synthetic embeddings (random
+embeddings have no neighbourhood structure, so IVF recall on them is
+meaningless), trains the IVF index, then for each nprobe reports
+recall@k against exact search and the query latency. The exact baseline
+is the same store opened without an IVF index.
+
+Usage:
+    python benchmarks/ann_benchmark.py
+    python benchmarks/ann_benchmark.py --size 1000000 --nprobe 4,8,16,32,64
+"""
+import argparse
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.rag.vector_backends import IVFIndex, NumpyBackend  # noqa: E402
+from backend.rag.vector_backends.numpy_backend import normalize_rows  # noqa: E402
+from backend.utils.logger import logger  # noqa: E402
+
+BATCH_SIZE = 5000
+
+
+def clustered_embeddings(rng: np.random.Generator, centers: np.ndarray, count: int, noise: float) -> np.ndarray:
+    """Normalized points scattered around randomly chosen centers."""
+    points = centers[rng.integers(0, len(centers), count)]
+    points = points + noise * rng.standard_normal(points.shape, dtype=np.float32)
+    return normalize_rows(points)
+
+
+def query_ids(backend: NumpyBackend, queries: np.ndarray, top_k: int):
+    """Run queries, returning result IDs and per-query latencies (ms)."""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = backend.query(query, top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([hit["id"] for hit in hits])
+    return results, latencies
+
+
+def recall_at_k(results: List[List[str]], truth: List[List[str]]) -> float:
+    found = sum(len(set(r) & set(t)) for r, t in zip(results, truth))
+    return found / max(sum(len(t) for t in truth), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IVF recall vs. latency benchmark")
+    parser.add_argument("--size", type=int, default=100000, help="Number of chunks")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=2000, help="Topics in the synthetic data")
+    parser.add_argument("--noise", type=float, default=0.04, help="Per-dimension spread around each topic")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF lists (0 = auto)")
+    parser.add_argument("--nprobe", default="1,4,8,16,32,64", help="Comma-separated nprobe values")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    rng = np.random.default_rng(args.seed)
+    centers = normalize_rows(rng.standard_normal((args.clusters, args.dimension), dtype=np.float32))
+    directory = Path(tempfile.mkdtemp(prefix="ann_bench_"))
+
+    try:
+        backend = NumpyBackend(str(directory), args.dimension, IVFIndex(args.dimension, nlist=args.nlist, min_rows=0))
+        backend.initialize()
+
+        start = time.perf_counter()
+        for offset in range(0, args.size, BATCH_SIZE):
+            count = min(BATCH_SIZE, args.size - offset)
+            ids = [f"chunk_{i}" for i in range(offset, offset + count)]
+            embeddings = clustered_embeddings(rng, centers, count, args.noise)
+            backend.upsert(ids, [""] * count, embeddings, [{}] * count)
+        insert_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        backend.flush()  # trains the IVF index
+        train_seconds = time.perf_counter() - start
+        nlist = len(backend.ivf.centroids)
+        print(f"{args.size} chunks, dimension {args.dimension}: insert {insert_seconds:.1f}s, "
+              f"IVF training ({nlist} lists) {train_seconds:.1f}s\n")
+
+        queries = clustered_embeddings(rng, centers, args.queries, args.noise)
+        exact = NumpyBackend(str(directory), args.dimension)
+        exact.initialize()
+        truth, latencies = query_ids(exact, queries, args.top_k)
+
+        print(f"{'search':<14} {'recall@' + str(args.top_k):>10} {'p50 ms':>8} {'p95 ms':>8} {'speedup':>8}")
+        exact_p50 = float(np.percentile(latencies, 50))
+        print(f"{'exact':<14} {1.0:>10.3f} {exact_p50:>8.2f} {np.percentile(latencies, 95):>8.2f} {1.0:>7.1f}x")
+
+        for nprobe in [int(value) for value in args.nprobe.split(",")]:
+            backend.ivf.nprobe = nprobe
+            results, latencies = query_ids(backend, queries, args.top_k)
+            p50 = float(np.percentile(latencies, 50))
+            print(f"{'ivf nprobe=' + str(nprobe):<14} {recall_at_k(results, truth):>10.3f} {p50:>8.2f} "
+                  f"{np.percentile(latencies, 95):>8.2f} {exact_p50 / p50:>7.1f}x")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
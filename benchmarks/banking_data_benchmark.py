@@ -0,0 +1,143 @@
+"""
+Benchmark: indexed banking data lookups vs. scanning the JSON lists.
+
+Generates synthetic banking data (users, accounts, transactions), loads it
+with BankingDataManager and times the lookups behind the balance and
+history tools against the list scans they replace:
+
+  get_account       scan every account  vs. (user_id, type) index
+  get_transactions  filter every transaction and sort by date
+                    vs. slice of the account's date-sorted list
+  add_transaction   append plus the incremental index update
+
+Both sides return the same results; the benchmark checks that first.
+
+Usage:
+    python benchmarks/banking_data_benchmark.py
+    python benchmarks/banking_data_benchmark.py --users 5000 --transactions 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.actions.banking_data import BankingDataManager  # noqa: E402
+
+ACCOUNT_TYPES = ["checking", "savings", "credit_card"]
+
+
+def generate_data(users: int, transactions: int, seed: int = 0) -> Dict:
+    rng = random.Random(seed)
+    data = {
+        "users": [{"id": f"user_{u:06d}", "name": f"User {u}"} for u in range(users)],
+        "accounts": [
+            {"id": f"acc_{t}_{u:06d}", "user_id": f"user_{u:06d}", "type": t, "balance": 1000.0}
+            for u in range(users) for t in ACCOUNT_TYPES
+        ],
+        "transactions": [],
+        "payees": [],
+    }
+    account_ids = [acc["id"] for acc in data["accounts"]]
+    for i in range(transactions):
+        data["transactions"].append({
+            "id": f"txn_{i:08d}",
+            "account_id": rng.choice(account_ids),
+            "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "amount": round(rng.uniform(-500, 500), 2),
+            "merchant": "Merchant",
+            "category": "shopping",
+        })
+    return data
+
+
+# The lookups as they were: linear scans over the JSON lists
+
+def scan_get_account(data: Dict, account_type: str, user_id: str) -> Optional[Dict]:
+    for acc in data["accounts"]:
+        if acc["user_id"] == user_id and acc["type"] == account_type:
+            return acc
+    return None
+
+
+def scan_get_transactions(data: Dict, account_id: str, limit: int) -> List[Dict]:
+    transactions = [txn for txn in data["transactions"] if txn["account_id"] == account_id]
+    transactions.sort(key=lambda x: x["date"], reverse=True)
+    return transactions[:limit]
+
+
+def time_calls(fn: Callable, calls: List[tuple]) -> float:
+    """Mean microseconds per call."""
+    start = time.perf_counter()
+    for args in calls:
+        fn(*args)
+    return (time.perf_counter() - start) / len(calls) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--transactions", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=200, help="Calls timed per operation")
+    parser.add_argument("--limit", type=int, default=10, help="Transactions per history read")
+    args = parser.parse_args()
+
+    data = generate_data(args.users, args.transactions)
+    rng = random.Random(1)
+    accounts = data["accounts"]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        data_file = os.path.join(workdir, "banking.json")
+        with open(data_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+        manager = BankingDataManager()
+        manager.data_file = data_file
+        start = time.perf_counter()
+        manager.load_data()
+        load_ms = (time.perf_counter() - start) * 1000.0
+        start = time.perf_counter()
+        manager._build_indexes()
+        index_ms = (time.perf_counter() - start) * 1000.0
+        manager.save_data = lambda: None  # Time the index update, not rewriting the JSON file
+        raw = manager.data
+
+        print(f"{args.users} users, {len(accounts)} accounts, {args.transactions} transactions")
+        print(f"load {load_ms:.0f} ms, including indexes (rebuilding them alone: {index_ms:.0f} ms)\n")
+
+        account_calls = [(rng.choice(ACCOUNT_TYPES), f"user_{rng.randrange(args.users):06d}")
+                         for _ in range(args.lookups)]
+        history_calls = [(rng.choice(accounts)["id"], args.limit) for _ in range(args.lookups)]
+
+        for account_type, user_id in account_calls:
+            assert manager.get_account(account_type, user_id) is scan_get_account(raw, account_type, user_id)
+        for account_id, limit in history_calls:
+            assert manager.get_transactions(account_id, limit) == scan_get_transactions(raw, account_id, limit)
+
+        print(f"{'operation':<18} {'scan us':>12} {'indexed us':>12} {'speedup':>9}")
+        rows = [
+            ("get_account", lambda t, u: scan_get_account(raw, t, u), manager.get_account, account_calls),
+            ("get_transactions", lambda a, n: scan_get_transactions(raw, a, n), manager.get_transactions,
+             history_calls),
+        ]
+        for name, scan_fn, indexed_fn, calls in rows:
+            scan_us = time_calls(scan_fn, calls)
+            indexed_us = time_calls(indexed_fn, calls)
+            print(f"{name:<18} {scan_us:>12.1f} {indexed_us:>12.2f} {scan_us / indexed_us:>8.0f}x")
+
+        new_transactions = [
+            ({"id": f"new_{i}", "account_id": rng.choice(accounts)["id"], "date": "2025-01-01", "amount": 1.0},)
+            for i in range(args.lookups)
+        ]
+        add_us = time_calls(manager.add_transaction, new_transactions)
+        print(f"{'add_transaction':<18} {'-':>12} {add_us:>12.2f} {'':>9}  (indexed append)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark: streaming chunker vs. the original string-based chunk_text.
+
+Generates a synthetic corpus (English/Arabic banking sentences, paragraphs
+and pages), then chunks it
+  - with the original chunk_text (copied below as legacy_chunk_text), on
+    the whole corpus as one string, and
+  - with the streaming chunker, fed page by page.
+Reports throughput, chunk counts and sizes and, with --memory, peak
+allocations. The legacy chunker prefers ". " anywhere in the window over
+later boundaries, so it emits many more, shorter chunks.
+
+Usage:
+    python benchmarks/chunker_benchmark.py --size-mb 50
+    python benchmarks/chunker_benchmark.py --size-mb 5 --memory
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.rag.chunker import chunk_segments  # noqa: E402
+from backend.utils.logger import logger  # noqa: E402
+
+SENTENCES = [
+    "The monthly maintenance fee is waived for balances above 1,000 LYD.",
+    "Wire transfers submitted after 3 PM are processed the next business day!",
+    "Do you need a guarantor for personal loans above 50,000 LYD?",
+    "رسوم التحويل الدولي تعتمد على البلد والعملة.",
+    "هل يمكن فتح حساب توفير عبر الإنترنت؟",
+    "Overdraft protection links your checking account to a savings account",
+    "Interest on savings is calculated daily and paid monthly.",
+    "Customers must present a valid national ID and proof of address.",
+]
+
+
+def legacy_chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """The original chunk_text implementation, kept for comparison."""
+    logger.info(f"Chunking text: {len(text)} chars, chunk_size={chunk_size}, overlap={chunk_overlap}")
+
+    if len(text) <= chunk_size:
+        logger.info("Text fits in single chunk")
+        return [text]
+
+    chunks = []
+    start = 0
+    iteration = 0
+    max_iterations = len(text) * 2  # Safety limit
+
+    while start < len(text):
+        iteration += 1
+        if iteration > max_iterations:
+            logger.error(f"Infinite loop detected in chunking! Breaking at iteration {iteration}")
+            break
+
+        end = start + chunk_size
+
+        # Try to break at sentence boundary
+        if end < len(text):
+            # Look for sentence endings
+            for punct in [". ", "! ", "? ", "\n\n"]:
+                last_punct = text.rfind(punct, start, end)
+                if last_punct != -1:
+                    end = last_punct + len(punct)
+                    break
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+
+        old_start = start
+        if end < len(text):
+            start = end - chunk_overlap
+            if start <= old_start:
+                start = old_start + 1
+        else:
+            start = end
+
+        if iteration % 10 == 0:
+            logger.debug(f"Chunking progress: {start}/{len(text)} chars, {len(chunks)} chunks created")
+
+    logger.info(f"Chunking complete: {len(chunks)} chunks created")
+    return chunks
+
+
+def generate_pages(size_bytes: int, page_chars: int, seed: int) -> List[str]:
+    """Generate pages of random paragraphs totalling about `size_bytes` characters."""
+    rng = random.Random(seed)
+    pages, total = [], 0
+    while total < size_bytes:
+        paragraphs, page_len = [], 0
+        while page_len < page_chars:
+            paragraph = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 8)))
+            paragraphs.append(paragraph)
+            page_len += len(paragraph) + 2
+        page = "\n\n".join(paragraphs)
+        pages.append(page)
+        total += len(page) + 2
+    return pages
+
+
+def measure(label: str, run, size_chars: int, track_memory: bool):
+    """Run a chunking function, printing time, throughput and peak memory."""
+    if track_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    count, chars = run()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if track_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    line = f"{label:<28} {elapsed:8.2f}s  {size_chars / elapsed / 1e6:7.2f} Mchar/s  {count:>9} chunks  avg {chars / max(count, 1):6.0f} chars"
+    if peak is not None:
+        line += f"  peak {peak / 1e6:8.1f} MB"
+    print(line)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming chunker benchmark")
+    parser.add_argument("--size-mb", type=float, default=50.0, help="Corpus size in millions of characters")
+    parser.add_argument("--page-chars", type=int, default=3000, help="Characters per generated page")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=50)
+    parser.add_argument("--memory", action="store_true", help="Track peak allocations (slower)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    pages = generate_pages(int(args.size_mb * 1e6), args.page_chars, args.seed)
+    size_chars = sum(len(page) for page in pages) + 2 * (len(pages) - 1)
+    print(f"Corpus: {size_chars / 1e6:.1f}M chars in {len(pages)} pages "
+          f"(chunk_size={args.chunk_size}, overlap={args.chunk_overlap})\n")
+
+    def run_legacy():
+        # The legacy path needs the whole document as one string
+        text = "\n\n".join(pages)
+        chunks = legacy_chunk_text(text, args.chunk_size, args.chunk_overlap)
+        return len(chunks), sum(len(chunk) for chunk in chunks)
+
+    def run_streaming():
+        segments: Iterator[dict] = ({"text": page, "page": i} for i, page in enumerate(pages, 1))
+        count = chars = 0
+        for chunk in chunk_segments(segments, {}, args.chunk_size, args.chunk_overlap):
+            count += 1
+            chars += len(chunk["text"])
+        return count, chars
+
+    legacy = measure("legacy chunk_text", run_legacy, size_chars, args.memory)
+    streaming = measure("streaming chunk_segments", run_streaming, size_chars, args.memory)
+    print(f"\nSpeedup: {legacy / streaming:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Soak test: classic agent conversation history under sustained traffic.
+
+Replays chat turns from many sessions into the classic agent's per-session
+history (backend/agent/conversation_history.py) and, for comparison, into
+one global list as the classic agent used to. Traced Python memory is
+reported after every round: the bounded history levels off once every
+live session has filled its ring buffer; the global list keeps growing.
+
+Usage:
+    python benchmarks/classic_history_soak.py
+    python benchmarks/classic_history_soak.py --rounds 10 --turns-per-round 50000 --sessions 5000
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.agent.conversation_history import ConversationHistories  # noqa: E402
+
+
+def make_turn(rng: random.Random, i: int) -> dict:
+    return {
+        "query": f"What was my largest transaction last month? #{i}",
+        "response": "Your largest transaction was a $1,250.00 rent payment on the 1st. " * rng.randint(1, 6),
+        "intent": "action",
+    }
+
+
+def soak(name: str, add_turn, args: argparse.Namespace):
+    rng = random.Random(0)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    print(f"\n{name}")
+    print(f"{'round':>5} {'turns':>9} {'memory MiB':>11} {'turns/s':>10}")
+    for round_index in range(1, args.rounds + 1):
+        start = time.perf_counter()
+        for i in range(args.turns_per_round):
+            add_turn(f"session-{rng.randrange(args.sessions)}", make_turn(rng, i))
+        elapsed = time.perf_counter() - start
+        memory = (tracemalloc.get_traced_memory()[0] - baseline) / 2**20
+        print(f"{round_index:>5} {round_index * args.turns_per_round:>9} {memory:>11.1f} "
+              f"{args.turns_per_round / elapsed:>10.0f}")
+    tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--turns-per-round", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=2000, help="Distinct session IDs in the traffic")
+    parser.add_argument("--max-turns", type=int, default=10, help="agent.max_conversation_history")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="agent.max_sessions")
+    args = parser.parse_args()
+
+    histories = ConversationHistories(max_turns=args.max_turns, max_sessions=args.max_sessions, idle_ttl_seconds=0)
+    soak(f"per-session ring buffers ({args.max_turns} turns x {args.max_sessions} sessions)", histories.append, args)
+    print(f"metrics: {histories.get_metrics()}")
+
+    global_history = []
+    soak("global list (previous behaviour)", lambda _, turn: global_history.append(turn), args)
+
+
+if __name__ == "__main__":
+    main()
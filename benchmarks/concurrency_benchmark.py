@@ -0,0 +1,92 @@
+"""
+Concurrency benchmark for the chat API.
+
+Measures how long one /api/chat request takes, then fires N chats in
+parallel and compares the wall-clock time. With non-blocking handlers the
+N parallel chats should finish in roughly the time of one (Groq latency
+dominates), and /health should stay responsive while they run.
+
+Usage:
+    # Start the backend first (./run_backend.sh), then:
+    python benchmarks/concurrency_benchmark.py --concurrency 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+import httpx
+
+
+DEFAULT_URL = "http://localhost:8000"
+DEFAULT_MESSAGE = "What are the wire transfer fees?"
+
+
+async def timed_chat(client: httpx.AsyncClient, message: str, session_id: str) -> float:
+    """Send one chat request and return its latency in seconds."""
+    start = time.perf_counter()
+    response = await client.post(
+        "/api/chat",
+        json={"message": message, "session_id": session_id}
+    )
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, samples: List[float]):
+    """Poll /health until stopped, recording each latency."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.1)
+
+
+async def run(base_url: str, message: str, concurrency: int, warmup: int):
+    limits = httpx.Limits(max_connections=concurrency + 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        # Warm up (model load, Groq connection)
+        for i in range(warmup):
+            await timed_chat(client, message, f"bench_warmup_{i}")
+
+        # Baseline: one request at a time
+        single = await timed_chat(client, message, "bench_single")
+        print(f"Single chat latency:          {single:.2f}s")
+
+        # N parallel requests, with /health probed in the background
+        stop = asyncio.Event()
+        health_samples: List[float] = []
+        prober = asyncio.create_task(probe_health(client, stop, health_samples))
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*[
+            timed_chat(client, message, f"bench_parallel_{i}")
+            for i in range(concurrency)
+        ])
+        wall = time.perf_counter() - start
+
+        stop.set()
+        await prober
+
+    print(f"{concurrency} parallel chats wall time: {wall:.2f}s")
+    print(f"  per-request p50 / max:      {statistics.median(latencies):.2f}s / {max(latencies):.2f}s")
+    print(f"  wall time / single latency: {wall / single:.2f}x (ideal ~1x, fully serialized ~{concurrency}x)")
+    if health_samples:
+        print(f"/health during load p50 / max: {statistics.median(health_samples) * 1000:.0f}ms / "
+              f"{max(health_samples) * 1000:.0f}ms ({len(health_samples)} samples)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent /api/chat requests")
+    parser.add_argument("--url", default=DEFAULT_URL, help="Backend base URL")
+    parser.add_argument("--message", default=DEFAULT_MESSAGE, help="Chat message to send")
+    parser.add_argument("--concurrency", type=int, default=10, help="Number of parallel chats")
+    parser.add_argument("--warmup", type=int, default=1, help="Warm-up requests before measuring")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.url, args.message, args.concurrency, args.warmup))
+
+
+if __name__ == "__main__":
+    main()
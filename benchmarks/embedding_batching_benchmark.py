@@ -0,0 +1,94 @@
+"""
+Benchmark: micro-batched query embeddings vs. one encode call per query.
+
+Simulates concurrent users: `--concurrency` threads each encode
+`--queries` distinct questions, first through EmbeddingModel.encode_single
+(the old per-call path), then through EmbeddingBatcher.
+
+Usage:
+    python benchmarks/embedding_batching_benchmark.py --concurrency 16 --queries 50
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.rag.embeddings import EmbeddingBatcher, embedding_model  # noqa: E402
+
+
+QUESTIONS = [
+    "What is the overdraft fee?",
+    "How do I open a savings account?",
+    "What are the wire transfer fees?",
+    "ما هي رسوم السحب على المكشوف؟",
+    "What documents do I need for a personal loan?",
+    "How long does an international transfer take?",
+    "What is the minimum balance for checking?",
+    "كيف أفتح حساب توفير؟",
+]
+
+
+def run_concurrent(encode: Callable[[str], object], concurrency: int, queries: int):
+    """Run `encode` from `concurrency` threads; return (wall seconds, latencies)."""
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def worker(worker_id: int):
+        local = []
+        for i in range(queries):
+            text = f"{QUESTIONS[(worker_id + i) % len(QUESTIONS)]} (user {worker_id}, #{i})"
+            start = time.perf_counter()
+            encode(text)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(w,)) for w in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, latencies
+
+
+def report(label: str, wall: float, latencies: List[float]):
+    latencies = sorted(latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(f"{label:<22} {len(latencies) / wall:>9.1f} q/s   "
+          f"p50 {statistics.median(latencies) * 1000:>7.1f}ms   p95 {p95 * 1000:>7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched query embeddings")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent callers")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per caller")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    embedding_model.load_model()
+    embedding_model.encode_single("warm up")
+
+    print(f"{args.concurrency} callers x {args.queries} queries, model={embedding_model.model_name}\n")
+
+    wall, latencies = run_concurrent(embedding_model.encode_single, args.concurrency, args.queries)
+    report("per-call encode", wall, latencies)
+
+    batcher = EmbeddingBatcher(embedding_model, args.max_batch_size, args.max_wait_ms)
+    wall, latencies = run_concurrent(batcher.encode, args.concurrency, args.queries)
+    report("micro-batched", wall, latencies)
+
+    metrics = batcher.get_metrics()
+    print(f"\nbatches: {metrics['batches']}, avg batch size: {metrics['avg_batch_size']}, "
+          f"max seen: {metrics['max_batch_size_seen']}")
+    batcher.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark: shared keep-alive HTTP pool vs. per-session and per-request clients.
+
+Starts a local stub of the Groq chat completions endpoint and replays
+chat sessions against it with three client strategies:
+
+  per-request  a new httpx client for every call (worst case)
+  per-session  a new client per session, as when every BankSightAgent
+               built its own ChatGroq
+  shared       the process-wide pool from backend.llm.http_transport
+
+The stub counts accepted connections, so the report shows how many
+connections each strategy opened, the mean and p95 request latency
+(including building the client, for the strategies that build one per
+request or session), throughput, and the shared pool's own saturation
+and reuse metrics. Pass --certfile and
+--keyfile to serve TLS, which makes the handshake cost (and what the pool
+saves) visible:
+
+    openssl req -x509 -newkey rsa:2048 -nodes -days 1 -subj /CN=localhost \\
+        -keyout /tmp/key.pem -out /tmp/cert.pem
+
+Usage:
+    python benchmarks/http_pool_benchmark.py
+    python benchmarks/http_pool_benchmark.py --sessions 50 --requests-per-session 10 --concurrency 8
+    python benchmarks/http_pool_benchmark.py --certfile /tmp/cert.pem --keyfile /tmp/key.pem
+"""
+import argparse
+import json
+import ssl
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.llm.http_transport import SharedHTTPClients  # noqa: E402
+
+COMPLETION = json.dumps({
+    "id": "chatcmpl-stub",
+    "object": "chat.completion",
+    "model": "stub",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "Your balance is $1,250.00."},
+                 "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 42, "completion_tokens": 8, "total_tokens": 50},
+}).encode("utf-8")
+
+PAYLOAD = {
+    "model": "stub",
+    "messages": [{"role": "user", "content": "What is my balance?"}],
+    "max_tokens": 64,
+}
+
+
+class StubServer(ThreadingHTTPServer):
+    """Chat completions stub that counts accepted connections."""
+
+    daemon_threads = True
+    request_queue_size = 128  # Listen backlog for bursts of new connections
+
+    def __init__(self, address, delay_s: float):
+        super().__init__(address, StubHandler)
+        self.delay_s = delay_s
+        self.connections = 0
+        self._count_lock = threading.Lock()
+
+    def get_request(self):
+        request = super().get_request()
+        with self._count_lock:
+            self.connections += 1
+        return request
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    disable_nagle_algorithm = True  # Headers and body are separate writes
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.server.delay_s:
+            time.sleep(self.server.delay_s)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_sessions(
+    sessions: int,
+    requests_per_session: int,
+    concurrency: int,
+    session_fn: Callable[[int], List[float]]
+) -> np.ndarray:
+    """Run sessions on a thread pool; return every request latency in ms."""
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(session_fn, range(sessions)))
+    return np.array([latency for session in results for latency in session]) * 1000.0
+
+
+def post(client: httpx.Client, url: str):
+    response = client.post(url, json=PAYLOAD)
+    response.raise_for_status()
+    response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--requests-per-session", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4, help="Sessions running at once")
+    parser.add_argument("--server-delay-ms", type=float, default=5.0, help="Simulated model time per request")
+    parser.add_argument("--certfile", help="Serve TLS with this certificate")
+    parser.add_argument("--keyfile", help="Private key for --certfile")
+    args = parser.parse_args()
+
+    server = StubServer(("127.0.0.1", 0), args.server_delay_ms / 1000.0)
+    scheme = "http"
+    verify = True
+    if args.certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(args.certfile, args.keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+        verify = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"{scheme}://127.0.0.1:{server.server_address[1]}/openai/v1/chat/completions"
+
+    shared = SharedHTTPClients(verify=verify)
+
+    def per_request(_):
+        latencies = []
+        for _ in range(args.requests_per_session):
+            start = time.perf_counter()
+            with httpx.Client(verify=verify) as client:
+                post(client, url)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    def per_session(_):
+        latencies = []
+        start = time.perf_counter()
+        with httpx.Client(verify=verify) as client:
+            for _ in range(args.requests_per_session):
+                post(client, url)
+                latencies.append(time.perf_counter() - start)
+                start = time.perf_counter()
+        return latencies
+
+    def shared_pool(_):
+        latencies = []
+        client = shared.get_client()
+        for _ in range(args.requests_per_session):
+            start = time.perf_counter()
+            post(client, url)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    strategies: Dict[str, Callable] = {
+        "per-request": per_request,
+        "per-session": per_session,
+        "shared": shared_pool,
+    }
+
+    total = args.sessions * args.requests_per_session
+    print(f"{args.sessions} sessions x {args.requests_per_session} requests ({total} total), "
+          f"concurrency {args.concurrency}, {scheme.upper()}, server delay {args.server_delay_ms:.1f} ms")
+    print(f"{'strategy':<12} {'connections':>11} {'mean ms':>9} {'p95 ms':>9} {'overhead ms':>12} {'req/s':>8}")
+
+    for name, session_fn in strategies.items():
+        before = server.connections
+        start = time.perf_counter()
+        latencies = run_sessions(args.sessions, args.requests_per_session, args.concurrency, session_fn)
+        wall = time.perf_counter() - start
+        overhead = latencies.mean() - args.server_delay_ms
+        print(f"{name:<12} {server.connections - before:>11} {latencies.mean():>9.2f} "
+              f"{np.percentile(latencies, 95):>9.2f} {overhead:>12.2f} {total / wall:>8.1f}")
+
+    print("\nshared pool metrics:")
+    print(json.dumps(shared.get_metrics()["sync"], indent=2))
+    shared.get_client().close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
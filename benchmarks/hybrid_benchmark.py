@@ -0,0 +1,223 @@
+"""
+Benchmark: hybrid (BM25 + dense, reciprocal rank fusion) vs. dense-only retrieval.
+
+Builds a synthetic banking corpus where every chunk belongs to a topic,
+carries a unique account code and a rare Arabic term (stored with
+diacritics and hamza-seated alef), and has an embedding near its topic
+center. Three query sets each target one chunk:
+
+  code      "ACC-xxxxxx" plus topic words; the query embedding only knows
+            the topic, so dense search cannot single the chunk out
+  arabic    the chunk's Arabic term written bare, with an attached article
+            (exercises normalization)
+  semantic  a paraphrase sharing no words with the chunk, with an
+            embedding close to the chunk's (dense search's home ground)
+
+Dense "models" are simulated by the noise on the semantic query
+embeddings: `--dense-noise` for the configured model, `--cheap-noise` for
+a smaller one. The report gives recall@k per query set for dense-only,
+BM25-only and hybrid retrieval (hybrid also with a smaller dense top_k),
+query latency, and the sparse index build, incremental add and size
+costs.
+
+Usage:
+    python benchmarks/hybrid_benchmark.py
+    python benchmarks/hybrid_benchmark.py --size 100000 --dense-top-k 10
+"""
+import argparse
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.rag.fusion import reciprocal_rank_fusion  # noqa: E402
+from backend.rag.sparse_index import SparseIndex  # noqa: E402
+from backend.rag.vector_backends import NumpyBackend  # noqa: E402
+from backend.rag.vector_backends.numpy_backend import normalize_rows  # noqa: E402
+from backend.utils.logger import logger  # noqa: E402
+
+BATCH_SIZE = 2000
+
+BANKING_WORDS = (
+    "account balance transfer deposit withdrawal loan mortgage interest rate fee card credit debit "
+    "savings checking statement payment overdraft limit branch wire swift iban currency exchange "
+    "investment portfolio fund insurance pension tax charge refund dispute fraud alert pin online "
+    "mobile app login password security verification customer service complaint policy term "
+    "condition minimum maximum monthly annual daily penalty early closure opening requirement"
+).split()
+PARAPHRASE_WORDS = "how can i what happens when my the do you need to get about for please tell me".split()
+ARABIC_LETTERS = "بتثجحخدذرزسشصضطظعغفقكلمنهوي"
+ARABIC_PREFIXES = ("ال", "بال", "وال")
+
+
+def arabic_term(rng: np.random.Generator) -> str:
+    """A random Arabic-letter word starting with alef (5-7 letters)."""
+    return "ا" + "".join(rng.choice(list(ARABIC_LETTERS), int(rng.integers(4, 7))))
+
+
+def decorate(term: str, rng: np.random.Generator) -> str:
+    """Write a term the way it may appear in a document: hamza alef and diacritics."""
+    letters = ["أ" if term[0] == "ا" else term[0]]
+    for letter in term[1:]:
+        letters.append(letter + (rng.choice(["َ", "ُ", "ِ", ""]) if rng.random() < 0.5 else ""))
+    return "ال" + "".join(letters)
+
+
+def build_corpus(rng: np.random.Generator, args) -> Dict:
+    """Chunk texts, embeddings and the three query sets."""
+    centers = normalize_rows(rng.standard_normal((args.topics, args.dimension), dtype=np.float32))
+    topic_words = [rng.choice(BANKING_WORDS, 6, replace=False).tolist() for _ in range(args.topics)]
+    topics = rng.integers(0, args.topics, args.size)
+
+    codes = [f"ACC-{i:06d}" for i in rng.permutation(args.size)]
+    terms = [arabic_term(rng) for _ in range(args.size)]
+    texts = []
+    for i, topic in enumerate(topics.tolist()):
+        filler = rng.choice(BANKING_WORDS, 40).tolist()
+        words = topic_words[topic] * 2 + filler
+        rng.shuffle(words)
+        texts.append(f"{' '.join(words)} reference {codes[i]} {decorate(terms[i], rng)}")
+
+    embeddings = normalize_rows(centers[topics] + args.doc_noise * rng.standard_normal(
+        (args.size, args.dimension), dtype=np.float32))
+
+    targets = rng.choice(args.size, args.queries, replace=False)
+    queries = {"code": [], "arabic": [], "semantic": []}
+    for target in targets.tolist():
+        topic_query = normalize_rows(centers[topics[target]] + args.doc_noise * rng.standard_normal(
+            (1, args.dimension), dtype=np.float32))[0]
+        queries["code"].append((target, f"{' '.join(topic_words[topics[target]][:2])} {codes[target]}", topic_query))
+        queries["arabic"].append((target, rng.choice(ARABIC_PREFIXES) + terms[target], topic_query))
+        queries["semantic"].append((target, " ".join(rng.choice(PARAPHRASE_WORDS, 8)), None))
+    return {"texts": texts, "embeddings": embeddings, "queries": queries}
+
+
+def semantic_embedding(embeddings: np.ndarray, target: int, noise: float, rng: np.random.Generator) -> np.ndarray:
+    return normalize_rows(embeddings[target:target + 1] + noise * rng.standard_normal(
+        (1, embeddings.shape[1]), dtype=np.float32))[0]
+
+
+def evaluate(search: Callable, query_set: List, embeddings: np.ndarray, noise: float, top_k: int, seed: int):
+    """Recall@k (target found) and per-query latencies for one retriever on one query set."""
+    rng = np.random.default_rng(seed)
+    found, latencies = 0, []
+    for target, text, embedding in query_set:
+        if embedding is None:
+            embedding = semantic_embedding(embeddings, target, noise, rng)
+        start = time.perf_counter()
+        ids = search(text, embedding, top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found += f"chunk_{target}" in ids
+    return found / len(query_set), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid BM25 + dense retrieval benchmark")
+    parser.add_argument("--size", type=int, default=20000, help="Number of chunks")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--doc-noise", type=float, default=0.05, help="Per-dimension spread of chunks around a topic")
+    parser.add_argument("--dense-noise", type=float, default=0.05, help="Semantic query noise, configured model")
+    parser.add_argument("--cheap-noise", type=float, default=0.06, help="Semantic query noise, cheaper model")
+    parser.add_argument("--candidates", type=int, default=20, help="Candidates per retriever before fusion")
+    parser.add_argument("--dense-top-k", type=int, default=5, help="Smaller dense candidate count to compare")
+    parser.add_argument("--rrf-k", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=200, help="Queries per query set")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    rng = np.random.default_rng(args.seed)
+    corpus = build_corpus(rng, args)
+    texts, embeddings = corpus["texts"], corpus["embeddings"]
+    ids = [f"chunk_{i}" for i in range(args.size)]
+    directory = Path(tempfile.mkdtemp(prefix="hybrid_bench_"))
+
+    try:
+        dense = NumpyBackend(str(directory / "dense"), args.dimension)
+        dense.initialize()
+        for offset in range(0, args.size, BATCH_SIZE):
+            batch = slice(offset, offset + BATCH_SIZE)
+            dense.upsert(ids[batch], texts[batch], embeddings[batch], [{}] * len(ids[batch]))
+        dense.flush()
+
+        sparse = SparseIndex(str(directory / "sparse_index.npz"))
+        start = time.perf_counter()
+        for offset in range(0, args.size, BATCH_SIZE):
+            batch = slice(offset, offset + BATCH_SIZE)
+            sparse.add(ids[batch], texts[batch])
+        add_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        sparse.flush()
+        flush_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        SparseIndex(str(directory / "sparse_index.npz")).load()
+        load_seconds = time.perf_counter() - start
+
+        text_bytes = sum(len(text.encode("utf-8")) for text in texts)
+        index_bytes = (directory / "sparse_index.npz").stat().st_size
+        print(f"{args.size} chunks: sparse index add {add_seconds:.2f}s "
+              f"({add_seconds / args.size * 1e6:.0f} us/chunk), flush {flush_seconds:.2f}s, load {load_seconds:.2f}s, "
+              f"{index_bytes / 1e6:.1f} MB on disk ({index_bytes / text_bytes:.2f}x the raw text)\n")
+
+        def dense_search(dense_k: int):
+            def search(text, embedding, top_k):
+                return [doc["id"] for doc in dense.query(embedding, max(dense_k, top_k))][:top_k]
+            return search
+
+        def bm25_search(text, embedding, top_k):
+            return [chunk_id for chunk_id, _ in sparse.search(text, top_k)]
+
+        def hybrid_search(dense_k: int):
+            def search(text, embedding, top_k):
+                candidates = max(args.candidates, top_k)
+                dense_ids = [doc["id"] for doc in dense.query(embedding, dense_k or candidates)]
+                sparse_ids = [chunk_id for chunk_id, _ in sparse.search(text, candidates)]
+                return [chunk_id for chunk_id, _ in reciprocal_rank_fusion(
+                    [dense_ids, sparse_ids], k=args.rrf_k)[:top_k]]
+            return search
+
+        runs = [
+            ("dense", dense_search(args.top_k), args.dense_noise),
+            ("dense (cheap)", dense_search(args.top_k), args.cheap_noise),
+            ("bm25", bm25_search, args.dense_noise),
+            (f"hybrid dense_k={args.candidates}", hybrid_search(args.candidates), args.dense_noise),
+            (f"hybrid dense_k={args.dense_top_k}", hybrid_search(args.dense_top_k), args.dense_noise),
+            (f"hybrid cheap dense_k={args.dense_top_k}", hybrid_search(args.dense_top_k), args.cheap_noise),
+        ]
+
+        sets = list(corpus["queries"])
+        print(f"recall@{args.top_k} ({args.queries} queries per set), latency over all sets")
+        print(f"{'retriever':<26} " + " ".join(f"{name:>9}" for name in sets) + f" {'mean ms':>8} {'p95 ms':>7}")
+        for name, search, noise in runs:
+            recalls, latencies = [], []
+            for query_set in sets:
+                recall, set_latencies = evaluate(
+                    search, corpus["queries"][query_set], embeddings, noise, args.top_k, args.seed)
+                recalls.append(recall)
+                latencies.extend(set_latencies)
+            print(f"{name:<26} " + " ".join(f"{recall:>9.3f}" for recall in recalls)
+                  + f" {np.mean(latencies):>8.2f} {np.percentile(latencies, 95):>7.2f}")
+
+        # Incremental ingest: cost of indexing a new document into the built index
+        start = time.perf_counter()
+        new_ids = [f"new_{i}" for i in range(100)]
+        sparse.add(new_ids, texts[:100])
+        sparse.flush()
+        print(f"\nincremental add + flush of 100 chunks: {(time.perf_counter() - start) * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
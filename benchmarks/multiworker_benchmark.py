@@ -0,0 +1,192 @@
+"""
+Benchmark: banking data and agent sessions served by several worker processes.
+
+Each worker process plays the part of one `uvicorn --workers N` worker:
+it opens the shared state backend, loads the banking data and runs a mix
+of requests against it, with no affinity between workers and data:
+
+  balance  read an account balance (replays new shared operations first)
+  transfer move money between checking and savings (cross-worker lock)
+  session  check a session for turns added elsewhere, then append a turn
+
+The report shows throughput per worker count and checks consistency
+afterwards: checking + savings must be unchanged (transfers only move
+money), every transfer must have left both of its transactions, and no
+session turn may be lost. With `--backend none` each worker keeps its own
+copy of the data (the old behaviour) and the check shows them diverge.
+
+Scaling is bounded by the CPU cores available and by the backend's write
+serialization (SQLite allows one writer at a time).
+
+Usage:
+    python benchmarks/multiworker_benchmark.py
+    python benchmarks/multiworker_benchmark.py --workers 1 2 4 8 --requests 2000
+    python benchmarks/multiworker_benchmark.py --backend redis --redis-url redis://localhost:6379/15
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DATA_FILE = Path(__file__).resolve().parent.parent / "data" / "banking_dummy_data.json"
+TRANSFER_AMOUNT = 1.25
+SESSIONS_PER_WORKER = 20
+
+
+def open_state(backend: str, workdir: str, redis_url: str):
+    from backend.utils.shared_state import RedisSharedState, SQLiteSharedState
+    if backend == "sqlite":
+        return SQLiteSharedState(os.path.join(workdir, "shared_state.sqlite"))
+    if backend == "redis":
+        return RedisSharedState.from_url(redis_url)
+    return None
+
+
+def worker(index: int, args: Dict, barrier, results):
+    """Run one worker's share of requests; report its counts and wall time."""
+    from backend.actions import banking_actions
+    from backend.actions.banking_data import BankingDataManager
+    from backend.agent.session_store import SharedStateSessionStore, turn_hash
+
+    state = open_state(args["backend"], args["workdir"], args["redis_url"])
+    manager = BankingDataManager(state=state)
+    manager.data_file = os.path.join(args["workdir"], "banking.json")
+    manager.load_data()
+    banking_actions.banking_data = manager  # The transfer tool uses the module-level manager
+    store = SharedStateSessionStore(state) if state is not None else None
+
+    rng = random.Random(index)
+    counts = {"balance": 0, "transfer": 0, "session": 0}
+    barrier.wait()
+    start = time.perf_counter()
+    for i in range(args["requests"]):
+        kind = rng.choices(["balance", "transfer", "session"], weights=args["mix"])[0]
+        if kind == "balance":
+            banking_actions.get_account_balance(rng.choice(["checking", "savings"]))
+        elif kind == "transfer":
+            source, dest = rng.sample(["checking", "savings"], 2)
+            result = banking_actions.transfer_funds(source, dest, TRANSFER_AMOUNT)
+            if not result["success"]:
+                continue
+        elif store is not None:
+            session_id = f"w{index}-s{rng.randrange(SESSIONS_PER_WORKER)}"
+            store.turn_count(session_id)
+            user, assistant = f"question {i}", f"answer {i}"
+            store.append_turns(session_id, [(user, assistant, turn_hash(user, assistant))])
+        counts[kind] += 1
+    results.put({"worker": index, "seconds": time.perf_counter() - start, **counts})
+
+
+def check_consistency(args: Dict, totals: Dict, initial: Dict) -> List[str]:
+    """Compare the data every worker now sees with what the requests should have produced."""
+    from backend.actions.banking_data import BankingDataManager
+    from backend.agent.session_store import SharedStateSessionStore
+
+    state = open_state(args["backend"], args["workdir"], args["redis_url"])
+    manager = BankingDataManager(state=state)
+    manager.data_file = os.path.join(args["workdir"], "banking.json")
+    manager.load_data()
+
+    problems = []
+    balances = {acc["type"]: acc["balance"] for acc in manager.get_accounts()}
+    expected_total = initial["checking"] + initial["savings"]
+    actual_total = balances["checking"] + balances["savings"]
+    if abs(actual_total - expected_total) > 1e-6:
+        problems.append(f"checking + savings is {actual_total:.2f}, expected {expected_total:.2f}")
+
+    transfer_txns = sum(1 for txn in manager.data["transactions"] if txn.get("category") == "transfer")
+    expected_txns = initial["transfer_txns"] + 2 * totals["transfer"]
+    if transfer_txns != expected_txns:
+        problems.append(f"{transfer_txns} transfer transactions, expected {expected_txns}")
+
+    if state is not None:
+        store = SharedStateSessionStore(state)
+        turns = sum(
+            store.turn_count(f"w{w}-s{s}") for w in range(args["num_workers"]) for s in range(SESSIONS_PER_WORKER)
+        )
+        if turns != totals["session"]:
+            problems.append(f"{turns} session turns stored, expected {totals['session']}")
+    return problems
+
+
+def run(num_workers: int, args: argparse.Namespace) -> Dict:
+    workdir = tempfile.mkdtemp(prefix="banksight-multiworker-")
+    try:
+        shutil.copy(DATA_FILE, os.path.join(workdir, "banking.json"))
+        data = json.loads(DATA_FILE.read_text(encoding="utf-8"))
+        balances = {acc["type"]: acc["balance"] for acc in data["accounts"]}
+        initial = {
+            "checking": balances["checking"],
+            "savings": balances["savings"],
+            "transfer_txns": sum(1 for txn in data["transactions"] if txn.get("category") == "transfer"),
+        }
+        worker_args = {
+            "backend": args.backend,
+            "workdir": workdir,
+            "redis_url": args.redis_url,
+            "requests": args.requests,
+            "mix": args.mix,
+            "num_workers": num_workers,
+        }
+        if args.backend == "redis":
+            open_state("redis", workdir, args.redis_url)._client.flushdb()
+
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(num_workers)
+        results = context.Queue()
+        processes = [
+            context.Process(target=worker, args=(i, worker_args, barrier, results)) for i in range(num_workers)
+        ]
+        for process in processes:
+            process.start()
+        reports = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        totals = {kind: sum(r[kind] for r in reports) for kind in ("balance", "transfer", "session")}
+        wall = max(r["seconds"] for r in reports)
+        return {
+            "workers": num_workers,
+            "requests": sum(totals.values()),
+            "throughput": sum(totals.values()) / wall,
+            "problems": check_consistency(worker_args, totals, initial),
+            **totals,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per worker")
+    parser.add_argument("--mix", type=float, nargs=3, default=[80, 10, 10], metavar=("BALANCE", "TRANSFER", "SESSION"),
+                        help="Relative weights of the request kinds")
+    parser.add_argument("--backend", choices=["sqlite", "redis", "none"], default="sqlite")
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15", help="Database is flushed first")
+    args = parser.parse_args()
+
+    print(f"backend {args.backend}, {args.requests} requests per worker, mix balance/transfer/session "
+          f"{'/'.join(f'{w:g}' for w in args.mix)}, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'requests':>9} {'req/s':>9} {'speedup':>8} {'consistent':>11}")
+    baseline = None
+    for num_workers in args.workers:
+        result = run(num_workers, args)
+        baseline = baseline or result["throughput"] / num_workers
+        print(f"{num_workers:>7} {result['requests']:>9} {result['throughput']:>9.0f} "
+              f"{result['throughput'] / baseline:>7.2f}x {'yes' if not result['problems'] else 'NO':>11}")
+        for problem in result["problems"]:
+            print(f"        - {problem}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: quantized embedding storage (int8 / PQ) vs. float32.
+
+Builds one NumPy vector store of clustered synthetic embeddings, then
+reopens it with each quantizer (which trains and encodes the codes) and
+reports, per mode:
+  - bytes per chunk of the scanned index and the reduction vs. float32,
+  - training + encoding time,
+  - recall@k against exact float32 search, with and without the exact
+    re-rank of the top top_k * rerank_factor candidates, and
+  - query latency (p50) for both.
+
+Usage:
+    python benchmarks/quantization_benchmark.py
+    python benchmarks/quantization_benchmark.py --size 1000000 --pq-subvectors 48,96
+"""
+import argparse
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.rag.vector_backends import Int8Quantizer, NumpyBackend, ProductQuantizer  # noqa: E402
+from backend.rag.vector_backends.numpy_backend import normalize_rows  # noqa: E402
+from backend.utils.logger import logger  # noqa: E402
+
+BATCH_SIZE = 5000
+
+
+def clustered_embeddings(rng: np.random.Generator, centers: np.ndarray, count: int, noise: float) -> np.ndarray:
+    """Normalized points scattered around randomly chosen centers."""
+    points = centers[rng.integers(0, len(centers), count)]
+    points = points + noise * rng.standard_normal(points.shape, dtype=np.float32)
+    return normalize_rows(points)
+
+
+def run_queries(backend: NumpyBackend, queries: np.ndarray, top_k: int):
+    """Run queries, returning result IDs and the p50 latency in ms."""
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = backend.query(query, top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([hit["id"] for hit in hits])
+    return results, float(np.percentile(latencies, 50))
+
+
+def recall_at_k(results: List[List[str]], truth: List[List[str]]) -> float:
+    found = sum(len(set(r) & set(t)) for r, t in zip(results, truth))
+    return found / max(sum(len(t) for t in truth), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized vector storage benchmark")
+    parser.add_argument("--size", type=int, default=100000, help="Number of chunks")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=2000, help="Topics in the synthetic data")
+    parser.add_argument("--noise", type=float, default=0.04, help="Per-dimension spread around each topic")
+    parser.add_argument("--pq-subvectors", default="48,96", help="Comma-separated PQ code sizes to test")
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    rng = np.random.default_rng(args.seed)
+    centers = normalize_rows(rng.standard_normal((args.clusters, args.dimension), dtype=np.float32))
+    directory = Path(tempfile.mkdtemp(prefix="quant_bench_"))
+
+    try:
+        store = NumpyBackend(str(directory), args.dimension)
+        store.initialize()
+        for offset in range(0, args.size, BATCH_SIZE):
+            count = min(BATCH_SIZE, args.size - offset)
+            ids = [f"chunk_{i}" for i in range(offset, offset + count)]
+            store.upsert(ids, [""] * count, clustered_embeddings(rng, centers, count, args.noise), [{}] * count)
+        store.flush()
+        del store
+
+        queries = clustered_embeddings(rng, centers, args.queries, args.noise)
+        exact = NumpyBackend(str(directory), args.dimension)
+        exact.initialize()
+        truth, exact_p50 = run_queries(exact, queries, args.top_k)
+        float_bytes = 4 * args.dimension
+        print(f"{args.size} chunks, dimension {args.dimension}, recall@{args.top_k}, "
+              f"re-rank of top {args.top_k * args.rerank_factor}\n")
+
+        header = (f"{'mode':<10} {'bytes':>6} {'smaller':>8} {'build s':>8} {'recall':>7} {'p50 ms':>7} "
+                  f"{'recall+rr':>10} {'p50+rr ms':>10}")
+        print(header)
+        print(f"{'float32':<10} {float_bytes:>6} {1.0:>7.1f}x {'-':>8} {1.0:>7.3f} {exact_p50:>7.2f} "
+              f"{'-':>10} {'-':>10}")
+
+        quantizers = [("int8", Int8Quantizer(args.dimension))]
+        for subvectors in [int(value) for value in args.pq_subvectors.split(",")]:
+            quantizers.append((f"pq{subvectors}", ProductQuantizer(args.dimension, subvectors, min_rows=0)))
+
+        for name, quantizer in quantizers:
+            start = time.perf_counter()
+            backend = NumpyBackend(str(directory), args.dimension, quantizer=quantizer, rerank_factor=0)
+            backend.initialize()  # trains (PQ) and encodes every row
+            build_seconds = time.perf_counter() - start
+
+            results, p50 = run_queries(backend, queries, args.top_k)
+            backend.rerank_factor = args.rerank_factor
+            reranked, reranked_p50 = run_queries(backend, queries, args.top_k)
+            print(f"{name:<10} {quantizer.code_size:>6} {float_bytes / quantizer.code_size:>7.1f}x "
+                  f"{build_seconds:>8.1f} {recall_at_k(results, truth):>7.3f} {p50:>7.2f} "
+                  f"{recall_at_k(reranked, truth):>10.3f} {reranked_p50:>10.2f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
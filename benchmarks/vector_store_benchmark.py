@@ -0,0 +1,143 @@
+"""
+Benchmark: NumPy (memory-mapped) vector backend vs. ChromaDB.
+
+For each collection size, fills both backends with random normalized
+embeddings (with chunk-like texts and metadata), then measures
+  - build time (batched upserts plus flush),
+  - startup time: opening the persisted store in a fresh backend instance
+    up to the first answered query, and
+  - query latency (p50/p95/mean over --queries random queries).
+ChromaDB is skipped if it is not installed. Stores are written to a
+temporary directory (or --dir) and removed afterwards unless --keep.
+
+1M chunks at 384 dimensions need about 1.5 GB of disk per backend and take
+a long time to build with ChromaDB.
+
+Usage:
+    python benchmarks/vector_store_benchmark.py
+    python benchmarks/vector_store_benchmark.py --sizes 10000,100000,1000000 --backends numpy
+"""
+import argparse
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.rag.vector_backends import ChromaBackend, NumpyBackend, VectorBackend  # noqa: E402
+from backend.utils.logger import logger  # noqa: E402
+
+BATCH_SIZE = 5000
+
+
+def random_embeddings(rng: np.random.Generator, count: int, dimension: int) -> np.ndarray:
+    embeddings = rng.standard_normal((count, dimension), dtype=np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def build(backend: VectorBackend, size: int, dimension: int, seed: int) -> float:
+    """Fill a backend with `size` chunks; returns seconds taken."""
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    for offset in range(0, size, BATCH_SIZE):
+        count = min(BATCH_SIZE, size - offset)
+        ids = [f"chunk_{i}" for i in range(offset, offset + count)]
+        texts = [f"Synthetic banking chunk {i} about fees, transfers and accounts." for i in range(offset, offset + count)]
+        metadatas = [
+            {"filename": f"doc_{i // 50}.pdf", "file_path": f"data/documents/doc_{i // 50}.pdf",
+             "chunk_index": i % 50, "page": i % 50 // 5 + 1}
+            for i in range(offset, offset + count)
+        ]
+        backend.upsert(ids, texts, random_embeddings(rng, count, dimension), metadatas)
+    backend.flush()
+    return time.perf_counter() - start
+
+
+def measure_startup(factory: Callable[[], VectorBackend], query: np.ndarray) -> float:
+    """Seconds from a fresh backend instance to its first query result."""
+    start = time.perf_counter()
+    backend = factory()
+    backend.initialize()
+    backend.query(query, 5)
+    return time.perf_counter() - start
+
+
+def measure_queries(backend: VectorBackend, queries: np.ndarray, top_k: int) -> Dict:
+    """Per-query latency percentiles in milliseconds."""
+    backend.query(queries[0], top_k)  # warm-up
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        backend.query(query, top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "mean": float(np.mean(latencies))
+    }
+
+
+def backend_factories(backends: List[str], root: Path, dimension: int) -> Dict[str, Callable[[], VectorBackend]]:
+    factories = {}
+    if "numpy" in backends:
+        factories["numpy"] = lambda: NumpyBackend(str(root / "numpy"), dimension)
+    if "chromadb" in backends:
+        factories["chromadb"] = lambda: ChromaBackend(str(root / "chroma"), "benchmark")
+    return factories
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector backend benchmark")
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated collection sizes")
+    parser.add_argument("--backends", default="numpy,chromadb", help="Comma-separated backends to run")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--dir", help="Directory for the stores (default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep the stores afterwards")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    backends = [name.strip() for name in args.backends.split(",")]
+    if "chromadb" in backends:
+        try:
+            import chromadb  # noqa: F401
+        except ImportError:
+            print("chromadb is not installed, skipping it\n")
+            backends.remove("chromadb")
+    queries = random_embeddings(np.random.default_rng(args.seed + 1), args.queries, args.dimension)
+
+    print(f"{'backend':<10} {'chunks':>9} {'build s':>9} {'startup s':>10} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    base = Path(args.dir) if args.dir else Path(tempfile.mkdtemp(prefix="vector_bench_"))
+    for size in sizes:
+        root = base / str(size)
+        try:
+            for name, factory in backend_factories(backends, root, args.dimension).items():
+                backend = factory()
+                backend.initialize()
+                build_seconds = build(backend, size, args.dimension, args.seed)
+                latency = measure_queries(backend, queries, args.top_k)
+                del backend
+
+                startup = measure_startup(factory, queries[0])
+                print(f"{name:<10} {size:>9} {build_seconds:>9.1f} {startup:>10.3f} "
+                      f"{latency['p50']:>8.2f} {latency['p95']:>8.2f} {latency['mean']:>8.2f}")
+        finally:
+            if not args.keep:
+                shutil.rmtree(root, ignore_errors=True)
+    if not args.dir and not args.keep:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
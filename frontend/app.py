@@ -2,7 +2,7 @@
 Streamlit frontend for Libya Banks AI.
 """
 import streamlit as st
-from utils.api_client import api_client
+from utils.api_client import api_client, STREAMING_ENABLED
 from pathlib import Path
 import time
 
@@ -46,6 +46,43 @@ if "session_id" not in st.session_state:
     import uuid
     st.session_state.session_id = str(uuid.uuid4())
 
+if "active_jobs" not in st.session_state:
+    st.session_state.active_jobs = []
+
+
+@st.fragment(run_every=2)
+def show_ingestion_jobs():
+    """Poll the backend for active ingestion jobs and show their progress."""
+    for job_id in list(st.session_state.active_jobs):
+        job = api_client.get_job(job_id)
+        status = job.get("status")
+        progress = job.get("progress", {})
+        files_total = progress.get("files_total", 0)
+        files_done = progress.get("files_done", 0)
+
+        st.caption(job.get("description", job_id))
+
+        if status in ("queued", "running"):
+            st.progress(files_done / files_total if files_total else 0.0)
+            details = f"{files_done}/{files_total} files · {progress.get('chunks_embedded', 0)} chunks embedded"
+            if job.get("eta_s") is not None:
+                details += f" · ETA {job['eta_s']:.0f}s"
+            st.caption(details if status == "running" else "Queued...")
+            if st.button("✖️ Cancel", key=f"cancel_{job_id}"):
+                api_client.cancel_job(job_id)
+            continue
+
+        st.session_state.active_jobs.remove(job_id)
+        result = job.get("result") or {}
+        if status == "completed":
+            st.success(f"✅ Processed {result.get('processed', 0)} documents ({result.get('total_chunks', 0)} chunks)")
+            if result.get("skipped"):
+                st.caption(f"Unchanged (skipped): {result['skipped']}")
+        elif status == "cancelled":
+            st.warning("Processing cancelled")
+        else:
+            st.error(f"❌ {job.get('error', 'Processing failed')}")
+
 # Header
 st.markdown('<div class="main-header">🏦 Libya Banks AI</div>', unsafe_allow_html=True)
 st.markdown('<div class="sub-header">Your Intelligent Banking Assistant</div>', unsafe_allow_html=True)
@@ -76,26 +113,27 @@ with st.sidebar:
 
     if uploaded_file is not None:
         if st.button("📤 Upload & Process"):
-            with st.spinner("Uploading and processing document..."):
+            with st.spinner("Uploading document..."):
                 result = api_client.upload_document(uploaded_file)
 
                 if result.get("success"):
                     st.success(f"✅ {result.get('message')}")
-                    st.info(f"Chunks created: {result.get('chunks', 0)}")
+                    st.session_state.active_jobs.append(result["job_id"])
                 else:
                     st.error(f"❌ {result.get('message')}")
 
     # Process existing documents
     st.subheader("Process Documents")
     if st.button("🔄 Process All Documents"):
-        with st.spinner("Processing all documents in data/documents/..."):
-            result = api_client.process_all_documents()
+        result = api_client.process_all_documents()
 
-            if result.get("success"):
-                st.success(f"✅ Processed {result.get('processed', 0)} documents")
-                st.info(f"Total chunks: {result.get('total_chunks', 0)}")
-            else:
-                st.error(f"❌ {result.get('message')}")
+        if result.get("success"):
+            st.session_state.active_jobs.append(result["job_id"])
+        else:
+            st.error(f"❌ {result.get('message')}")
+
+    # Progress of background processing jobs
+    show_ingestion_jobs()
 
     # List documents
     with st.expander("📄 View Documents"):
@@ -166,15 +204,29 @@ if prompt := st.chat_input("Ask me anything about banking..."):
     # Get response from API
     with st.chat_message("assistant"):
         with st.spinner("Thinking..."):
-            response_data = api_client.chat(prompt, st.session_state.session_id)
+            if STREAMING_ENABLED:
+                # Render tokens as they arrive; the final frame carries sources/metadata
+                response_data = {}
+
+                def token_stream():
+                    for frame in api_client.chat_stream(prompt, st.session_state.session_id):
+                        if frame.get("type") == "token":
+                            yield frame.get("content", "")
+                        elif frame.get("type") == "final":
+                            response_data.update(frame)
+
+                st.write_stream(token_stream())
+            else:
+                response_data = api_client.chat(prompt, st.session_state.session_id)
 
             if response_data.get("success"):
                 response_text = response_data.get("response", "No response")
                 intent = response_data.get("intent", "unknown")
                 sources = response_data.get("sources", [])
 
-                # Display response
-                st.markdown(response_text)
+                # Display response (already rendered token by token when streaming)
+                if not STREAMING_ENABLED:
+                    st.markdown(response_text)
 
                 # Display sources if available
                 if sources:
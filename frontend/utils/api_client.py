@@ -1,8 +1,9 @@
 """
 API client for communicating with FastAPI backend.
 """
+import json
 import requests
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 import yaml
 from pathlib import Path
 
@@ -13,6 +14,7 @@ with open(config_path, "r", encoding="utf-8") as f:
     config = yaml.safe_load(f)
 
 BACKEND_URL = config["frontend"]["backend_url"]
+STREAMING_ENABLED = config.get("agent", {}).get("enable_streaming", False)
 
 
 class APIClient:
@@ -39,8 +41,36 @@ class APIClient:
                 "sources": []
             }
 
+    def chat_stream(self, message: str, session_id: str = "default") -> Iterator[Dict]:
+        """
+        Send chat message to the streaming endpoint.
+
+        Yields 'token' frames as they arrive, then one 'final' frame with
+        the same fields as chat().
+        """
+        try:
+            with requests.post(
+                f"{self.base_url}/api/chat/stream",
+                json={"message": message, "session_id": session_id},
+                stream=True,
+                timeout=120  # Applies per read, not to the whole stream
+            ) as response:
+                response.raise_for_status()
+                response.encoding = "utf-8"
+                for line in response.iter_lines(decode_unicode=True):
+                    if line and line.startswith("data: "):
+                        yield json.loads(line[len("data: "):])
+        except Exception as e:
+            yield {
+                "type": "final",
+                "success": False,
+                "response": f"Error connecting to backend: {str(e)}",
+                "intent": "error",
+                "sources": []
+            }
+
     def upload_document(self, file) -> Dict:
-        """Upload a document."""
+        """Upload a document; processing runs as a background job."""
         try:
             files = {"file": file}
             response = requests.post(
@@ -66,11 +96,11 @@ class APIClient:
             return {"documents": [], "error": str(e)}
 
     def process_all_documents(self) -> Dict:
-        """Process all documents in upload directory."""
+        """Queue processing of all documents in upload directory."""
         try:
             response = requests.post(
                 f"{self.base_url}/api/documents/process-all",
-                timeout=300
+                timeout=30
             )
             response.raise_for_status()
             return response.json()
@@ -80,6 +110,33 @@ class APIClient:
                 "message": f"Processing failed: {str(e)}"
             }
 
+    def get_job(self, job_id: str) -> Dict:
+        """Get an ingestion job's status and progress."""
+        try:
+            response = requests.get(f"{self.base_url}/api/jobs/{job_id}", timeout=5)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            return {"job_id": job_id, "status": "unknown", "error": str(e)}
+
+    def list_jobs(self) -> Dict:
+        """List ingestion jobs, newest first."""
+        try:
+            response = requests.get(f"{self.base_url}/api/jobs", timeout=5)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            return {"jobs": [], "error": str(e)}
+
+    def cancel_job(self, job_id: str) -> Dict:
+        """Cancel an ingestion job."""
+        try:
+            response = requests.post(f"{self.base_url}/api/jobs/{job_id}/cancel", timeout=5)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            return {"job_id": job_id, "status": "unknown", "error": str(e)}
+
     def health_check(self) -> Dict:
         """Check backend health."""
         try:
@@ -0,0 +1,40 @@
+"""
+Tests for the semantic answer cache.
+"""
+import numpy as np
+
+from backend.rag.answer_cache import SemanticAnswerCache
+from backend.utils.shared_state import SQLiteSharedState
+
+QUESTION = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+DOCUMENTS = [{"id": "chunk_0", "metadata": {"file_path": "fees.pdf"}}]
+
+
+def _store(cache, epoch):
+    cache.store("overdraft fee?", QUESTION, "35 dollars", [], DOCUMENTS, epoch=epoch)
+
+
+def test_answer_invalidated_while_generated_is_not_stored():
+    cache = SemanticAnswerCache(dimension=4, max_entries=4)
+    cached, epoch = cache.lookup(QUESTION)
+    assert cached is None
+
+    cache.invalidate_files(["fees.pdf"])  # Re-ingested during generation
+    _store(cache, epoch)
+    assert cache.lookup(QUESTION)[0] is None
+    assert cache.get_stats()["stale_stores"] == 1
+
+    _, epoch = cache.lookup(QUESTION)
+    _store(cache, epoch)
+    assert cache.lookup(QUESTION)[0]["answer"] == "35 dollars"
+
+
+def test_invalidation_on_another_worker_discards_the_store(tmp_path):
+    path = str(tmp_path / "state.sqlite")
+    cache = SemanticAnswerCache(dimension=4, max_entries=4, state=SQLiteSharedState(path))
+    other = SemanticAnswerCache(dimension=4, max_entries=4, state=SQLiteSharedState(path))
+
+    _, epoch = cache.lookup(QUESTION)
+    other.invalidate_chunks(["chunk_0"])
+    _store(cache, epoch)
+    assert cache.lookup(QUESTION)[0] is None
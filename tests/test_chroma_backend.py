@@ -0,0 +1,54 @@
+"""
+Tests for the ChromaDB vector backend.
+"""
+import pytest
+
+pytest.importorskip("chromadb")
+
+from backend.rag.vector_backends import chroma_backend  # noqa: E402
+from backend.rag.vector_backends.chroma_backend import ChromaBackend  # noqa: E402
+
+HNSW = {"hnsw:search_ef": 64, "hnsw:construction_ef": 200, "hnsw:M": 16}
+
+
+def _open(path, hnsw) -> ChromaBackend:
+    backend = ChromaBackend(str(path), "test_collection", hnsw)
+    backend.initialize()
+    return backend
+
+
+def test_changed_hnsw_settings_are_reported(tmp_path, monkeypatch):
+    warnings = []
+    monkeypatch.setattr(chroma_backend.logger, "warning", warnings.append)
+
+    _open(tmp_path, HNSW).close()
+    _open(tmp_path, HNSW).close()
+    assert warnings == []
+
+    _open(tmp_path, {**HNSW, "hnsw:M": 32}).close()
+    assert len(warnings) == 1
+    assert "hnsw:M 16 (configured 32)" in warnings[0]
+
+
+def test_l2_collection_is_reported_and_scored_by_cosine(tmp_path, monkeypatch):
+    import chromadb
+    import numpy as np
+
+    # A collection built before cosine distance was configured (Chroma's default l2)
+    client = chromadb.PersistentClient(path=str(tmp_path))
+    client.create_collection(name="test_collection").add(
+        ids=["a", "b"], documents=["alpha", "beta"], embeddings=[[3.0, 0.0], [0.0, 2.0]]
+    )
+    client.clear_system_cache()
+
+    warnings = []
+    monkeypatch.setattr(chroma_backend.logger, "warning", warnings.append)
+    backend = _open(tmp_path, {})
+    assert backend.space == "l2"
+    assert any("hnsw:space 'l2'" in warning for warning in warnings)
+
+    results = backend.query(np.array([1.0, 0.0]), top_k=2)
+    assert [doc["id"] for doc in results] == ["a", "b"]
+    assert results[0]["score"] == pytest.approx(0.0, abs=1e-6)
+    assert results[1]["score"] == pytest.approx(1.0, abs=1e-6)
+    backend.close()
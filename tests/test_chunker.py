@@ -0,0 +1,13 @@
+"""
+Tests for the streaming chunker.
+"""
+from backend.rag.chunker import chunk_text
+
+
+def test_boundary_inside_the_overlap_is_not_reused():
+    chunks = chunk_text("Intro line. " + "x" * 2000, chunk_size=500, chunk_overlap=50)
+
+    # Not 'Intro line.', 'ntro line.', 'tro line.', ... before the real chunks
+    assert chunks[0].startswith("Intro line. xxx")
+    assert len(chunks) == 5
+    assert all(len(chunk) <= 500 for chunk in chunks)
@@ -0,0 +1,28 @@
+"""
+Tests for the classic agent's per-session conversation history.
+"""
+from backend.agent.conversation_history import SharedConversationHistories
+from backend.utils.shared_state import SQLiteSharedState
+
+
+def _turn(i):
+    return {"user": f"question {i}", "assistant": f"answer {i}"}
+
+
+def test_shared_history_is_seen_by_every_worker(tmp_path):
+    path = str(tmp_path / "state.sqlite")
+    first = SharedConversationHistories(SQLiteSharedState(path), max_turns=3)
+    second = SharedConversationHistories(SQLiteSharedState(path), max_turns=3)
+
+    for i in range(2):
+        first.append("s1", _turn(i))
+    second.append("s1", _turn(2))
+    second.append("s1", _turn(3))
+
+    # Capped at the last max_turns, whichever worker added them
+    assert first.get("s1") == [_turn(1), _turn(2), _turn(3)]
+    assert second.get_metrics()["sessions"] == 1
+
+    assert second.clear("s1") is True
+    assert first.get("s1") == []
+    assert first.clear("s1") is False
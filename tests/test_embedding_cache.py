@@ -0,0 +1,56 @@
+"""
+Tests for the persistent embedding cache shared by several processes.
+"""
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from backend.rag.embedding_cache import EmbeddingCache, fcntl
+
+DIMENSION = 8
+
+
+def _embedding(text: str) -> np.ndarray:
+    seed = int.from_bytes(text.encode("utf-8"), "little") % (2**32)
+    return np.random.default_rng(seed).standard_normal(DIMENSION).astype(np.float32)
+
+
+def _writer(cache_dir: str, worker: int):
+    cache = EmbeddingCache(cache_dir, "test-model", DIMENSION)
+    for batch in range(40):
+        texts = [f"chunk {(worker * 37 + batch * 7 + i) % 600}" for i in range(25)]
+        cache.put_many(texts, np.stack([_embedding(text) for text in texts]))
+
+
+def test_round_trip_and_reload(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "test-model", DIMENSION)
+    texts = ["alpha", "beta", "alpha"]
+    cache.put_many(texts, np.stack([_embedding(text) for text in texts]))
+
+    reopened = EmbeddingCache(str(tmp_path), "test-model", DIMENSION)
+    embeddings, misses = reopened.get_many(["alpha", "beta", "gamma"])
+    assert misses == [2]
+    assert np.allclose(embeddings[0], _embedding("alpha"))
+    assert np.allclose(embeddings[1], _embedding("beta"))
+    assert reopened.get_stats()["chunks"]["entries"] == 2
+
+
+@pytest.mark.skipif(fcntl is None, reason="cross-process locking needs fcntl")
+def test_concurrent_processes_never_share_rows(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_writer, args=(str(tmp_path), w)) for w in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    cache = EmbeddingCache(str(tmp_path), "test-model", DIMENSION)
+    texts = [f"chunk {i}" for i in range(600)]
+    embeddings, misses = cache.get_many(texts)
+    stored = [(text, emb) for text, emb in zip(texts, embeddings) if emb is not None]
+    assert stored
+    assert all(np.allclose(emb, _embedding(text)) for text, emb in stored)
+    rows = list(cache._index.values())
+    assert len(rows) == len(set(rows)) == len(stored)
@@ -0,0 +1,28 @@
+"""
+Tests for the background ingestion job manager.
+"""
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("sentence_transformers")
+
+from backend.rag import ingestion_jobs  # noqa: E402
+from backend.rag.ingestion_jobs import JobManager  # noqa: E402
+from backend.utils.shared_state import SQLiteSharedState  # noqa: E402
+
+
+def test_shutdown_leaves_other_workers_jobs_alone(tmp_path):
+    state = SQLiteSharedState(str(tmp_path / "state.sqlite"))
+    # A job another worker is still running
+    state.set(ingestion_jobs._JOB_KEY.format("remote"), json.dumps({"job_id": "remote", "status": "running"}))
+    state.append(ingestion_jobs._JOB_LOG_KEY, "remote")
+
+    manager = JobManager(state=state)
+    assert [job.job_id for job in manager.list()] == ["remote"]
+
+    manager.shutdown()
+
+    assert json.loads(state.get(ingestion_jobs._JOB_KEY.format("remote")))["status"] == "running"
+    assert state.get(ingestion_jobs._CANCEL_KEY.format("remote")) is None
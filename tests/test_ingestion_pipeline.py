@@ -0,0 +1,67 @@
+"""
+Tests for the staged ingestion pipeline.
+
+A dict-backed vector store and a constant embedder stand in for the real
+ones; parsing runs in the real worker pool.
+"""
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from backend.rag import ingestion, ingestion_pipeline  # noqa: E402
+from backend.rag.ingestion import DocumentIngestor, IngestionManifest  # noqa: E402
+from backend.rag.ingestion_pipeline import IngestionCancelled, IngestionPipeline  # noqa: E402
+
+
+class FakeVectorStore:
+    def __init__(self, on_write=None):
+        self.chunks = {"unrelated": {"file_path": "other.txt"}}
+        self.on_write = on_write
+
+    def add_embeddings(self, ids, texts, embeddings, metadatas):
+        self.chunks.update(zip(ids, metadatas))
+        if self.on_write is not None:
+            self.on_write()
+
+    def delete_ids(self, ids):
+        for chunk_id in ids:
+            self.chunks.pop(chunk_id, None)
+
+    def delete_by_file(self, file_path):
+        self.chunks = {k: m for k, m in self.chunks.items() if m.get("file_path") != file_path}
+
+    def flush(self):
+        pass
+
+    def count(self):
+        return len(self.chunks)
+
+
+class FakeEmbedder:
+    def encode(self, texts):
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+
+def test_cancelled_run_discards_chunks_of_the_file_in_flight(tmp_path, monkeypatch):
+    cancel = threading.Event()
+    store = FakeVectorStore(on_write=cancel.set)  # Cancel right after the first batch lands
+    monkeypatch.setattr(ingestion, "vector_store", store)
+    monkeypatch.setattr(ingestion_pipeline, "vector_store", store)
+    monkeypatch.setattr(ingestion_pipeline, "embedding_model", FakeEmbedder())
+
+    document = tmp_path / "docs" / "long.txt"
+    document.parent.mkdir()
+    document.write_text("\n\n".join(f"Paragraph {i}. " + "Account fees apply. " * 30 for i in range(60)))
+    ingestor = DocumentIngestor(IngestionManifest(str(tmp_path / "manifest.json")))
+    before = store.count()
+
+    pipeline = IngestionPipeline(ingestor=ingestor, workers=1, embed_batch_size=2, queue_size=1)
+    with pytest.raises(IngestionCancelled):
+        pipeline.run(str(document.parent), cancel_event=cancel)
+
+    assert cancel.is_set()
+    assert store.count() == before
+    assert ingestor.manifest.get(str(document)) is None
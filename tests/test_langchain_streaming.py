@@ -0,0 +1,81 @@
+"""
+Token streaming through the LangChain agent (/api/chat/stream).
+
+ChatGroq is replaced by a fake chat model that streams its reply word by
+word only when the model is configured to stream, as LangChain decides
+for the real ChatGroq.
+"""
+import asyncio
+import os
+from typing import Any, Optional
+
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_groq")
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel  # noqa: E402
+
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+from backend.agent import langchain_agent  # noqa: E402
+
+REPLY = "Your checking balance is 5430.50 dollars"
+
+
+class FakeChatGroq(GenericFakeChatModel):
+    """Accepts ChatGroq's constructor arguments; answers REPLY without tool calls."""
+
+    groq_api_key: Any = None
+    model_name: str = "fake"
+    temperature: float = 0.0
+    max_tokens: Optional[int] = None
+    http_client: Any = None
+    http_async_client: Any = None
+    streaming: bool = False
+
+    def __init__(self, **kwargs):
+        super().__init__(messages=iter([REPLY] * 10), **kwargs)
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(langchain_agent, "ChatGroq", FakeChatGroq)
+    manager = langchain_agent.SessionManager(store=None)
+    return manager.get("streaming-test")
+
+
+def collect(agent, message):
+    async def run():
+        return [frame async for frame in agent.stream(message)]
+    return asyncio.run(run())
+
+
+def test_llm_is_created_streaming(agent):
+    assert agent.components.llm.streaming is True
+
+
+def test_tokens_arrive_before_final_frame(agent):
+    frames = collect(agent, "What is my balance?")
+
+    tokens = [frame for frame in frames if frame["type"] == "token"]
+    assert len(tokens) > 1
+    assert frames[-1]["type"] == "final"
+    assert all(frame["type"] == "token" for frame in frames[:-1])
+    assert frames[-1]["success"] is True
+    assert "".join(frame["content"] for frame in tokens) == REPLY
+    assert frames[-1]["response"] == REPLY
+
+
+def test_turn_is_recorded_when_the_client_goes_away(agent):
+    async def run():
+        frames = agent.stream("What is my balance?")
+        assert (await frames.__anext__())["type"] == "token"
+        await frames.aclose()  # Client disconnected after the first token
+        await asyncio.gather(*langchain_agent._abandoned_runs)
+
+    asyncio.run(run())
+    assert agent.memory.messages()[-1].content == REPLY
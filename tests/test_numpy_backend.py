@@ -0,0 +1,75 @@
+"""
+Tests for the NumPy vector backend.
+"""
+import random
+import threading
+
+import numpy as np
+
+from backend.rag.vector_backends.numpy_backend import NumpyBackend
+
+DIMENSION = 16
+
+
+def _add(backend: NumpyBackend, rng: np.random.Generator, start: int, count: int):
+    rows = range(start, start + count)
+    backend.upsert(
+        [f"chunk-{i}" for i in rows],
+        [f"text {i}" for i in rows],
+        rng.standard_normal((count, DIMENSION)).astype(np.float32),
+        [{"i": i} for i in rows]
+    )
+
+
+def test_query_returns_nearest_rows(tmp_path):
+    backend = NumpyBackend(str(tmp_path), DIMENSION)
+    backend.initialize()
+    _add(backend, np.random.default_rng(0), 0, 200)
+
+    target = backend.get_embeddings(["chunk-42"])[0]
+    results = backend.query(target, 5)
+    assert results[0]["id"] == "chunk-42"
+    assert results[0]["text"] == "text 42"
+    assert abs(results[0]["score"]) < 1e-5
+    assert [r["score"] for r in results] == sorted(r["score"] for r in results)
+
+
+def test_queries_stay_consistent_during_compaction(tmp_path):
+    backend = NumpyBackend(str(tmp_path), DIMENSION)
+    backend.initialize()
+    rng = np.random.default_rng(0)
+    _add(backend, rng, 0, 2000)
+
+    stop = threading.Event()
+    errors = []
+
+    def reader(seed: int):
+        queries = np.random.default_rng(seed)
+        while not stop.is_set():
+            try:
+                for doc in backend.query(queries.standard_normal(DIMENSION).astype(np.float32), 10):
+                    i = doc["metadata"]["i"]
+                    assert doc["id"] == f"chunk-{i}" and doc["text"] == f"text {i}"
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(repr(e))
+                stop.set()
+
+    readers = [threading.Thread(target=reader, args=(seed,)) for seed in range(3)]
+    for thread in readers:
+        thread.start()
+
+    picker = random.Random(0)
+    added = 2000
+    for _ in range(10):
+        # Deleting this many rows makes flushes compact (renumber) the store
+        backend.delete_ids([f"chunk-{i}" for i in picker.sample(range(added), 1000)])
+        backend.flush()
+        _add(backend, rng, added, 1000)
+        added += 1000
+        backend.flush()
+
+    stop.set()
+    for thread in readers:
+        thread.join()
+    assert errors == []
+    assert backend._layout > 0  # At least one compaction ran during the queries
@@ -0,0 +1,27 @@
+"""
+Tests for retrieval post-processing.
+"""
+import numpy as np
+
+from backend.rag.postprocessing import postprocess_results
+
+
+def _candidates(*scores):
+    return [{"id": str(i), "text": str(i), "metadata": {}, "score": score} for i, score in enumerate(scores)]
+
+
+def test_candidates_without_stored_embeddings_keep_their_dense_score():
+    query = np.array([1.0, 0.0], dtype=np.float32)
+
+    # None of the chunks exist any more: a zero-width embedding matrix
+    documents = postprocess_results(
+        _candidates(0.1, 0.9), query, np.zeros((2, 0), dtype=np.float32), top_k=2, similarity_threshold=0.5
+    )
+    assert [doc["id"] for doc in documents] == ["0"]
+
+    # One chunk deleted since the search, the other re-scored from its embedding
+    embeddings = np.array([[0.0, 0.0], [1.0, 0.0]], dtype=np.float32)
+    documents = postprocess_results(
+        _candidates(0.2, 0.9), query, embeddings, top_k=2, similarity_threshold=0.5, mmr=False
+    )
+    assert [doc["id"] for doc in documents] == ["0", "1"]
@@ -0,0 +1,113 @@
+"""
+Tests for the NumPy backend's embedding quantizers.
+"""
+import numpy as np
+import pytest
+
+from backend.rag.vector_backends.quantization import (
+    Int8Quantizer, ProductQuantizer, create_quantizer, load_quantizer, save_quantizer
+)
+
+DIMENSION = 32
+
+
+def _normalized(count: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _recall(quantizer, vectors: np.ndarray, queries: np.ndarray, k: int, candidates: int) -> float:
+    """Share of the exact top k found among the quantizer's best candidates."""
+    codes = quantizer.encode(vectors)
+    found = 0
+    for query in queries:
+        exact = np.argsort(-(vectors @ query))[:k]
+        approximate = np.argsort(-quantizer.scores(query, codes))[:candidates]
+        found += len(np.intersect1d(exact, approximate))
+    return found / (k * len(queries))
+
+
+def test_int8_round_trip():
+    quantizer = Int8Quantizer(DIMENSION)
+    vectors = _normalized(100, seed=0)
+    vectors[0] = 0.0  # A zero vector must not divide by a zero scale
+
+    codes = quantizer.encode(vectors)
+    assert codes.shape == (100, quantizer.code_size) and codes.dtype == np.uint8
+
+    values = codes[:, :DIMENSION].view(np.int8).astype(np.float32)
+    scales = np.ascontiguousarray(codes[:, DIMENSION:]).view(np.float32)
+    decoded = values * scales
+    assert np.all(np.abs(decoded - vectors) <= scales / 2 + 1e-6)
+    assert np.array_equal(decoded[0], np.zeros(DIMENSION))
+
+
+def test_int8_scores_match_inner_products():
+    quantizer = Int8Quantizer(DIMENSION)
+    # More rows than one scoring block
+    vectors = _normalized(1500, seed=1)
+    query = _normalized(1, seed=2)[0]
+
+    scores = quantizer.scores(query, quantizer.encode(vectors))
+    assert np.allclose(scores, vectors @ query, atol=0.02)
+
+
+def test_int8_recall():
+    quantizer = Int8Quantizer(DIMENSION)
+    assert _recall(quantizer, _normalized(2000, seed=3), _normalized(20, seed=4), k=10, candidates=10) >= 0.9
+
+
+def test_pq_training_and_round_trip():
+    quantizer = ProductQuantizer(DIMENSION, subvectors=8, min_rows=500)
+    assert not quantizer.trained
+    assert not quantizer.needs_training(499)
+    assert quantizer.needs_training(500)
+
+    vectors = _normalized(3000, seed=5)
+    quantizer.train(vectors)
+    assert quantizer.trained and not quantizer.needs_training(3000)
+
+    codes = quantizer.encode(vectors)
+    assert codes.shape == (3000, 8) and codes.dtype == np.uint8
+    decoded = np.concatenate([quantizer.codebooks[j][codes[:, j]] for j in range(8)], axis=1)
+    # Each piece is replaced by its nearest centroid
+    error = np.linalg.norm(decoded - vectors, axis=1)
+    assert error.mean() < 0.5 * np.linalg.norm(vectors - vectors.mean(axis=0), axis=1).mean()
+
+    query = _normalized(1, seed=6)[0]
+    assert np.allclose(quantizer.scores(query, codes), decoded @ query, atol=1e-4)
+
+
+def test_pq_recall_with_rerank_candidates():
+    quantizer = ProductQuantizer(DIMENSION, subvectors=8, min_rows=500)
+    vectors = _normalized(3000, seed=7)
+    quantizer.train(vectors)
+    # The backend re-ranks the best PQ candidates exactly
+    assert _recall(quantizer, vectors, _normalized(20, seed=8), k=10, candidates=100) >= 0.9
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / "quantizer.npz"
+    trained = ProductQuantizer(DIMENSION, subvectors=8, min_rows=500)
+    trained.train(_normalized(1000, seed=9))
+    save_quantizer(trained, path, generation=3, encoded_rows=1000)
+
+    restored = ProductQuantizer(DIMENSION, subvectors=8, min_rows=500)
+    assert load_quantizer(restored, path, generation=3) == 1000
+    assert np.array_equal(restored.codebooks, trained.codebooks)
+
+    # Stale generation or a different code layout: nothing is valid
+    assert load_quantizer(ProductQuantizer(DIMENSION, subvectors=8), path, generation=4) == 0
+    assert load_quantizer(ProductQuantizer(DIMENSION, subvectors=16), path, generation=3) == 0
+    assert load_quantizer(Int8Quantizer(DIMENSION), path, generation=3) == 0
+    assert load_quantizer(Int8Quantizer(DIMENSION), tmp_path / "missing.npz", generation=3) == 0
+
+
+def test_create_quantizer():
+    assert create_quantizer("none", DIMENSION) is None
+    assert isinstance(create_quantizer("int8", DIMENSION), Int8Quantizer)
+    assert create_quantizer("pq", DIMENSION, pq_subvectors=8).subvectors == 8
+    with pytest.raises(ValueError):
+        create_quantizer("pq", DIMENSION, pq_subvectors=5)
+    with pytest.raises(ValueError):
+        create_quantizer("fp16", DIMENSION)
@@ -0,0 +1,51 @@
+"""
+Tests for the cross-encoder re-ranker's latency budget.
+"""
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sentence_transformers")
+
+from backend.rag.reranker import CrossEncoderReranker  # noqa: E402
+
+
+class SlowModel:
+    """Scores by text length once released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.batches = 0
+
+    def predict(self, pairs, **kwargs):
+        self.batches += 1
+        self.release.wait(5)
+        return np.array([len(text) for _, text in pairs], dtype=np.float32)
+
+
+def _documents(*texts):
+    return [{"id": str(i), "text": text} for i, text in enumerate(texts)]
+
+
+def test_overdue_batch_is_not_joined_by_another():
+    reranker = CrossEncoderReranker()
+    reranker.model = model = SlowModel()
+
+    async def run():
+        first = await reranker.arerank("q1", _documents("a", "bbb"), top_n=1, budget_ms=20)
+        second = await reranker.arerank("q2", _documents("cc", "d"), top_n=1, budget_ms=20)
+        model.release.set()
+        while reranker.get_metrics()["overdue_batches"]:
+            await asyncio.sleep(0.01)
+        third = await reranker.arerank("q1", _documents("a", "bbb"), top_n=1, budget_ms=1000)
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first == (_documents("a"), False)
+    assert second == (_documents("cc"), False)
+    # Only the first question was scored; its scores were cached in the background
+    assert model.batches == 1
+    assert third[1] is True and third[0][0]["id"] == "1"
+    assert reranker.get_metrics()["busy_skips"] == 1
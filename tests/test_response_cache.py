@@ -0,0 +1,18 @@
+"""
+Tests for the LLM response cache.
+"""
+import time
+
+from backend.llm.response_cache import SharedStateResponseCache
+from backend.utils.shared_state import SQLiteSharedState
+
+
+def test_shared_state_responses_expire_without_a_ttl(tmp_path, monkeypatch):
+    state = SQLiteSharedState(str(tmp_path / "state.sqlite"))
+    cache = SharedStateResponseCache(state, ttl_seconds=0)
+    cache.put("key", "Hello!")
+    assert cache.get("key") == "Hello!" and len(cache) == 1
+
+    later = time.time() + cache.ttl_seconds + 1
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get("key") is None and len(cache) == 0
@@ -0,0 +1,82 @@
+"""
+Reconciling client-sent history (old_messages) with a session's stored turns.
+
+Two SessionManagers sharing one SQLite session store stand in for two
+workers; ChatGroq is the fake chat model from the streaming tests.
+"""
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_groq")
+
+from .test_langchain_streaming import REPLY, FakeChatGroq  # noqa: E402  (sets GROQ_API_KEY)
+
+from backend.agent import langchain_agent  # noqa: E402
+from backend.agent.session_store import SQLiteSessionStore  # noqa: E402
+
+SESSION = "reconcile-test"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(langchain_agent, "ChatGroq", FakeChatGroq)
+    return SQLiteSessionStore(str(tmp_path / "sessions.sqlite"))
+
+
+def worker(store):
+    return langchain_agent.SessionManager(store=store)
+
+
+def stored(store):
+    record = store.load(SESSION)
+    return [(user, assistant) for user, assistant, _ in record.turns] if record else []
+
+
+def history(*pairs):
+    return [{"user": user, "assistant": assistant} for user, assistant in pairs]
+
+
+def test_resent_full_history_adds_only_new_turns(store):
+    agent = worker(store).get(SESSION)
+    agent.invoke("hi")
+    agent.invoke("balance?", old_messages=history(("hi", REPLY)))
+    assert stored(store) == [("hi", REPLY), ("balance?", REPLY)]
+
+    # The client also had a turn this session never saw
+    agent.invoke("thanks", old_messages=history(("hi", REPLY), ("balance?", REPLY), ("offline", "noted")))
+    assert stored(store) == [("hi", REPLY), ("balance?", REPLY), ("offline", "noted"), ("thanks", REPLY)]
+
+
+def test_repeated_identical_turn_is_added_per_repetition(store):
+    agent = worker(store).get(SESSION)
+    agent.invoke("first", old_messages=history(("thanks", "welcome"), ("thanks", "welcome")))
+    assert stored(store) == [("thanks", "welcome"), ("thanks", "welcome"), ("first", REPLY)]
+
+    # Resending both plus a third repetition adds only the third
+    repeated = history(("thanks", "welcome"), ("thanks", "welcome"), ("first", REPLY), ("thanks", "welcome"))
+    agent.invoke("second", old_messages=repeated)
+    assert stored(store) == [
+        ("thanks", "welcome"), ("thanks", "welcome"), ("first", REPLY), ("thanks", "welcome"), ("second", REPLY)
+    ]
+
+
+def test_turns_added_on_another_worker_are_not_duplicated(store):
+    first, second = worker(store), worker(store)
+    second.get(SESSION)  # Live on both workers before the turn below
+    first.get(SESSION).invoke("hi")
+
+    second.get(SESSION).invoke("balance?", old_messages=history(("hi", REPLY)))
+    assert stored(store) == [("hi", REPLY), ("balance?", REPLY)]
+
+
+def test_session_cleared_on_another_worker_is_reset(store):
+    first, second = worker(store), worker(store)
+    first.get(SESSION).invoke("hi")
+    agent = second.get(SESSION)  # Restored with the "hi" turn
+    assert first.remove(SESSION)
+    assert stored(store) == []
+
+    # The resent turn is no longer in the session, so it is added back
+    agent.invoke("balance?", old_messages=history(("hi", REPLY)))
+    assert stored(store) == [("hi", REPLY), ("balance?", REPLY)]
+    assert [m["content"] for m in agent.get_memory_history()][:2] == ["hi", REPLY]
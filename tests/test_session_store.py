@@ -0,0 +1,80 @@
+"""
+Tests for the persistent session stores.
+"""
+import time
+
+import pytest
+
+from backend.agent.session_store import (
+    JSONLSessionStore, SQLiteSessionStore, SharedStateSessionStore, turn_hash
+)
+from backend.utils.shared_state import SQLiteSharedState
+
+
+def _turns(*pairs):
+    return [(user, assistant, turn_hash(user, assistant)) for user, assistant in pairs]
+
+
+@pytest.fixture(params=["sqlite", "jsonl", "shared_state"])
+def make_store(request, tmp_path):
+    def make(retention_seconds: float = 0):
+        if request.param == "sqlite":
+            return SQLiteSessionStore(str(tmp_path / "sessions.sqlite"), retention_seconds=retention_seconds)
+        if request.param == "jsonl":
+            return JSONLSessionStore(str(tmp_path / "sessions"), retention_seconds=retention_seconds)
+        return SharedStateSessionStore(SQLiteSharedState(str(tmp_path / "state.sqlite")), retention_seconds)
+    return make
+
+
+def test_append_load_and_count(make_store):
+    store = make_store()
+    store.append_turns("s1", _turns(("hi", "hello")))
+    store.save_summary("s1", "greeting", 1)
+    store.append_turns("s1", _turns(("balance?", "$10"), ("thanks", "welcome")))
+
+    record = store.load("s1")
+    assert [turn[0] for turn in record.turns] == ["hi", "balance?", "thanks"]
+    assert (record.summary, record.summarized_turns) == ("greeting", 1)
+    assert store.turn_count("s1") == 3
+    assert store.turn_count("unknown") == 0
+    assert store.load("unknown") is None
+
+    store.delete("s1")
+    assert store.turn_count("s1") == 0
+    assert store.load("s1") is None
+
+
+def test_turn_count_sees_appends_by_another_store(make_store):
+    first, second = make_store(), make_store()
+    first.append_turns("s1", _turns(("a", "1")))
+    assert second.turn_count("s1") == 1
+    first.append_turns("s1", _turns(("b", "2"), ("c", "3")))
+    assert second.turn_count("s1") == 3
+    first.delete("s1")
+    first.append_turns("s1", _turns(("d", "4"), ("e", "5"), ("f", "6"), ("g", "7")))
+    assert second.turn_count("s1") == 4
+
+
+def test_sessions_expire_after_retention(make_store):
+    store = make_store(retention_seconds=0.2)
+    store.append_turns("old", _turns(("a", "1")))
+    store.save_summary("old", "summary", 1)
+    time.sleep(0.3)
+    store.append_turns("new", _turns(("b", "2")))
+    if hasattr(store, "purge_expired"):
+        store.purge_expired()
+
+    assert store.load("old") is None
+    assert store.turn_count("old") == 0
+    assert store.turn_count("new") == 1
+
+
+def test_jsonl_turn_count_reads_only_appended_bytes(tmp_path, monkeypatch):
+    store = JSONLSessionStore(str(tmp_path))
+    store.append_turns("s1", _turns(*[(f"q{i}", f"a{i}") for i in range(50)]))
+    assert store.turn_count("s1") == 50
+
+    monkeypatch.setattr(store, "load", lambda session_id: pytest.fail("turn_count re-parsed the log"))
+    store.save_summary("s1", "summary", 40)
+    store.append_turns("s1", _turns(("q50", "a50")))
+    assert store.turn_count("s1") == 51
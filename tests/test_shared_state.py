@@ -0,0 +1,73 @@
+"""
+Tests for the shared state layer.
+
+The Redis backend runs against fakeredis, a local stand-in for a server.
+"""
+import time
+
+import pytest
+
+from backend.utils.shared_state import RedisSharedState, SQLiteSharedState
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_state(request, tmp_path):
+    """Factory for handles on one shared store, as separate workers would hold."""
+    if request.param == "sqlite":
+        path = str(tmp_path / "state.sqlite")
+        return lambda: SQLiteSharedState(path)
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis runs the Lua scripts behind Redis locks with it
+    server = fakeredis.FakeServer()
+    return lambda: RedisSharedState(fakeredis.FakeRedis(server=server, decode_responses=True))
+
+
+def test_values_and_logs_are_shared(make_state):
+    first, second = make_state(), make_state()
+
+    first.set("key", "value")
+    assert second.get("key") == "value"
+    assert second.incr("counter") == 1 and first.incr("counter", 2) == 3
+
+    assert first.append("log", "a") == 1
+    assert second.append_many("log", ["b", "c"]) == 3
+    assert first.read_log("log", after=1) == [(2, "b"), (3, "c")]
+    assert second.log_length("log") == 3
+
+    second.delete("key", "log")
+    assert first.get("key") is None and first.log_length("log") == 0
+
+
+def test_renewed_lock_outlives_its_timeout(make_state):
+    holder, other = make_state(), make_state()
+
+    with holder.lock("index", timeout=0.3) as renew:
+        for _ in range(3):
+            time.sleep(0.15)
+            assert renew() is True
+        with pytest.raises(TimeoutError):
+            with other.lock("index", timeout=0.3, wait=0.05):
+                pass
+
+
+def test_renew_reports_a_lost_lock(make_state):
+    holder, other = make_state(), make_state()
+
+    with holder.lock("index", timeout=0.1) as renew:
+        time.sleep(0.15)
+        # Expired: another worker takes it over
+        with other.lock("index", timeout=10, wait=0.05):
+            assert renew() is False
+
+
+def test_releasing_an_expired_lock_does_not_raise(make_state):
+    holder, other = make_state(), make_state()
+
+    with holder.lock("banking", timeout=0.1):
+        time.sleep(0.15)  # The work is done, but the lock expired meanwhile
+
+    # And the expired holder did not release a lock taken over by another worker
+    with holder.lock("banking", timeout=0.1):
+        time.sleep(0.15)
+        with other.lock("banking", timeout=10, wait=0.05):
+            pass
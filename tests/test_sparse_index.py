@@ -0,0 +1,101 @@
+"""
+Tests for the BM25 sparse index and its compressed postings.
+"""
+import numpy as np
+
+from backend.rag.sparse_index import SparseIndex, _narrowest_uint, _Postings
+
+
+def test_narrowest_uint():
+    assert _narrowest_uint(np.array([0, 255])).dtype == np.uint8
+    assert _narrowest_uint(np.array([256])).dtype == np.uint16
+    assert _narrowest_uint(np.array([70000])).dtype == np.uint32
+    assert _narrowest_uint(np.array([2**33])).dtype == np.uint64
+    assert _narrowest_uint(np.array([], dtype=np.int64)).dtype == np.uint8
+
+
+def test_postings_round_trip():
+    docs = np.array([3, 4, 300, 70300, 70301], dtype=np.int64)
+    tfs = np.array([1, 2, 1, 400, 1], dtype=np.float32)
+    postings = _Postings.encode(docs, tfs)
+    assert postings.first == 3
+    assert postings.deltas.dtype == np.uint32  # Largest gap is 70000
+    assert postings.tfs.dtype == np.uint16
+
+    postings.append(70500, 7)
+    assert len(postings) == 6
+    decoded_docs, decoded_tfs = postings.decode()
+    assert decoded_docs.tolist() == docs.tolist() + [70500]
+    assert decoded_tfs.tolist() == tfs.tolist() + [7]
+
+    # Tail merged into a new block, as on flush
+    merged = _Postings.encode(decoded_docs, decoded_tfs)
+    assert not merged.tail_docs
+    assert [a.tolist() for a in merged.decode()] == [a.tolist() for a in postings.decode()]
+
+
+def test_empty_and_single_postings():
+    empty = _Postings.encode(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+    assert len(empty) == 0
+    assert [a.tolist() for a in empty.decode()] == [[], []]
+
+    single = _Postings.encode(np.array([42]), np.array([3]))
+    assert len(single.deltas) == 0
+    assert [a.tolist() for a in single.decode()] == [[42], [3]]
+
+
+def _index(path):
+    index = SparseIndex(str(path))
+    texts = {
+        "a": "credit card annual fee",
+        "b": "savings account interest rate",
+        "c": "credit card interest rate and credit limit",
+        "d": "رسوم البطاقة الائتمانية",
+    }
+    index.add(list(texts), list(texts.values()), [{"file_path": f"{key}.txt"} for key in texts])
+    return index
+
+
+def test_search_ranks_by_bm25(tmp_path):
+    index = _index(tmp_path / "sparse.npz")
+    results = index.search("credit", 10)
+    assert [chunk_id for chunk_id, _ in results] == ["c", "a"]  # "c" mentions credit twice
+    assert results[0][1] > results[1][1] > 0
+    assert [chunk_id for chunk_id, _ in index.search("بطاقة", 10)] == ["d"]  # Definite article stripped
+    assert index.search("mortgage", 10) == []
+
+
+def test_flush_and_load_round_trip(tmp_path):
+    path = tmp_path / "sparse.npz"
+    index = _index(path)
+    index.remove(["b"])
+    index.flush()
+    expected = index.search("interest rate credit", 10)
+
+    reopened = SparseIndex(str(path))
+    assert reopened.count() == 3
+    assert reopened.search("interest rate credit", 10) == expected
+
+    # Appends to a loaded block and removals by file survive another round trip
+    reopened.add(["e"], ["interest free credit"], [{"file_path": "e.txt"}])
+    reopened.remove_file("a.txt")
+    reopened.flush()
+    again = SparseIndex(str(path))
+    assert again.count() == 3
+    assert sorted(chunk_id for chunk_id, _ in again.search("credit", 10)) == ["c", "e"]
+
+
+def test_compaction_keeps_results(tmp_path):
+    path = tmp_path / "sparse.npz"
+    index = SparseIndex(str(path))
+    ids = [f"chunk-{i}" for i in range(1000)]
+    index.add(ids, [f"term{i % 7} common word{i}" for i in range(1000)])
+    index.flush()
+    # Removing most chunks makes the next flush renumber the rest
+    index.remove(ids[:900])
+    before = index.search("term3 common", 20)
+    index.flush()
+
+    assert len(index._doc_ids) == 100
+    assert index.search("term3 common", 20) == before
+    assert SparseIndex(str(path)).search("term3 common", 20) == before